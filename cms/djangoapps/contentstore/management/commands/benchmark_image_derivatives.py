@@ -0,0 +1,94 @@
+"""
+Benchmark generating the thumbnail and the downsized variants of images.
+
+Times generate_thumbnail and generate_image_variants on each image of a
+directory, against decoding each image at full size for the thumbnail and
+for each variant, as the thumbnail used to be generated. Nothing is stored.
+"""
+import mimetypes
+import os
+import StringIO
+from optparse import make_option
+from timeit import default_timer
+
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+from xmodule.contentstore.content import ContentStore, IMAGE_VARIANT_SIZES, StaticContent, THUMBNAIL_SIZE
+from opaque_keys.edx.keys import CourseKey
+
+
+class DiscardingContentStore(ContentStore):
+    """
+    A content store which discards what is saved and deleted.
+    """
+    def save(self, content):
+        return content
+
+    def delete(self, location_or_id):
+        pass
+
+
+def full_size_derivatives(path):
+    """
+    Generate the thumbnail and the variants of the image at `path`, decoding it at full size for each of them.
+    """
+    for size in (THUMBNAIL_SIZE,) + tuple((variant_size, variant_size) for variant_size in IMAGE_VARIANT_SIZES):
+        im = Image.open(path).convert('RGB')
+        im.thumbnail(size, Image.ANTIALIAS)
+        im.save(StringIO.StringIO(), 'JPEG')
+
+
+class Command(BaseCommand):
+    """
+    Time generating the derivatives of the images of a directory.
+    """
+    help = __doc__
+    args = '<image directory>'
+
+    option_list = BaseCommand.option_list + (
+        make_option('--course', dest='course', default='course-v1:Benchmark+Images+run',
+                    help='Id of the course the images are assets of'),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError('benchmark_image_derivatives requires one argument: <image directory>')
+
+        course_key = CourseKey.from_string(options['course'])
+        store = DiscardingContentStore()
+        totals = {'full size': 0.0, 'derivatives': 0.0}
+        count = 0
+        for filename in sorted(os.listdir(args[0])):
+            path = os.path.join(args[0], filename)
+            try:
+                width, height = Image.open(path).size
+            except IOError:
+                # not an image
+                continue
+            with open(path, 'rb') as image_file:
+                content = StaticContent(
+                    StaticContent.compute_location(course_key, filename), filename,
+                    mimetypes.guess_type(filename)[0] or 'image/jpeg', image_file.read()
+                )
+
+            start = default_timer()
+            full_size_derivatives(path)
+            full_size = default_timer() - start
+
+            start = default_timer()
+            store.generate_thumbnail(content)
+            store.generate_image_variants(content)
+            derivatives = default_timer() - start
+
+            self.stdout.write(u'{} ({}x{}): {:.0f} ms at full size, {:.0f} ms\n'.format(
+                filename, width, height, full_size * 1000, derivatives * 1000
+            ))
+            totals['full size'] += full_size
+            totals['derivatives'] += derivatives
+            count += 1
+
+        if not count:
+            raise CommandError('No images found in {}'.format(args[0]))
+        for name in ('full size', 'derivatives'):
+            self.stdout.write(u'{}: {:.0f} ms per image\n'.format(name, totals[name] * 1000 / count))
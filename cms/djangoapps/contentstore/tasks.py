@@ -10,11 +10,16 @@ from pytz import UTC
 
 from django.contrib.auth.models import User
 
+from cache_toolbox.core import del_cached_content
+
 from contentstore.courseware_index import CoursewareSearchIndexer, LibrarySearchIndexer, SearchIndexingError
 from contentstore.utils import initialize_permissions
 from course_action_state.models import CourseRerunState
 from opaque_keys.edx.keys import CourseKey
+from xmodule.contentstore.content import IMAGE_VARIANT_SIZES, StaticContent
+from xmodule.contentstore.django import contentstore
 from xmodule.course_module import CourseFields
+from xmodule.exceptions import NotFoundError
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import DuplicateCourseError, ItemNotFoundError
 
@@ -125,3 +130,31 @@ def push_course_update_task(course_key_string, course_subscription_id, course_di
     # TODO Use edx-notifications library instead (MA-638).
     from .push_notification import send_push_course_update
     send_push_course_update(course_key_string, course_subscription_id, course_display_name)
+
+
+@task()
+def generate_asset_derivatives(course_key_string, asset_name):
+    """
+    Generates the thumbnail and the downsized variants of an uploaded course asset, off the request path.
+    """
+    course_key = CourseKey.from_string(course_key_string)
+    asset_key = course_key.make_asset_key('asset', asset_name)
+    store = contentstore()
+    try:
+        content = store.find(asset_key)
+    except NotFoundError:
+        # the asset was deleted since the task was queued
+        LOGGER.warning('Asset %s not found, not generating its derivatives', asset_key)
+        return
+
+    thumbnail_content, thumbnail_location = store.generate_thumbnail(content)
+    if thumbnail_content is None and content.thumbnail_location is not None:
+        # stop referring to a thumbnail which couldn't be created
+        store.set_attr(asset_key, 'thumbnail_location', None)
+        del_cached_content(asset_key)
+    del_cached_content(thumbnail_location)
+
+    store.generate_image_variants(content)
+    # variants of all sizes were either replaced or deleted
+    for size in IMAGE_VARIANT_SIZES:
+        del_cached_content(StaticContent.compute_image_variant_location(asset_key, size))
@@ -1,6 +1,12 @@
+from time import time
+
 from cache_toolbox.core import get_cached_content, set_cached_content, del_cached_content
+from cache_toolbox.local_content import get_local_content_cache
 from opaque_keys.edx.locations import Location
+from django.core.cache import cache
 from django.test import TestCase
+from django.test.utils import override_settings
+from mock import patch
 
 
 class Content(object):
@@ -38,3 +44,80 @@ class CachingTestCase(TestCase):
                          'should not be stored in cache with unicodeLocation')
         self.assertEqual(None, get_cached_content(self.nonUnicodeLocation),
                          'should not be stored in cache with nonUnicodeLocation')
+
+
+class StaticContent(Content):
+    """
+    Mock cached content, with a known length
+    """
+    def __init__(self, location, content):
+        super(StaticContent, self).__init__(location, content)
+        self.length = len(content)
+
+
+@override_settings(STATIC_CONTENT_MEMORY_CACHE={'MAX_BYTES': 100, 'TIMEOUT': 60, 'CHECK_INTERVAL': 5})
+class LocalContentCachingTestCase(TestCase):
+    """
+    Tests of the local content cache in front of the shared cache.
+    """
+    location = Location(u'c4x', u'mitX', u'800', u'run', u'asset', u'small.jpg')
+
+    def setUp(self):
+        super(LocalContentCachingTestCase, self).setUp()
+        self.local_cache = get_local_content_cache()
+        self.local_cache.clear()
+        self.addCleanup(self.local_cache.clear)
+
+    def test_served_from_local_cache(self):
+        asset = StaticContent(self.location, 'my content')
+        set_cached_content(asset)
+        with patch.object(cache, 'get', wraps=cache.get) as mock_get:
+            self.assertIs(get_cached_content(self.location), asset)
+        self.assertFalse(mock_get.called)
+
+        # once CHECK_INTERVAL has passed, only the generation of the content is read from the shared cache
+        with patch('cache_toolbox.core.time', return_value=time() + 6):
+            with patch.object(cache, 'get', wraps=cache.get) as mock_get:
+                self.assertIs(get_cached_content(self.location), asset)
+        self.assertEqual(mock_get.call_count, 1)
+
+    def test_shared_cache_hit_cached_locally(self):
+        set_cached_content(StaticContent(self.location, 'my content'))
+        self.local_cache.clear()
+        self.assertEqual(get_cached_content(self.location).content, 'my content')
+        self.assertEqual(len(self.local_cache), 1)
+
+    def test_delete(self):
+        set_cached_content(StaticContent(self.location, 'my content'))
+        del_cached_content(self.location)
+        self.assertIsNone(get_cached_content(self.location))
+        self.assertEqual(self.local_cache.current_bytes, 0)
+
+    def test_deleted_by_other_process(self):
+        set_cached_content(StaticContent(self.location, 'my content'))
+        # Studio deletes the content without a local content cache
+        with patch('cache_toolbox.core.get_local_content_cache', return_value=None):
+            del_cached_content(self.location)
+        # which is no longer served once CHECK_INTERVAL has passed
+        with patch('cache_toolbox.core.time', return_value=time() + 6):
+            self.assertIsNone(get_cached_content(self.location))
+
+    def test_expiry(self):
+        set_cached_content(StaticContent(self.location, 'my content'))
+        with patch('cache_toolbox.local_content.time', return_value=time() + 61):
+            self.assertIsNone(self.local_cache.get(unicode(self.location)))
+        self.assertEqual(self.local_cache.current_bytes, 0)
+
+    def test_byte_budget(self):
+        locations = [self.location.replace(name='asset{}.jpg'.format(index)) for index in range(3)]
+        for location in locations:
+            set_cached_content(StaticContent(location, 'x' * 40))
+        # only the two most recently cached assets fit in 100 bytes
+        self.assertEqual(len(self.local_cache), 2)
+        self.assertIsNone(self.local_cache.get(unicode(locations[0])))
+        self.assertIsNotNone(self.local_cache.get(unicode(locations[2])))
+        self.assertLessEqual(self.local_cache.current_bytes, 100)
+
+    @override_settings(STATIC_CONTENT_MEMORY_CACHE={'MAX_BYTES': 0})
+    def test_disabled(self):
+        self.assertIsNone(get_local_content_cache())
@@ -13,10 +13,11 @@ from django.conf import settings
 from edxmako.shortcuts import render_to_response
 from cache_toolbox.core import del_cached_content
 
+from contentstore.tasks import generate_asset_derivatives
 from contentstore.utils import reverse_course_url
 from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore
-from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore.content import IMAGE_VARIANT_SIZES, StaticContent, is_image
 from xmodule.exceptions import NotFoundError
 from django.core.exceptions import PermissionDenied
 from opaque_keys.edx.keys import CourseKey, AssetKey
@@ -259,27 +260,24 @@ def _upload_asset(request, course_key):
     sc_partial = partial(StaticContent, content_loc, filename, mime_type)
     if chunked:
         content = sc_partial(upload_file.chunks())
-        tempfile_path = upload_file.temporary_file_path()
     else:
         content = sc_partial(upload_file.read())
-        tempfile_path = None
 
-    # first let's see if a thumbnail can be created
-    (thumbnail_content, thumbnail_location) = contentstore().generate_thumbnail(
-        content,
-        tempfile_path=tempfile_path,
+    # the thumbnail and the downsized variants of images are generated in a celery task,
+    # so their location is computed here and only unset by the task if it fails
+    thumbnail_location = StaticContent.compute_location(
+        course_key, StaticContent.generate_thumbnail_name(content.location.name), is_thumbnail=True
     )
-
     # delete cached thumbnail even if one couldn't be created this time (else
     # the old thumbnail will continue to show)
     del_cached_content(thumbnail_location)
-    # now store thumbnail location only if we could create it
-    if thumbnail_content is not None:
+    if is_image(content):
         content.thumbnail_location = thumbnail_location
 
     # then commit the content
     contentstore().save(content)
     del_cached_content(content.location)
+    generate_asset_derivatives.delay(unicode(course_key), content.location.name)
 
     # readback the saved content - we need the database timestamp
     readback = contentstore().find(content.location)
@@ -334,6 +332,10 @@ def _update_asset(request, course_key, asset_key):
             except:
                 logging.warning('Could not delete thumbnail: %s', thumbnail_location)
 
+        # the downsized variants of images are only derived from them, so aren't kept in the trashcan
+        for variant_location in contentstore().delete_image_variants(content.location):
+            del_cached_content(variant_location)
+
         # delete the original
         contentstore().delete(content.get_id())
         # remove from cache
@@ -352,6 +354,14 @@ def _update_asset(request, course_key, asset_key):
             contentstore().set_attr(asset_key, 'locked', modified_asset['locked'])
             # Delete the asset from the cache so we check the lock status the next time it is requested.
             del_cached_content(asset_key)
+            # downsized variants of images are served in place of the original, so share its lock
+            for size in IMAGE_VARIANT_SIZES:
+                variant_location = StaticContent.compute_image_variant_location(asset_key, size)
+                try:
+                    contentstore().set_attr(variant_location, 'locked', modified_asset['locked'])
+                except NotFoundError:
+                    continue
+                del_cached_content(variant_location)
             return JsonResponse(modified_asset, status=201)
 
 
@@ -13,11 +13,13 @@ from xmodule.assetstore.assetmgr import AssetMetadataFoundTemporary
 from xmodule.assetstore import AssetMetadata
 from xmodule.contentstore.content import StaticContent
 from xmodule.contentstore.django import contentstore
+from xmodule.exceptions import NotFoundError
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.xml_importer import import_course_from_xml
 from django.test.utils import override_settings
 from opaque_keys.edx.locations import SlashSeparatedCourseKey, AssetLocation
+from PIL import Image
 from static_replace import replace_static_urls
 import mock
 from ddt import ddt
@@ -259,6 +261,25 @@ class UploadTestCase(AssetsTestCase):
         resp = self.upload_asset()
         self.assertEquals(resp.status_code, 200)
 
+    def test_image_derivatives(self):
+        image_file = BytesIO()
+        Image.new('RGB', (1000, 500)).save(image_file, 'PNG')
+        image_file.name = 'image.png'
+        image_file.seek(0)
+        resp = self.client.post(self.url, {"name": "image", "file": image_file})
+        self.assertEquals(resp.status_code, 200)
+        thumbnail_url = json.loads(resp.content)['asset']['thumbnail']
+        self.assertIsNotNone(thumbnail_url)
+
+        # the derivatives were generated by the celery task, which runs eagerly in tests
+        asset_key = self.course.id.make_asset_key('asset', 'image.png')
+        contentstore().find(StaticContent.get_location_from_path(thumbnail_url))
+        for size in (320, 640):
+            variant = contentstore().find(StaticContent.compute_image_variant_location(asset_key, size))
+            self.assertEquals(variant.content_type, 'image/jpeg')
+        with self.assertRaises(NotFoundError):
+            contentstore().find(StaticContent.compute_image_variant_location(asset_key, 1280))
+
     def test_no_file(self):
         resp = self.client.post(self.url, {"name": "file.txt"}, "application/json")
         self.assertEquals(resp.status_code, 400)
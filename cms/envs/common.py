@@ -167,6 +167,14 @@ FEATURES = {
 
 ENABLE_JASMINE = False
 
+# Connections to the comments service, which Studio uses to create the users
+# of the forums. See the LMS settings.
+COMMENTS_SERVICE_CONNECTION = {
+    'POOL_MAXSIZE': 10,
+    'TIMEOUT': 5,
+    'MAX_RETRIES': 1,
+}
+
 
 ############################# SET PATH INFORMATION #############################
 PROJECT_ROOT = path(__file__).abspath().dirname().dirname()  # /edx-platform/cms
@@ -729,6 +737,7 @@ INSTALLED_APPS = (
     'edx_jsme',    # Molecular Structure
 
     'openedx.core.djangoapps.content.course_structures',
+    'openedx.core.djangoapps.content.course_overviews',
 
     # Credit courses
     'openedx.core.djangoapps.credit',
@@ -8,11 +8,15 @@ Core methods
 
 """
 
+from time import time
+from uuid import uuid4
+
 from django.core.cache import cache
 from django.db import DEFAULT_DB_ALIAS
 from opaque_keys import InvalidKeyError
 
 from . import app_settings
+from .local_content import get_local_content_cache
 
 
 def get_instance(model, instance_or_pk, timeout=None, using=None):
@@ -110,12 +114,106 @@ def instance_key(model, instance_or_pk):
     )
 
 
+def _content_size(content):
+    """
+    Returns the size in bytes of the data of `content`, or None if unknown.
+    """
+    length = getattr(content, 'length', None)
+    if length is None and isinstance(getattr(content, 'data', None), basestring):
+        length = len(content.data)
+    return length
+
+
+def _content_generation_key(key):
+    """
+    Returns the cache key of the generation of the content cached under `key`.
+    """
+    return 'generation:' + key
+
+
+def _get_content_generation(key):
+    """
+    Returns the generation of the content cached under `key`: a token kept in
+    the shared cache, which changes whenever the content is deleted from it by
+    any process. Returns None if the shared cache can't hold it.
+    """
+    generation_key = _content_generation_key(key)
+    generation = cache.get(generation_key)
+    if generation is None:
+        cache.add(generation_key, uuid4().hex)
+        generation = cache.get(generation_key)
+    return generation
+
+
 def set_cached_content(content):
-    cache.set(unicode(content.location).encode("utf-8"), content)
+    """
+    Caches `content` in the shared cache, and in the local content cache of
+    this process if it is enabled.
+    """
+    key = unicode(content.location).encode("utf-8")
+    cache.set(key, content)
+    cache.delete(_missing_content_key(key))
+
+    local_cache = get_local_content_cache()
+    size = _content_size(content)
+    if local_cache is not None and size is not None:
+        generation = _get_content_generation(key)
+        if generation is not None:
+            local_cache.set(key, [generation, content, time()], size)
 
 
 def get_cached_content(location):
-    return cache.get(unicode(location).encode("utf-8"))
+    """
+    Returns the content cached for `location`, or None if it isn't cached.
+
+    The content is served from the local content cache of this process if it
+    was cached there since its current generation started. The generation is
+    checked at most every `check_interval` seconds, so content deleted by any
+    process stops being served from the local cache within that interval.
+    """
+    key = unicode(location).encode("utf-8")
+    local_cache = get_local_content_cache()
+    if local_cache is None:
+        return cache.get(key)
+
+    # entries are [generation, content, time the generation was last checked]
+    entry = local_cache.get(key)
+    if entry is not None and time() < entry[2] + local_cache.check_interval:
+        return entry[1]
+
+    generation = _get_content_generation(key)
+    if entry is not None and entry[0] == generation:
+        entry[2] = time()
+        return entry[1]
+
+    content = cache.get(key)
+    size = _content_size(content)
+    if content is not None and generation is not None and size is not None:
+        local_cache.set(key, [generation, content, time()], size)
+    return content
+
+
+def _missing_content_key(key):
+    """
+    Returns the cache key recording that there is no content at the location
+    whose content is cached under `key`.
+    """
+    return 'missing:' + key
+
+
+def set_missing_content(location):
+    """
+    Records in the shared cache that there is no content at `location`, until
+    content is cached or deleted for it.
+    """
+    cache.set(_missing_content_key(unicode(location).encode("utf-8")), True)
+
+
+def is_missing_content(location):
+    """
+    Returns whether it is recorded that there is no content at `location`.
+    """
+    return cache.get(_missing_content_key(unicode(location).encode("utf-8")), False)
 
 
 def del_cached_content(location):
@@ -123,6 +221,10 @@ def del_cached_content(location):
     delete content for the given location, as well as for content with run=None.
     it's possible that the content could have been cached without knowing the
     course_key - and so without having the run.
+
+    Its generation is deleted along with it, so that other processes stop
+    serving it from their local content caches too. Any record that there is
+    no content at the location is removed as well.
     """
     def location_str(loc):
         return unicode(loc).encode("utf-8")
@@ -134,4 +236,13 @@ def del_cached_content(location):
         # although deprecated keys allowed run=None, new keys don't if there is no version.
         pass
 
-    cache.delete_many(locations)
+    cache.delete_many(
+        locations +
+        [_content_generation_key(key) for key in locations] +
+        [_missing_content_key(key) for key in locations]
+    )
+
+    local_cache = get_local_content_cache()
+    if local_cache is not None:
+        for key in locations:
+            local_cache.delete(key)
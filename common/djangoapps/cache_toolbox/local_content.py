@@ -0,0 +1,141 @@
+"""
+A per-process cache of static content, in front of the shared cache used by
+``get_cached_content`` and ``set_cached_content``.
+
+Hot assets such as course thumbnails can then be served without fetching
+them from memcached. Each entry records the generation of the content in the
+shared cache when it was cached, and ``get_cached_content`` only serves it
+while that generation is current: ``del_cached_content`` deletes the
+generation, so an asset changed, locked or deleted in any process is no
+longer served from the cache of any other. The generation is checked at most
+every ``CHECK_INTERVAL`` seconds, which bounds how long such an asset can
+still be served. Entries also expire after ``TIMEOUT`` seconds.
+
+The cache is configured with ``settings.STATIC_CONTENT_MEMORY_CACHE``, and is
+disabled unless ``MAX_BYTES`` is positive.
+"""
+from collections import OrderedDict
+import threading
+from time import time
+
+from django.conf import settings
+
+import dogstats_wrapper as dog_stats_api
+
+METRIC_PREFIX = 'cache_toolbox.local_content.'
+
+
+def _increment(metric, value=1):
+    """
+    Increment the local content cache `metric`.
+    """
+    dog_stats_api.increment(METRIC_PREFIX + metric, value)
+
+
+class LocalContentCache(object):
+    """
+    A thread-safe LRU cache of content objects, holding at most `max_bytes`
+    bytes of content, each for at most `timeout` seconds. Users of the cache
+    check that its content is still current every `check_interval` seconds.
+
+    The cached objects are shared by the threads of the process, and must
+    not be modified.
+    """
+    def __init__(self, max_bytes, timeout, check_interval=0):
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the content cached under `key`, or None.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                content, size, expires_at = entry
+                if expires_at > time():
+                    # re-insert the entry to mark it as the most recently used
+                    self._entries[key] = entry
+                else:
+                    self.current_bytes -= size
+                    content = None
+                    _increment('expired')
+            else:
+                content = None
+
+        _increment('hit' if content is not None else 'miss')
+        return content
+
+    def set(self, key, content, size):
+        """
+        Cache `content`, which is `size` bytes long, under `key`, evicting the
+        least recently used content to stay within `max_bytes`.
+        """
+        if size > self.max_bytes:
+            _increment('too_large')
+            return
+
+        evictions = 0
+        with self._lock:
+            self._remove(key)
+            while self._entries and self.current_bytes + size > self.max_bytes:
+                __, (__, evicted_size, __) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                evictions += 1
+            self._entries[key] = (content, size, time() + self.timeout)
+            self.current_bytes += size
+
+        if evictions:
+            _increment('eviction', evictions)
+        dog_stats_api.histogram(METRIC_PREFIX + 'bytes', self.current_bytes)
+
+    def delete(self, key):
+        """
+        Remove the content cached under `key`, if any.
+        """
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        """
+        Empty the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        """
+        Remove the entry of `key`. The lock must be held.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[1]
+
+
+# The local content cache of this process.
+_LOCAL_CONTENT_CACHE = LocalContentCache(0, 0)
+
+
+def get_local_content_cache():
+    """
+    Return the local content cache of this process, configured by
+    `settings.STATIC_CONTENT_MEMORY_CACHE`, or None if it is disabled.
+    """
+    config = getattr(settings, 'STATIC_CONTENT_MEMORY_CACHE', None) or {}
+    max_bytes = config.get('MAX_BYTES', 0)
+    if max_bytes <= 0:
+        return None
+    if max_bytes < _LOCAL_CONTENT_CACHE.current_bytes:
+        _LOCAL_CONTENT_CACHE.clear()
+    _LOCAL_CONTENT_CACHE.max_bytes = max_bytes
+    _LOCAL_CONTENT_CACHE.timeout = config.get('TIMEOUT', 60)
+    _LOCAL_CONTENT_CACHE.check_interval = config.get('CHECK_INTERVAL', 5)
+    return _LOCAL_CONTENT_CACHE
@@ -0,0 +1,166 @@
+"""
+A local disk cache of large course assets served by StaticContentServer.
+
+Assets too large to be cached in memcached are copied to a local directory
+the first time they are served, so that later requests for them can be
+served without reading their data from GridFS again. Their lock status can
+change in Studio at any time, so StaticContentServer still fetches the
+asset's GridFS metadata for each request, and only serves the cached copy
+if its md5 digest still matches.
+"""
+import calendar
+from datetime import datetime
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from pytz import UTC
+
+from xmodule.contentstore.content import StaticContentStream
+
+log = logging.getLogger(__name__)
+
+# Size of the chunks used to copy assets to the disk cache
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+class LocalAssetCache(object):
+    """
+    Cache of course assets in the directory `root`.
+
+    Only assets of at most `max_asset_size` bytes are cached, and the least
+    recently served assets are removed from the cache when the cached
+    assets take up more than `max_total_size` bytes.
+    """
+    def __init__(self, root, max_asset_size, max_total_size):
+        self.root = root
+        self.max_asset_size = max_asset_size
+        self.max_total_size = max_total_size
+
+    @classmethod
+    def from_settings(cls):
+        """
+        Return a LocalAssetCache configured by `settings.STATIC_CONTENT_DISK_CACHE`,
+        or None if the disk cache is disabled.
+        """
+        config = getattr(settings, 'STATIC_CONTENT_DISK_CACHE', None)
+        if not config or not config.get('ROOT'):
+            return None
+        return cls(
+            config['ROOT'],
+            config.get('MAX_ASSET_SIZE', 100 * 1024 * 1024),
+            config.get('MAX_TOTAL_SIZE', 2 * 1024 * 1024 * 1024),
+        )
+
+    def should_cache(self, content):
+        """
+        Return whether `content` is small enough to be cached.
+        """
+        return content.length is not None and content.length <= self.max_asset_size
+
+    def get(self, location):
+        """
+        Return a StaticContentStream reading the cached copy of the asset at
+        `location`, or None if it isn't cached.  Its lock status is the one
+        the asset had when it was cached.
+        """
+        metadata_path, data_path = self._paths(location)
+        try:
+            with open(metadata_path) as metadata_file:
+                metadata = json.load(metadata_file)
+            stream = open(data_path, 'rb')
+        except (IOError, ValueError):
+            return None
+
+        # Record that the asset was served, for the LRU eviction of assets
+        try:
+            os.utime(data_path, None)
+        except OSError:
+            pass
+
+        content = StaticContentStream(
+            location,
+            metadata['name'],
+            metadata['content_type'],
+            stream,
+            last_modified_at=datetime.fromtimestamp(metadata['last_modified_at'], UTC),
+            length=metadata['length'],
+            locked=metadata['locked'],
+            content_digest=metadata['content_digest'],
+        )
+        return content
+
+    def set(self, content):
+        """
+        Copy the asset read by the StaticContentStream `content` to the
+        cache, and return a StaticContentStream reading the cached copy.
+        """
+        metadata_path, data_path = self._paths(content.location)
+        if not os.path.isdir(self.root):
+            os.makedirs(self.root)
+
+        # Write to temporary files first, so that other processes never see a partial copy
+        data_fd, data_tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(data_fd, 'wb') as data_file:
+            for chunk in content.stream_data(COPY_CHUNK_SIZE):
+                data_file.write(chunk)
+        os.rename(data_tmp_path, data_path)
+        self._write_metadata(metadata_path, {
+            'name': content.name,
+            'content_type': content.content_type,
+            'last_modified_at': calendar.timegm(content.last_modified_at.utctimetuple()),
+            'length': content.length,
+            'locked': content.locked,
+            'content_digest': content.content_digest,
+        })
+        self._enforce_size_limit()
+
+        cached_content = self.get(content.location)
+        return cached_content if cached_content is not None else content
+
+    def _write_metadata(self, metadata_path, metadata):
+        """
+        Atomically write `metadata` as json to `metadata_path`.
+        """
+        metadata_fd, metadata_tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(metadata_fd, 'w') as metadata_file:
+            json.dump(metadata, metadata_file)
+        os.rename(metadata_tmp_path, metadata_path)
+
+    def _paths(self, location):
+        """
+        Return the paths of the metadata and data files of the asset at `location`.
+        """
+        key = hashlib.sha1(unicode(location).encode('utf-8')).hexdigest()
+        return os.path.join(self.root, key + '.json'), os.path.join(self.root, key + '.data')
+
+    def _enforce_size_limit(self):
+        """
+        Remove the least recently served assets until the cached assets take
+        up at most `max_total_size` bytes.
+        """
+        entries = []
+        total_size = 0
+        for filename in os.listdir(self.root):
+            if not filename.endswith('.data'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.root, filename))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, filename[:-len('.data')]))
+            total_size += stat.st_size
+
+        for __, size, key in sorted(entries):
+            if total_size <= self.max_total_size:
+                break
+            for extension in ('.json', '.data'):
+                try:
+                    os.remove(os.path.join(self.root, key + extension))
+                except OSError:
+                    pass
+            total_size -= size
+            log.info(u"Removed asset %s from the local disk cache", key)
@@ -3,6 +3,7 @@ Middleware to serve assets.
 """
 
 import logging
+from uuid import uuid4
 
 from django.http import (
     HttpResponse, HttpResponseNotModified, HttpResponseForbidden
@@ -10,11 +11,12 @@ from django.http import (
 from student.models import CourseEnrollment
 
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
+from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG, is_image
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
-from cache_toolbox.core import get_cached_content, set_cached_content
+from cache_toolbox.core import get_cached_content, set_cached_content, is_missing_content, set_missing_content
+from contentserver.disk_cache import LocalAssetCache
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -23,6 +25,10 @@ from xmodule.exceptions import NotFoundError
 
 log = logging.getLogger(__name__)
 
+# Size of the chunks read from GridFS or the disk cache when streaming content.
+# Django 1.4 streams HttpResponses built from iterators chunk by chunk.
+STREAM_CHUNK_SIZE = 64 * 1024
+
 
 class StaticContentServer(object):
     def process_request(self, request):
@@ -41,27 +47,11 @@ class StaticContentServer(object):
                 response.status_code = 400
                 return response
 
-            # first look in our cache so we don't have to round-trip to the DB
-            content = get_cached_content(loc)
+            content = self._load_content(loc)
             if content is None:
-                # nope, not in cache, let's fetch from DB
-                try:
-                    content = AssetManager.find(loc, as_stream=True)
-                except (ItemNotFoundError, NotFoundError):
-                    response = HttpResponse()
-                    response.status_code = 404
-                    return response
-
-                # since we fetched it from DB, let's cache it going forward, but only if it's < 1MB
-                # this is because I haven't been able to find a means to stream data out of memcached
-                if content.length is not None:
-                    if content.length < 1048576:
-                        # since we've queried as a stream, let's read in the stream into memory to set in cache
-                        content = content.copy_to_in_mem()
-                        set_cached_content(content)
-            else:
-                # NOP here, but we may wish to add a "cache-hit" counter in the future
-                pass
+                response = HttpResponse()
+                response.status_code = 404
+                return response
 
             # Check that user has access to content
             if getattr(content, "locked", False):
@@ -77,13 +67,33 @@ class StaticContentServer(object):
                     ):
                         return HttpResponseForbidden('Unauthorized')
 
+            # serve the smallest downsized variant of an image at least as wide as requested, if it was generated
+            variant_size = get_requested_image_variant_size(request, content)
+            if variant_size is not None:
+                variant = self._load_image_variant(StaticContent.compute_image_variant_location(loc, variant_size))
+                if variant is not None:
+                    if hasattr(content, 'close'):
+                        content.close()
+                    content = variant
+
             # convert over the DB persistent last modified timestamp to a HTTP compatible
             # timestamp, so we can simply compare the strings
             last_modified_at_str = content.last_modified_at.strftime("%a, %d-%b-%Y %H:%M:%S GMT")
 
+            # The md5 digest of the content computed by GridFS makes a strong entity tag.
+            # Content cached before digests were recorded has none.
+            content_digest = getattr(content, 'content_digest', None)
+            etag = '"{}"'.format(content_digest) if content_digest else None
+
             # see if the client has cached this content, if so then compare the
-            # timestamps, if they are the same then just return a 304 (Not Modified)
-            if 'HTTP_IF_MODIFIED_SINCE' in request.META:
+            # entity tags or the timestamps, if they are the same then just return
+            # a 304 (Not Modified). If-None-Match takes precedence over If-Modified-Since.
+            if etag and 'HTTP_IF_NONE_MATCH' in request.META:
+                if etag_matches(request.META['HTTP_IF_NONE_MATCH'], etag):
+                    response = HttpResponseNotModified()
+                    response['ETag'] = etag
+                    return response
+            elif 'HTTP_IF_MODIFIED_SINCE' in request.META:
                 if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
                 if if_modified_since == last_modified_at_str:
                     return HttpResponseNotModified()
@@ -96,10 +106,6 @@ class StaticContentServer(object):
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
             if request.META.get('HTTP_RANGE'):
-                # Data from cache (StaticContent) has no easy byte management, so we use the DB instead (StaticContentStream)
-                if type(content) == StaticContent:
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -109,45 +115,209 @@ class StaticContentServer(object):
                         u"%s in Range header: %s for content: %s", exception.message, header_value, unicode(loc)
                     )
                 else:
+                    # A set of ranges is satisfiable if any of its ranges is
+                    satisfiable_ranges = [
+                        (first, last) for first, last in ranges if 0 <= first <= last < content.length
+                    ]
                     if unit != 'bytes':
                         # Only accept ranges in bytes
                         log.warning(u"Unknown unit in Range header: %s for content: %s", header_value, unicode(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
+                    elif not satisfiable_ranges:
                         log.warning(
-                            u"More than 1 ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
                         )
+                        return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                    elif len(satisfiable_ranges) > 1:
+                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
+                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
+                        response = multipart_byteranges_response(content, satisfiable_ranges)
                     else:
-                        first, last = ranges[0]
-
-                        if 0 <= first <= last < content.length:
-                            # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
-                            response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
-                                first=first, last=last, length=content.length
-                            )
-                            response['Content-Length'] = str(last - first + 1)
-                            response.status_code = 206  # Partial Content
-                        else:
-                            log.warning(
-                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
-                            )
-                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                        first, last = satisfiable_ranges[0]
+                        response = HttpResponse(
+                            closing_iterator(content, content.stream_data_in_range(first, last, STREAM_CHUNK_SIZE))
+                        )
+                        response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
+                            first=first, last=last, length=content.length
+                        )
+                        response['Content-Length'] = str(last - first + 1)
+                        response['Content-Type'] = content.content_type
+                        response.status_code = 206  # Partial Content
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                response = HttpResponse(closing_iterator(content, content.stream_data(STREAM_CHUNK_SIZE)))
                 response['Content-Length'] = content.length
+                response['Content-Type'] = content.content_type
 
             # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
             response['Accept-Ranges'] = 'bytes'
-            response['Content-Type'] = content.content_type
             response['Last-Modified'] = last_modified_at_str
+            if etag:
+                response['ETag'] = etag
 
             return response
 
+    def _load_content(self, loc):
+        """
+        Return the content at `loc` from the cache, the local disk cache or the DB, in that order,
+        caching it as appropriate, or None if there is no such content.
+        """
+        # first look in our cache so we don't have to round-trip to the DB
+        content = get_cached_content(loc)
+        if content is None:
+            # then in the local disk cache of large assets, if any
+            disk_cache = LocalAssetCache.from_settings()
+            if disk_cache is not None:
+                content = disk_cache.get(loc)
+                if content is not None:
+                    content = self._revalidate_disk_cached_content(loc, content)
+
+        if content is None:
+            # nope, not in cache, let's fetch from DB
+            try:
+                content = AssetManager.find(loc, as_stream=True)
+            except (ItemNotFoundError, NotFoundError):
+                return None
+
+            # since we fetched it from DB, let's cache it going forward, but only if it's < 1MB
+            # this is because I haven't been able to find a means to stream data out of memcached
+            if content.length is not None:
+                if content.length < 1048576:
+                    # since we've queried as a stream, let's read in the stream into memory to set in cache
+                    content = content.copy_to_in_mem()
+                    set_cached_content(content)
+                elif disk_cache is not None and disk_cache.should_cache(content):
+                    content = self._set_disk_cached_content(disk_cache, content)
+        return content
+
+    def _load_image_variant(self, variant_loc):
+        """
+        Return the image variant at `variant_loc` like _load_content, or None
+        if there is no such variant. Small images have no variants, so their
+        absence is cached rather than looked up in the DB on each request.
+        """
+        if is_missing_content(variant_loc):
+            return None
+        variant = self._load_content(variant_loc)
+        if variant is None:
+            set_missing_content(variant_loc)
+        return variant
+
+    def _revalidate_disk_cached_content(self, loc, content):
+        """
+        Check the disk cached copy of the asset at `loc` against the asset's
+        metadata in GridFS. Returns the disk cached `content`, with the
+        current lock status of the asset, if it is still up to date, or None
+        if the asset must be fetched again.
+        """
+        try:
+            # Only the metadata of streamed content is fetched from GridFS
+            current_content = AssetManager.find(loc, as_stream=True)
+        except (ItemNotFoundError, NotFoundError):
+            content.close()
+            return None
+        current_content.close()
+
+        if content.content_digest and content.content_digest == current_content.content_digest:
+            # The lock status of an asset can change without changing its data
+            content.locked = current_content.locked
+            return content
+        content.close()
+        return None
+
+    def _set_disk_cached_content(self, disk_cache, content):
+        """
+        Copy the streamed `content` to the local disk cache, and return the
+        content to serve.
+        """
+        try:
+            cached_content = disk_cache.set(content)
+        except (IOError, OSError):
+            log.exception(u"Unable to cache content %s on disk", unicode(content.location))
+            # The stream may have been partially read; fetch it again
+            content.close()
+            return AssetManager.find(content.location, as_stream=True)
+        content.close()
+        return cached_content
+
+
+def get_requested_image_variant_size(request, content):
+    """
+    Return the size of the downsized variant of the image `content` to serve for the width
+    requested by the `width` query parameter, or None if the content itself should be served.
+    """
+    try:
+        width = int(request.GET.get('width', ''))
+    except ValueError:
+        return None
+    if width <= 0 or not is_image(content):
+        return None
+    return StaticContent.get_image_variant_size(width)
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Return whether the value of an If-None-Match header matches `etag`.
+    """
+    if if_none_match.strip() == '*':
+        return True
+    # Weak comparison is used for If-None-Match, so ignore weakness indicators
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return etag in [candidate[2:] if candidate.startswith('W/') else candidate for candidate in candidates]
+
+
+def closing_iterator(content, chunks):
+    """
+    Iterate over `chunks`, closing the stream of `content`, if any, once
+    they have been consumed or the response is closed.
+    """
+    try:
+        for chunk in chunks:
+            yield chunk
+    finally:
+        if hasattr(content, 'close'):
+            content.close()
+
+
+def multipart_byteranges_response(content, ranges):
+    """
+    Return a 206 (Partial Content) response streaming the `ranges` of
+    `content` as a multipart/byteranges message.
+    """
+    boundary = uuid4().hex
+    part_headers = [
+        (
+            '--{boundary}\r\n'
+            'Content-Type: {content_type}\r\n'
+            'Content-Range: bytes {first}-{last}/{length}\r\n'
+            '\r\n'
+        ).format(
+            boundary=boundary, content_type=content.content_type, first=first, last=last, length=content.length
+        ).encode('utf-8')
+        for first, last in ranges
+    ]
+    closing_boundary = '--{boundary}--\r\n'.format(boundary=boundary)
+
+    def stream_parts():
+        """
+        Stream each range of the content, preceded by its part headers.
+        """
+        for part_header, (first, last) in zip(part_headers, ranges):
+            yield part_header
+            for chunk in content.stream_data_in_range(first, last, STREAM_CHUNK_SIZE):
+                yield chunk
+            yield '\r\n'
+        yield closing_boundary
+
+    response = HttpResponse(closing_iterator(content, stream_parts()))
+    response['Content-Length'] = str(
+        sum(len(part_header) + last - first + 1 + 2 for part_header, (first, last) in zip(part_headers, ranges)) +
+        len(closing_boundary)
+    )
+    response['Content-Type'] = 'multipart/byteranges; boundary={}'.format(boundary)
+    response.status_code = 206  # Partial Content
+    return response
+
 
 def parse_range_header(header_value, content_length):
     """
@@ -4,6 +4,10 @@ Tests for StaticContentServer
 import copy
 import ddt
 import logging
+import mock
+import os
+import shutil
+import tempfile
 import unittest
 from uuid import uuid4
 
@@ -11,12 +15,15 @@ from django.conf import settings
 from django.test.client import Client
 from django.test.utils import override_settings
 
+from xmodule.assetstore.assetmgr import AssetManager
+from xmodule.contentstore.content import StaticContent
 from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.xml_importer import import_course_from_xml
 
+from cache_toolbox.core import del_cached_content
 from contentserver.middleware import parse_range_header
 from student.models import CourseEnrollment
 
@@ -110,6 +117,27 @@ class ContentStoreToyCourseTest(ModuleStoreTestCase):
         resp = self.client.get(self.url_locked)
         self.assertEqual(resp.status_code, 200)
 
+    def test_disk_cached_asset_locked(self):
+        """
+        Test that an asset served from the local disk cache is no longer served
+        publicly once it is locked.
+        """
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        asset_key = self.course_key.make_asset_key('asset', 'large_static.txt')
+        self.contentstore.save(StaticContent(asset_key, 'large_static.txt', 'text/plain', 'a' * 1048576))
+
+        self.client.logout()
+        with override_settings(STATIC_CONTENT_DISK_CACHE={'ROOT': root}):
+            resp = self.client.get(unicode(asset_key))
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(len(''.join(resp)), 1048576)
+            self.assertEqual(len(os.listdir(root)), 2)
+
+            self.contentstore.set_attr(asset_key, 'locked', True)
+            resp = self.client.get(unicode(asset_key))
+            self.assertEqual(resp.status_code, 403)
+
     def test_range_request_full_file(self):
         """
         Test that a range request from byte 0 to last,
@@ -146,17 +174,58 @@ class ContentStoreToyCourseTest(ModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart/byteranges message.
         """
         first_byte = self.length_unlocked / 4
         last_byte = self.length_unlocked / 2
+        full_content = self.client.get(self.url_unlocked).content
         resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}, -100'.format(
             first=first_byte, last=last_byte)
         )
 
-        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.status_code, 206)
         self.assertNotIn('Content-Range', resp)
-        self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
+        self.assertTrue(resp['Content-Type'].startswith('multipart/byteranges; boundary='))
+        boundary = resp['Content-Type'].split('boundary=')[1]
+        self.assertEqual(resp['Content-Length'], str(len(resp.content)))
+
+        parts = resp.content.split('--{}'.format(boundary))
+        # Content before the first boundary and after the closing one
+        self.assertEqual(parts[0], '')
+        self.assertEqual(parts[-1], '--\r\n')
+        expected_ranges = [
+            (first_byte, last_byte),
+            (max(0, self.length_unlocked - 100), self.length_unlocked - 1),
+        ]
+        for part, (first, last) in zip(parts[1:-1], expected_ranges):
+            headers, body = part.split('\r\n\r\n', 1)
+            self.assertIn('Content-Range: bytes {}-{}/{}'.format(first, last, self.length_unlocked), headers)
+            self.assertEqual(body, full_content[first:last + 1] + '\r\n')
+
+    def test_range_request_partially_satisfiable(self):
+        """
+        Test that unsatisfiable ranges are ignored if other ranges are satisfiable.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9, {first}-'.format(
+            first=self.length_unlocked)
+        )
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(resp['Content-Range'], 'bytes 0-9/{}'.format(self.length_unlocked))
+
+    def test_etag(self):
+        """
+        Test that responses carry an ETag, which can be used to revalidate them.
+        """
+        resp = self.client.get(self.url_unlocked)
+        etag = resp['ETag']
+        self.assertEqual(etag, '"{}"'.format(self.contentstore.get_attr(self.unlocked_asset, 'md5')))
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"other", {}'.format(etag))
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(resp.status_code, 200)
 
     @ddt.data(
         'bytes 0-',
@@ -192,6 +261,41 @@ class ContentStoreToyCourseTest(ModuleStoreTestCase):
         )
         self.assertEqual(resp.status_code, 416)
 
+    @ddt.data((300, 320), (1000, None), ('wide', None))
+    @ddt.unpack
+    def test_image_variant(self, width, variant_size):
+        """
+        Test that the smallest downsized variant of an image at least as wide as requested is served.
+        """
+        image_key = self.course_key.make_asset_key('asset', 'image.png')
+        self.contentstore.save(StaticContent(image_key, 'image.png', 'image/png', 'original'))
+        variant_key = StaticContent.compute_image_variant_location(image_key, 320)
+        self.contentstore.save(StaticContent(variant_key, variant_key.name, 'image/jpeg', 'variant'))
+
+        resp = self.client.get(unicode(image_key), {'width': width})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.content, 'variant' if variant_size else 'original')
+
+    def test_missing_image_variant_cached(self):
+        """
+        Test that the absence of the variant of a small image is only looked up once in the DB,
+        until variants are generated for it.
+        """
+        image_key = self.course_key.make_asset_key('asset', 'small_image.png')
+        self.contentstore.save(StaticContent(image_key, 'small_image.png', 'image/png', 'original'))
+        with mock.patch('contentserver.middleware.AssetManager.find', wraps=AssetManager.find) as mock_find:
+            for __ in range(3):
+                resp = self.client.get(unicode(image_key), {'width': 300})
+                self.assertEqual(resp.content, 'original')
+        # the image itself, then its variant
+        self.assertEqual(mock_find.call_count, 2)
+
+        variant_key = StaticContent.compute_image_variant_location(image_key, 320)
+        self.contentstore.save(StaticContent(variant_key, variant_key.name, 'image/jpeg', 'variant'))
+        del_cached_content(variant_key)
+        resp = self.client.get(unicode(image_key), {'width': 300})
+        self.assertEqual(resp.content, 'variant')
+
 
 @ddt.ddt
 class ParseRangeHeaderTestCase(unittest.TestCase):
@@ -0,0 +1,79 @@
+"""
+Tests for the local disk cache of course assets.
+"""
+from datetime import datetime
+import os
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from django.test.utils import override_settings
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+from pytz import UTC
+
+from contentserver.disk_cache import LocalAssetCache
+from xmodule.contentstore.content import StaticContentStream
+
+
+class LocalAssetCacheTestCase(unittest.TestCase):
+    """
+    Tests for LocalAssetCache.
+    """
+    def setUp(self):
+        super(LocalAssetCacheTestCase, self).setUp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.cache = LocalAssetCache(self.root, max_asset_size=1000, max_total_size=2500)
+        self.course_key = SlashSeparatedCourseKey('edX', 'toy', '2012_Fall')
+
+    def _content(self, name, data, digest='digest'):
+        """
+        Return a StaticContentStream for an asset named `name` containing `data`.
+        """
+        return StaticContentStream(
+            self.course_key.make_asset_key('asset', name), name, 'text/plain', StringIO(data),
+            last_modified_at=datetime(2015, 1, 1, tzinfo=UTC), length=len(data), locked=True,
+            content_digest=digest,
+        )
+
+    def test_from_settings(self):
+        with override_settings(STATIC_CONTENT_DISK_CACHE={'ROOT': None}):
+            self.assertIsNone(LocalAssetCache.from_settings())
+        with override_settings(STATIC_CONTENT_DISK_CACHE={'ROOT': self.root, 'MAX_ASSET_SIZE': 10}):
+            self.assertEqual(LocalAssetCache.from_settings().max_asset_size, 10)
+
+    def test_should_cache(self):
+        self.assertTrue(self.cache.should_cache(self._content('small', 'a' * 1000)))
+        self.assertFalse(self.cache.should_cache(self._content('large', 'a' * 1001)))
+
+    def test_set_and_get(self):
+        content = self._content('asset.txt', 'some data')
+        self.assertIsNone(self.cache.get(content.location))
+
+        cached_content = self.cache.set(content)
+        self.assertEqual(''.join(cached_content.stream_data()), 'some data')
+        cached_content.close()
+
+        cached_content = self.cache.get(content.location)
+        self.assertEqual(''.join(cached_content.stream_data_in_range(2, 5)), 'me d')
+        cached_content.close()
+        self.assertEqual(cached_content.content_type, 'text/plain')
+        self.assertEqual(cached_content.content_digest, 'digest')
+        self.assertEqual(cached_content.length, 9)
+        self.assertTrue(cached_content.locked)
+        self.assertEqual(cached_content.last_modified_at, datetime(2015, 1, 1, tzinfo=UTC))
+
+    def test_size_limit(self):
+        contents = [self._content('asset{}.txt'.format(index), 'a' * 1000) for index in range(3)]
+        for index, content in enumerate(contents):
+            self.cache.set(content).close()
+            # make sure the files have distinct modification times
+            os.utime(self.cache._paths(content.location)[1], (index, index))  # pylint: disable=protected-access
+
+        # the least recently served asset was removed
+        self.assertIsNone(self.cache.get(contents[0].location))
+        for content in contents[1:]:
+            cached_content = self.cache.get(content.location)
+            self.assertIsNotNone(cached_content)
+            cached_content.close()
@@ -0,0 +1,52 @@
+"""
+Compile all the mako templates of the template lookups to python modules
+in settings.MAKO_MODULE_DIR, so that processes using the same module
+directory don't compile them on first use.
+
+Run it at deploy time, after the templates are installed. Files of the
+template directories which aren't mako templates, such as underscore
+templates, fail to compile and are skipped.
+"""
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from edxmako import LOOKUP
+from edxmako.paths import get_template_stats
+
+
+class Command(BaseCommand):
+    """
+    Compile the mako templates of the template lookups.
+    """
+    help = __doc__
+
+    option_list = BaseCommand.option_list + (
+        make_option('--namespace', dest='namespaces', action='append', default=[],
+                    help='Namespace of the templates to compile; all of them by default'),
+    )
+
+    def handle(self, *args, **options):
+        verbosity = int(options.get('verbosity', 1))
+        namespaces = options['namespaces'] or sorted(LOOKUP)
+        for namespace in namespaces:
+            lookup = LOOKUP[namespace]
+            counts = {'compiled': 0, 'up_to_date': 0, 'skipped': 0}
+            compile_time = get_template_stats()['compile_time']
+            for uri in lookup.iter_template_uris():
+                compiles = get_template_stats()['compiles']
+                try:
+                    lookup.get_template(uri)
+                except Exception as exc:  # pylint: disable=broad-except
+                    counts['skipped'] += 1
+                    if verbosity > 1:
+                        self.stdout.write(u'Skipped {}: {}\n'.format(uri, exc))
+                    continue
+                counts['compiled' if get_template_stats()['compiles'] > compiles else 'up_to_date'] += 1
+
+            self.stdout.write(
+                u'{namespace}: {compiled} templates compiled in {seconds:.1f}s, '
+                u'{up_to_date} up to date, {skipped} skipped\n'.format(
+                    namespace=namespace, seconds=get_template_stats()['compile_time'] - compile_time, **counts
+                )
+            )
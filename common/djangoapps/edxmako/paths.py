@@ -1,20 +1,115 @@
 """
 Set up lookup paths for mako templates.
+
+Templates are compiled to python modules in `settings.MAKO_MODULE_DIR`,
+which processes reuse as long as they are newer than their template. The
+`compile_mako_templates` management command compiles all the templates
+ahead of time, e.g. at deploy time, and `get_template_stats` tells how many
+templates a process compiled itself.
 """
 import os
+import shutil
+import tempfile
+import threading
+import time
 import pkg_resources
 
 from django.conf import settings
 from mako.lookup import TemplateLookup
 
+import dogstats_wrapper as dog_stats_api
+
 from . import LOOKUP
 
+_STATS_LOCK = threading.Lock()
+_TEMPLATE_STATS = {
+    # templates loaded by this process, i.e. missing from the in-memory cache of their lookup
+    'lookup_misses': 0,
+    # templates this process had to compile, because their module was missing or stale
+    'compiles': 0,
+    'compile_time': 0.0,
+}
+
+# Whether a template was compiled by the current thread since the flag was last reset.
+_COMPILING = threading.local()
+
+
+def _write_module(source, outputpath):
+    """
+    Write the compiled module `source` of a template to `outputpath`.
+
+    As mako does, the module is written to a temporary file which is then
+    moved into place, so that processes sharing the module directory never
+    load a partially written module.
+    """
+    _COMPILING.compiled = True
+    dest, name = tempfile.mkstemp(dir=os.path.dirname(outputpath))
+    os.write(dest, source)
+    os.close(dest)
+    shutil.move(name, outputpath)
+
+
+def get_template_stats():
+    """
+    Return a copy of the template stats of this process.
+    """
+    with _STATS_LOCK:
+        return dict(_TEMPLATE_STATS)
+
+
+def reset_template_stats():
+    """
+    Zero the template stats of this process.
+    """
+    with _STATS_LOCK:
+        _TEMPLATE_STATS.update(lookup_misses=0, compiles=0, compile_time=0.0)
+
 
 class DynamicTemplateLookup(TemplateLookup):
     """
     A specialization of the standard mako `TemplateLookup` class which allows
-    for adding directories progressively.
+    for adding directories progressively, and records the stats of the
+    templates it loads and compiles.
     """
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('module_writer', _write_module)
+        super(DynamicTemplateLookup, self).__init__(*args, **kwargs)
+
+    def _load(self, filename, uri):
+        """
+        Load the template `uri` from `filename`, compiling it if its module is missing or stale.
+        """
+        _COMPILING.compiled = False
+        start = time.time()
+        template = super(DynamicTemplateLookup, self)._load(filename, uri)
+        duration = time.time() - start
+        compiled = _COMPILING.compiled
+
+        with _STATS_LOCK:
+            _TEMPLATE_STATS['lookup_misses'] += 1
+            if compiled:
+                _TEMPLATE_STATS['compiles'] += 1
+                _TEMPLATE_STATS['compile_time'] += duration
+        dog_stats_api.increment('edxmako.template.lookup_miss')
+        if compiled:
+            dog_stats_api.increment('edxmako.template.compile')
+            dog_stats_api.histogram('edxmako.template.compile_time', duration)
+        return template
+
+    def iter_template_uris(self):
+        """
+        Yield the uri of each template file in the directories of the lookup,
+        skipping those shadowed by a file of an earlier directory.
+        """
+        seen = set()
+        for directory in self.directories:
+            for root, __, files in os.walk(directory):
+                for filename in sorted(files):
+                    uri = '/' + os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/')
+                    if uri not in seen:
+                        seen.add(uri)
+                        yield uri
+
     def add_directory(self, directory, prepend=False):
         """
         Add a new directory to the template lookup path.
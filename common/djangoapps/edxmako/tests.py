@@ -1,9 +1,13 @@
 
 from mock import patch, Mock
+import os
+import shutil
+import tempfile
 import unittest
 import ddt
 
 from django.conf import settings
+from django.core.management import call_command
 from django.http import HttpResponse
 from django.test import TestCase
 from django.test.utils import override_settings
@@ -12,6 +16,7 @@ from django.core.urlresolvers import reverse
 import edxmako.middleware
 from edxmako.middleware import get_template_request_context
 from edxmako import add_lookup, LOOKUP
+from edxmako.paths import get_template_stats, reset_template_stats
 from edxmako.shortcuts import (
     marketing_link,
     render_to_string,
@@ -63,6 +68,55 @@ class AddLookupTests(TestCase):
         self.assertTrue(dirs[0].endswith('management'))
 
 
+class CompileTemplatesTests(TestCase):
+    """
+    Test the precompilation of templates, and the template stats.
+    """
+    def setUp(self):
+        super(CompileTemplatesTests, self).setUp()
+        self.template_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.template_dir)
+        os.makedirs(os.path.join(self.template_dir, 'sub'))
+        with open(os.path.join(self.template_dir, 'sub', 'page.html'), 'w') as template:
+            template.write('<p>${message}</p>')
+        with open(os.path.join(self.template_dir, 'widget.underscore'), 'w') as template:
+            template.write('<p><%= message %></p>')
+
+        module_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, module_dir)
+        settings_patcher = override_settings(MAKO_MODULE_DIR=module_dir)
+        settings_patcher.enable()
+        self.addCleanup(settings_patcher.disable)
+
+        lookup_patcher = patch.dict('edxmako.LOOKUP', clear=True)
+        lookup_patcher.start()
+        self.addCleanup(lookup_patcher.stop)
+        add_lookup('test', self.template_dir)
+        reset_template_stats()
+
+    def test_compile_templates(self):
+        call_command('compile_mako_templates', namespaces=['test'])
+        stats = get_template_stats()
+        self.assertEqual(stats['lookup_misses'], 1)
+        self.assertEqual(stats['compiles'], 1)
+
+        # another process loads the compiled module
+        LOOKUP.clear()
+        add_lookup('test', self.template_dir)
+        reset_template_stats()
+        self.assertEqual(LOOKUP['test'].get_template('/sub/page.html').render(message='hi'), '<p>hi</p>')
+        self.assertEqual(get_template_stats()['compiles'], 0)
+        self.assertEqual(get_template_stats()['lookup_misses'], 1)
+
+    def test_compiled_on_first_use(self):
+        LOOKUP['test'].get_template('/sub/page.html')
+        LOOKUP['test'].get_template('/sub/page.html')
+        stats = get_template_stats()
+        self.assertEqual(stats['lookup_misses'], 1)
+        self.assertEqual(stats['compiles'], 1)
+        self.assertGreater(stats['compile_time'], 0)
+
+
 class MakoMiddlewareTest(TestCase):
     """
     Test MakoMiddleware.
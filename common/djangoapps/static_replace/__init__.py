@@ -10,9 +10,14 @@ from xmodule.modulestore import ModuleStoreEnum
 from xmodule.contentstore.content import StaticContent
 
 from opaque_keys.edx.locator import AssetLocator
+from request_cache.middleware import RequestCache
 
 log = logging.getLogger(__name__)
 
+# Compiled url replacement regexes, keyed by prefix pattern.  There is one
+# pattern per prefix and course data directory, so this stays small.
+_URL_REPLACE_REGEXES = {}
+
 
 def _url_replace_regex(prefix):
     """
@@ -30,6 +35,28 @@ def _url_replace_regex(prefix):
         """.format(prefix=prefix)
 
 
+def _compiled_url_replace_regex(prefix):
+    """
+    Returns _url_replace_regex(prefix) compiled, compiling it only the first
+    time it is used.
+    """
+    regex = _URL_REPLACE_REGEXES.get(prefix)
+    if regex is None:
+        regex = _URL_REPLACE_REGEXES[prefix] = re.compile(_url_replace_regex(prefix))
+    return regex
+
+
+def _static_url_prefix(data_dir):
+    """
+    Returns the prefix pattern of the urls of static files that are not
+    already in the course data directory `data_dir`.
+    """
+    return u'(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )
+
+
 def try_staticfiles_lookup(path):
     """
     Try to lookup a path in staticfiles_storage.  If it fails, return
@@ -71,7 +98,7 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):
         rest = match.group('rest')
         return "".join([quote, jump_to_id_base_url + rest, quote])
 
-    return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
+    return _compiled_url_replace_regex('/jump_to_id/').sub(replace_jump_to_id_url, text)
 
 
 def replace_course_urls(text, course_key):
@@ -91,7 +118,7 @@ def replace_course_urls(text, course_key):
         rest = match.group('rest')
         return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
-    return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
+    return _compiled_url_replace_regex('/course/').sub(replace_course_url, text)
 
 
 def process_static_urls(text, replacement_function, data_dir=None):
@@ -110,14 +137,7 @@ def process_static_urls(text, replacement_function, data_dir=None):
         rest = match.group('rest')
         return replacement_function(original, prefix, quote, rest)
 
-    return re.sub(
-        _url_replace_regex(u'(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
-        wrap_part_extraction,
-        text
-    )
+    return _compiled_url_replace_regex(_static_url_prefix(data_dir)).sub(wrap_part_extraction, text)
 
 
 def make_static_urls_absolute(request, html):
@@ -149,22 +169,79 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
     course_id: The course identifier used to distinguish static content for this course in studio
     static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
     """
+    replace_static_url = _static_url_replacer(data_directory, course_id, static_asset_path)
+    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
 
-    def replace_static_url(original, prefix, quote, rest):
+
+def replace_urls(text, course_id, jump_to_id_base_url, data_directory=None, static_asset_path=''):
+    """
+    Replace /static/, /course/ and /jump_to_id/ urls in one pass over `text`.
+
+    Same as calling replace_static_urls, replace_course_urls and then
+    replace_jump_to_id_urls on `text`, except that urls inside the urls
+    replaced are left alone.
+
+    text: The source text to do the substitution in
+    course_id: The course_id in which this rewrite happens
+    jump_to_id_base_url: The base of the url that /jump_to_id/ urls are replaced with, see
+        replace_jump_to_id_urls
+    data_directory, static_asset_path: see replace_static_urls
+    """
+    data_dir = static_asset_path or data_directory
+    replace_static_url = _static_url_replacer(data_directory, course_id, static_asset_path)
+    course_url_base = '/courses/' + course_id.to_deprecated_string() + '/'
+
+    def replace_url(match):
         """
-        Replace a single matched url.
+        Replace a single matched url, according to its prefix.
         """
-        # Don't mess with things that end in '?raw'
-        if rest.endswith('?raw'):
-            return original
+        quote = match.group('quote')
+        prefix = match.group('prefix')
+        rest = match.group('rest')
+        if match.group('static') is not None:
+            return replace_static_url(match.group(0), prefix, quote, rest)
+        elif prefix == '/course/':
+            return "".join([quote, course_url_base, rest, quote])
+        else:
+            return "".join([quote, jump_to_id_base_url + rest, quote])
 
-        # In debug mode, if we can find the url as is,
-        if settings.DEBUG and finders.find(rest, True):
-            return original
+    regex = _compiled_url_replace_regex(
+        u'(?P<static>{static})|/course/|/jump_to_id/'.format(static=_static_url_prefix(data_dir))
+    )
+    return regex.sub(replace_url, text)
+
+
+def _static_url_replacer(data_directory, course_id, static_asset_path):
+    """
+    Returns the function that replace_static_urls calls on each matched url,
+    see process_static_urls.
+
+    While a request is being served, the urls that static files resolve to
+    are remembered in the request cache, as the same files are often used
+    in many blocks of a course.
+    """
+    resolved_urls = None
+    if getattr(RequestCache.get_request_cache(), 'request', None) is not None:
+        resolved_urls = RequestCache.get_request_cache().data.setdefault('static_replace_urls', {}).setdefault(
+            (course_id, data_directory, static_asset_path), {}
+        )
+    modulestore_types = []
+
+    def is_xml_course():
+        """
+        Returns whether the course is in an xml modulestore, only looking
+        it up on first use.
+        """
+        if not modulestore_types:
+            modulestore_types.append(modulestore().get_modulestore_type(course_id))
+        return modulestore_types[0] == ModuleStoreEnum.Type.xml
+
+    def resolve_url(prefix, rest):
+        """
+        Returns the url that the static file `rest` resolves to.
+        """
         # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
-        elif (not static_asset_path) \
-                and course_id \
-                and modulestore().get_modulestore_type(course_id) != ModuleStoreEnum.Type.xml:
+        if (not static_asset_path) and course_id and not is_xml_course():
             # first look in the static file pipeline and see if we are trying to reference
             # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
 
@@ -200,6 +277,27 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
                     rest, str(err)))
                 url = "".join([prefix, course_path])
 
+        return url
+
+    def replace_static_url(original, prefix, quote, rest):
+        """
+        Replace a single matched url.
+        """
+        # Don't mess with things that end in '?raw'
+        if rest.endswith('?raw'):
+            return original
+
+        # In debug mode, if we can find the url as is,
+        if settings.DEBUG and finders.find(rest, True):
+            return original
+
+        if resolved_urls is None:
+            url = resolve_url(prefix, rest)
+        else:
+            url = resolved_urls.get((prefix, rest))
+            if url is None:
+                url = resolved_urls[(prefix, rest)] = resolve_url(prefix, rest)
+
         return "".join([quote, url, quote])
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    return replace_static_url
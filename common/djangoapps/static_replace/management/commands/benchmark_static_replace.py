@@ -0,0 +1,79 @@
+"""
+Benchmark rewriting the urls of a large html block.
+
+Times replacing the /static/, /course/ and /jump_to_id/ urls of a synthetic
+html fragment with three passes, as replace_static_urls, replace_course_urls
+and replace_jump_to_id_urls, and with the single pass of replace_urls.
+"""
+from optparse import make_option
+from timeit import timeit
+
+from django.core.management.base import BaseCommand
+from mock import Mock
+from opaque_keys.edx.keys import CourseKey
+
+from request_cache.middleware import RequestCache
+from static_replace import replace_course_urls, replace_jump_to_id_urls, replace_static_urls, replace_urls
+
+
+def synthetic_html(links):
+    """
+    Returns html with `links` links of each of the rewritten forms, to
+    `links` / 10 distinct files, between paragraphs of text.
+    """
+    parts = []
+    for index in range(links):
+        parts.append(
+            u'<p>Paragraph {index} of some text, with an image <img src="/static/images/image{file}.png"/>, '
+            u'a <a href="/course/chapter/{index}">course link</a> and a '
+            u'<a href=\'/jump_to_id/block{index}\'>jump link</a>.</p>'.format(index=index, file=index % 10)
+        )
+    return u'\n'.join(parts)
+
+
+class Command(BaseCommand):
+    """
+    Time rewriting the urls of a synthetic html block in three passes, and
+    in one pass.
+    """
+    help = __doc__
+
+    option_list = BaseCommand.option_list + (
+        make_option('--course', dest='course', default='course-v1:Benchmark+StaticReplace+run',
+                    help='Id of the course the urls are rewritten for'),
+        make_option('--data-dir', dest='data_dir', default='benchmark',
+                    help='Data directory of the course'),
+        make_option('--links', dest='links', type='int', default=1000,
+                    help='Number of links of each form in the html'),
+        make_option('--repeat', dest='repeat', type='int', default=10,
+                    help='Number of times the urls are rewritten'),
+    )
+
+    def handle(self, *args, **options):
+        course_key = CourseKey.from_string(options['course'])
+        data_dir = options['data_dir']
+        jump_to_id_base_url = u'/courses/{}/jump_to_id/'.format(course_key)
+        html = synthetic_html(options['links'])
+
+        def three_passes():
+            """Rewrite the urls as the separate block wrappers did."""
+            text = replace_static_urls(html, data_dir, course_id=course_key)
+            text = replace_course_urls(text, course_key)
+            return replace_jump_to_id_urls(text, course_key, jump_to_id_base_url)
+
+        def one_pass():
+            """Rewrite the urls with replace_urls."""
+            return replace_urls(html, course_key, jump_to_id_base_url, data_directory=data_dir)
+
+        self.stdout.write(u'{} bytes of html, {} links\n'.format(len(html), options['links'] * 3))
+        for name, func in (('three passes', three_passes), ('one pass', one_pass)):
+            seconds = timeit(func, number=options['repeat'])
+            self.stdout.write(u'{}: {:.2f} ms per rewrite\n'.format(name, seconds * 1000 / options['repeat']))
+
+        # Rewrites in requests remember the url of each static file.
+        RequestCache().process_request(Mock())
+        try:
+            seconds = timeit(one_pass, number=options['repeat'])
+        finally:
+            RequestCache().clear_request_cache()
+        self.stdout.write(u'one pass in a request: {:.2f} ms per rewrite\n'.format(seconds * 1000 / options['repeat']))
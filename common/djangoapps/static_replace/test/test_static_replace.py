@@ -4,12 +4,17 @@ from nose.tools import assert_equals, assert_true, assert_false  # pylint: disab
 from static_replace import (
     replace_static_urls,
     replace_course_urls,
+    replace_jump_to_id_urls,
+    replace_urls,
     _url_replace_regex,
+    _compiled_url_replace_regex,
     process_static_urls,
     make_static_urls_absolute
 )
 from mock import patch, Mock
 
+from request_cache.middleware import RequestCache
+
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.modulestore.mongo import MongoModuleStore
 from xmodule.modulestore.xml import XMLModuleStore
@@ -161,3 +166,64 @@ def test_regex():
     for s in no:
         print 'Should not match: {0!r}'.format(s)
         assert_false(re.match(regex, s))
+
+
+def test_compiled_regex_cached():
+    assert_true(_compiled_url_replace_regex('/static/') is _compiled_url_replace_regex('/static/'))
+    assert_equals(_compiled_url_replace_regex('/static/').pattern, _url_replace_regex('/static/'))
+
+
+@patch('static_replace.staticfiles_storage')
+@patch('static_replace.modulestore')
+def test_replace_urls(mock_modulestore, mock_storage):
+    """
+    Make sure replace_urls replaces the urls of all forms like the separate
+    replacement functions
+    """
+    mock_storage.exists.return_value = False
+    mock_modulestore.return_value = Mock(MongoModuleStore)
+    jump_to_id_base_url = '/courses/org/course/run/jump_to_id/'
+
+    text = (
+        '<img src="/static/file.png"/> <a href=\'/course/chapter\'>link</a> '
+        '<a href="/jump_to_id/block">jump</a> "/static/raw.png?raw" "/not-replaced/file.png"'
+    )
+    expected = replace_jump_to_id_urls(
+        replace_course_urls(replace_static_urls(text, DATA_DIRECTORY, COURSE_KEY), COURSE_KEY),
+        COURSE_KEY,
+        jump_to_id_base_url
+    )
+    assert_equals(
+        expected,
+        replace_urls(text, COURSE_KEY, jump_to_id_base_url, data_directory=DATA_DIRECTORY)
+    )
+    assert_equals(
+        '<img src="/c4x/org/course/asset/file.png"/> <a href=\'/courses/org/course/run/chapter\'>link</a> '
+        '<a href="/courses/org/course/run/jump_to_id/block">jump</a> "/static/raw.png?raw" "/not-replaced/file.png"',
+        expected
+    )
+
+
+@patch('static_replace.staticfiles_storage')
+@patch('static_replace.modulestore')
+def test_static_urls_resolved_once_per_request(mock_modulestore, mock_storage):
+    """
+    Make sure the urls of static files are only resolved once per request
+    """
+    mock_storage.exists.return_value = False
+    mock_modulestore.return_value = Mock(MongoModuleStore)
+    text = '"/static/file.png" "/static/file.png" "/static/other.png"'
+    expected = '"/c4x/org/course/asset/file.png" "/c4x/org/course/asset/file.png" "/c4x/org/course/asset/other.png"'
+
+    RequestCache().process_request(Mock())
+    try:
+        assert_equals(expected, replace_static_urls(text, DATA_DIRECTORY, COURSE_KEY))
+        assert_equals(expected, replace_static_urls(text, DATA_DIRECTORY, COURSE_KEY))
+        assert_equals(mock_storage.exists.call_count, 2)
+    finally:
+        RequestCache().clear_request_cache()
+
+    # Outside of requests, each url is resolved every time
+    mock_storage.exists.reset_mock()
+    assert_equals(expected, replace_static_urls(text, DATA_DIRECTORY, COURSE_KEY))
+    assert_equals(mock_storage.exists.call_count, 3)
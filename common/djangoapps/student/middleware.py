@@ -1,11 +1,12 @@
 """
 Middleware that checks user standing for the purpose of keeping users with
-disabled accounts from accessing the site.
+disabled accounts from accessing the site, and that invalidates the cached
+enrollments changed by a request once its transaction is committed.
 """
 from django.http import HttpResponseForbidden
 from django.utils.translation import ugettext as _
 from django.conf import settings
-from student.models import UserStanding
+from student.models import CourseEnrollment, UserStanding
 
 
 class UserStandingMiddleware(object):
@@ -34,3 +35,14 @@ class UserStandingMiddleware(object):
                     ),
                 )
                 return HttpResponseForbidden(msg)
+
+
+class EnrollmentCacheMiddleware(object):
+    """
+    Removes the enrollment states changed by a request from the shared cache
+    once the request's transaction is committed. Must be listed before
+    TransactionMiddleware, so that it processes responses after it.
+    """
+    def process_response(self, request, response):  # pylint: disable=unused-argument
+        CourseEnrollment.delete_committed_enrollment_caches()
+        return response
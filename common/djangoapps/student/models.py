@@ -26,10 +26,11 @@ from django.utils import timezone
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.signals import user_logged_in, user_logged_out
-from django.db import models, IntegrityError
+from django.db import models, transaction, IntegrityError
 from django.db.models import Count
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver, Signal
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils.translation import ugettext_noop
 from django_countries.fields import CountryField
@@ -37,6 +38,7 @@ from config_models.models import ConfigurationModel
 from track import contexts
 from eventtracking import tracker
 from importlib import import_module
+from request_cache.middleware import RequestCache
 
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
@@ -51,6 +53,7 @@ from functools import total_ordering
 
 from certificates.models import GeneratedCertificate
 from course_modes.models import CourseMode
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 
 import analytics
 
@@ -750,6 +753,11 @@ class CourseEnrollment(models.Model):
     """
     MODEL_TAGS = ['course_id', 'is_active', 'mode']
 
+    # Keys of the enrollment states cached by _get_cached_enrollment_state,
+    # in the request cache and the shared cache.
+    ENROLLMENT_STATE_CACHE_KEY = u"student.courseenrollment.state.{user_id}.{course_key}"
+    ENROLLMENT_PARTIAL_CACHE_KEY = u"student.courseenrollment.partial.{user_id}.{org}.{course}"
+
     user = models.ForeignKey(User)
     course_id = CourseKeyField(max_length=255, db_index=True)
     created = models.DateTimeField(auto_now_add=True, null=True, db_index=True)
@@ -1131,11 +1139,8 @@ class CourseEnrollment(models.Model):
 
         `course_id` is our usual course_id string (e.g. "edX/Test101/2013_Fall)
         """
-        try:
-            record = CourseEnrollment.objects.get(user=user, course_id=course_key)
-            return record.is_active
-        except cls.DoesNotExist:
-            return False
+        __, is_active = cls.enrollment_mode_for_user(user, course_key)
+        return bool(is_active)
 
     @classmethod
     def is_enrolled_by_partial(cls, user, course_id_partial):
@@ -1156,14 +1161,18 @@ class CourseEnrollment(models.Model):
         assert not course_id_partial.run  # None or empty string
         course_key = SlashSeparatedCourseKey(course_id_partial.org, course_id_partial.course, '')
         querystring = unicode(course_key.to_deprecated_string())
-        try:
-            return CourseEnrollment.objects.filter(
+        cache_key = cls.ENROLLMENT_PARTIAL_CACHE_KEY.format(
+            user_id=user.id, org=course_id_partial.org, course=course_id_partial.course
+        )
+        return cls._get_cached_enrollment_state(
+            user,
+            cache_key,
+            lambda: CourseEnrollment.objects.filter(
                 user=user,
                 course_id__startswith=querystring,
                 is_active=1
             ).exists()
-        except cls.DoesNotExist:
-            return False
+        )
 
     @classmethod
     def enrollment_mode_for_user(cls, user, course_id):
@@ -1177,11 +1186,90 @@ class CourseEnrollment(models.Model):
             and is_active is whether the enrollment is active.
         Returns (None, None) if the courseenrollment record does not exist.
         """
-        try:
-            record = CourseEnrollment.objects.get(user=user, course_id=course_id)
-            return (record.mode, record.is_active)
-        except cls.DoesNotExist:
-            return (None, None)
+        def get_enrollment_state():
+            """
+            Reads the mode and is_active of the enrollment from the database.
+            """
+            try:
+                record = CourseEnrollment.objects.get(user=user, course_id=course_id)
+                return (record.mode, record.is_active)
+            except cls.DoesNotExist:
+                return (None, None)
+
+        cache_key = cls.ENROLLMENT_STATE_CACHE_KEY.format(user_id=user.id, course_key=course_id)
+        return cls._get_cached_enrollment_state(user, cache_key, get_enrollment_state)
+
+    @classmethod
+    def _get_cached_enrollment_state(cls, user, cache_key, get_state):
+        """
+        Returns the enrollment state of `user` cached under `cache_key`,
+        looking in the request cache, then in the shared cache, and finally
+        calling `get_state` to read it from the database and caching it.
+
+        The shared cache is only used if COURSE_ENROLLMENT_CACHE_TIMEOUT is
+        set, and the request cache only while a request is being served.
+        Users that were not saved yet are not cached.
+
+        The states of an enrollment are invalidated when it is saved or
+        deleted, see invalidate_enrollment_cache.
+        """
+        if user.id is None:
+            return get_state()
+
+        request_cache = None
+        # The request cache is only set up in threads that serve requests.
+        if getattr(RequestCache.get_request_cache(), 'request', None) is not None:
+            request_cache = RequestCache.get_request_cache().data.setdefault('course_enrollment_state', {})
+            if cache_key in request_cache:
+                dog_stats_api.increment("common.student.enrollment_cache", tags=["result:request_hit"])
+                return request_cache[cache_key]
+
+        timeout = getattr(settings, 'COURSE_ENROLLMENT_CACHE_TIMEOUT', 0)
+        state = cache.get(cache_key) if timeout else None
+        if state is not None:
+            dog_stats_api.increment("common.student.enrollment_cache", tags=["result:shared_hit"])
+        else:
+            dog_stats_api.increment("common.student.enrollment_cache", tags=["result:miss"])
+            state = get_state()
+            if timeout:
+                cache.set(cache_key, state, timeout)
+
+        if request_cache is not None:
+            request_cache[cache_key] = state
+        return state
+
+    @classmethod
+    def invalidate_enrollment_cache(cls, user_id, course_key):
+        """
+        Removes the cached enrollment states of the user with `user_id` in the
+        course with `course_key` from the request cache and the shared cache.
+
+        Until the transaction of a request changing the enrollment commits,
+        concurrent requests can still read and cache its previous state, so
+        the states are removed from the shared cache again once it commits,
+        see delete_committed_enrollment_caches.
+        """
+        cache_keys = [
+            cls.ENROLLMENT_STATE_CACHE_KEY.format(user_id=user_id, course_key=course_key),
+            cls.ENROLLMENT_PARTIAL_CACHE_KEY.format(user_id=user_id, org=course_key.org, course=course_key.course),
+        ]
+        request_cache = getattr(RequestCache.get_request_cache(), 'data', {}).get('course_enrollment_state', {})
+        for cache_key in cache_keys:
+            request_cache.pop(cache_key, None)
+        cache.delete_many(cache_keys)
+
+        if transaction.is_managed() and getattr(RequestCache.get_request_cache(), 'request', None) is not None:
+            RequestCache.get_request_cache().data.setdefault('course_enrollment_uncommitted', set()).update(cache_keys)
+
+    @classmethod
+    def delete_committed_enrollment_caches(cls):
+        """
+        Removes the enrollment states invalidated in the transaction of the
+        current request from the shared cache, once it has been committed.
+        """
+        cache_keys = RequestCache.get_request_cache().data.pop('course_enrollment_uncommitted', None)
+        if cache_keys:
+            cache.delete_many(list(cache_keys))
 
     @classmethod
     def enrollments_for_user(cls, user):
@@ -1268,6 +1356,22 @@ class CourseEnrollment(models.Model):
     def course(self):
         return modulestore().get_course(self.course_id)
 
+    @property
+    def course_overview(self):
+        """
+        Returns the CourseOverview of the course of this enrollment, or None if
+        the course does not exist.  It is only read on first access, unless set
+        beforehand, e.g. from CourseOverview.get_from_ids.
+        """
+        if not hasattr(self, '_course_overview'):
+            self._course_overview = CourseOverview.get_from_id(self.course_id)
+        return self._course_overview
+
+    @course_overview.setter
+    def course_overview(self, course_overview):
+        # pylint: disable=attribute-defined-outside-init
+        self._course_overview = course_overview
+
     def is_verified_enrollment(self):
         """
         Check the course enrollment mode is verified or not
@@ -1275,6 +1379,16 @@ class CourseEnrollment(models.Model):
         return CourseMode.is_verified_slug(self.mode)
 
 
+@receiver(post_save, sender=CourseEnrollment)
+@receiver(post_delete, sender=CourseEnrollment)
+def invalidate_enrollment_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the cached states of an enrollment whenever it is saved,
+    including by update_enrollment and unenroll, or deleted.
+    """
+    CourseEnrollment.invalidate_enrollment_cache(instance.user_id, instance.course_id)
+
+
 class CourseEnrollmentAllowed(models.Model):
     """
     Table of users (specified by email address strings) who are allowed to enroll in a specified course.
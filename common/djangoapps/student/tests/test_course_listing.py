@@ -13,6 +13,7 @@ from xmodule.modulestore.tests.factories import CourseFactory
 from xmodule.modulestore.django import modulestore
 from xmodule.error_module import ErrorDescriptor
 from django.test.client import Client
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from student.models import CourseEnrollment
 from student.views import get_course_enrollment_pairs
 from util.milestones_helpers import (
@@ -91,6 +92,8 @@ class TestCourseListing(ModuleStoreTestCase):
         course_key = mongo_store.make_course_key('Org1', 'Course1', 'Run1')
         self._create_course_with_access_groups(course_key, default_store=ModuleStoreEnum.Type.mongo)
 
+        # the course fails to load before its overview is generated
+        CourseOverview.objects.all().delete()
         with patch('xmodule.modulestore.mongo.base.MongoKeyValueStore', Mock(side_effect=Exception)):
             self.assertIsInstance(modulestore().get_course(course_key), ErrorDescriptor)
 
@@ -125,6 +128,8 @@ class TestCourseListing(ModuleStoreTestCase):
                 'metadata.tabs': course_db_record['metadata']['tabs'],
             }},
         )
+        # the errored course fails to load before its overview is generated
+        CourseOverview.objects.filter(id=course_location).delete()
 
         courses_list = list(get_course_enrollment_pairs(self.student, None, []))
         self.assertEqual(len(courses_list), 1, courses_list)
@@ -17,14 +17,17 @@ from django.contrib.sessions.middleware import SessionMiddleware
 from django.core.urlresolvers import reverse
 from django.test import TestCase
 from django.test.client import RequestFactory, Client
+from django.test.utils import override_settings
 from mock import Mock, patch
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
+from request_cache.middleware import RequestCache
 
 from student.models import (
     anonymous_id_for_user, user_by_anonymous_id, CourseEnrollment, unique_id_for_user, LinkedInAddToProfileConfiguration
 )
 from student.views import (process_survey_link, _cert_info,
                            change_enrollment, complete_course_mode_info)
+from student.middleware import EnrollmentCacheMiddleware
 from student.tests.factories import UserFactory, CourseModeFactory
 from util.testing import EventTestMixin
 from util.model_utils import USER_SETTINGS_CHANGED_EVENT_NAME
@@ -735,6 +738,84 @@ class EnrollInCourseTest(EnrollmentEventTestMixin, TestCase):
         self.assert_enrollment_mode_change_event_was_emitted(user, course_id, "honor")
 
 
+@unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
+class EnrollmentCacheTest(TestCase):
+    """Tests the caching of enrollment states."""
+
+    def setUp(self):
+        super(EnrollmentCacheTest, self).setUp()
+        self.user = UserFactory.create()
+        self.course_id = SlashSeparatedCourseKey("edX", "Test101", "2013")
+        self.course_id_partial = SlashSeparatedCourseKey("edX", "Test101", None)
+
+        # enrollment states are only cached in the request cache while serving a request
+        RequestCache().process_request(Mock())
+        self.addCleanup(RequestCache().clear_request_cache)
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_request_cache(self):
+        with self.assertNumQueries(2):
+            self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_id))
+            self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.course_id), (None, None))
+            self.assertFalse(CourseEnrollment.is_enrolled_by_partial(self.user, self.course_id_partial))
+            self.assertFalse(CourseEnrollment.is_enrolled_by_partial(self.user, self.course_id_partial))
+
+        # enrolling invalidates the cached states
+        CourseEnrollment.enroll(self.user, self.course_id, "verified")
+        with self.assertNumQueries(2):
+            self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.course_id))
+            self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.course_id), ("verified", True))
+            self.assertTrue(CourseEnrollment.is_enrolled_by_partial(self.user, self.course_id_partial))
+            self.assertTrue(CourseEnrollment.is_enrolled_by_partial(self.user, self.course_id_partial))
+
+        # and so do unenrolling and changing modes
+        CourseEnrollment.unenroll(self.user, self.course_id)
+        self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_id))
+        self.assertFalse(CourseEnrollment.is_enrolled_by_partial(self.user, self.course_id_partial))
+        CourseEnrollment.objects.get(user=self.user, course_id=self.course_id).change_mode("honor")
+        self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.course_id), ("honor", False))
+
+    def test_not_cached_outside_requests(self):
+        RequestCache().clear_request_cache()
+        with self.assertNumQueries(2):
+            self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_id))
+            self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_id))
+
+    @override_settings(COURSE_ENROLLMENT_CACHE_TIMEOUT=60)
+    def test_shared_cache(self):
+        with self.assertNumQueries(1):
+            self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_id))
+
+        # the next request reads the state from the shared cache
+        RequestCache().process_request(Mock())
+        with self.assertNumQueries(0):
+            self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_id))
+
+        # which is invalidated when enrolling
+        CourseEnrollment.enroll(self.user, self.course_id)
+        RequestCache().process_request(Mock())
+        with self.assertNumQueries(1):
+            self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.course_id))
+
+    @override_settings(COURSE_ENROLLMENT_CACHE_TIMEOUT=60)
+    def test_invalidated_after_commit(self):
+        request = Mock()
+        RequestCache().process_request(request)
+        with patch('student.models.transaction.is_managed', return_value=True):
+            CourseEnrollment.enroll(self.user, self.course_id)
+
+        # a concurrent request caches the state it read before the enrollment was committed
+        cache_key = CourseEnrollment.ENROLLMENT_STATE_CACHE_KEY.format(user_id=self.user.id, course_key=self.course_id)
+        cache.set(cache_key, (None, None), 60)
+
+        # the stale state is removed once the transaction is committed
+        EnrollmentCacheMiddleware().process_response(request, Mock())
+        RequestCache().process_request(Mock())
+        with self.assertNumQueries(1):
+            self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.course_id))
+
+
 @unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
 class ChangeEnrollmentViewTest(ModuleStoreTestCase):
     """Tests the student.views.change_enrollment view"""
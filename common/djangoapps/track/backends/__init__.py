@@ -26,3 +26,14 @@ class BaseBackend(object):
     def send(self, event):
         """Send event to tracker."""
         pass
+
+    def send_batch(self, events):
+        """
+        Send a list of events to tracker.
+
+        Backends that can store several events at once should override
+        this, see track.backends.buffered.
+
+        """
+        for event in events:
+            self.send(event)
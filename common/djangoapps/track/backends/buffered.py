@@ -0,0 +1,189 @@
+"""
+Event tracker backend that buffers events in memory, and sends them in
+batches to another backend from a background thread, so that requests do
+not wait for the events they emit to be stored.
+
+The backend can be configured using Django settings as the example below::
+
+  TRACKING_BACKENDS = {
+      'mongo': {
+          'ENGINE': 'track.backends.buffered.BufferedBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'track.backends.mongodb.MongoBackend',
+                  'OPTIONS': {...}
+              },
+              'batch_size': 100,
+              'flush_interval': 1.0,
+              'max_queue_size': 10000,
+          }
+      }
+  }
+
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import logging
+import os
+import threading
+import weakref
+from Queue import Queue, Empty, Full
+
+from dogapi import dog_stats_api
+
+from track.backends import BaseBackend
+
+
+log = logging.getLogger(__name__)
+
+# The backends of this process, whose queued events are sent when it exits.
+_BACKENDS = weakref.WeakSet()
+
+
+@atexit.register
+def _close_backends():
+    """Close all the backends, sending the events still queued."""
+    for backend in list(_BACKENDS):
+        backend.close()
+
+
+class BufferedBackend(BaseBackend):
+    """
+    Event tracker backend that queues events, and sends them to the
+    backend it wraps in batches, using its `send_batch` method.
+
+    A batch is sent from a background thread once `batch_size` events are
+    queued, or at the latest `flush_interval` seconds after the previous
+    batch.  Events sent while `max_queue_size` events are already queued
+    are dropped, rather than blocking the request that sent them, and the
+    number of dropped events is logged with each batch.  The queued events
+    are sent when the process exits.
+    """
+
+    def __init__(self, backend, batch_size=100, flush_interval=1.0, max_queue_size=10000, **kwargs):
+        """
+        :Parameters:
+
+          - `backend`: the configuration of the backend to send the
+            events to, as a dict with an `ENGINE` and optional `OPTIONS`,
+            like the entries of TRACKING_BACKENDS.
+          - `batch_size`: maximum number of events sent in one batch.
+          - `flush_interval`: maximum number of seconds between batches.
+          - `max_queue_size`: maximum number of events queued.
+
+        """
+        super(BufferedBackend, self).__init__(**kwargs)
+
+        # Imported here, as the tracker imports this module when it
+        # initializes its backends.
+        from track.tracker import _instantiate_backend_from_name
+        self.backend = _instantiate_backend_from_name(backend['ENGINE'], backend.get('OPTIONS', {}))
+        self.backend_name = backend['ENGINE'].split('.')[-1]
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = Queue(maxsize=max_queue_size)
+        self.dropped_count = 0
+        self._logged_dropped_count = 0
+
+        self._flush_requested = threading.Event()
+        self._stopping = False
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+
+        _BACKENDS.add(self)
+
+    def send(self, event):
+        """Queue the event, to be sent with the next batch."""
+        self._ensure_thread()
+        try:
+            self.queue.put_nowait(event)
+        except Full:
+            self.dropped_count += 1
+            dog_stats_api.increment(
+                'track.buffered.dropped', tags=[u'backend:{}'.format(self.backend_name)]
+            )
+            return
+
+        if self.queue.qsize() >= self.batch_size:
+            self._flush_requested.set()
+
+    def flush(self):
+        """Send all the queued events, in batches."""
+        self._log_dropped_events()
+        while True:
+            batch = []
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.get_nowait())
+            except Empty:
+                pass
+
+            if not batch:
+                return
+
+            try:
+                self.backend.send_batch(batch)
+            except Exception:  # pylint: disable=broad-except
+                log.exception(u'Error sending a batch of %d tracking events to %s', len(batch), self.backend_name)
+
+    def close(self):
+        """Stop the background thread, and send the events still queued."""
+        self._stopping = True
+        self._flush_requested.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(self.flush_interval * 2)
+        self.flush()
+
+    def _ensure_thread(self):
+        """
+        Start the background thread, unless it is running in this process.
+
+        Threads do not survive forks, so this checks the process id, and
+        starts a new thread in processes forked from one that had sent
+        events, such as the workers of a preloaded application server.
+        The events queued by the parent process are left for it to send.
+        """
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            if self._thread_pid is not None:
+                # The queue may have been locked by a thread of the parent
+                # process when it forked, so the child gets a new one.
+                self.queue = Queue(maxsize=self.queue.maxsize)
+                self._flush_requested = threading.Event()
+                self.dropped_count = 0
+                self._logged_dropped_count = 0
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name=u'track-buffered-{}'.format(self.backend_name)
+            )
+            self._thread.daemon = True
+            self._thread.start()
+            self._thread_pid = os.getpid()
+
+    def _run(self):
+        """Send the queued events in batches until the backend is closed."""
+        while not self._stopping:
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            dog_stats_api.gauge(
+                'track.buffered.queue_depth', self.queue.qsize(), tags=[u'backend:{}'.format(self.backend_name)]
+            )
+            self.flush()
+
+    def _log_dropped_events(self):
+        """Log the number of events dropped since this was last logged."""
+        dropped_count = self.dropped_count - self._logged_dropped_count
+        if dropped_count > 0:
+            self._logged_dropped_count += dropped_count
+            log.warning(
+                u'Dropped %d tracking events, as %d events were queued for %s',
+                dropped_count, self.queue.maxsize, self.backend_name
+            )
@@ -81,3 +81,14 @@ class DjangoBackend(BaseBackend):
             tldat.save(using=self.name)
         except Exception as e:  # pylint: disable=broad-except
             log.exception(e)
+
+    def send_batch(self, events):
+        """Save the events in one query, or one by one if that fails."""
+        logs = [TrackingLog(**{x: event.get(x, '') for x in LOGFIELDS}) for event in events]
+        try:
+            TrackingLog.objects.using(self.name).bulk_create(logs)
+        except Exception as e:  # pylint: disable=broad-except
+            log.exception(e)
+            # Save the valid events of the batch
+            for event in events:
+                self.send(event)
@@ -0,0 +1,102 @@
+from __future__ import absolute_import
+
+import os
+import threading
+
+from django.test import TestCase
+from mock import patch
+
+from track.backends import BaseBackend
+from track.backends import buffered
+from track.backends.buffered import BufferedBackend
+
+
+class DummyBackend(BaseBackend):
+    """Backend that records the batches of events it is sent."""
+    def __init__(self, **options):
+        super(DummyBackend, self).__init__(**options)
+        self.batches = []
+        self.batch_sent = threading.Event()
+
+    def send(self, event):
+        self.send_batch([event])
+
+    def send_batch(self, events):
+        self.batches.append(events)
+        self.batch_sent.set()
+
+
+class TestBufferedBackend(TestCase):
+    def create_backend(self, **options):
+        backend = BufferedBackend(
+            backend={'ENGINE': 'track.backends.tests.test_buffered.DummyBackend'},
+            **options
+        )
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_sends_full_batches_in_background(self):
+        backend = self.create_backend(batch_size=2, flush_interval=60)
+        events = [{'test': 1}, {'test': 2}, {'test': 3}]
+        for event in events:
+            backend.send(event)
+
+        backend.backend.batch_sent.wait(10)
+        self.assertEqual(backend.backend.batches[0], events[:2])
+
+        # the queued events are all sent by the time the backend is closed
+        backend.close()
+        self.assertEqual(backend.backend.batches, [events[:2], events[2:]])
+
+    def test_sends_batches_after_flush_interval(self):
+        backend = self.create_backend(batch_size=10, flush_interval=0.1)
+        backend.send({'test': 1})
+
+        backend.backend.batch_sent.wait(10)
+        self.assertEqual(backend.backend.batches, [[{'test': 1}]])
+
+    def test_drops_events_when_queue_is_full(self):
+        backend = self.create_backend(batch_size=10, flush_interval=60, max_queue_size=2)
+        events = [{'test': 1}, {'test': 2}, {'test': 3}]
+        for event in events:
+            backend.send(event)
+        self.assertEqual(backend.dropped_count, 1)
+
+        backend.flush()
+        self.assertEqual(backend.backend.batches, [events[:2]])
+
+    def test_logs_dropped_count_with_batches(self):
+        backend = self.create_backend(batch_size=10, flush_interval=60, max_queue_size=1)
+        with patch.object(buffered, 'log') as mock_log:
+            for index in range(3):
+                backend.send({'test': index})
+            self.assertFalse(mock_log.warning.called)
+
+            backend.flush()
+            backend.flush()
+        mock_log.warning.assert_called_once_with(
+            u'Dropped %d tracking events, as %d events were queued for %s', 2, 1, 'DummyBackend'
+        )
+
+    def test_new_queue_after_fork(self):
+        backend = self.create_backend(batch_size=10, flush_interval=60)
+        # no background thread actually sends the events
+        with patch.object(BufferedBackend, '_run'):
+            backend.send({'test': 1})
+            parent_queue = backend.queue
+            with patch('track.backends.buffered.os.getpid', return_value=os.getpid() + 1):
+                backend.send({'test': 2})
+
+        # the event queued by the parent process is left for it to send
+        self.assertEqual(parent_queue.qsize(), 1)
+        backend.flush()
+        self.assertEqual(backend.backend.batches, [[{'test': 2}]])
+
+    def test_closed_at_exit(self):
+        with patch('atexit.register') as mock_register:
+            backend = self.create_backend(batch_size=10, flush_interval=60)
+        self.assertFalse(mock_register.called)
+
+        backend.send({'test': 1})
+        buffered._close_backends()  # pylint: disable=protected-access
+        self.assertEqual(backend.backend.batches, [[{'test': 1}]])
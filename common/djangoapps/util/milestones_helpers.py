@@ -116,6 +116,22 @@ def get_pre_requisite_courses_not_completed(user, enrolled_courses):
     return pre_requisite_courses
 
 
+def get_completed_pre_requisite_courses(user):
+    """
+    Returns the set of ids, as strings, of the courses that the user has
+    completed as pre-requisites of other courses, read in one call to the
+    milestones api rather than one call per course.
+    """
+    if not settings.FEATURES.get('ENABLE_PREREQUISITE_COURSES', False):
+        return frozenset()
+    from milestones import api as milestones_api
+    # The milestones fulfilled by pre-requisite courses are in the namespace
+    # of the pre-requisite course, see add_prerequisite_course.
+    return frozenset(
+        milestone['namespace'] for milestone in milestones_api.get_user_milestones({'id': user.id})
+    )
+
+
 def get_prerequisite_courses_display(course_descriptor):
     """
     It would retrieve pre-requisite courses, make display strings
@@ -3,8 +3,10 @@ Tests for the milestones helpers library, which is the integration point for the
 """
 
 from mock import patch
+from opaque_keys.edx.keys import CourseKey
 
 from milestones.exceptions import InvalidCourseKeyException, InvalidUserException
+from student.tests.factories import UserFactory
 from util import milestones_helpers
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
@@ -95,3 +97,22 @@ class MilestonesHelpersTestCase(ModuleStoreTestCase):
             milestones_helpers.any_unfulfilled_milestones(None, self.user)
         with self.assertRaises(InvalidUserException):
             milestones_helpers.any_unfulfilled_milestones(self.course.id, None)
+
+    @patch.dict('django.conf.settings.FEATURES', {'MILESTONES_APP': True, 'ENABLE_PREREQUISITE_COURSES': True})
+    def test_get_completed_pre_requisite_courses(self):
+        milestones_helpers.seed_milestone_relationship_types()
+        user = UserFactory()
+        pre_requisite_ids = [unicode(CourseFactory.create().id) for __ in range(2)]
+        course = CourseFactory.create(pre_requisite_courses=pre_requisite_ids)
+        milestones_helpers.set_prerequisite_courses(course.id, pre_requisite_ids)
+        self.assertEqual(milestones_helpers.get_completed_pre_requisite_courses(user), frozenset())
+
+        milestones_helpers.fulfill_course_milestone(CourseKey.from_string(pre_requisite_ids[0]), user)
+        completed = milestones_helpers.get_completed_pre_requisite_courses(user)
+        self.assertEqual(completed, frozenset(pre_requisite_ids[:1]))
+        # the pre-requisites not completed according to get_pre_requisite_courses_not_completed are the others
+        not_completed = milestones_helpers.get_pre_requisite_courses_not_completed(user, [course.id])
+        self.assertEqual(
+            [unicode(required_course['key']) for required_course in not_completed[course.id]['courses']],
+            [course_id for course_id in pre_requisite_ids if course_id not in completed]
+        )
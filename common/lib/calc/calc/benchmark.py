@@ -0,0 +1,124 @@
+"""
+Benchmark evaluating a corpus of realistic answers with `evaluator`.
+
+Times each evaluation as it used to run, building the grammar and parsing
+the expression every time, then parsing the expression every time with the
+grammar built once, and finally with the parsed expressions cached.
+
+Also times evaluating the expressions for many samples of their variables,
+as FormulaResponse does, one sample at a time and with `evaluate_samples`.
+
+    python -m calc.benchmark --repeat 100 --samples 20
+"""
+import argparse
+import random
+from timeit import default_timer
+
+import numpy
+
+from calc import PARSE_CACHE, build_grammar, evaluate_samples, evaluator
+
+# Answers as typed by students to numerical and formula problems, with the
+# variables and functions of their problems.
+CORPUS = [
+    ({}, {}, "3.14"),
+    ({}, {}, "6.02e23"),
+    ({}, {}, "1.5k"),
+    ({}, {}, "4.7k || 10k"),
+    ({}, {}, "2*pi*60"),
+    ({}, {}, "-9.8*2.5^2/2"),
+    ({}, {}, "sqrt(2)/2"),
+    ({}, {}, "sin(pi/6) + cos(pi/3)"),
+    ({}, {}, "exp(-0.5)*(1 - e^(-2))"),
+    ({}, {}, "ln(2)/0.0231"),
+    ({}, {}, "12%"),
+    ({}, {}, "k*T/q"),
+    ({'x': 2.0}, {}, "3*x^2 - 2*x + 1"),
+    ({'x': 2.0, 'y': 3.0}, {}, "(x + y)^2 / (x*y)"),
+    ({'m': 2.0, 'v': 3.0}, {}, "m*v^2/2"),
+    ({'R1': 100.0, 'R2': 220.0}, {}, "R1 || R2"),
+    ({'omega': 5.0, 't': 0.1, 'A': 2.0}, {}, "A*cos(omega*t + pi/4)"),
+    ({'a': 1.0, 'b': -3.0, 'c': 2.0}, {}, "(-b + sqrt(b^2 - 4*a*c))/(2*a)"),
+    ({'x': 0.5}, {'f': numpy.tanh}, "f(x)^2 + 1/cosh(x)^2"),
+    ({'L': 1e-3, 'C': 1e-6}, {}, "1/(2*pi*sqrt(L*C))"),
+]
+
+
+def evaluate_corpus():
+    """
+    Evaluate each expression of the corpus.
+    """
+    for variables, functions, expression in CORPUS:
+        evaluator(variables, functions, expression)
+
+
+def time_per_expression(func, repeat):
+    """
+    Return the average time taken by `func` to evaluate an expression of the corpus, in microseconds.
+    """
+    start = default_timer()
+    for __ in range(repeat):
+        func()
+    return (default_timer() - start) * 1e6 / (repeat * len(CORPUS))
+
+
+def main():
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark evaluating a corpus of answers')
+    parser.add_argument("--repeat", type=int, default=100, help="Number of evaluations of the corpus")
+    parser.add_argument("--samples", type=int, default=20, help="Number of samples of the variables")
+    args = parser.parse_args()
+    # Some samples are out of the domain of the functions of their expression.
+    numpy.seterr(all='ignore')
+
+    def rebuilt_grammar():
+        """
+        Evaluate the corpus, building the grammar and parsing each expression.
+        """
+        for __ in CORPUS:
+            build_grammar()
+        uncached()
+
+    def uncached():
+        """
+        Evaluate the corpus, parsing each expression.
+        """
+        for variables, functions, expression in CORPUS:
+            PARSE_CACHE.clear()
+            evaluator(variables, functions, expression)
+
+    print "{} expressions".format(len(CORPUS))
+    for name, func in (('grammar built and expression parsed', rebuilt_grammar),
+                       ('expression parsed', uncached),
+                       ('parse cached', evaluate_corpus)):
+        print "{}: {:.0f} us per evaluation".format(name, time_per_expression(func, args.repeat))
+
+    samples = [
+        [{name: value * random.uniform(0.5, 2) for name, value in variables.iteritems()} for __ in range(args.samples)]
+        for variables, __, __ in CORPUS
+    ]
+
+    def each_sample():
+        """
+        Evaluate the corpus for each sample in turn.
+        """
+        for variables_list, (__, functions, expression) in zip(samples, CORPUS):
+            for variables in variables_list:
+                evaluator(variables, functions, expression)
+
+    def all_samples():
+        """
+        Evaluate the corpus for all the samples at once.
+        """
+        for variables_list, (__, functions, expression) in zip(samples, CORPUS):
+            evaluate_samples(variables_list, functions, expression)
+
+    print "{} samples".format(args.samples)
+    for name, func in (('each sample', each_sample), ('all samples', all_samples)):
+        print "{}: {:.0f} us per expression".format(name, time_per_expression(func, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
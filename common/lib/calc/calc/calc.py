@@ -7,6 +7,9 @@ Uses pyparsing to parse. Main function as of now is evaluator().
 import math
 import operator
 import numbers
+import threading
+from collections import OrderedDict
+
 import numpy
 import scipy.constants
 import functions
@@ -61,6 +64,13 @@ DEFAULT_VARIABLES = {
     'q': scipy.constants.e  # Fund. Charge: 1.602176565e-19 (Coulombs)
 }
 
+# The default functions which aren't numpy ufuncs, but can be applied to
+# arrays all the same.
+VECTORIZED_FUNCTIONS = frozenset([
+    functions.sec, functions.csc, functions.cot, functions.arcsec, functions.arccsc,
+    functions.sech, functions.csch, functions.coth, functions.arcsech, functions.arccsch, functions.arccoth,
+])
+
 # We eliminated the following extreme suffixes:
 #   P (1e15), E (1e18), Z (1e21), Y (1e24),
 #   f (1e-15), a (1e-18), z (1e-21), y (1e-24)
@@ -73,6 +83,11 @@ SUFFIXES = {
 }
 
 
+# Number of parsed expressions kept by `ParseAugmenter.parse_algebra`, so that
+# evaluating or previewing the same expression again skips parsing.
+PARSE_CACHE_SIZE = 1024
+
+
 class UndefinedVariable(Exception):
     """
     Indicate when a student inputs a variable which was not expected.
@@ -121,8 +136,8 @@ def eval_atom(parse_result):
 
     In the case of parenthesis, ignore them.
     """
-    # Find first number in the list
-    result = next(k for k in parse_result if isinstance(k, numbers.Number))
+    # Find first number (or array of samples) in the list
+    result = next(k for k in parse_result if not isinstance(k, basestring))
     return result
 
 
@@ -136,7 +151,7 @@ def eval_power(parse_result):
     # `reduce` will go from left to right; reverse the list.
     parse_result = reversed(
         [k for k in parse_result
-         if isinstance(k, numbers.Number)]  # Ignore the '^' marks.
+         if not isinstance(k, basestring)]  # Ignore the '^' marks.
     )
     # Having reversed it, raise `b` to the power of `a`.
     power = reduce(lambda a, b: b ** a, parse_result)
@@ -173,12 +188,12 @@ def eval_sum(parse_result):
     total = 0.0
     current_op = operator.add
     for token in parse_result:
-        if token == '+':
+        if not isinstance(token, basestring):
+            total = current_op(total, token)
+        elif token == '+':
             current_op = operator.add
         elif token == '-':
             current_op = operator.sub
-        else:
-            total = current_op(total, token)
     return total
 
 
@@ -191,15 +206,44 @@ def eval_product(parse_result):
     prod = 1.0
     current_op = operator.mul
     for token in parse_result:
-        if token == '*':
+        if not isinstance(token, basestring):
+            prod = current_op(prod, token)
+        elif token == '*':
             current_op = operator.mul
         elif token == '/':
             current_op = operator.truediv
-        else:
-            prod = current_op(prod, token)
     return prod
 
 
+def eval_parallel_samples(parse_result):
+    """
+    Like `eval_parallel`, for arrays of samples.
+
+    Raise FloatingPointError if there is a zero among the inputs, for the
+    samples to be evaluated one by one, as `eval_parallel` returns NaN for
+    the samples with a zero only.
+    """
+    values = [k for k in parse_result if not isinstance(k, basestring)]
+    if len(values) == 1:
+        return values[0]
+    if any(numpy.any(numpy.equal(value, 0)) for value in values):
+        raise FloatingPointError('zero in parallel resistors')
+    return 1. / sum(1. / value for value in values)
+
+
+def apply_function(function, argument):
+    """
+    Apply `function` to `argument`, which may be an array of samples.
+
+    Functions which can't be applied to arrays are applied to each sample.
+    """
+    if isinstance(argument, numpy.ndarray) and not (
+            isinstance(function, numpy.ufunc) or function in VECTORIZED_FUNCTIONS
+    ):
+        return numpy.array([function(value) for value in argument.tolist()])
+    return function(argument)
+
+
 def add_defaults(variables, functions, case_sensitive):
     """
     Create dictionaries with both the default and user-defined variables.
@@ -258,6 +302,230 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
     return math_interpreter.reduce_tree(evaluate_actions)
 
 
+def evaluate_samples(variables_list, functions, math_expr, case_sensitive=False):
+    """
+    Evaluate an expression for each dictionary of variables of `variables_list`.
+
+    Return the same list of results as evaluating the expression with
+    `evaluator` for each of them, but parse the expression only once, and
+    evaluate it for all the samples at once, over numpy arrays of the values
+    of each variable.
+
+    If numpy flags a floating point error (a division by zero, an overflow,
+    an invalid operation, ...) for any of the samples, they are evaluated one
+    by one with `evaluator`, to get the same NaNs, infinities or errors.
+    """
+    if not variables_list:
+        return []
+
+    # No need to go further.
+    if math_expr.strip() == "":
+        return [float('nan')] * len(variables_list)
+
+    def evaluate_each():
+        """
+        Evaluate the expression for each dictionary of variables in turn.
+        """
+        return [evaluator(variables, functions, math_expr, case_sensitive) for variables in variables_list]
+
+    # Get our variables together, as arrays of their samples.
+    names = set(variables_list[0])
+    if any(set(variables) != names for variables in variables_list):
+        return evaluate_each()
+    samples = {
+        name: numpy.array([variables[name] for variables in variables_list])
+        for name in names
+    }
+    if any(values.dtype.kind not in 'fc' for values in samples.values()):
+        # Only floats and complex numbers behave the same in arrays
+        return evaluate_each()
+
+    # Parse the tree.
+    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
+    math_interpreter.parse_algebra()
+
+    all_variables, all_functions = add_defaults(samples, functions, case_sensitive)
+
+    # ...and check them
+    math_interpreter.check_variables(all_variables, all_functions)
+
+    # Create a recursion to evaluate the tree.
+    if case_sensitive:
+        casify = lambda x: x
+    else:
+        casify = lambda x: x.lower()  # Lowercase for case insens.
+
+    evaluate_actions = {
+        'number': eval_number,
+        'variable': lambda x: all_variables[casify(x[0])],
+        'function': lambda x: apply_function(all_functions[casify(x[0])], x[1]),
+        'atom': eval_atom,
+        'power': eval_power,
+        'parallel': eval_parallel_samples,
+        'product': eval_product,
+        'sum': eval_sum
+    }
+
+    try:
+        with numpy.errstate(all='raise'):
+            result = math_interpreter.reduce_tree(evaluate_actions)
+    except FloatingPointError:
+        return evaluate_each()
+
+    if isinstance(result, numpy.ndarray):
+        return result.tolist()
+    # The expression doesn't depend on the samples.
+    return [result] * len(variables_list)
+
+
+def build_grammar():
+    """
+    Build the pyparsing grammar of algebraic expressions.
+
+    The grammar keeps all operators in the tree and does not parse any strings
+    of numbers into their float versions. It does not depend on the expression
+    nor on case sensitivity, so it is only built once, by `get_grammar`.
+    """
+    # 0.33 or 7 or .34 or 16.
+    number_part = Word(nums)
+    inner_number = (number_part + Optional("." + Optional(number_part))) | ("." + number_part)
+    # pyparsing allows spaces between tokens--`Combine` prevents that.
+    inner_number = Combine(inner_number)
+
+    # SI suffixes and percent.
+    number_suffix = MatchFirst(Literal(k) for k in SUFFIXES.keys())
+
+    # 0.33k or 17
+    plus_minus = Literal('+') | Literal('-')
+    number = Group(
+        Optional(plus_minus) +
+        inner_number +
+        Optional(CaselessLiteral("E") + Optional(plus_minus) + number_part) +
+        Optional(number_suffix)
+    )
+    number = number("number")
+
+    # Predefine recursive variables.
+    expr = Forward()
+
+    # Handle variables passed in. They must start with letters/underscores
+    # and may contain numbers afterward.
+    inner_varname = Word(alphas + "_", alphanums + "_")
+    varname = Group(inner_varname)("variable")
+
+    # Same thing for functions.
+    function = Group(inner_varname + Suppress("(") + expr + Suppress(")"))("function")
+
+    atom = number | function | varname | "(" + expr + ")"
+    atom = Group(atom)("atom")
+
+    # Do the following in the correct order to preserve order of operation.
+    pow_term = atom + ZeroOrMore("^" + atom)
+    pow_term = Group(pow_term)("power")
+
+    par_term = pow_term + ZeroOrMore('||' + pow_term)  # 5k || 4k
+    par_term = Group(par_term)("parallel")
+
+    prod_term = par_term + ZeroOrMore((Literal('*') | Literal('/')) + par_term)  # 7 * 5 / 4
+    prod_term = Group(prod_term)("product")
+
+    sum_term = Optional(plus_minus) + prod_term + ZeroOrMore(plus_minus + prod_term)  # -5 + 4 - 3
+    sum_term = Group(sum_term)("sum")
+
+    # Finish the recursion.
+    expr << sum_term  # pylint: disable=pointless-statement
+    return expr + stringEnd
+
+
+_GRAMMAR = None
+_GRAMMAR_LOCK = threading.Lock()
+
+
+def get_grammar():
+    """
+    Return the grammar of algebraic expressions, building it on first use.
+    """
+    global _GRAMMAR  # pylint: disable=global-statement
+    if _GRAMMAR is None:
+        with _GRAMMAR_LOCK:
+            if _GRAMMAR is None:
+                _GRAMMAR = build_grammar()
+    return _GRAMMAR
+
+
+class ParseCache(object):
+    """
+    A thread-safe LRU cache of at most `size` parsed expressions.
+    """
+    def __init__(self, size):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, math_expr):
+        """
+        Return the parsed `math_expr`, or None if it isn't cached.
+        """
+        with self._lock:
+            parsed = self._entries.pop(math_expr, None)
+            if parsed is not None:
+                # re-insert the entry to mark it as the most recently used
+                self._entries[math_expr] = parsed
+        return parsed
+
+    def set(self, math_expr, parsed):
+        """
+        Cache the parsed `math_expr`, evicting the least recently used expression if the cache is full.
+        """
+        with self._lock:
+            self._entries.pop(math_expr, None)
+            while self._entries and len(self._entries) >= self.size:
+                self._entries.popitem(last=False)
+            self._entries[math_expr] = parsed
+
+    def clear(self):
+        """
+        Empty the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+PARSE_CACHE = ParseCache(PARSE_CACHE_SIZE)
+
+
+def parse_expression(math_expr):
+    """
+    Parse `math_expr` into a tree of nested `(name, children)` tuples, with
+    strings as leaves. Return the tree, along with the names of the variables
+    and of the functions the expression uses.
+
+    Unlike pyparsing's `ParseResults`, the tree is immutable and fast to walk,
+    so it is cached and shared by all the parses of the same expression.
+    """
+    variables_used = set()
+    functions_used = set()
+
+    def reduce_node(node):
+        """
+        Convert the pyparsing `node` into a tuple, recording the names used.
+        """
+        if not isinstance(node, ParseResults):
+            return node
+        node_name = node.getName()
+        if node_name == 'variable':
+            variables_used.add(node[0])
+        elif node_name == 'function':
+            functions_used.add(node[0])
+        return (node_name, tuple(reduce_node(child) for child in node))
+
+    tree = reduce_node(get_grammar().parseString(math_expr)[0])
+    return tree, frozenset(variables_used), frozenset(functions_used)
+
+
 class ParseAugmenter(object):
     """
     Holds the data for a particular parse.
@@ -278,86 +546,25 @@ class ParseAugmenter(object):
         self.variables_used = set()
         self.functions_used = set()
 
-        def vpa(tokens):
-            """
-            When a variable is recognized, store it in `variables_used`.
-            """
-            varname = tokens[0][0]
-            self.variables_used.add(varname)
-
-        def fpa(tokens):
-            """
-            When a function is recognized, store it in `functions_used`.
-            """
-            varname = tokens[0][0]
-            self.functions_used.add(varname)
-
-        self.variable_parse_action = vpa
-        self.function_parse_action = fpa
-
     def parse_algebra(self):
         """
         Parse an algebraic expression into a tree.
 
-        Store a `pyparsing.ParseResult` in `self.tree` with proper groupings to
-        reflect parenthesis and order of operations. Leave all operators in the
-        tree and do not parse any strings of numbers into their float versions.
+        Store a tree of `(name, children)` tuples in `self.tree`, with proper
+        groupings to reflect parenthesis and order of operations, and the names
+        of the variables and functions used in `self.variables_used` and
+        `self.functions_used`. See `parse_expression`.
 
-        Adding the groups and result names makes the `repr()` of the result
-        really gross. For debugging, use something like
-          print OBJ.tree.asXML()
+        Parsed expressions are kept in `PARSE_CACHE`, whatever the case
+        sensitivity, since it only matters when checking and evaluating them.
         """
-        # 0.33 or 7 or .34 or 16.
-        number_part = Word(nums)
-        inner_number = (number_part + Optional("." + Optional(number_part))) | ("." + number_part)
-        # pyparsing allows spaces between tokens--`Combine` prevents that.
-        inner_number = Combine(inner_number)
-
-        # SI suffixes and percent.
-        number_suffix = MatchFirst(Literal(k) for k in SUFFIXES.keys())
-
-        # 0.33k or 17
-        plus_minus = Literal('+') | Literal('-')
-        number = Group(
-            Optional(plus_minus) +
-            inner_number +
-            Optional(CaselessLiteral("E") + Optional(plus_minus) + number_part) +
-            Optional(number_suffix)
-        )
-        number = number("number")
-
-        # Predefine recursive variables.
-        expr = Forward()
-
-        # Handle variables passed in. They must start with letters/underscores
-        # and may contain numbers afterward.
-        inner_varname = Word(alphas + "_", alphanums + "_")
-        varname = Group(inner_varname)("variable")
-        varname.setParseAction(self.variable_parse_action)
-
-        # Same thing for functions.
-        function = Group(inner_varname + Suppress("(") + expr + Suppress(")"))("function")
-        function.setParseAction(self.function_parse_action)
-
-        atom = number | function | varname | "(" + expr + ")"
-        atom = Group(atom)("atom")
-
-        # Do the following in the correct order to preserve order of operation.
-        pow_term = atom + ZeroOrMore("^" + atom)
-        pow_term = Group(pow_term)("power")
-
-        par_term = pow_term + ZeroOrMore('||' + pow_term)  # 5k || 4k
-        par_term = Group(par_term)("parallel")
-
-        prod_term = par_term + ZeroOrMore((Literal('*') | Literal('/')) + par_term)  # 7 * 5 / 4
-        prod_term = Group(prod_term)("product")
-
-        sum_term = Optional(plus_minus) + prod_term + ZeroOrMore(plus_minus + prod_term)  # -5 + 4 - 3
-        sum_term = Group(sum_term)("sum")
-
-        # Finish the recursion.
-        expr << sum_term  # pylint: disable=pointless-statement
-        self.tree = (expr + stringEnd).parseString(self.math_expr)[0]
+        parsed = PARSE_CACHE.get(self.math_expr)
+        if parsed is None:
+            parsed = parse_expression(self.math_expr)
+            PARSE_CACHE.set(self.math_expr, parsed)
+        self.tree, variables_used, functions_used = parsed
+        self.variables_used = set(variables_used)
+        self.functions_used = set(functions_used)
 
     def reduce_tree(self, handle_actions, terminal_converter=None):
         """
@@ -379,19 +586,19 @@ class ParseAugmenter(object):
             Call the appropriate `handle_action` for this node. As its inputs,
             feed it the output of `handle_node` for each child node.
             """
-            if not isinstance(node, ParseResults):
+            if not isinstance(node, tuple):
                 # Then treat it as a terminal node.
                 if terminal_converter is None:
                     return node
                 else:
                     return terminal_converter(node)
 
-            node_name = node.getName()
+            node_name, children = node
             if node_name not in handle_actions:  # pragma: no cover
                 raise Exception(u"Unknown branch name '{}'".format(node_name))
 
             action = handle_actions[node_name]
-            handled_kids = [handle_node(k) for k in node]
+            handled_kids = [handle_node(k) for k in children]
             return action(handled_kids)
 
         # Find the value of the entire tree.
@@ -5,6 +5,7 @@ Unit tests for calc.py
 import unittest
 import numpy
 import calc
+from mock import patch
 from pyparsing import ParseException
 
 # numpy's default behavior when it evaluates a function outside its domain
@@ -559,3 +560,128 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+    def test_cached_parse_case_sensitivity(self):
+        """
+        Check that a cached parse is checked against the case sensitivity of each evaluation
+        """
+        variables = {'R1': 2.0}
+        self.assertEqual(calc.evaluator(variables, {}, "r1*3"), 6.0)
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1'):
+            calc.evaluator(variables, {}, "r1*3", case_sensitive=True)
+
+
+class ParseCacheTest(unittest.TestCase):
+    """
+    Test the caching of parsed expressions
+    """
+    def setUp(self):
+        super(ParseCacheTest, self).setUp()
+        calc.PARSE_CACHE.clear()
+
+    def test_parsed_once(self):
+        """
+        Check that an expression is only parsed once
+        """
+        with patch('calc.calc.parse_expression', wraps=calc.calc.parse_expression) as parse:
+            self.assertEqual(calc.evaluator({'x': 2}, {}, "3*x^2"), 12.0)
+            self.assertEqual(calc.evaluator({'x': 3}, {}, "3*x^2"), 27.0)
+        self.assertEqual(parse.call_count, 1)
+
+    def test_names_used(self):
+        """
+        Check that the variables and functions used by a cached parse are found
+        """
+        for __ in range(2):
+            parser = calc.ParseAugmenter("f(x) + sin(2*y)")
+            parser.parse_algebra()
+            self.assertEqual(parser.variables_used, set(['x', 'y']))
+            self.assertEqual(parser.functions_used, set(['f', 'sin']))
+
+    def test_parse_error_not_cached(self):
+        """
+        Check that expressions which don't parse aren't cached
+        """
+        with self.assertRaises(ParseException):
+            calc.evaluator({}, {}, "3*(2")
+        self.assertEqual(len(calc.PARSE_CACHE), 0)
+
+    def test_least_recently_used_evicted(self):
+        """
+        Check that the least recently used expression is evicted from a full cache
+        """
+        cache = calc.ParseCache(2)
+        cache.set('a', 'parsed a')
+        cache.set('b', 'parsed b')
+        cache.get('a')
+        cache.set('c', 'parsed c')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'parsed a')
+        self.assertEqual(cache.get('c'), 'parsed c')
+
+
+class EvaluateSamplesTest(unittest.TestCase):
+    """
+    Test the evaluation of expressions for many samples at once
+    """
+    def assert_same_as_evaluator(self, variables_list, functions, math_expr):
+        """
+        Check that `evaluate_samples` returns the results of `evaluator` for each sample
+        """
+        expected = [calc.evaluator(variables, functions, math_expr) for variables in variables_list]
+        results = calc.evaluate_samples(variables_list, functions, math_expr)
+        self.assertEqual(len(results), len(expected))
+        for result, expected_result in zip(results, expected):
+            if numpy.isnan(expected_result):
+                self.assertTrue(numpy.isnan(result))
+            else:
+                self.assertAlmostEqual(result, expected_result)
+
+    def test_vectorized(self):
+        """
+        Check expressions evaluated over arrays of samples
+        """
+        variables_list = [{'x': x, 'Y': x / 3.0} for x in (0.5, 1.0, 2.0)]
+        for math_expr in ["3*x^2 - x/y", "sin(x) + sec(x) + sqrt(x)", "x || y", "-x^y^2 + 2", "i*x", "2*pi"]:
+            self.assert_same_as_evaluator(variables_list, {}, math_expr)
+
+    def test_not_vectorized_functions(self):
+        """
+        Check that functions which can't be applied to arrays are applied to each sample
+        """
+        variables_list = [{'x': x} for x in (0.5, 1.0, 2.0)]
+        functions = {'f': lambda x: x if x > 1 else -x}
+        self.assert_same_as_evaluator(variables_list, functions, "f(x) + arccot(x - 1)")
+
+    def test_floating_point_errors(self):
+        """
+        Check that samples with floating point errors are evaluated one by one
+        """
+        variables_list = [{'x': x} for x in (-1.0, 0.0, 1.0)]
+        for math_expr in ["sqrt(x)", "x || 2", "ln(x) + 1"]:
+            self.assert_same_as_evaluator(variables_list, {}, math_expr)
+        with self.assertRaises(ZeroDivisionError):
+            calc.evaluate_samples(variables_list, {}, "1/x")
+        with self.assertRaises(ValueError):
+            calc.evaluate_samples(variables_list, {}, "x^0.5")
+
+    def test_errors(self):
+        """
+        Check that the errors of `evaluator` are raised
+        """
+        variables_list = [{'x': 1.0}, {'x': 2.5}]
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'y'):
+            calc.evaluate_samples(variables_list, {}, "x + y")
+        with self.assertRaisesRegexp(ValueError, 'factorial'):
+            calc.evaluate_samples(variables_list, {}, "fact(x)")
+        with self.assertRaises(ParseException):
+            calc.evaluate_samples(variables_list, {}, "x +")
+
+    def test_empty(self):
+        """
+        Check empty expressions and empty lists of samples
+        """
+        results = calc.evaluate_samples([{'x': 1.0}, {'x': 2.0}], {}, "  ")
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(numpy.isnan(result) for result in results))
+        self.assertEqual(calc.evaluate_samples([], {}, "x"), [])
@@ -0,0 +1,122 @@
+"""
+Benchmark instantiating a problem for many seeds, as grading and rescoring
+do for each learner.
+
+Times constructing the problem with its tree parsed each time, against
+copying its tree from the problem tree cache.
+
+    python -m capa.benchmark --seeds 10000
+"""
+import argparse
+import gettext
+import tempfile
+from timeit import default_timer
+
+import fs.osfs
+
+from capa.capa_problem import PROBLEM_TREE_CACHE, LoncapaProblem, LoncapaSystem
+
+# A randomized problem, with the usual response types.
+PROBLEM = """
+<problem>
+<script type="loncapa/python">
+import random
+mass = random.randint(2, 10)
+speed = random.randint(5, 30)
+energy = mass * speed ** 2 / 2.0
+</script>
+<p>A ball of mass $mass kg moves at $speed m/s.</p>
+<p>What is its kinetic energy, in joules?</p>
+<numericalresponse answer="$energy">
+  <responseparam type="tolerance" default="1%"/>
+  <formulaequationinput/>
+</numericalresponse>
+<p>Write its kinetic energy as a function of its mass m and speed v.</p>
+<formularesponse type="ci" samples="m,v@1,1:10,30#20" answer="m*v^2/2">
+  <responseparam type="tolerance" default="0.001"/>
+  <formulaequationinput size="40"/>
+</formularesponse>
+<p>Which quantity is conserved in an elastic collision?</p>
+<multiplechoiceresponse>
+  <choicegroup type="MultipleChoice" shuffle="true">
+    <choice correct="false">The speed of each ball</choice>
+    <choice correct="true">The total kinetic energy</choice>
+    <choice correct="false">The momentum of each ball</choice>
+    <choice correct="false">Nothing</choice>
+  </choicegroup>
+</multiplechoiceresponse>
+<p>Which units are units of energy?</p>
+<choiceresponse>
+  <checkboxgroup>
+    <choice correct="true">joule</choice>
+    <choice correct="false">watt</choice>
+    <choice correct="true">electronvolt</choice>
+    <choice correct="false">newton</choice>
+  </checkboxgroup>
+</choiceresponse>
+<p>In which unit is the kinetic energy given here?</p>
+<stringresponse answer="joule" type="ci">
+  <additional_answer>J</additional_answer>
+  <textline size="20"/>
+</stringresponse>
+<solution>
+  <p>The kinetic energy is m*v^2/2 = $energy J.</p>
+</solution>
+</problem>
+"""
+
+
+def capa_system():
+    """
+    Return a LoncapaSystem running the scripts of problems in this process.
+    """
+    return LoncapaSystem(
+        ajax_url='/ajax',
+        anonymous_student_id='student',
+        cache=None,
+        can_execute_unsafe_code=lambda: True,
+        get_python_lib_zip=lambda: None,
+        DEBUG=False,
+        filestore=fs.osfs.OSFS(tempfile.gettempdir()),
+        i18n=gettext.NullTranslations(),
+        node_path='',
+        render_template=lambda template, context: '<div/>',
+        seed=0,
+        STATIC_URL='/static/',
+        xqueue=None,
+    )
+
+
+def main():
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark instantiating a problem for many seeds')
+    parser.add_argument("--seeds", type=int, default=10000, help="Number of seeds to instantiate the problem for")
+    args = parser.parse_args()
+    system = capa_system()
+
+    def uncached(seed):
+        """
+        Instantiate the problem for `seed`, parsing its tree.
+        """
+        PROBLEM_TREE_CACHE.clear()
+        LoncapaProblem(PROBLEM, 'i4x-Benchmark-Physics-problem-energy', system, seed=seed)
+
+    def cached(seed):
+        """
+        Instantiate the problem for `seed`, copying its tree from the cache.
+        """
+        LoncapaProblem(PROBLEM, 'i4x-Benchmark-Physics-problem-energy', system, seed=seed)
+
+    print "{} seeds".format(args.seeds)
+    for name, func in (('tree parsed', uncached), ('tree cached', cached)):
+        start = default_timer()
+        for seed in range(args.seeds):
+            func(seed)
+        elapsed = default_timer() - start
+        print "{}: {:.2f}s, {:.0f} us per problem".format(name, elapsed, elapsed * 1e6 / args.seeds)
+
+
+if __name__ == '__main__':
+    main()
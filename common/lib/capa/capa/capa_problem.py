@@ -13,11 +13,14 @@ Main module which shows problems (of "capa" type).
 This is used by capa_module.
 """
 
+from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
+import hashlib
 import logging
 import os.path
 import re
+import threading
 
 from lxml import etree
 from pytz import UTC
@@ -58,6 +61,85 @@ html_problem_semantics = [
 
 log = logging.getLogger(__name__)
 
+# number of problem trees kept by each process
+PROBLEM_TREE_CACHE_SIZE = 256
+
+
+class ProblemTemplate(object):
+    """
+    The parts of a problem which don't depend on its seed: its parsed tree,
+    with the IDs of its responses and inputs assigned, and the class and
+    input fields of each of its responses.
+
+    The tree of a template is never modified: each problem gets a copy.
+    """
+    def __init__(self, tree, responses):
+        """
+        `responses` is a list of (response, response class, input fields) tuples of the elements of `tree`.
+        """
+        self.tree = tree
+        positions = {element: position for position, element in enumerate(tree.iter())}
+        self.responses = [
+            (positions[response], responsetype_cls, [positions[entry] for entry in inputfields])
+            for response, responsetype_cls, inputfields in responses
+        ]
+
+    def copy(self):
+        """
+        Return a copy of the tree, and the responses of the copy, as (response, response class, input fields) tuples.
+        """
+        tree = deepcopy(self.tree)
+        elements = list(tree.iter())
+        responses = [
+            (elements[response], responsetype_cls, [elements[entry] for entry in inputfields])
+            for response, responsetype_cls, inputfields in self.responses
+        ]
+        return tree, responses
+
+
+class ProblemTreeCache(object):
+    """
+    A thread-safe LRU cache of at most `size` problem templates.
+    """
+    def __init__(self, size):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the template cached under `key`, or None.
+        """
+        with self._lock:
+            template = self._entries.pop(key, None)
+            if template is not None:
+                # re-insert the entry to mark it as the most recently used
+                self._entries[key] = template
+        return template
+
+    def set(self, key, template):
+        """
+        Cache `template` under `key`, evicting the least recently used template if the cache is full.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            while self._entries and len(self._entries) >= self.size:
+                self._entries.popitem(last=False)
+            self._entries[key] = template
+
+    def clear(self):
+        """
+        Empty the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+PROBLEM_TREE_CACHE = ProblemTreeCache(PROBLEM_TREE_CACHE_SIZE)
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -160,20 +242,17 @@ class LoncapaProblem(object):
         problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
         self.problem_text = problem_text
 
-        # parse problem XML file into an element tree
-        self.tree = etree.XML(problem_text)
-
-        # handle any <include file="foo"> tags
-        self._process_includes()
+        # parse problem XML file into an element tree, with its includes processed
+        # and the IDs of its responses and inputs assigned
+        self.tree, responses = self._load_tree(problem_text)
 
         # construct script processor context (eg for customresponse problems)
         self.context = self._extract_context(self.tree)
 
-        # Pre-parse the XML tree: modifies it to add ID's and perform some in-place
-        # transformations.  This also creates the dict (self.responders) of Response
-        # instances for each question in the problem. The dict has keys = xml subtree of
-        # Response, values = Response instance
-        self._preprocess_problem(self.tree)
+        # Pre-parse the XML tree: performs some in-place transformations. This also
+        # creates the dict (self.responders) of Response instances for each question
+        # in the problem. The dict has keys = xml subtree of Response, values = Response instance
+        self._preprocess_problem(self.tree, responses)
 
         if not self.student_answers:  # True when student_answers is an empty dict
             self.set_initial_display()
@@ -530,6 +609,30 @@ class LoncapaProblem(object):
 
     # ======= Private Methods Below ========
 
+    def _load_tree(self, problem_text):
+        """
+        Return the tree of `problem_text`, and its responses, as (response, response class,
+        input fields) tuples.
+
+        The tree of a problem without includes is parsed once per process: the tree of
+        each instance of the problem is copied from its template, cached by problem text
+        and id. Included files may change, so the trees of problems with includes aren't
+        cached.
+        """
+        text = problem_text.encode('utf-8') if isinstance(problem_text, unicode) else problem_text
+        key = (hashlib.sha1(text).hexdigest(), self.problem_id)
+        template = PROBLEM_TREE_CACHE.get(key)
+        if template is None:
+            self.tree = etree.XML(problem_text)
+            if self.tree.find('.//include') is not None:
+                # handle any <include file="foo"> tags
+                self._process_includes()
+                return self.tree, self._assign_ids(self.tree)
+
+            template = ProblemTemplate(self.tree, self._assign_ids(self.tree))
+            PROBLEM_TREE_CACHE.set(key, template)
+        return template.copy()
+
     def _process_includes(self):
         """
         Handle any <include file="foo"> tags by reading in the specified file and inserting it
@@ -783,19 +886,16 @@ class LoncapaProblem(object):
 
         return tree
 
-    def _preprocess_problem(self, tree):  # private
+    def _assign_ids(self, tree):  # private
         """
         Assign IDs to all the responses
         Assign sub-IDs to all entries (textline, schematic, etc.)
-        Annoted correctness and value
         In-place transformation
 
-        Also create capa Response instances for each responsetype and save as self.responders
-
-        Obtain all responder answers and save as self.responder_answers dict (key = response)
+        Returns the responses, as (response, response class, input fields) tuples.
         """
         response_id = 1
-        self.responders = {}
+        responses = []
         for response in tree.xpath('//' + "|//".join(responsetypes.registry.registered_tags())):
             response_id_str = self.problem_id + "_" + str(response_id)
             # create and save ID for this response
@@ -816,8 +916,23 @@ class LoncapaProblem(object):
                 entry.attrib['id'] = "%s_%i_%i" % (self.problem_id, response_id, answer_id)
                 answer_id = answer_id + 1
 
-            # instantiate capa Response
             responsetype_cls = responsetypes.registry.get_class_for_tag(response.tag)
+            responses.append((response, responsetype_cls, inputfields))
+        return responses
+
+    def _preprocess_problem(self, tree, responses):  # private
+        """
+        Annoted correctness and value
+        In-place transformation
+
+        Create capa Response instances for each of the `responses` returned by
+        _assign_ids, and save as self.responders
+
+        Obtain all responder answers and save as self.responder_answers dict (key = response)
+        """
+        self.responders = {}
+        for response, responsetype_cls, inputfields in responses:
+            # instantiate capa Response
             responder = responsetype_cls(response, inputfields, self.context, self.capa_system)
             # save in list in self
             self.responders[response] = responder
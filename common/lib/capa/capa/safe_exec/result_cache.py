@@ -0,0 +1,89 @@
+"""A bounded, process-local cache of safe_exec results, in front of a shared cache."""
+
+from collections import OrderedDict
+import cPickle as pickle
+import logging
+import threading
+
+from dogapi import dog_stats_api
+
+log = logging.getLogger(__name__)
+
+
+class LocalFrontCache(object):
+    """
+    A cache for `safe_exec` results, with .get(key) and .set(key, value) methods.
+
+    Results are kept in a process-local LRU cache holding at most `max_bytes`
+    bytes of pickled values.  If `backend` is given, it must be another cache
+    with .get(key) and .set(key, value) methods (such as a memcached-backed
+    Django cache) shared by all processes: results missing from the local cache
+    are looked up there, and new results are stored in both.
+
+    Values are stored pickled so that callers can't modify cached results
+    through the objects they were given.
+
+    """
+    def __init__(self, backend=None, max_bytes=16 * 1024 * 1024):
+        self.backend = backend
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the value cached under `key`, or None."""
+        with self._lock:
+            pickled = self._entries.pop(key, None)
+            if pickled is not None:
+                # Re-insert the entry to mark it as the most recently used.
+                self._entries[key] = pickled
+
+        if pickled is not None:
+            dog_stats_api.increment('capa.safe_exec.cache', tags=['tier:local', 'result:hit'])
+            return pickle.loads(pickled)
+        dog_stats_api.increment('capa.safe_exec.cache', tags=['tier:local', 'result:miss'])
+
+        if self.backend is None:
+            return None
+
+        try:
+            value = self.backend.get(key)
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Unable to read %s from the shared safe_exec cache", key)
+            value = None
+        result = 'miss' if value is None else 'hit'
+        dog_stats_api.increment('capa.safe_exec.cache', tags=['tier:shared', 'result:' + result])
+        if value is not None:
+            self._add(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        return value
+
+    def set(self, key, value):
+        """Cache `value` under `key`."""
+        self._add(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        if self.backend is not None:
+            try:
+                self.backend.set(key, value)
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Unable to write %s to the shared safe_exec cache", key)
+
+    def _add(self, key, pickled):
+        """Add a pickled value, evicting the least recently used ones to stay within `max_bytes`."""
+        size = len(pickled)
+        if size > self.max_bytes:
+            return
+
+        evictions = 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+            while self._entries and self.current_bytes + size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                evictions += 1
+            self._entries[key] = pickled
+            self.current_bytes += size
+
+        if evictions:
+            dog_stats_api.increment('capa.safe_exec.cache.evictions', evictions, tags=['tier:local'])
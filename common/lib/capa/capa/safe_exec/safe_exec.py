@@ -1,12 +1,13 @@
 """Capa's specialized use of codejail.safe_exec."""
 
-from codejail.safe_exec import safe_exec as codejail_safe_exec
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import json_safe, SafeExecException
 from . import lazymod
+from . import sandbox_pool
 from dogapi import dog_stats_api
 
 import hashlib
+import time
 
 # Establish the Python environment for Capa.
 # Capa assumes float-friendly division always.
@@ -131,9 +132,10 @@ def safe_exec(
     if unsafely:
         exec_fn = codejail_not_safe_exec
     else:
-        exec_fn = codejail_safe_exec
+        exec_fn = sandbox_pool.safe_exec
 
     # Run the code!  Results are side effects in globals_dict.
+    start = time.time()
     try:
         exec_fn(
             code_prolog + LAZY_IMPORTS + code, globals_dict,
@@ -143,6 +145,12 @@ def safe_exec(
         emsg = e.message
     else:
         emsg = None
+    finally:
+        # The wall time spent running code, as opposed to capa.safe_exec.time
+        # which also counts the time spent on cached results.
+        dog_stats_api.histogram(
+            'capa.safe_exec.sandbox_time', time.time() - start, tags=['unsafely:{}'.format(bool(unsafely))]
+        )
 
     # Put the result back in the cache.  This is complicated by the fact that
     # the globals dict might not be entirely serializable.
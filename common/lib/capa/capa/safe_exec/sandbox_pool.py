@@ -0,0 +1,399 @@
+"""
+A pool of warm sandboxed Python processes for running capa code.
+
+Running code with codejail starts a new sandboxed Python for every execution,
+which then has to import numpy, scipy and the other modules problems use
+before it can run any of the problem's code.  A `SandboxPool` instead keeps
+a few sandboxed Pythons running with those modules already imported, and
+sends them code to run over a pipe.
+
+The workers never run code themselves: each execution happens in a child
+forked from the worker, with the codejail limits applied, so nothing an
+execution does to its modules or globals is seen by the next one.  The
+per-execution wall-clock `timeout` is enforced by killing the child, which
+runs in a process group of its own so that any process it starts is killed
+with it, and each worker is replaced after `max_runs` executions.
+
+The pool is off unless `configure` is called.  When it is off, or when all
+of its workers are busy, code is run with codejail as usual.
+"""
+
+import json
+import logging
+import os
+import select
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+
+from codejail.safe_exec import safe_exec as codejail_safe_exec
+from codejail.safe_exec import json_safe, SafeExecException
+from dogapi import dog_stats_api
+
+log = logging.getLogger(__name__)
+
+# The limits codejail applies to its sandboxed processes, used for the ones
+# not given in the codejail settings.  A CPU or VMEM of 0 means no limit.
+DEFAULT_LIMITS = {
+    # CPU seconds, not wall clock time.
+    'CPU': 1,
+    # Total process virtual memory, in bytes.
+    'VMEM': 0,
+    # Size of written files, in bytes.  0 means nothing can be written.
+    'FSIZE': 0,
+    # Number of processes of the sandbox user.
+    'NPROC': 15,
+}
+
+# Seconds to wait for a worker after the timeout of an execution, before
+# deciding it is stuck.
+WORKER_GRACE_PERIOD = 1
+
+# The program run by the workers.  It imports the modules given as arguments,
+# then reads requests from stdin, one json object per line, and writes a json
+# response line for each of them to stdout.  The code of each request runs in
+# a forked child, which sends its results back to the worker over a new pipe.
+WORKER_SCRIPT = r"""
+import json, os, resource, select, signal, sys, time, traceback
+for name in sys.argv[1:]:
+    try:
+        __import__(name)
+    except Exception:
+        pass
+
+# Keep private copies of the pipes, so that code printing things can't
+# interfere with the responses.
+requests = os.fdopen(os.dup(0), 'r')
+responses = os.fdopen(os.dup(1), 'w')
+os.dup2(2, 0)
+os.dup2(2, 1)
+
+# The worker opens few files, and file descriptors are allocated lowest
+# first, so the children close the ones below this.
+MAXFD = min(os.sysconf('SC_OPEN_MAX'), 1024)
+
+def jsonable(value):
+    try:
+        json.dumps(value)
+    except Exception:
+        return False
+    return True
+
+def set_limits(limits):
+    resource.setrlimit(resource.RLIMIT_NPROC, (limits['NPROC'], limits['NPROC']))
+    if limits['CPU']:
+        resource.setrlimit(resource.RLIMIT_CPU, (limits['CPU'], limits['CPU'] + 1))
+    if limits['VMEM']:
+        resource.setrlimit(resource.RLIMIT_AS, (limits['VMEM'], limits['VMEM']))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (limits['FSIZE'], limits['FSIZE']))
+
+def execute(request, output):
+    # Run in the child: its changes to modules and globals die with it.
+    response = {}
+    g_dict = request['globals_dict']
+    try:
+        set_limits(request['limits'])
+        os.chdir(request['tmpdir'])
+        sys.path[:0] = [os.path.join(request['tmpdir'], name) for name in request['python_path']]
+        exec compile(request['code'], 'jailed_code', 'exec') in g_dict
+    except BaseException:
+        response['error'] = traceback.format_exc()
+    else:
+        response['globals'] = dict(
+            (key, value) for key, value in g_dict.iteritems() if key != '__builtins__' and jsonable(value)
+        )
+    output.write(json.dumps(response))
+    output.flush()
+
+def kill_group(pgid):
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except OSError:
+        pass
+
+def run(request):
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            # Put the child and anything it starts in a process group of
+            # their own, and only let them inherit the pipe of the results.
+            os.setsid()
+            os.closerange(3, write_fd)
+            os.closerange(write_fd + 1, MAXFD)
+            execute(request, os.fdopen(write_fd, 'w'))
+        finally:
+            # Kill whatever the code started, so that nothing keeps the
+            # pipe of the results open once the child is done.
+            kill_group(0)
+            os._exit(0)
+    os.close(write_fd)
+
+    output = []
+    timed_out = False
+    deadline = time.time() + request['timeout']
+    while True:
+        remaining = deadline - time.time()
+        if remaining <= 0 or not select.select([read_fd], [], [], remaining)[0]:
+            timed_out = True
+            os.kill(pid, signal.SIGKILL)
+            break
+        data = os.read(read_fd, 64 * 1024)
+        if not data:
+            break
+        output.append(data)
+    os.close(read_fd)
+    # The child isn't reaped yet, so its pid still names its process group.
+    kill_group(pid)
+    __, status = os.waitpid(pid, 0)
+
+    if timed_out:
+        return {'error': 'timed out'}
+    try:
+        response = json.loads(''.join(output))
+    except ValueError:
+        if os.WIFSIGNALED(status):
+            return {'error': 'killed by signal {}'.format(os.WTERMSIG(status))}
+        return {'error': 'exited with status {}'.format(os.WEXITSTATUS(status))}
+    if not isinstance(response, dict) or not (
+        isinstance(response.get('error'), unicode) or isinstance(response.get('globals'), dict)
+    ):
+        return {'error': 'invalid response'}
+    return response
+
+while True:
+    line = requests.readline()
+    if not line:
+        break
+    request = json.loads(line)
+    response = run(request)
+    response['id'] = request['id']
+    responses.write(json.dumps(response) + '\n')
+    responses.flush()
+"""
+
+
+class SandboxWorkerError(Exception):
+    """A sandbox worker died, timed out or sent an invalid response."""
+    pass
+
+
+class SandboxWorker(object):
+    """
+    A sandboxed Python process running `WORKER_SCRIPT`.
+    """
+    def __init__(self, cmdline, preload):
+        self.runs = 0
+        self.uses_sudo = cmdline[0] == 'sudo'
+
+        with open(os.devnull, 'w') as devnull:
+            self.process = subprocess.Popen(
+                cmdline + ['-E', '-B', '-c', WORKER_SCRIPT] + list(preload),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=devnull,
+                # Run the worker and its children in their own process group.
+                preexec_fn=os.setsid,
+                close_fds=True,
+            )
+        self._buffer = ''
+
+    def run(self, request, timeout):
+        """
+        Send `request` to the worker, to be run within `timeout` seconds, and
+        return its response.
+
+        Raises SandboxWorkerError if no valid response is received in time.
+        """
+        request['id'] = uuid.uuid4().hex
+        request['timeout'] = timeout
+        try:
+            self.process.stdin.write(json.dumps(request) + '\n')
+            self.process.stdin.flush()
+        except (IOError, OSError):
+            raise SandboxWorkerError("the worker died")
+        self.runs += 1
+
+        response = json.loads(self._read_line(time.time() + timeout + WORKER_GRACE_PERIOD))
+        if response.get('id') != request['id']:
+            raise SandboxWorkerError("the worker sent an unexpected response")
+        return response
+
+    def _read_line(self, deadline):
+        """Read a line from the worker's stdout, waiting at most until `deadline`."""
+        stdout = self.process.stdout.fileno()
+        while '\n' not in self._buffer:
+            remaining = deadline - time.time()
+            if remaining <= 0 or not select.select([stdout], [], [], remaining)[0]:
+                raise SandboxWorkerError("timed out")
+            data = os.read(stdout, 64 * 1024)
+            if not data:
+                raise SandboxWorkerError("the worker died")
+            self._buffer += data
+        line, self._buffer = self._buffer.split('\n', 1)
+        return line
+
+    def close(self):
+        """Kill the worker."""
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except OSError:
+            if self.uses_sudo:
+                # The worker runs as the sandbox user: use the same sudo rule as codejail.
+                subprocess.call(['sudo', 'pkill', '-9', '-g', str(self.process.pid)])
+        self.process.wait()
+
+
+class SandboxPool(object):
+    """
+    Up to `size` warm sandbox workers, started with `cmdline`.
+
+    Workers import the `preload` modules when they start, and are replaced
+    after `max_runs` executions.  Executions are killed if they take more than
+    `timeout` seconds, and run with the codejail `limits`, completed with
+    `DEFAULT_LIMITS`.
+    """
+    def __init__(self, cmdline, size, max_runs=100, timeout=5, preload=(), limits=None):
+        self.cmdline = cmdline
+        self.size = size
+        self.max_runs = max_runs
+        self.timeout = timeout
+        self.preload = preload
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self._idle = []
+        self._busy = 0
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        """Return an idle worker, starting one if needed, or None if all the workers are busy."""
+        with self._lock:
+            if os.getpid() != self._pid:
+                # We were forked: the workers belong to our parent.
+                self._idle = []
+                self._busy = 0
+                self._pid = os.getpid()
+            if self._idle:
+                worker = self._idle.pop()
+            elif self._busy < self.size:
+                worker = None
+            else:
+                return None
+            self._busy += 1
+
+        if worker is None:
+            try:
+                worker = SandboxWorker(self.cmdline, self.preload)
+            except OSError:
+                log.exception("Unable to start a sandbox worker")
+                with self._lock:
+                    self._busy -= 1
+                return None
+            dog_stats_api.increment('capa.safe_exec.pool.worker_started')
+        return worker
+
+    def _release(self, worker, reusable):
+        """Return `worker` to the pool, or kill it if it can't be used any more."""
+        if not reusable or worker.runs >= self.max_runs:
+            worker.close()
+            worker = None
+        with self._lock:
+            self._busy -= 1
+            if worker is not None and os.getpid() == self._pid:
+                self._idle.append(worker)
+
+    def safe_exec(self, code, globals_dict, python_path=None, extra_files=None, slug=None):
+        """
+        Run `code` like `codejail.safe_exec.safe_exec`, in a warm worker if one is available.
+        """
+        worker = self._acquire()
+        if worker is None:
+            dog_stats_api.increment('capa.safe_exec.pool', tags=['result:fallback'])
+            codejail_safe_exec(code, globals_dict, python_path=python_path, extra_files=extra_files, slug=slug)
+            return
+        dog_stats_api.increment('capa.safe_exec.pool', tags=['result:warm'])
+
+        tmpdir = tempfile.mkdtemp(prefix='codejail-')
+        reusable = False
+        try:
+            # The sandbox user needs to read the files.
+            os.chmod(tmpdir, 0775)
+            _write_files(tmpdir, python_path or (), extra_files or ())
+            request = {
+                'code': code,
+                'globals_dict': json_safe(globals_dict),
+                'limits': self.limits,
+                'python_path': [os.path.basename(filename) for filename in python_path or ()],
+                'tmpdir': tmpdir,
+            }
+            try:
+                response = worker.run(request, self.timeout)
+            except (SandboxWorkerError, ValueError) as error:
+                log.info("Sandbox worker failed running %s: %s", slug, error)
+                raise SafeExecException("Couldn't execute jailed code: {}".format(error))
+            reusable = True
+        finally:
+            self._release(worker, reusable)
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+        if 'error' in response:
+            raise SafeExecException("Couldn't execute jailed code: {}".format(response['error']))
+        globals_dict.update(response['globals'])
+
+    def close(self):
+        """Kill the idle workers."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.close()
+
+
+def _write_files(tmpdir, python_path, extra_files):
+    """Copy the `python_path` files and write the `extra_files` to `tmpdir`, as codejail does."""
+    extra_names = set(name for name, __ in extra_files)
+    for filename in python_path:
+        if filename in extra_names:
+            continue
+        destination = os.path.join(tmpdir, os.path.basename(filename))
+        if os.path.isdir(filename):
+            shutil.copytree(filename, destination)
+        else:
+            shutil.copy(filename, destination)
+    for name, content in extra_files:
+        with open(os.path.join(tmpdir, name), 'wb') as extra_file:
+            extra_file.write(content)
+
+
+# The pool used by `safe_exec`, if any.
+_POOL = None
+
+
+def configure(python_bin, user=None, size=4, max_runs=100, timeout=5, preload=(), limits=None):
+    """
+    Use a pool of `size` warm workers running `python_bin` as `user` for sandboxed code.
+
+    A `size` of 0 turns the pool off.
+    """
+    global _POOL  # pylint: disable=global-statement
+    if _POOL is not None:
+        _POOL.close()
+        _POOL = None
+    if size:
+        cmdline = [python_bin]
+        if user:
+            cmdline = ['sudo', '-u', user] + cmdline
+        _POOL = SandboxPool(cmdline, size, max_runs, timeout, preload, limits)
+
+
+def safe_exec(code, globals_dict, python_path=None, extra_files=None, slug=None):
+    """
+    Run `code` in the sandbox pool if it is configured, or with codejail otherwise.
+    """
+    if _POOL is None:
+        codejail_safe_exec(code, globals_dict, python_path=python_path, extra_files=extra_files, slug=slug)
+    else:
+        _POOL.safe_exec(code, globals_dict, python_path=python_path, extra_files=extra_files, slug=slug)
@@ -10,6 +10,7 @@ import unittest
 from nose.plugins.skip import SkipTest
 
 from capa.safe_exec import safe_exec, update_hash
+from capa.safe_exec.result_cache import LocalFrontCache
 from codejail.safe_exec import SafeExecException
 from codejail.jail_code import is_configured
 
@@ -177,6 +178,56 @@ class TestSafeExecCaching(unittest.TestCase):
                 self.fail("Tried executing code with non-ASCII unicode: {0}".format(code))
 
 
+class TestLocalFrontCache(unittest.TestCase):
+    """Test the process-local cache in front of a shared cache."""
+
+    def test_shared_results(self):
+        shared = {}
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=LocalFrontCache(DictCache(shared)))
+        self.assertEqual(shared.values()[0], (None, {'a': 3}))
+
+        # Another process, with an empty local cache, uses the shared result.
+        shared[shared.keys()[0]] = (None, {'a': 17})
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=LocalFrontCache(DictCache(shared)))
+        self.assertEqual(g['a'], 17)
+
+    def test_local_hits_skip_the_backend(self):
+        shared = {}
+        cache = LocalFrontCache(DictCache(shared))
+        cache.set('key', (None, {'a': 3}))
+        shared.clear()
+        self.assertEqual(cache.get('key'), (None, {'a': 3}))
+
+    def test_get_returns_copies(self):
+        cache = LocalFrontCache()
+        cache.set('key', (None, {'a': [1, 2]}))
+        cache.get('key')[1]['a'].append(3)
+        self.assertEqual(cache.get('key'), (None, {'a': [1, 2]}))
+
+    def test_lru_eviction(self):
+        value = (None, {'a': 'x' * 100})
+        probe = LocalFrontCache()
+        probe.set('probe', value)
+        # Room for exactly two results.
+        cache = LocalFrontCache(max_bytes=probe.current_bytes * 2)
+        cache.set('a', value)
+        cache.set('b', value)
+        cache.get('a')
+        cache.set('c', value)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), value)
+        self.assertEqual(cache.get('c'), value)
+        self.assertLessEqual(cache.current_bytes, cache.max_bytes)
+
+    def test_too_large(self):
+        cache = LocalFrontCache(max_bytes=10)
+        cache.set('key', (None, {'a': 'x' * 100}))
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(cache.current_bytes, 0)
+
+
 class TestUpdateHash(unittest.TestCase):
     """Test the safe_exec.update_hash function to be sure it canonicalizes properly."""
 
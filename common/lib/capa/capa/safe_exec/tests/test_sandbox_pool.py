@@ -0,0 +1,137 @@
+"""Test sandbox_pool.py"""
+
+from StringIO import StringIO
+import sys
+import time
+import unittest
+import zipfile
+
+from codejail.safe_exec import SafeExecException
+from mock import patch
+
+from capa.safe_exec.sandbox_pool import SandboxPool
+
+
+def is_running(pid):
+    """Return whether the process `pid` exists, and isn't a zombie waiting to be reaped."""
+    try:
+        with open('/proc/{}/status'.format(pid)) as status:
+            return 'zombie' not in status.read()
+    except IOError:
+        return False
+
+
+class TestSandboxPool(unittest.TestCase):
+    """
+    Test the pool of warm workers.  The workers run this Python, unsandboxed.
+    """
+    def setUp(self):
+        super(TestSandboxPool, self).setUp()
+        self.pool = SandboxPool([sys.executable], size=1, max_runs=3, timeout=5, preload=['math'])
+        self.addCleanup(self.pool.close)
+
+    def test_set_values(self):
+        g = {'a': 17}
+        self.pool.safe_exec("import math\nb = a + int(math.pi)", g)
+        self.assertEqual(g['b'], 20)
+
+    def test_raising_exceptions(self):
+        with self.assertRaises(SafeExecException) as context:
+            self.pool.safe_exec("1/0", {})
+        self.assertIn("ZeroDivisionError", context.exception.message)
+        # The worker survives exceptions
+        g = {}
+        self.pool.safe_exec("a = 1", g)
+        self.assertEqual(g['a'], 1)
+
+    def test_workers_are_reused(self):
+        g = {}
+        self.pool.safe_exec("import os\npid = os.getpid()\nworker_pid = os.getppid()", g)
+        first_pid, first_worker_pid = g['pid'], g['worker_pid']
+        self.pool.safe_exec("import os\npid = os.getpid()\nworker_pid = os.getppid()", g)
+        # Each execution runs in a new child of the same worker.
+        self.assertEqual(g['worker_pid'], first_worker_pid)
+        self.assertNotEqual(g['pid'], first_pid)
+
+    def test_workers_are_recycled(self):
+        worker_pids = set()
+        for __ in range(4):
+            g = {}
+            self.pool.safe_exec("import os\nworker_pid = os.getppid()", g)
+            worker_pids.add(g['worker_pid'])
+        self.assertEqual(len(worker_pids), 2)
+
+    def test_modules_are_restored(self):
+        self.pool.safe_exec("import fractions\nimport sys\nsys.modules['math'] = None", {})
+        g = {}
+        self.pool.safe_exec(
+            "import sys\nmath_ok = sys.modules['math'] is not None\nfractions = 'fractions' in sys.modules", g
+        )
+        self.assertTrue(g['math_ok'])
+        self.assertFalse(g['fractions'])
+
+    def test_modules_are_isolated(self):
+        self.pool.safe_exec("import math\nmath.pi = 3", {})
+        g = {}
+        self.pool.safe_exec("import math\npi = math.pi", g)
+        self.assertNotEqual(g['pi'], 3)
+
+    def test_forged_response(self):
+        with self.assertRaises(SafeExecException):
+            self.pool.safe_exec("import json\njson.dumps = lambda *args, **kwargs: '{}'", {})
+
+    def test_limits(self):
+        self.pool.limits['FSIZE'] = 10
+        with self.assertRaises(SafeExecException):
+            self.pool.safe_exec("with open('data.txt', 'w') as data:\n    data.write('x' * 100)", {})
+
+        self.pool.limits['CPU'] = 1
+        self.pool.timeout = 10
+        with self.assertRaises(SafeExecException) as context:
+            self.pool.safe_exec("while True: pass", {})
+        self.assertIn("killed by signal", context.exception.message)
+
+    def test_extra_files(self):
+        zip_file = StringIO()
+        with zipfile.ZipFile(zip_file, 'w') as lib:
+            lib.writestr('constants.py', 'ANSWER = 42\n')
+        g = {}
+        self.pool.safe_exec(
+            "import constants\na = constants.ANSWER\nb = open('data.txt').read()",
+            g,
+            python_path=['lib.zip'],
+            extra_files=[('lib.zip', zip_file.getvalue()), ('data.txt', 'hello')],
+        )
+        self.assertEqual((g['a'], g['b']), (42, 'hello'))
+
+    def test_timeout(self):
+        self.pool.timeout = 0.5
+        self.pool.limits['CPU'] = 0
+        g = {}
+        self.pool.safe_exec("import os\nworker_pid = os.getppid()", g)
+        with self.assertRaises(SafeExecException) as context:
+            self.pool.safe_exec("while True: pass", {})
+        self.assertIn("timed out", context.exception.message)
+        # The worker survives the execution that timed out.
+        worker_pid = g['worker_pid']
+        self.pool.safe_exec("import os\nworker_pid = os.getppid()", g)
+        self.assertEqual(g['worker_pid'], worker_pid)
+
+    def test_children_are_killed(self):
+        g = {}
+        start = time.time()
+        self.pool.safe_exec(
+            "import os, time\nchild_pid = os.fork()\nif not child_pid:\n    time.sleep(30)\n    os._exit(0)", g
+        )
+        # The process keeping the pipe of the results open doesn't make the execution time out
+        self.assertLess(time.time() - start, self.pool.timeout)
+        # and is killed with the execution that started it.
+        time.sleep(0.1)
+        self.assertFalse(is_running(g['child_pid']))
+
+    def test_fallback_when_exhausted(self):
+        worker = self.pool._acquire()  # pylint: disable=protected-access
+        self.addCleanup(self.pool._release, worker, False)  # pylint: disable=protected-access
+        with patch('capa.safe_exec.sandbox_pool.codejail_safe_exec') as mock_safe_exec:
+            self.pool.safe_exec("a = 1", {})
+        self.assertTrue(mock_safe_exec.called)
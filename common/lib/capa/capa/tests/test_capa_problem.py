@@ -0,0 +1,85 @@
+"""
+Tests of the problem tree cache of LoncapaProblem.
+"""
+from cStringIO import StringIO
+import textwrap
+import unittest
+
+from mock import Mock
+
+from capa.capa_problem import PROBLEM_TREE_CACHE, LoncapaProblem
+from . import test_capa_system, new_loncapa_problem
+
+
+class ProblemTreeCacheTest(unittest.TestCase):
+    """
+    Tests of the caching of problem trees.
+    """
+    xml_str = textwrap.dedent("""
+        <problem>
+        <p>Which one is a fruit?</p>
+        <multiplechoiceresponse>
+          <choicegroup type="MultipleChoice" shuffle="true">
+            <choice correct="false">Apple</choice>
+            <choice correct="false">Banana</choice>
+            <choice correct="false">Chocolate</choice>
+            <choice correct="true">Donut</choice>
+          </choicegroup>
+        </multiplechoiceresponse>
+        <stringresponse answer="Paris">
+          <textline size="20"/>
+        </stringresponse>
+        <solution><p>Donut, and Paris.</p></solution>
+        </problem>
+    """)
+
+    def setUp(self):
+        super(ProblemTreeCacheTest, self).setUp()
+        PROBLEM_TREE_CACHE.clear()
+        self.addCleanup(PROBLEM_TREE_CACHE.clear)
+
+    def uncached_html(self, seed):
+        """
+        Return the html of the problem with `seed`, parsing its tree.
+        """
+        PROBLEM_TREE_CACHE.clear()
+        return new_loncapa_problem(self.xml_str, seed=seed).get_html()
+
+    def test_cached(self):
+        problem = new_loncapa_problem(self.xml_str)
+        self.assertEqual(len(PROBLEM_TREE_CACHE), 1)
+        other_problem = new_loncapa_problem(self.xml_str)
+        self.assertEqual(len(PROBLEM_TREE_CACHE), 1)
+        self.assertIsNot(problem.tree, other_problem.tree)
+        self.assertEqual(problem.get_html(), other_problem.get_html())
+        self.assertEqual(sorted(problem.get_answer_ids()), [['1_2_1'], ['1_3_1']])
+        self.assertEqual(sorted(other_problem.get_question_answers()), ['1_2_1', '1_3_1', '1_solution_1'])
+
+    def test_seeds(self):
+        # each problem shuffles the choices of its own copy of the tree
+        htmls = [new_loncapa_problem(self.xml_str, seed=seed).get_html() for seed in range(4)]
+        self.assertEqual(len(PROBLEM_TREE_CACHE), 1)
+        self.assertGreater(len(set(htmls)), 1)
+        self.assertEqual(htmls, [self.uncached_html(seed) for seed in range(4)])
+
+    def test_grading(self):
+        problem = new_loncapa_problem(self.xml_str)
+        new_loncapa_problem(self.xml_str).grade_answers({'1_3_1': 'London'})
+        problem.grade_answers({'1_3_1': 'Paris'})
+        self.assertEqual(problem.correct_map.get_correctness('1_3_1'), 'correct')
+
+    def test_problem_id(self):
+        new_loncapa_problem(self.xml_str)
+        problem = LoncapaProblem(self.xml_str, id='2', seed=1, capa_system=test_capa_system())
+        self.assertEqual(len(PROBLEM_TREE_CACHE), 2)
+        self.assertEqual(sorted(problem.get_answer_ids()), [['2_2_1'], ['2_3_1']])
+
+    def test_includes_not_cached(self):
+        capa_system = test_capa_system()
+        capa_system.filestore = Mock()
+        xml_str = '<problem><include file="included.xml"/></problem>'
+        for text in ('Included', 'Changed'):
+            capa_system.filestore.open.return_value = StringIO('<p>{}</p>'.format(text))
+            problem = new_loncapa_problem(xml_str, capa_system=capa_system)
+            self.assertEqual(problem.tree.find('p').text, text)
+        self.assertEqual(len(PROBLEM_TREE_CACHE), 0)
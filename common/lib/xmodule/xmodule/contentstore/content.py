@@ -5,6 +5,13 @@ XASSET_SRCREF_PREFIX = 'xasset:'
 
 XASSET_THUMBNAIL_TAIL_NAME = '.jpg'
 
+THUMBNAIL_SIZE = (128, 128)
+
+# Largest dimension of the downsized variants of uploaded images, which are
+# served instead of the original when a smaller image is requested.
+IMAGE_VARIANT_SIZES = (320, 640, 1280)
+IMAGE_VARIANT_JPEG_QUALITY = 85
+
 STREAM_DATA_CHUNK_SIZE = 1024
 
 import os
@@ -21,7 +28,7 @@ from PIL import Image
 
 class StaticContent(object):
     def __init__(self, loc, name, content_type, data, last_modified_at=None, thumbnail_location=None, import_path=None,
-                 length=None, locked=False):
+                 length=None, locked=False, content_digest=None):
         self.location = loc
         self.name = name  # a display string which can be edited, and thus not part of the location which needs to be fixed
         self.content_type = content_type
@@ -33,6 +40,8 @@ class StaticContent(object):
         # cycles
         self.import_path = import_path
         self.locked = locked
+        # md5 hex digest of the content, as computed by GridFS (None if unknown)
+        self.content_digest = content_digest
 
     @property
     def is_thumbnail(self):
@@ -47,6 +56,40 @@ class StaticContent(object):
             name_root=name_root,
             extension=XASSET_THUMBNAIL_TAIL_NAME,)
 
+    @staticmethod
+    def generate_image_variant_name(original_name, size):
+        """
+        Returns the name of the variant of the image `original_name` downsized to fit in `size` pixels.
+        """
+        name_root, ext = os.path.splitext(original_name)
+        return u"{name_root}{ext}-{size}px{extension}".format(
+            name_root=name_root,
+            ext=ext.replace(u'.', u'-'),
+            size=size,
+            extension=XASSET_THUMBNAIL_TAIL_NAME,
+        )
+
+    @staticmethod
+    def compute_image_variant_location(location, size):
+        """
+        Returns the location of the variant of the image at `location` downsized to fit in `size` pixels.
+        Like thumbnails, variants are stored as thumbnails of the course, so that they aren't listed as assets.
+        """
+        return StaticContent.compute_location(
+            location.course_key, StaticContent.generate_image_variant_name(location.name, size), is_thumbnail=True
+        )
+
+    @staticmethod
+    def get_image_variant_size(width):
+        """
+        Returns the size of the smallest image variant at least `width` pixels wide,
+        or None if the original image should be served.
+        """
+        for size in IMAGE_VARIANT_SIZES:
+            if size >= width:
+                return size
+        return None
+
     @staticmethod
     def compute_location(course_key, path, revision=None, is_thumbnail=False):
         """
@@ -154,9 +197,15 @@ class StaticContent(object):
         # Reconstruct with new path
         return urlunparse((scheme, netloc, loc_url, params, urlencode(new_query_list), fragment))
 
-    def stream_data(self):
+    def stream_data(self, chunk_size=STREAM_DATA_CHUNK_SIZE):  # pylint: disable=unused-argument
         yield self._data
 
+    def stream_data_in_range(self, first_byte, last_byte, chunk_size=STREAM_DATA_CHUNK_SIZE):  # pylint: disable=unused-argument
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        yield self._data[first_byte:last_byte + 1]
+
     @staticmethod
     def serialize_asset_key_with_slash(asset_key):
         """
@@ -171,32 +220,32 @@ class StaticContent(object):
 
 class StaticContentStream(StaticContent):
     def __init__(self, loc, name, content_type, stream, last_modified_at=None, thumbnail_location=None, import_path=None,
-                 length=None, locked=False):
+                 length=None, locked=False, content_digest=None):
         super(StaticContentStream, self).__init__(loc, name, content_type, None, last_modified_at=last_modified_at,
                                                   thumbnail_location=thumbnail_location, import_path=import_path,
-                                                  length=length, locked=locked)
+                                                  length=length, locked=locked, content_digest=content_digest)
         self._stream = stream
 
-    def stream_data(self):
+    def stream_data(self, chunk_size=STREAM_DATA_CHUNK_SIZE):
         while True:
-            chunk = self._stream.read(STREAM_DATA_CHUNK_SIZE)
+            chunk = self._stream.read(chunk_size)
             if len(chunk) == 0:
                 break
             yield chunk
 
-    def stream_data_in_range(self, first_byte, last_byte):
+    def stream_data_in_range(self, first_byte, last_byte, chunk_size=STREAM_DATA_CHUNK_SIZE):
         """
         Stream the data between first_byte and last_byte (included)
         """
         self._stream.seek(first_byte)
         position = first_byte
         while True:
-            if last_byte < position + STREAM_DATA_CHUNK_SIZE - 1:
+            if last_byte < position + chunk_size - 1:
                 chunk = self._stream.read(last_byte - position + 1)
                 yield chunk
                 break
-            chunk = self._stream.read(STREAM_DATA_CHUNK_SIZE)
-            position += STREAM_DATA_CHUNK_SIZE
+            chunk = self._stream.read(chunk_size)
+            position += chunk_size
             yield chunk
 
     def close(self):
@@ -206,7 +255,8 @@ class StaticContentStream(StaticContent):
         self._stream.seek(0)
         content = StaticContent(self.location, self.name, self.content_type, self._stream.read(),
                                 last_modified_at=self.last_modified_at, thumbnail_location=self.thumbnail_location,
-                                import_path=self.import_path, length=self.length, locked=self.locked)
+                                import_path=self.import_path, length=self.length, locked=self.locked,
+                                content_digest=self.content_digest)
         return content
 
 
@@ -220,6 +270,9 @@ class ContentStore(object):
     def find(self, filename):
         raise NotImplementedError
 
+    def delete(self, location_or_id):
+        raise NotImplementedError
+
     def get_all_content_for_course(self, course_key, start=0, maxresults=-1, sort=None, filter_params=None):
         '''
         Returns a list of static assets for a course, followed by the total number of assets.
@@ -259,30 +312,15 @@ class ContentStore(object):
 
         # if we're uploading an image, then let's generate a thumbnail so that we can
         # serve it up when needed without having to rescale on the fly
-        if content.content_type is not None and content.content_type.split('/')[0] == 'image':
+        if is_image(content):
             try:
-                # use PIL to do the thumbnail generation (http://www.pythonware.com/products/pil/)
-                # My understanding is that PIL will maintain aspect ratios while restricting
-                # the max-height/width to be whatever you pass in as 'size'
-                # @todo: move the thumbnail size to a configuration setting?!?
-                if tempfile_path is None:
-                    im = Image.open(StringIO.StringIO(content.data))
-                else:
-                    im = Image.open(tempfile_path)
-
-                # I've seen some exceptions from the PIL library when trying to save palletted
-                # PNG files to JPEG. Per the google-universe, they suggest converting to RGB first.
-                im = im.convert('RGB')
-                size = 128, 128
-                im.thumbnail(size, Image.ANTIALIAS)
-                thumbnail_file = StringIO.StringIO()
-                im.save(thumbnail_file, 'JPEG')
-                thumbnail_file.seek(0)
+                # PIL maintains aspect ratios while restricting the max-height/width to THUMBNAIL_SIZE
+                im = _open_image(content, tempfile_path, THUMBNAIL_SIZE)
+                thumbnail_content = StaticContent(
+                    thumbnail_file_location, thumbnail_name, 'image/jpeg', _downsized_jpeg(im, THUMBNAIL_SIZE)
+                )
 
                 # store this thumbnail as any other piece of content
-                thumbnail_content = StaticContent(thumbnail_file_location, thumbnail_name,
-                                                  'image/jpeg', thumbnail_file)
-
                 self.save(thumbnail_content)
 
             except Exception, e:
@@ -291,9 +329,93 @@ class ContentStore(object):
 
         return thumbnail_content, thumbnail_file_location
 
+    def generate_image_variants(self, content, tempfile_path=None):
+        """
+        Stores the variants of the image `content` downsized to each of the IMAGE_VARIANT_SIZES smaller
+        than it, recompressed as JPEG, and deletes its previously stored variants of the other sizes.
+
+        Returns the locations of the stored variants, by size.
+        """
+        variant_locations = {}
+        if not is_image(content):
+            return variant_locations
+
+        try:
+            im = _open_image(content, tempfile_path, (max(IMAGE_VARIANT_SIZES), max(IMAGE_VARIANT_SIZES)))
+            # downsize each variant from the next larger one, which is faster than from the original
+            for size in sorted(IMAGE_VARIANT_SIZES, reverse=True):
+                if max(im.size) <= size:
+                    continue
+                im = im.copy()
+                location = StaticContent.compute_image_variant_location(content.location, size)
+                # unlike thumbnails, which Studio shows to course staff, variants are locked
+                # along with their original
+                self.save(StaticContent(
+                    location, location.name, 'image/jpeg', _downsized_jpeg(im, (size, size)),
+                    locked=getattr(content, 'locked', False)
+                ))
+                variant_locations[size] = location
+        except Exception:  # pylint: disable=broad-except
+            # variants are optional, like thumbnails
+            logging.exception(u"Failed to generate image variants for %s", content.location)
+
+        self.delete_image_variants(content.location, keep=variant_locations.keys())
+        return variant_locations
+
+    def delete_image_variants(self, location, keep=()):
+        """
+        Deletes the stored variants of the image at `location`, except those of the sizes in `keep`.
+
+        Returns the locations of the deleted variants.
+        """
+        deleted = []
+        for size in IMAGE_VARIANT_SIZES:
+            if size not in keep:
+                variant_location = StaticContent.compute_image_variant_location(location, size)
+                self.delete(variant_location)
+                deleted.append(variant_location)
+        return deleted
+
     def ensure_indexes(self):
         """
         Ensure that all appropriate indexes are created that are needed by this modulestore, or raise
         an exception if unable to.
         """
         pass
+
+
+def is_image(content):
+    """
+    Returns whether `content` is an image, from its content type.
+    """
+    return content.content_type is not None and content.content_type.split('/')[0] == 'image'
+
+
+def _open_image(content, tempfile_path, size):
+    """
+    Opens the image `content`, or the file at `tempfile_path` holding it, converted to RGB.
+
+    Large JPEG images are decoded at the smallest scale still larger than `size`, which is
+    much faster, and uses much less memory, than decoding them at full size.
+    """
+    if tempfile_path is None:
+        im = Image.open(StringIO.StringIO(content.data))
+    else:
+        im = Image.open(tempfile_path)
+    im.draft('RGB', size)
+
+    # I've seen some exceptions from the PIL library when trying to save palletted
+    # PNG files to JPEG. Per the google-universe, they suggest converting to RGB first.
+    return im.convert('RGB')
+
+
+def _downsized_jpeg(im, size):
+    """
+    Downsizes the image `im` in place to fit in `size`, keeping its aspect ratio, and returns
+    a file holding it compressed as JPEG.
+    """
+    im.thumbnail(size, Image.ANTIALIAS)
+    jpeg_file = StringIO.StringIO()
+    im.save(jpeg_file, 'JPEG', quality=IMAGE_VARIANT_JPEG_QUALITY, optimize=True)
+    jpeg_file.seek(0)
+    return jpeg_file
@@ -0,0 +1,165 @@
+"""
+Simple utility functions that operate on course metadata.
+
+These are shared by CourseDescriptor and the denormalized CourseOverview
+model, so that both compute derived values such as display dates the same
+way from the same fields.
+"""
+from base64 import b32encode
+from datetime import datetime
+from math import exp
+
+import dateutil.parser
+from django.utils.timezone import UTC
+
+from .fields import Date
+
+DEFAULT_START_DATE = datetime(2030, 1, 1, tzinfo=UTC())
+
+
+def clean_course_key(course_key, padding_char):
+    """
+    Returns a unique deterministic base32-encoded ID for `course_key`, padded
+    with `padding_char` instead of '='.
+    """
+    return "course_{}".format(
+        b32encode(unicode(course_key)).replace('=', padding_char)
+    )
+
+
+def display_name_with_default(display_name, location):
+    """
+    Returns `display_name` if it is set, otherwise a name derived from the
+    course `location`, escaped for use in HTML like the descriptor's.
+    """
+    name = display_name
+    if name is None:
+        name = location.name.replace('_', ' ')
+    return name.replace('<', '&lt;').replace('>', '&gt;')
+
+
+def has_course_started(start_date):
+    """
+    Returns whether a course with start date `start_date` has started.
+    """
+    return datetime.now(UTC()) > start_date
+
+
+def has_course_ended(end_date):
+    """
+    Returns whether a course with end date `end_date` has ended.  Courses
+    without an end date never end.
+    """
+    return datetime.now(UTC()) > end_date if end_date is not None else False
+
+
+def course_start_date_is_default(start, advertised_start):
+    """
+    Returns whether the start date of a course is still the default, i.e.
+    `start` was not modified and `advertised_start` was not set.
+    """
+    return advertised_start is None and start == DEFAULT_START_DATE
+
+
+def _add_timezone_string(date_time):
+    """
+    Adds 'UTC' string to the end of start/end date and time texts.
+    """
+    return date_time + u" UTC"
+
+
+def course_start_datetime_text(start_date, advertised_start, format_string, ugettext, strftime):
+    """
+    Returns the text of the start date and time of a course in UTC, preferring
+    `advertised_start` to `start_date`.
+
+    `ugettext` and `strftime` are the translation and localized date
+    formatting functions to use.
+    """
+    if isinstance(advertised_start, basestring):
+        try:
+            result = Date().from_json(advertised_start)
+            if result is None:
+                result = advertised_start.title()
+            else:
+                result = strftime(result, format_string)
+                if format_string == "DATE_TIME":
+                    result = _add_timezone_string(result)
+        except ValueError:
+            result = advertised_start.title()
+        return result
+    elif course_start_date_is_default(start_date, advertised_start):
+        # Translators: TBD stands for 'To Be Determined' and is used when a course
+        # does not yet have an announced start date.
+        return ugettext('TBD')
+    else:
+        when = advertised_start or start_date
+
+        if format_string == "DATE_TIME":
+            return _add_timezone_string(strftime(when, format_string))
+
+        return strftime(when, format_string)
+
+
+def course_end_datetime_text(end_date, format_string, strftime):
+    """
+    Returns the text of the end date or date and time of a course, or an empty
+    string if it has no end date.
+    """
+    if end_date is None:
+        return ''
+    else:
+        date_time = strftime(end_date, format_string)
+        return date_time if format_string == "SHORT_DATE" else _add_timezone_string(date_time)
+
+
+def may_certify_for_course(certificates_display_behavior, certificates_show_before_end, has_ended):
+    """
+    Returns whether it is acceptable to show the student a certificate
+    download link for a course with these settings.
+    """
+    show_early = (
+        certificates_display_behavior in ('early_with_info', 'early_no_info') or
+        certificates_show_before_end
+    )
+    return show_early or has_ended
+
+
+def sorting_dates(start, advertised_start, announcement):
+    """
+    Returns the announcement, start and current dates used to sort courses
+    by how new they are.
+    """
+    try:
+        start = dateutil.parser.parse(advertised_start)
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=UTC())
+    except (ValueError, AttributeError):
+        pass
+
+    now = datetime.now(UTC())
+
+    return announcement, start, now
+
+
+def sorting_score(start, advertised_start, announcement):
+    """
+    Returns a number that can be used to sort courses according to how "new"
+    they are.  The "newness" score is computed using a heuristic that takes
+    into account the announcement and (advertised) start dates of the course
+    if available.
+
+    The lower the number the "newer" the course.
+    """
+    # Make courses that have an announcement date have a lower
+    # score than courses than don't, older courses should have a
+    # higher score.
+    announcement, start, now = sorting_dates(start, advertised_start, announcement)
+    scale = 300.0  # about a year
+    if announcement:
+        days = (now - announcement).days
+        score = -exp(-days / scale)
+    else:
+        days = (now - start).days
+        score = exp(days / scale)
+    return score
@@ -864,6 +864,14 @@ class ModuleStoreRead(ModuleStoreAssetBase):
         '''
         pass
 
+    def get_course_keys(self, **kwargs):
+        '''
+        Returns a list of the keys of the courses in this modulestore, accepting
+        the same optional 'org' argument as get_courses.  Modulestores that can
+        list their courses without loading them override this.
+        '''
+        return [course.location.course_key for course in self.get_courses(**kwargs)]
+
     @abstractmethod
     def get_course(self, course_id, depth=0, **kwargs):
         '''
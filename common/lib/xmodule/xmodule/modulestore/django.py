@@ -80,10 +80,12 @@ class SignalHandler(object):
 
     """
     course_published = django.dispatch.Signal(providing_args=["course_key"])
+    course_deleted = django.dispatch.Signal(providing_args=["course_key"])
     library_updated = django.dispatch.Signal(providing_args=["library_key"])
 
     _mapping = {
         "course_published": course_published,
+        "course_deleted": course_deleted,
         "library_updated": library_updated
     }
 
@@ -135,6 +137,12 @@ def create_modulestore_instance(
         if key in _options and isinstance(_options[key], basestring):
             _options[key] = load_function(_options[key])
 
+    # Options naming a django cache to use
+    CACHE_KEYS = ['structure_cache_memcache']
+    for key in CACHE_KEYS:
+        if key in _options and isinstance(_options[key], basestring):
+            _options[key] = get_cache(_options[key])
+
     if HAS_REQUEST_CACHE:
         request_cache = RequestCache.get_request_cache()
     else:
@@ -48,6 +48,7 @@ from xmodule.modulestore.draft_and_published import ModuleStoreDraftAndPublished
 from xmodule.modulestore.edit_info import EditInfoRuntimeMixin
 from xmodule.modulestore.exceptions import ItemNotFoundError, DuplicateCourseError, ReferentialIntegrityError
 from xmodule.modulestore.inheritance import InheritanceMixin, inherit_metadata, InheritanceKeyValueStore
+from xmodule.modulestore.mongo.inheritance_cache import MetadataInheritanceCache
 from xmodule.modulestore.xml import CourseLocationManager
 from xmodule.services import SettingsService
 
@@ -667,38 +668,27 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         else:
             return ParentLocationCache()
 
-    def _compute_metadata_inheritance_tree(self, course_id):
-        '''
-        Find all inheritable fields from all xblocks in the course which may define inheritable data
-        '''
-        # get all collections in the course, this query should not return any leaf nodes
-        course_id = self.fill_in_run(course_id)
-        query = SON([
-            ('_id.tag', 'i4x'),
-            ('_id.org', course_id.org),
-            ('_id.course', course_id.course),
-            ('_id.category', {'$in': BLOCK_TYPES_WITH_CHILDREN})
-        ])
-        # if we're only dealing in the published branch, then only get published containers
-        if self.get_branch_setting() == ModuleStoreEnum.Branch.published_only:
-            query['_id.revision'] = None
-        # we just want the Location, children, and inheritable metadata
+    def _inheritance_record_filter(self):
+        """
+        Returns the fields of the records needed to compute inherited metadata: the Location,
+        children, and inheritable metadata.
+        """
         record_filter = {'_id': 1, 'definition.children': 1}
 
         # just get the inheritable metadata since that is all we need for the computation
         # this minimizes both data pushed over the wire
         for field_name in InheritanceMixin.fields:
             record_filter['metadata.{0}'.format(field_name)] = 1
+        return record_filter
 
-        # call out to the DB
-        resultset = self.collection.find(query, record_filter)
+    def _add_inheritance_records(self, course_id, resultset, results_by_url):
+        """
+        Adds the records of resultset to results_by_url, keyed by their published location url,
+        merging the children of the draft and published versions of an item.
 
-        # it's ok to keep these as deprecated strings b/c the overall cache is indexed by course_key and this
-        # is a dictionary relative to that course
-        results_by_url = {}
+        Returns the url of the course, if it was in resultset.
+        """
         root = None
-
-        # now go through the results and order them by the location url
         for result in resultset:
             # manually pick it apart b/c the db has tag and we want as_published revision regardless
             location = as_published(Location._from_deprecated_son(result['_id'], course_id.run))
@@ -717,68 +707,189 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
                 results_by_url[location_url] = result
             if location.category == 'course':
                 root = location_url
+        return root
 
-        # now traverse the tree and compute down the inherited metadata
-        metadata_to_inherit = {}
+    def _compute_inherited_metadata(self, url, results_by_url, metadata_to_inherit):
+        """
+        Computes down the inherited metadata of the descendants of the container at url into
+        metadata_to_inherit, from the records of the containers in results_by_url.
+        """
+        my_metadata = results_by_url[url].get('metadata', {})
 
-        def _compute_inherited_metadata(url):
-            """
-            Helper method for computing inherited metadata for a specific location url
-            """
-            my_metadata = results_by_url[url].get('metadata', {})
-
-            # go through all the children and recurse, but only if we have
-            # in the result set. Remember results will not contain leaf nodes
-            for child in results_by_url[url].get('definition', {}).get('children', []):
-                if child in results_by_url:
-                    new_child_metadata = copy.deepcopy(my_metadata)
-                    new_child_metadata.update(results_by_url[child].get('metadata', {}))
-                    results_by_url[child]['metadata'] = new_child_metadata
-                    metadata_to_inherit[child] = new_child_metadata
-                    _compute_inherited_metadata(child)
-                else:
-                    # this is likely a leaf node, so let's record what metadata we need to inherit
-                    metadata_to_inherit[child] = my_metadata.copy()
-                # WARNING: 'parent' is not part of inherited metadata, but
-                # we're piggybacking on this recursive traversal to grab
-                # and cache the child's parent, as a performance optimization.
-                # The 'parent' key will be popped out of the dictionary during
-                # CachingDescriptorSystem.load_item
-                metadata_to_inherit[child].setdefault('parent', {})[self.get_branch_setting()] = url
+        # go through all the children and recurse, but only if we have
+        # in the result set. Remember results will not contain leaf nodes
+        for child in results_by_url[url].get('definition', {}).get('children', []):
+            if child in results_by_url:
+                new_child_metadata = copy.deepcopy(my_metadata)
+                new_child_metadata.update(results_by_url[child].get('metadata', {}))
+                results_by_url[child]['metadata'] = new_child_metadata
+                metadata_to_inherit[child] = new_child_metadata
+                self._compute_inherited_metadata(child, results_by_url, metadata_to_inherit)
+            else:
+                # this is likely a leaf node, so let's record what metadata we need to inherit
+                metadata_to_inherit[child] = my_metadata.copy()
+            # WARNING: 'parent' is not part of inherited metadata, but
+            # we're piggybacking on this recursive traversal to grab
+            # and cache the child's parent, as a performance optimization.
+            # The 'parent' key will be popped out of the dictionary during
+            # CachingDescriptorSystem.load_item
+            metadata_to_inherit[child].setdefault('parent', {})[self.get_branch_setting()] = url
 
+    def _compute_metadata_inheritance_tree(self, course_id):
+        '''
+        Find all inheritable fields from all xblocks in the course which may define inheritable data
+        '''
+        # get all collections in the course, this query should not return any leaf nodes
+        course_id = self.fill_in_run(course_id)
+        query = SON([
+            ('_id.tag', 'i4x'),
+            ('_id.org', course_id.org),
+            ('_id.course', course_id.course),
+            ('_id.category', {'$in': BLOCK_TYPES_WITH_CHILDREN})
+        ])
+        # if we're only dealing in the published branch, then only get published containers
+        if self.get_branch_setting() == ModuleStoreEnum.Branch.published_only:
+            query['_id.revision'] = None
+
+        # call out to the DB
+        resultset = self.collection.find(query, self._inheritance_record_filter())
+
+        # it's ok to keep these as deprecated strings b/c the overall cache is indexed by course_key and this
+        # is a dictionary relative to that course
+        results_by_url = {}
+
+        # now go through the results and order them by the location url
+        root = self._add_inheritance_records(course_id, resultset, results_by_url)
+
+        # now traverse the tree and compute down the inherited metadata
+        metadata_to_inherit = {}
         if root is not None:
-            _compute_inherited_metadata(root)
+            self._compute_inherited_metadata(root, results_by_url, metadata_to_inherit)
 
         return metadata_to_inherit
 
-    def _get_cached_metadata_inheritance_tree(self, course_id, force_refresh=False):
+    def _find_inheritance_records(self, course_id, locations):
+        """
+        Returns the records of the draft and published versions of the containers at locations,
+        with the fields needed to compute inherited metadata.
+        """
+        revisions = [as_published]
+        if self.get_branch_setting() != ModuleStoreEnum.Branch.published_only:
+            revisions.append(as_draft)
+        query = {'_id': {'$in': [
+            as_revision(location).to_deprecated_son()
+            for location in locations
+            for as_revision in revisions
+        ]}}
+        return self.collection.find(query, self._inheritance_record_filter())
+
+    def _update_metadata_inheritance_tree(self, course_id, tree, location):
+        """
+        Updates tree, the cached metadata inheritance tree of the course, after the container at
+        location was edited, by recomputing the inherited metadata of its subtree only.
+
+        Returns the updated tree, or None if it has to be recomputed entirely.
+        """
+        url = unicode(location)
+        if url not in tree:
+            return None
+        parent_url = tree[url].get('parent', {}).get(self.get_branch_setting())
+        if parent_url is None:
+            return None
+
+        if parent_url in tree:
+            parent_metadata = dict(tree[parent_url])
+            # the parent's own parent was not yet recorded when its children were computed
+            parent_metadata.pop('parent', None)
+        else:
+            # the course itself, which isn't in the tree
+            parent_location = course_id.make_usage_key_from_deprecated_string(parent_url)
+            parent_records = {}
+            self._add_inheritance_records(
+                course_id, self._find_inheritance_records(course_id, [parent_location]), parent_records
+            )
+            if parent_url not in parent_records:
+                return None
+            parent_metadata = parent_records[parent_url].get('metadata', {})
+
+        # fetch the containers of the subtree, one level at a time
+        results_by_url = {}
+        requested = set([url])
+        level = [location]
+        while level:
+            self._add_inheritance_records(
+                course_id, self._find_inheritance_records(course_id, level), results_by_url
+            )
+            level = []
+            for result in results_by_url.values():
+                for child in result.get('definition', {}).get('children', []):
+                    child_location = course_id.make_usage_key_from_deprecated_string(child)
+                    if child_location.category in BLOCK_TYPES_WITH_CHILDREN and child not in requested:
+                        requested.add(child)
+                        level.append(child_location)
+        if url not in results_by_url:
+            return None
+
+        # forget the previous subtree, including the items which are no longer children
+        children_by_parent = {}
+        for child_url, metadata in tree.iteritems():
+            for item_parent_url in metadata.get('parent', {}).values():
+                children_by_parent.setdefault(item_parent_url, []).append(child_url)
+        stale = children_by_parent.get(url, [])
+        while stale:
+            child_url = stale.pop()
+            tree.pop(child_url, None)
+            stale.extend(children_by_parent.pop(child_url, []))
+
+        metadata = copy.deepcopy(parent_metadata)
+        metadata.update(results_by_url[url].get('metadata', {}))
+        results_by_url[url]['metadata'] = metadata
+        tree[url] = metadata
+        self._compute_inherited_metadata(url, results_by_url, tree)
+        tree[url].setdefault('parent', {})[self.get_branch_setting()] = parent_url
+        return tree
+
+    def _get_cached_metadata_inheritance_tree(self, course_id, force_refresh=False, edited_location=None):
         '''
         Compute the metadata inheritance for the course.
-        '''
-        tree = {}
 
+        If given the edited_location of the only item edited since the tree was last computed,
+        a refresh only recomputes the part of the tree that item can have changed.
+        '''
         course_id = self.fill_in_run(course_id)
         if not force_refresh:
             # see if we are first in the request cache (if present)
             if self.request_cache is not None and unicode(course_id) in self.request_cache.data.get('metadata_inheritance', {}):
                 return self.request_cache.data['metadata_inheritance'][unicode(course_id)]
 
-            # then look in any caching subsystem (e.g. memcached)
-            if self.metadata_inheritance_cache_subsystem is not None:
-                tree = self.metadata_inheritance_cache_subsystem.get(unicode(course_id), {})
-            else:
-                logging.warning(
-                    'Running MongoModuleStore without a metadata_inheritance_cache_subsystem. This is \
-                    OK in localdev and testing environment. Not OK in production.'
-                )
-
-        if not tree:
-            # if not in subsystem, or we are on force refresh, then we have to compute
-            tree = self._compute_metadata_inheritance_tree(course_id)
+        compute = lambda: self._compute_metadata_inheritance_tree(course_id)
 
-            # now write out computed tree to caching subsystem (e.g. memcached), if available
-            if self.metadata_inheritance_cache_subsystem is not None:
-                self.metadata_inheritance_cache_subsystem.set(unicode(course_id), tree)
+        # then look in any caching subsystem (e.g. memcached)
+        if self.metadata_inheritance_cache_subsystem is not None:
+            cache = MetadataInheritanceCache(self.metadata_inheritance_cache_subsystem)
+            if not force_refresh:
+                tree = cache.get(course_id, compute)
+            elif edited_location is None or edited_location.category == 'course':
+                tree = cache.refresh(course_id, compute)
+            else:
+                url = unicode(as_published(edited_location))
+                tree = cache.peek(course_id)
+                # Items which aren't in the tree are not part of the course yet, and the inherited
+                # metadata of leaves only depends on their parents: in either case editing the item
+                # doesn't change the tree.
+                if tree is None or (url in tree and edited_location.category in BLOCK_TYPES_WITH_CHILDREN):
+                    tree = cache.refresh(
+                        course_id, compute,
+                        lambda previous_tree: self._update_metadata_inheritance_tree(
+                            course_id, previous_tree, as_published(edited_location)
+                        )
+                    )
+        else:
+            logging.warning(
+                'Running MongoModuleStore without a metadata_inheritance_cache_subsystem. This is \
+                OK in localdev and testing environment. Not OK in production.'
+            )
+            tree = compute()
 
         # now populate a request_cache, if available. NOTE, we are outside of the
         # scope of the above if: statement so that after a memcache hit, it'll get
@@ -792,18 +903,23 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
 
         return tree
 
-    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None):
+    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None, location=None):
         """
         Refresh the cached metadata inheritance tree for the org/course combination
         for location
 
         If given a runtime, it replaces the cached_metadata in that runtime. NOTE: failure to provide
         a runtime may mean that some objects report old values for inherited data.
+
+        If given the location of the edited item, only the part of the tree that the edit
+        can have changed is recomputed.
         """
         course_id = course_id.for_branch(None)
         if not self._is_in_bulk_operation(course_id):
             # below is done for side effects when runtime is None
-            cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
+            cached_metadata = self._get_cached_metadata_inheritance_tree(
+                course_id, force_refresh=True, edited_location=location
+            )
             if runtime:
                 runtime.cached_metadata = cached_metadata
 
@@ -996,6 +1112,21 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         )
         return [course for course in base_list if not isinstance(course, ErrorDescriptor)]
 
+    @autoretry_read()
+    def get_course_keys(self, **kwargs):
+        '''
+        Returns a list of the keys of the courses, reading only the ids of their course records. This accepts
+        the same optional parameter of 'org' as get_courses.
+        '''
+        query = {'_id.category': 'course'}
+        if kwargs.get('org'):
+            query['_id.org'] = kwargs['org']
+        return [
+            SlashSeparatedCourseKey(course['_id']['org'], course['_id']['course'], course['_id']['name'])
+            for course in self.collection.find(query, fields={'_id': True})
+            if not (course['_id']['org'] == 'edx' and course['_id']['course'] == 'templates')
+        ]
+
     def _find_one(self, location):
         '''Look for a given location in the collection. If the item is not present, raise
         ItemNotFoundError.
@@ -1451,7 +1582,9 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             xblock._edit_info = payload['edit_info']
 
             # recompute (and update) the metadata inheritance tree which is cached
-            self.refresh_cached_metadata_inheritance_tree(xblock.scope_ids.usage_id.course_key, xblock.runtime)
+            self.refresh_cached_metadata_inheritance_tree(
+                xblock.scope_ids.usage_id.course_key, xblock.runtime, xblock.location
+            )
             # fire signal that we've written to DB
         except ItemNotFoundError:
             if not allow_not_found:
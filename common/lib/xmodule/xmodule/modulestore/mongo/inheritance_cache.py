@@ -0,0 +1,229 @@
+"""
+A cache of the metadata inheritance trees of old mongo courses, shared by
+all the processes using the same cache backend (e.g. memcached).
+
+Each course has a version stamp, which is replaced whenever the course is
+edited. A tree is only read back if it was stored for the current version
+of its course, so that a tree computed before an edit is not served after
+it, even if it was stored after the edit was made.
+
+Trees are stored pickled and zlib compressed, split into chunks that each
+fit in a memcached item. Computing the tree of a course is single-flight
+protected (see xmodule.modulestore.single_flight): when a tree is missing
+only one process computes it, while the others wait for it to be stored,
+and then serve the tree of the previous version of the course rather than
+computing it too.
+"""
+import cPickle as pickle
+import logging
+import zlib
+from uuid import uuid4
+
+# We don't want to force a dependency on datadog, so make the import conditional
+try:
+    import dogstats_wrapper as dog_stats_api
+except ImportError:
+    # pylint: disable=invalid-name
+    dog_stats_api = None
+
+from xmodule.modulestore.single_flight import LOCK_TIMEOUT, LOCK_WAIT, cache_add, cache_lock, single_flight
+
+log = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'mongo_modulestore.inheritance_cache.'
+
+# memcached refuses items bigger than 1MB, including the key and the
+# pickling overhead of the cache backend.
+CHUNK_SIZE = 512 * 1024
+
+
+def _increment(metric, value=1):
+    """
+    Increment the inheritance cache `metric`.
+    """
+    if dog_stats_api:
+        dog_stats_api.increment(METRIC_PREFIX + metric, value)
+
+
+class MetadataInheritanceCache(object):
+    """
+    Stores the metadata inheritance trees of courses in `cache`, which must
+    implement the django cache api.
+
+    Caches that only implement `get` and `set`, such as the in-memory
+    caches of the tests, are also supported; the lock is then not atomic.
+    """
+    def __init__(self, cache, chunk_size=CHUNK_SIZE, lock_timeout=LOCK_TIMEOUT, lock_wait=LOCK_WAIT):
+        self.cache = cache
+        self.chunk_size = chunk_size
+        self.lock_timeout = lock_timeout
+        self.lock_wait = lock_wait
+
+    def get(self, course_key, compute):
+        """
+        Return the tree of the course, computing it with `compute()` if it is
+        not cached for the current version of the course.
+
+        If another process is computing the tree, waits up to `lock_wait`
+        seconds for it to be stored, and then returns the tree of the
+        previous version of the course if it is cached, rather than
+        computing it again.
+        """
+        tree = self.peek(course_key)
+        if tree is not None:
+            _increment('hit')
+            return tree
+        _increment('miss')
+
+        def compute_and_store():
+            """
+            Compute the tree of the current version of the course, and store it.
+            """
+            version = self._get_version(course_key)
+            tree = compute()
+            self._write(course_key, version, tree)
+            return tree
+
+        return single_flight(
+            self.cache, self._key(course_key, 'tree'),
+            lambda: self.peek(course_key),
+            compute_and_store,
+            stale=lambda: self._read(course_key, allow_stale=True)[1],
+            lock_timeout=self.lock_timeout,
+            wait=self.lock_wait,
+            name='inheritance_tree',
+        )
+
+    def refresh(self, course_key, compute, update=None):
+        """
+        Start a new version of the course, and store and return its tree.
+
+        If `update` is given and the tree of the previous version is cached,
+        the new tree is `update(previous_tree)`, unless that returns None.
+        Otherwise the tree is computed with `compute()`.
+        """
+        lock = cache_lock(
+            self.cache, self._key(course_key, 'tree'), self.lock_timeout, self.lock_wait, name='inheritance_tree'
+        )
+        with lock as acquired:
+            __, previous_tree = self._read(course_key)
+            version = self._new_version(course_key)
+
+            tree = None
+            # only update the previous tree while holding the lock, or
+            # concurrent edits could be lost
+            if acquired and update is not None and previous_tree is not None:
+                tree = update(previous_tree)
+            if tree is None:
+                _increment('full_refresh')
+                tree = compute()
+            else:
+                _increment('incremental_refresh')
+            self._write(course_key, version, tree)
+        return tree
+
+    def peek(self, course_key):
+        """
+        Return the tree of the current version of the course if it is cached,
+        and None otherwise.
+        """
+        return self._read(course_key)[1]
+
+    def _read(self, course_key, allow_stale=False):
+        """
+        Return the current version of the course, and its tree if it is
+        cached, or None.
+
+        If `allow_stale` is True, the tree of a previous version of the
+        course is returned if it is the one cached.
+        """
+        version_key = self._key(course_key, 'version')
+        header_key = self._key(course_key, 'tree')
+        values = self._get_many([version_key, header_key])
+        version = values.get(version_key)
+        header = values.get(header_key)
+        if version is None:
+            version = self._create_version(course_key)
+        if header is None or (header.get('version') != version and not allow_stale):
+            return version, None
+
+        chunk_keys = [self._chunk_key(course_key, header['version'], index) for index in range(header['chunks'])]
+        chunks = self._get_many(chunk_keys)
+        if len(chunks) != len(chunk_keys):
+            # some chunks were evicted
+            return version, None
+        try:
+            return version, pickle.loads(zlib.decompress(''.join(chunks[key] for key in chunk_keys)))
+        except Exception:  # pylint: disable=broad-except
+            log.exception(u"Unable to read the cached inheritance tree of %s", course_key)
+            return version, None
+
+    def _write(self, course_key, version, tree):
+        """
+        Store the tree of the course, unless the course was edited since
+        `version` was read.
+        """
+        compressed = zlib.compress(pickle.dumps(tree, pickle.HIGHEST_PROTOCOL))
+        chunks = [
+            compressed[start:start + self.chunk_size]
+            for start in range(0, len(compressed), self.chunk_size)
+        ]
+        if self.cache.get(self._key(course_key, 'version')) != version:
+            _increment('stale_write')
+            return
+        # write the header last, so that it only refers to stored chunks
+        for index, chunk in enumerate(chunks):
+            self.cache.set(self._chunk_key(course_key, version, index), chunk)
+        self.cache.set(self._key(course_key, 'tree'), {'version': version, 'chunks': len(chunks)})
+
+    def _get_version(self, course_key):
+        """
+        Return the current version of the course.
+        """
+        return self.cache.get(self._key(course_key, 'version')) or self._create_version(course_key)
+
+    def _create_version(self, course_key):
+        """
+        Return the version of the course, giving it a first one if it has none.
+        """
+        key = self._key(course_key, 'version')
+        version = uuid4().hex
+        if cache_add(self.cache, key, version):
+            return version
+        # another process created it first
+        return self.cache.get(key) or version
+
+    def _new_version(self, course_key):
+        """
+        Give the course a new version, and return it.
+        """
+        version = uuid4().hex
+        self.cache.set(self._key(course_key, 'version'), version)
+        return version
+
+    def _get_many(self, keys):
+        """
+        Return a dict of the values of the `keys` that are set.
+        """
+        if hasattr(self.cache, 'get_many'):
+            return self.cache.get_many(keys)
+        values = {}
+        for key in keys:
+            value = self.cache.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    @staticmethod
+    def _key(course_key, name):
+        """
+        Return the key of the `name` entry of the course.
+        """
+        return u'{}.inheritance_{}'.format(course_key, name)
+
+    @staticmethod
+    def _chunk_key(course_key, version, index):
+        """
+        Return the key of chunk `index` of the tree of `version` of the course.
+        """
+        return u'{}.inheritance_tree.{}.{}'.format(course_key, version, index)
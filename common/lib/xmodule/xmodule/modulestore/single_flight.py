@@ -0,0 +1,163 @@
+"""
+Single-flight protection of values shared through a cache (e.g. memcached).
+
+When a value many processes need falls out of the cache, such as the
+structure or the inheritance tree of a popular course, every process
+would otherwise rebuild it at the same time. With `single_flight`, only
+the process that takes the value's lock rebuilds it, while the others
+wait for it to be cached, and fall back to a stale copy of it if there is
+one, or to rebuilding it themselves, if it takes too long. Waiting stops
+as soon as the lock is released without the value having been cached,
+e.g. because rebuilding it failed or the value is too large to be cached.
+
+The cache is also used as the lock service: locks are taken with the
+atomic `add` of the django cache api, and expire after `lock_timeout`
+seconds should the process holding them die.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from uuid import uuid4
+
+# We don't want to force a dependency on datadog, so make the import conditional
+try:
+    import dogstats_wrapper as dog_stats_api
+except ImportError:
+    # pylint: disable=invalid-name
+    dog_stats_api = None
+
+log = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'modulestore.single_flight.'
+
+# Seconds after which a lock is released, should the process that took
+# it die while holding it.
+LOCK_TIMEOUT = 60
+
+# Seconds to wait for another process to cache a value, and how often to
+# check whether it was cached.
+LOCK_WAIT = 5
+LOCK_POLL_INTERVAL = 0.1
+
+
+def _record(metric, name, result, wait_time=None):
+    """
+    Report the `result` of a single-flight `metric` for values of kind `name`.
+    """
+    if dog_stats_api:
+        tags = [u'name:{}'.format(name), u'result:{}'.format(result)]
+        dog_stats_api.increment(METRIC_PREFIX + metric, tags=tags)
+        if wait_time is not None:
+            dog_stats_api.histogram(METRIC_PREFIX + metric + '_time', wait_time, tags=tags)
+
+
+def _lock_key(key):
+    """
+    Return the cache key of the lock of `key`.
+    """
+    return u'{}.lock'.format(key)
+
+
+def cache_add(cache, key, value, timeout=None):
+    """
+    Set `key` to `value` in `cache` unless it is already set, returning
+    whether it was set.
+
+    Caches that only implement `get` and `set`, such as the in-memory caches
+    of the tests, are supported, although the operation is then not atomic.
+    """
+    if hasattr(cache, 'add'):
+        if timeout is None:
+            return cache.add(key, value)
+        return cache.add(key, value, timeout)
+    if cache.get(key) is not None:
+        return False
+    cache.set(key, value)
+    return True
+
+
+def cache_delete(cache, key):
+    """
+    Unset `key` in `cache`.
+    """
+    if hasattr(cache, 'delete'):
+        cache.delete(key)
+    else:
+        cache.set(key, None)
+
+
+@contextmanager
+def cache_lock(cache, key, lock_timeout=LOCK_TIMEOUT, wait=0, name='lock'):
+    """
+    Try to take the lock `key` in `cache`, yielding whether it was taken.
+
+    Retries for up to `wait` seconds if the lock is held by another process.
+    """
+    lock_key = _lock_key(key)
+    token = uuid4().hex
+    acquired = cache_add(cache, lock_key, token, lock_timeout)
+    if not acquired and wait:
+        start = time.time()
+        while not acquired and time.time() < start + wait:
+            time.sleep(LOCK_POLL_INTERVAL)
+            acquired = cache_add(cache, lock_key, token, lock_timeout)
+        _record('lock_wait', name, 'acquired' if acquired else 'timeout', time.time() - start)
+    try:
+        yield acquired
+    finally:
+        if acquired and cache.get(lock_key) == token:
+            cache_delete(cache, lock_key)
+
+
+def single_flight(cache, key, fetch, compute, stale=None, lock_timeout=LOCK_TIMEOUT, wait=LOCK_WAIT, name='value'):
+    """
+    Return the value cached under `key`, rebuilding it at most once across
+    the processes sharing `cache`.
+
+    `fetch()` returns the cached value, or None if it isn't cached, and
+    `compute()` rebuilds, caches and returns it. While another process holds
+    the lock of `key`, waits up to `wait` seconds for the value to be cached.
+    After that, returns `stale()` if given and not None, and otherwise
+    computes the value without the lock. If the lock is released without
+    the value having been cached, computes it without waiting any longer.
+
+    `name` tags the metrics of the waits, to tell kinds of values apart.
+    """
+    value = fetch()
+    if value is not None:
+        return value
+
+    with cache_lock(cache, key, lock_timeout, name=name) as acquired:
+        if acquired:
+            # the value may have been cached while we were taking the lock
+            value = fetch()
+            if value is None:
+                value = compute()
+            return value
+
+        start = time.time()
+        while time.time() < start + wait:
+            time.sleep(LOCK_POLL_INTERVAL)
+            value = fetch()
+            if value is not None:
+                _record('wait', name, 'cached', time.time() - start)
+                return value
+            if cache.get(_lock_key(key)) is None:
+                # the value may have been cached just before the lock was released
+                value = fetch()
+                if value is not None:
+                    _record('wait', name, 'cached', time.time() - start)
+                    return value
+                # the process holding the lock failed to compute or to cache the value
+                _record('wait', name, 'released', time.time() - start)
+                log.info(u"Lock of %s %s released before it was cached, computing it", name, key)
+                return compute()
+
+        value = stale() if stale is not None else None
+        if value is not None:
+            _record('wait', name, 'stale', time.time() - start)
+            return value
+
+        _record('wait', name, 'timeout', time.time() - start)
+        log.info(u"Timed out waiting for %s %s to be cached, computing it", name, key)
+        return compute()
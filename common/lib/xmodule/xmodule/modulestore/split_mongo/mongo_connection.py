@@ -11,6 +11,7 @@ from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 from contracts import check, new_contract
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
+from xmodule.modulestore.single_flight import single_flight
 from xmodule.modulestore.split_mongo import BlockKey
 import datetime
 import pytz
@@ -76,10 +77,13 @@ class MongoConnection(object):
     """
     def __init__(
         self, db, collection, host, port=27017, tz_aware=True, user=None, password=None,
-        asset_collection=None, retry_wait_time=0.1, **kwargs
+        asset_collection=None, retry_wait_time=0.1, structure_cache=None, **kwargs
     ):
         """
         Create & open the connection, authenticate, and provide pointers to the collections
+
+        If `structure_cache` is given, it must be a StructureCache, which
+        will be used to avoid reading structures from mongo.
         """
         self.database = MongoProxy(
             pymongo.database.Database(
@@ -101,6 +105,9 @@ class MongoConnection(object):
         self.structures = self.database[collection + '.structures']
         self.definitions = self.database[collection + '.definitions']
 
+        self.structure_cache = structure_cache
+        self.structure_cache_prefix = u'{}.{}'.format(db, collection)
+
         # every app has write access to the db (v having a flag to indicate r/o v write)
         # Force mongo to report errors, at the expense of performance
         # pymongo docs suck but explanation:
@@ -118,11 +125,58 @@ class MongoConnection(object):
         else:
             raise HeartbeatFailure("Can't connect to {}".format(self.database.name))
 
+    def _structure_cache_key(self, key):
+        """
+        Return the key of the structure with id `key` in the structure cache.
+        """
+        return u'{}.{}'.format(self.structure_cache_prefix, key)
+
+    def _get_cached_structure(self, key):
+        """
+        Return the mongo document of the structure with id `key` from the
+        structure cache, or None if it isn't cached.
+        """
+        if self.structure_cache is None:
+            return None
+        return self.structure_cache.get(self._structure_cache_key(key))
+
+    def _cache_structure(self, structure):
+        """
+        Add the mongo document `structure` to the structure cache, if any.
+        """
+        if self.structure_cache is not None and structure is not None:
+            self.structure_cache.set(self._structure_cache_key(structure['_id']), structure)
+
     def get_structure(self, key):
         """
         Get the structure from the persistence mechanism whose id is the given key
-        """
-        return structure_from_mongo(self.structures.find_one({'_id': key}))
+
+        If the structure cache is shared between processes, only one of them reads
+        a missing structure from mongo, while the others wait for it to be cached,
+        unless the structure is known to be too large to be shared.
+        """
+        def read_structure():
+            """
+            Read the structure from mongo, and cache it.
+            """
+            structure = self.structures.find_one({'_id': key})
+            self._cache_structure(structure)
+            return structure
+
+        structure = self._get_cached_structure(key)
+        if structure is None:
+            cache_key = self._structure_cache_key(key)
+            if self.structure_cache is not None and self.structure_cache.is_shareable(cache_key):
+                structure = single_flight(
+                    self.structure_cache.second_tier,
+                    u'split_structure.{}'.format(cache_key),
+                    lambda: self._get_cached_structure(key),
+                    read_structure,
+                    name='split_structure',
+                )
+            else:
+                structure = read_structure()
+        return structure_from_mongo(structure)
 
     @autoretry_read()
     def find_structures_by_id(self, ids):
@@ -132,7 +186,21 @@ class MongoConnection(object):
         Arguments:
             ids (list): A list of structure ids
         """
-        return [structure_from_mongo(structure) for structure in self.structures.find({'_id': {'$in': ids}})]
+        structures = []
+        uncached_ids = []
+        for structure_id in ids:
+            structure = self._get_cached_structure(structure_id)
+            if structure is None:
+                uncached_ids.append(structure_id)
+            else:
+                structures.append(structure)
+
+        if uncached_ids:
+            for structure in self.structures.find({'_id': {'$in': uncached_ids}}):
+                self._cache_structure(structure)
+                structures.append(structure)
+
+        return [structure_from_mongo(structure) for structure in structures]
 
     @autoretry_read()
     def find_structures_derived_from(self, ids):
@@ -173,7 +241,9 @@ class MongoConnection(object):
         """
         Insert a new structure into the database.
         """
-        self.structures.insert(structure_to_mongo(structure))
+        mongo_structure = structure_to_mongo(structure)
+        self.structures.insert(mongo_structure)
+        self._cache_structure(mongo_structure)
 
     def get_course_index(self, key, ignore_case=False):
         """
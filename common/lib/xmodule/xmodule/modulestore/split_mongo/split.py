@@ -80,6 +80,7 @@ from xmodule.modulestore import (
 from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
+from xmodule.modulestore.split_mongo.structure_cache import get_structure_cache
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
 from xmodule.error_module import ErrorDescriptor
 from collections import defaultdict
@@ -636,14 +637,22 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                  default_class=None,
                  error_tracker=null_error_tracker,
                  i18n_service=None, fs_service=None, user_service=None,
-                 services=None, signal_handler=None, **kwargs):
+                 services=None, signal_handler=None,
+                 structure_cache_max_bytes=0, structure_cache_memcache=None, **kwargs):
         """
         :param doc_store_config: must have a host, db, and collection entries. Other common entries: port, tz_aware.
+        :param structure_cache_max_bytes: if positive, structures read from mongo are kept in a process-wide
+            LRU cache of at most this many bytes.
+        :param structure_cache_memcache: an optional django cache used as a second tier of the structure cache.
         """
 
         super(SplitMongoModuleStore, self).__init__(contentstore, **kwargs)
 
-        self.db_connection = MongoConnection(**doc_store_config)
+        if structure_cache_max_bytes:
+            structure_cache = get_structure_cache(structure_cache_max_bytes, structure_cache_memcache)
+        else:
+            structure_cache = None
+        self.db_connection = MongoConnection(structure_cache=structure_cache, **doc_store_config)
         self.db = self.db_connection.database
 
         if default_class is not None:
@@ -691,6 +700,9 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         connection.drop_database(self.db.name)
         connection.close()
 
+        if self.db_connection.structure_cache is not None:
+            self.db_connection.structure_cache.clear()
+
     def cache_items(self, system, base_block_ids, course_key, depth=0, lazy=True):
         """
         Handles caching of items once inheritance and any other one time
@@ -924,6 +936,18 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         # get the blocks for each course index (s/b the root)
         return self._get_structures_for_branch_and_locator(branch, self._create_course_locator, **kwargs)
 
+    def get_course_keys(self, branch, **kwargs):
+        """
+        Returns a list of the locators of the courses with the named branch, read from their course indexes
+        without loading their structures.  Accepts the same qualifiers as get_courses.
+
+        :param branch: the branch for which to return courses.
+        """
+        return [
+            self._create_course_locator(course_index, branch)
+            for course_index in self.find_matching_course_indexes(branch, org_target=kwargs.get('org'))
+        ]
+
     def get_libraries(self, branch="library", **kwargs):
         """
         Returns a list of "library" root blocks matching any given qualifiers.
@@ -2425,6 +2449,9 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         log.info(u"deleting course from split-mongo: %s", course_key)
         self.delete_course_index(course_key)
 
+        if self.signal_handler:
+            self.signal_handler.send("course_deleted", course_key=course_key)
+
         # We do NOT call the super class here since we need to keep the assets
         # in case the course is later restored.
         # super(SplitMongoModuleStore, self).delete_course(course_key, user_id)
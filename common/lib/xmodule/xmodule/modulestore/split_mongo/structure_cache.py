@@ -0,0 +1,201 @@
+"""
+A process-wide cache of split modulestore structure documents.
+
+Structures are never modified once they have been saved, so a structure
+document can be cached for as long as there is room for it, keyed by its
+version guid. Each process keeps a bounded LRU cache of pickled structure
+documents, optionally backed by a second, shared cache (e.g. memcached)
+holding compressed copies. Structures too large for an item of the second
+tier are only cached locally, and marked as such in the second tier so
+that processes don't wait for one another to cache them.
+
+Cached documents are stored pickled so that every lookup returns a new copy
+of the document, exactly as a fresh read from mongo would: callers are free
+to modify the structures they are given.
+"""
+from collections import OrderedDict
+import cPickle as pickle
+import logging
+import threading
+import zlib
+
+# We don't want to force a dependency on datadog, so make the import conditional
+try:
+    import dogstats_wrapper as dog_stats_api
+except ImportError:
+    # pylint: disable=invalid-name
+    dog_stats_api = None
+
+log = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'split_modulestore.structure_cache.'
+
+# The largest compressed structure stored in the second tier cache: memcached
+# rejects items over 1MB by default, and the item's key and the pickling of
+# the compressed structure by the cache backend take some room too.
+SECOND_TIER_MAX_BYTES = 1000 * 1000
+
+
+def _increment(metric, tier, value=1):
+    """
+    Increment the structure cache `metric` for the given cache `tier`.
+    """
+    if dog_stats_api:
+        dog_stats_api.increment(METRIC_PREFIX + metric, value, tags=[u'tier:{}'.format(tier)])
+
+
+class StructureCache(object):
+    """
+    A thread-safe LRU cache of structure documents, holding at most
+    `max_bytes` bytes of pickled documents.
+
+    If `second_tier` is given, it must implement the django cache api
+    (`get` and `set`); structures missing from the local cache are
+    looked up there, and new structures are added to it, zlib compressed,
+    if they take at most `second_tier_max_bytes` bytes.
+    """
+    def __init__(self, max_bytes, second_tier=None, second_tier_max_bytes=SECOND_TIER_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.second_tier = second_tier
+        self.second_tier_max_bytes = second_tier_max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return a copy of the structure document cached under `key`, or None.
+        """
+        with self._lock:
+            pickled = self._entries.pop(key, None)
+            if pickled is not None:
+                # re-insert the entry to mark it as the most recently used
+                self._entries[key] = pickled
+
+        if pickled is not None:
+            _increment('hit', 'local')
+            return pickle.loads(pickled)
+        _increment('miss', 'local')
+
+        if self.second_tier is None:
+            return None
+
+        try:
+            compressed = self.second_tier.get(self._second_tier_key(key))
+        except Exception:  # pylint: disable=broad-except
+            log.exception(u"Unable to read structure %s from the second tier cache", key)
+            compressed = None
+        if compressed is None:
+            _increment('miss', 'shared')
+            return None
+
+        _increment('hit', 'shared')
+        pickled = zlib.decompress(compressed)
+        self._add(key, pickled)
+        return pickle.loads(pickled)
+
+    def set(self, key, structure):
+        """
+        Cache a copy of the `structure` document under `key`.
+        """
+        pickled = pickle.dumps(structure, pickle.HIGHEST_PROTOCOL)
+        self._add(key, pickled)
+
+        if self.second_tier is not None:
+            compressed = zlib.compress(pickled)
+            try:
+                if len(compressed) > self.second_tier_max_bytes:
+                    _increment('too_large', 'shared')
+                    log.warning(
+                        u"Structure %s is too large for the second tier cache (%d compressed bytes)",
+                        key, len(compressed)
+                    )
+                    self.second_tier.set(self._too_large_key(key), True)
+                else:
+                    self.second_tier.set(self._second_tier_key(key), compressed)
+            except Exception:  # pylint: disable=broad-except
+                log.exception(u"Unable to write structure %s to the second tier cache", key)
+
+    def is_shareable(self, key):
+        """
+        Return whether the structure with `key` can be shared through the
+        second tier cache, i.e. there is one, and the structure isn't known
+        to be too large for it.
+        """
+        if self.second_tier is None:
+            return False
+        try:
+            return not self.second_tier.get(self._too_large_key(key))
+        except Exception:  # pylint: disable=broad-except
+            log.exception(u"Unable to read structure %s from the second tier cache", key)
+            return False
+
+    def clear(self):
+        """
+        Empty the local cache. The second tier cache is left untouched.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _add(self, key, pickled):
+        """
+        Add the `pickled` structure to the local cache, evicting the least
+        recently used structures to stay within `max_bytes`.
+        """
+        size = len(pickled)
+        if size > self.max_bytes:
+            _increment('too_large', 'local')
+            return
+
+        evictions = 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+            while self._entries and self.current_bytes + size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                evictions += 1
+            self._entries[key] = pickled
+            self.current_bytes += size
+
+        if evictions:
+            _increment('eviction', 'local', evictions)
+
+    @staticmethod
+    def _second_tier_key(key):
+        """
+        Return the key of the structure cached under `key` in the second tier.
+        """
+        return u'split_structure.{}'.format(key)
+
+    @staticmethod
+    def _too_large_key(key):
+        """
+        Return the key marking the structure `key` as too large for the second tier.
+        """
+        return u'split_structure.{}.too_large'.format(key)
+
+
+# The structure cache shared by all the split modulestores of this process.
+_PROCESS_STRUCTURE_CACHE = None
+
+
+def get_structure_cache(max_bytes, second_tier=None):
+    """
+    Return the process-wide StructureCache, creating it if needed.
+
+    The cache is shared by all modulestores of the process, so the last
+    modulestore configured wins if they disagree on the cache's settings.
+    """
+    global _PROCESS_STRUCTURE_CACHE  # pylint: disable=global-statement
+    if _PROCESS_STRUCTURE_CACHE is None:
+        _PROCESS_STRUCTURE_CACHE = StructureCache(max_bytes, second_tier)
+    else:
+        _PROCESS_STRUCTURE_CACHE.max_bytes = max_bytes
+        _PROCESS_STRUCTURE_CACHE.second_tier = second_tier
+    return _PROCESS_STRUCTURE_CACHE
@@ -857,6 +857,18 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
             published_courses = self.store.get_courses(remove_branch=True)
         self.assertEquals([c.id for c in draft_courses], [c.id for c in published_courses])
 
+    @ddt.data('draft', 'split')
+    def test_get_course_keys(self, default_ms):
+        self.initdb(default_ms)
+        self.assertItemsEqual(
+            self.store.get_course_keys(),
+            [course.id for course in self.store.get_courses()]
+        )
+        self.assertItemsEqual(
+            self.store.get_course_keys(org='MITx'),
+            [course.id for course in self.store.get_courses(org='MITx')]
+        )
+
     @ddt.data('draft', 'split')
     def test_create_child_detached_tabs(self, default_ms):
         """
@@ -2057,6 +2069,32 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
                     self.store.clone_course(course_key, dest_course_id, self.user_id)
                     self.assertEqual(receiver.call_count, 1)
 
+    @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+    def test_course_deleted_signal(self, default):
+        with MongoContentstoreBuilder().build() as contentstore:
+            self.store = MixedModuleStore(
+                contentstore=contentstore,
+                create_modulestore_instance=create_modulestore_instance,
+                mappings={},
+                signal_handler=SignalHandler(MixedModuleStore),
+                **self.OPTIONS
+            )
+            self.addCleanup(self.store.close_all_connections)
+
+            with self.store.default_store(default):
+                self.assertIsNotNone(self.store.thread_cache.default_store.signal_handler)
+
+                with mock_signal_receiver(SignalHandler.course_deleted) as receiver:
+                    self.assertEqual(receiver.call_count, 0)
+
+                    # Course creation should not fire the signal
+                    course = self.store.create_course('org_x', 'course_y', 'run_z', self.user_id)
+                    self.assertEqual(receiver.call_count, 0)
+
+                    # Course deletion should fire the signal
+                    self.store.delete_course(course.id, self.user_id)
+                    self.assertEqual(receiver.call_count, 1)
+
     @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
     def test_course_publish_signal_import_firing(self, default):
         with MongoContentstoreBuilder().build() as contentstore:
@@ -0,0 +1,144 @@
+"""
+Tests of the cache of old mongo metadata inheritance trees.
+"""
+import unittest
+
+from mock import Mock, patch
+
+from xmodule.modulestore.mongo.inheritance_cache import MetadataInheritanceCache
+from xmodule.modulestore.single_flight import cache_lock
+from xmodule.modulestore.tests.test_cross_modulestore_import_export import MemoryCache
+
+
+class DictCache(MemoryCache):
+    """
+    An in-memory cache implementing the parts of the django cache api
+    used for locking.
+    """
+    def add(self, key, value, timeout=None):  # pylint: disable=unused-argument
+        """
+        Set the key, unless it is already set.
+        """
+        if key in self._data:
+            return False
+        self._data[key] = value
+        return True
+
+    def get_many(self, keys):
+        """
+        Get the values of the keys that are set.
+        """
+        return {key: self._data[key] for key in keys if key in self._data}
+
+    def delete(self, key):
+        """
+        Unset the key.
+        """
+        self._data.pop(key, None)
+
+
+TREE = {
+    'i4x://org/course/chapter/one': {'graded': True, 'parent': {'draft': 'i4x://org/course/course/run'}},
+    'i4x://org/course/html/two': {'graded': True, 'parent': {'draft': 'i4x://org/course/chapter/one'}},
+}
+
+
+class TestMetadataInheritanceCache(unittest.TestCase):
+    """
+    Tests of MetadataInheritanceCache.
+    """
+    def setUp(self):
+        super(TestMetadataInheritanceCache, self).setUp()
+        self.cache = MetadataInheritanceCache(DictCache(), chunk_size=16, lock_wait=0.2)
+
+    def test_computed_once(self):
+        compute = Mock(return_value=TREE)
+        self.assertEqual(self.cache.get('org/course/run', compute), TREE)
+        self.assertEqual(self.cache.get('org/course/run', compute), TREE)
+        self.assertEqual(compute.call_count, 1)
+
+    def test_stored_in_chunks(self):
+        self.cache.get('org/course/run', lambda: TREE)
+        chunk_keys = [key for key in self.cache.cache._data if '.inheritance_tree.' in key]
+        self.assertGreater(len(chunk_keys), 1)
+
+    def test_missing_chunk(self):
+        self.cache.get('org/course/run', lambda: TREE)
+        chunk_key = next(key for key in self.cache.cache._data if '.inheritance_tree.' in key)
+        self.cache.cache.delete(chunk_key)
+        self.assertIsNone(self.cache.peek('org/course/run'))
+
+    def test_refresh_invalidates(self):
+        self.cache.get('org/course/run', lambda: TREE)
+        self.assertEqual(self.cache.refresh('org/course/run', lambda: {}), {})
+        self.assertEqual(self.cache.get('org/course/run', Mock()), {})
+
+    def test_refresh_updates_previous_tree(self):
+        self.cache.get('org/course/run', lambda: TREE)
+        compute = Mock()
+        update = Mock(return_value={'updated': True})
+        self.assertEqual(self.cache.refresh('org/course/run', compute, update), {'updated': True})
+        update.assert_called_once_with(TREE)
+        self.assertFalse(compute.called)
+        self.assertEqual(self.cache.peek('org/course/run'), {'updated': True})
+
+    def test_refresh_without_previous_tree(self):
+        update = Mock()
+        self.assertEqual(self.cache.refresh('org/course/run', lambda: TREE, update), TREE)
+        self.assertFalse(update.called)
+
+    def test_stale_tree_not_stored(self):
+        def compute():
+            """
+            Compute a tree while the course is being edited.
+            """
+            self.cache.refresh('org/course/run', lambda: {'edited': True})
+            return TREE
+
+        self.assertEqual(self.cache.get('org/course/run', compute), TREE)
+        self.assertEqual(self.cache.peek('org/course/run'), {'edited': True})
+
+    def locked(self):
+        """
+        Hold the lock of the tree of the course, as another process would.
+        """
+        return cache_lock(self.cache.cache, self.cache._key('org/course/run', 'tree'))  # pylint: disable=protected-access
+
+    def test_waits_for_locked_tree(self):
+        with self.locked() as acquired:
+            self.assertTrue(acquired)
+            compute = Mock(return_value=TREE)
+            # the tree is stored by the process holding the lock while we wait
+            with patch.object(self.cache, 'peek', side_effect=[None, None, TREE]):
+                self.assertEqual(self.cache.get('org/course/run', compute), TREE)
+            self.assertFalse(compute.called)
+
+    def test_computes_after_lock_wait(self):
+        with self.locked():
+            compute = Mock(return_value=TREE)
+            self.assertEqual(self.cache.get('org/course/run', compute), TREE)
+            self.assertEqual(compute.call_count, 1)
+
+    def test_serves_stale_tree_after_lock_wait(self):
+        self.cache.get('org/course/run', lambda: TREE)
+        with self.locked():
+            self.cache._new_version('org/course/run')  # pylint: disable=protected-access
+            compute = Mock(return_value={})
+            self.assertEqual(self.cache.get('org/course/run', compute), TREE)
+            self.assertFalse(compute.called)
+
+    def test_refresh_without_lock_recomputes(self):
+        self.cache.get('org/course/run', lambda: TREE)
+        with self.locked():
+            update = Mock()
+            self.assertEqual(self.cache.refresh('org/course/run', lambda: {}, update), {})
+            self.assertFalse(update.called)
+
+    def test_get_and_set_only_cache(self):
+        cache = MetadataInheritanceCache(MemoryCache(), lock_wait=0.2)
+        compute = Mock(return_value=TREE)
+        self.assertEqual(cache.get('org/course/run', compute), TREE)
+        self.assertEqual(cache.get('org/course/run', compute), TREE)
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual(cache.refresh('org/course/run', lambda: {}), {})
+        self.assertEqual(cache.peek('org/course/run'), {})
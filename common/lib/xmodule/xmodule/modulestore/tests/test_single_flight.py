@@ -0,0 +1,102 @@
+"""
+Tests of the single-flight protection of cached values.
+"""
+import unittest
+
+from mock import Mock, patch
+
+from xmodule.modulestore.single_flight import cache_lock, single_flight
+from xmodule.modulestore.tests.test_cross_modulestore_import_export import MemoryCache
+
+
+class TestCacheLock(unittest.TestCase):
+    """
+    Tests of cache_lock.
+    """
+    def setUp(self):
+        super(TestCacheLock, self).setUp()
+        self.cache = MemoryCache()
+
+    def test_lock_released(self):
+        with cache_lock(self.cache, 'key') as acquired:
+            self.assertTrue(acquired)
+            with cache_lock(self.cache, 'key') as acquired_again:
+                self.assertFalse(acquired_again)
+            # failing to take the lock doesn't release it
+            with cache_lock(self.cache, 'key') as acquired_again:
+                self.assertFalse(acquired_again)
+        with cache_lock(self.cache, 'key') as acquired:
+            self.assertTrue(acquired)
+
+    def test_released_on_error(self):
+        with self.assertRaises(ValueError):
+            with cache_lock(self.cache, 'key'):
+                raise ValueError
+        with cache_lock(self.cache, 'key') as acquired:
+            self.assertTrue(acquired)
+
+    def test_wait(self):
+        with cache_lock(self.cache, 'key'):
+            with patch('xmodule.modulestore.single_flight.dog_stats_api') as mock_stats:
+                with cache_lock(self.cache, 'key', wait=0.2, name='test') as acquired:
+                    self.assertFalse(acquired)
+        mock_stats.increment.assert_called_with(
+            'modulestore.single_flight.lock_wait', tags=[u'name:test', u'result:timeout']
+        )
+
+
+class TestSingleFlight(unittest.TestCase):
+    """
+    Tests of single_flight.
+    """
+    def setUp(self):
+        super(TestSingleFlight, self).setUp()
+        self.cache = MemoryCache()
+        self.compute = Mock(return_value='computed')
+
+    def test_cached(self):
+        self.assertEqual(single_flight(self.cache, 'key', lambda: 'cached', self.compute), 'cached')
+        self.assertFalse(self.compute.called)
+
+    def test_computed(self):
+        self.assertEqual(single_flight(self.cache, 'key', lambda: None, self.compute), 'computed')
+        self.assertEqual(self.compute.call_count, 1)
+        # the lock was released
+        with cache_lock(self.cache, 'key') as acquired:
+            self.assertTrue(acquired)
+
+    def test_cached_while_taking_lock(self):
+        fetch = Mock(side_effect=[None, 'cached'])
+        self.assertEqual(single_flight(self.cache, 'key', fetch, self.compute), 'cached')
+        self.assertFalse(self.compute.called)
+
+    def test_waits_for_other_process(self):
+        fetch = Mock(side_effect=[None, None, 'cached'])
+        with cache_lock(self.cache, 'key'):
+            with patch('xmodule.modulestore.single_flight.dog_stats_api') as mock_stats:
+                self.assertEqual(single_flight(self.cache, 'key', fetch, self.compute, wait=1, name='test'), 'cached')
+        self.assertFalse(self.compute.called)
+        mock_stats.increment.assert_called_with(
+            'modulestore.single_flight.wait', tags=[u'name:test', u'result:cached']
+        )
+
+    def test_stale_after_wait(self):
+        with cache_lock(self.cache, 'key'):
+            value = single_flight(self.cache, 'key', lambda: None, self.compute, stale=lambda: 'stale', wait=0.2)
+        self.assertEqual(value, 'stale')
+        self.assertFalse(self.compute.called)
+
+    def test_computed_after_wait(self):
+        with cache_lock(self.cache, 'key'):
+            value = single_flight(self.cache, 'key', lambda: None, self.compute, stale=lambda: None, wait=0.2)
+        self.assertEqual(value, 'computed')
+
+    def test_stops_waiting_when_lock_released(self):
+        # the process holding the lock failed to cache the value and released the lock
+        with patch('xmodule.modulestore.single_flight.cache_add', return_value=False):
+            with patch('xmodule.modulestore.single_flight.dog_stats_api') as mock_stats:
+                value = single_flight(self.cache, 'key', lambda: None, self.compute, wait=10, name='test')
+        self.assertEqual(value, 'computed')
+        mock_stats.increment.assert_called_with(
+            'modulestore.single_flight.wait', tags=[u'name:test', u'result:released']
+        )
@@ -0,0 +1,179 @@
+"""
+Tests of the process-wide cache of split modulestore structures.
+"""
+import unittest
+
+from bson.objectid import ObjectId
+from mock import MagicMock, patch
+
+from xmodule.modulestore.single_flight import cache_lock
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, structure_from_mongo
+from xmodule.modulestore.split_mongo.structure_cache import StructureCache
+
+
+class DictCache(object):
+    """
+    A minimal in-memory implementation of the django cache api.
+    """
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+def mongo_structure(structure_id=None):
+    """
+    Return a structure document as it is stored in mongo.
+    """
+    return {
+        '_id': structure_id or ObjectId(),
+        'root': ['course', 'course'],
+        'blocks': [{'block_type': 'course', 'block_id': 'course', 'fields': {'children': []}}],
+    }
+
+
+class TestStructureCache(unittest.TestCase):
+    """
+    Tests of StructureCache.
+    """
+    def test_get_returns_copies(self):
+        cache = StructureCache(10 ** 6)
+        structure = mongo_structure()
+        cache.set('key', structure)
+        cached = cache.get('key')
+        self.assertEqual(cached, structure)
+        cached['blocks'] = []
+        self.assertEqual(cache.get('key'), structure)
+
+    def test_miss(self):
+        self.assertIsNone(StructureCache(10 ** 6).get('key'))
+
+    def test_lru_eviction(self):
+        structure = mongo_structure()
+        cache = StructureCache(10 ** 6)
+        cache.set('probe', structure)
+        # room for exactly two structures
+        cache = StructureCache(cache.current_bytes * 2)
+        cache.set('a', structure)
+        cache.set('b', structure)
+        cache.get('a')
+        with patch('xmodule.modulestore.split_mongo.structure_cache.dog_stats_api') as mock_stats:
+            cache.set('c', structure)
+        mock_stats.increment.assert_called_with(
+            'split_modulestore.structure_cache.eviction', 1, tags=[u'tier:local']
+        )
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertLessEqual(cache.current_bytes, cache.max_bytes)
+
+    def test_too_large(self):
+        cache = StructureCache(10)
+        cache.set('key', mongo_structure())
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.current_bytes, 0)
+
+    def test_second_tier(self):
+        second_tier = DictCache()
+        structure = mongo_structure()
+        StructureCache(10 ** 6, second_tier).set('key', structure)
+        self.assertEqual(len(second_tier.values), 1)
+
+        # a process with an empty local cache finds the structure in the second tier
+        cache = StructureCache(10 ** 6, second_tier)
+        self.assertEqual(cache.get('key'), structure)
+        self.assertEqual(len(cache), 1)
+
+    def test_second_tier_too_large(self):
+        second_tier = DictCache()
+        cache = StructureCache(10 ** 6, second_tier, second_tier_max_bytes=10)
+        self.assertTrue(cache.is_shareable('key'))
+        with patch('xmodule.modulestore.split_mongo.structure_cache.dog_stats_api') as mock_stats:
+            cache.set('key', mongo_structure())
+        mock_stats.increment.assert_called_with(
+            'split_modulestore.structure_cache.too_large', 1, tags=[u'tier:shared']
+        )
+        self.assertIsNone(second_tier.get(cache._second_tier_key('key')))  # pylint: disable=protected-access
+        self.assertFalse(cache.is_shareable('key'))
+        # the structure is still cached locally
+        self.assertIsNotNone(cache.get('key'))
+
+    def test_clear(self):
+        cache = StructureCache(10 ** 6)
+        cache.set('key', mongo_structure())
+        cache.clear()
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(cache.current_bytes, 0)
+
+
+class TestMongoConnectionStructureCache(unittest.TestCase):
+    """
+    Tests that MongoConnection only reads uncached structures from mongo.
+    """
+    def setUp(self):
+        super(TestMongoConnectionStructureCache, self).setUp()
+        # Don't actually connect to mongo
+        self.connection = MongoConnection.__new__(MongoConnection)
+        self.connection.structures = MagicMock(name='structures')
+        self.connection.structure_cache = StructureCache(10 ** 6)
+        self.connection.structure_cache_prefix = u'test.modulestore'
+
+    def test_get_structure(self):
+        structure = mongo_structure()
+        self.connection.structures.find_one.return_value = structure
+        for __ in range(2):
+            result = self.connection.get_structure(structure['_id'])
+            self.assertEqual(result['root'], BlockKey('course', 'course'))
+        self.assertEqual(self.connection.structures.find_one.call_count, 1)
+
+    def test_find_structures_by_id(self):
+        cached = mongo_structure()
+        uncached = mongo_structure()
+        self.connection.structures.find_one.return_value = cached
+        self.connection.get_structure(cached['_id'])
+
+        self.connection.structures.find.return_value = [uncached]
+        results = self.connection.find_structures_by_id([cached['_id'], uncached['_id']])
+        self.assertItemsEqual([result['_id'] for result in results], [cached['_id'], uncached['_id']])
+        self.connection.structures.find.assert_called_once_with({'_id': {'$in': [uncached['_id']]}})
+
+    def test_insert_structure(self):
+        structure = mongo_structure()
+        self.connection.insert_structure(structure_from_mongo(mongo_structure(structure['_id'])))
+        result = self.connection.get_structure(structure['_id'])
+        self.assertEqual(result['root'], BlockKey('course', 'course'))
+        self.assertFalse(self.connection.structures.find_one.called)
+
+    def test_get_structure_single_flight(self):
+        structure = mongo_structure()
+        self.connection.structure_cache = StructureCache(10 ** 6, DictCache())
+        lock_key = u'split_structure.test.modulestore.{}'.format(structure['_id'])
+        # another process is reading the structure from mongo, and caches it while we wait
+        with cache_lock(self.connection.structure_cache.second_tier, lock_key):
+            with patch.object(self.connection, '_get_cached_structure', side_effect=[None, None, structure]):
+                result = self.connection.get_structure(structure['_id'])
+        self.assertEqual(result['root'], BlockKey('course', 'course'))
+        self.assertFalse(self.connection.structures.find_one.called)
+
+    def test_get_structure_too_large_to_share(self):
+        structure = mongo_structure()
+        self.connection.structure_cache = StructureCache(10 ** 6, DictCache(), second_tier_max_bytes=10)
+        self.connection.structures.find_one.return_value = structure
+        self.connection.get_structure(structure['_id'])
+
+        # another process doesn't wait on the lock for a structure that can't be shared
+        other_process_cache = StructureCache(10 ** 6, self.connection.structure_cache.second_tier)
+        self.connection.structure_cache = other_process_cache
+        lock_key = u'split_structure.test.modulestore.{}'.format(structure['_id'])
+        with cache_lock(other_process_cache.second_tier, lock_key):
+            with patch('xmodule.modulestore.single_flight.time.sleep') as mock_sleep:
+                result = self.connection.get_structure(structure['_id'])
+        self.assertEqual(result['root'], BlockKey('course', 'course'))
+        self.assertFalse(mock_sleep.called)
+        self.assertEqual(self.connection.structures.find_one.call_count, 2)
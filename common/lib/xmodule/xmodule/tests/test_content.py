@@ -1,9 +1,11 @@
 """Tests for contents"""
 
 import os
+import StringIO
 import unittest
 import ddt
 from path import path
+from PIL import Image
 from xmodule.contentstore.content import StaticContent, StaticContentStream
 from xmodule.contentstore.content import ContentStore
 from opaque_keys.edx.locations import SlashSeparatedCourseKey, AssetLocation
@@ -83,6 +85,30 @@ class FakeGridFsItem(object):
         return chunk
 
 
+class MemoryContentStore(ContentStore):
+    """
+    A content store keeping the content saved to it in memory
+    """
+    def __init__(self):
+        self.saved = {}
+
+    def save(self, content):
+        self.saved[content.location] = content
+        return content
+
+    def delete(self, location_or_id):
+        self.saved.pop(location_or_id, None)
+
+
+def image_content(location, width, height):
+    """
+    Returns a PNG image of width x height pixels at location
+    """
+    image_file = StringIO.StringIO()
+    Image.new('RGB', (width, height), 'red').save(image_file, 'PNG')
+    return StaticContent(location, location.name, 'image/png', image_file.getvalue(), locked=True)
+
+
 @ddt.ddt
 class ContentTest(unittest.TestCase):
     def test_thumbnail_none(self):
@@ -113,6 +139,45 @@ class ContentTest(unittest.TestCase):
         self.assertIsNone(thumbnail_content)
         self.assertEqual(AssetLocation(u'mitX', u'800', u'ignore_run', u'thumbnail', thumbnail_filename), thumbnail_file_location)
 
+    @ddt.data(
+        (u"monsters__.jpg", 320, u"monsters__-jpg-320px.jpg"),
+        (u"dots.in.name.png", 1280, u"dots.in.name-png-1280px.jpg"),
+    )
+    @ddt.unpack
+    def test_generate_image_variant_name(self, original_filename, size, variant_filename):
+        self.assertEqual(StaticContent.generate_image_variant_name(original_filename, size), variant_filename)
+
+    @ddt.data((1, 320), (320, 320), (321, 640), (1280, 1280), (1281, None))
+    @ddt.unpack
+    def test_get_image_variant_size(self, width, size):
+        self.assertEqual(StaticContent.get_image_variant_size(width), size)
+
+    def test_generate_image_variants(self):
+        store = MemoryContentStore()
+        location = AssetLocation(u'mitX', u'800', u'ignore_run', u'asset', u'image.png')
+        # a variant of a previous, larger, version of the image
+        stale_location = StaticContent.compute_image_variant_location(location, 1280)
+        store.save(StaticContent(stale_location, stale_location.name, 'image/jpeg', 'data'))
+
+        variant_locations = store.generate_image_variants(image_content(location, 1000, 500))
+
+        # only the variants smaller than the image are generated
+        self.assertEqual(sorted(variant_locations), [320, 640])
+        self.assertEqual(sorted(store.saved), sorted(variant_locations.values()))
+        for size, variant_location in variant_locations.items():
+            variant = store.saved[variant_location]
+            self.assertEqual(variant_location.category, u'thumbnail')
+            self.assertEqual(variant.content_type, 'image/jpeg')
+            self.assertTrue(variant.locked)
+            self.assertEqual(Image.open(variant.data).size, (size, size / 2))
+
+    def test_generate_image_variants_not_image(self):
+        store = MemoryContentStore()
+        location = AssetLocation(u'mitX', u'800', u'ignore_run', u'asset', u'notes.txt')
+        content = StaticContent(location, location.name, 'text/plain', 'notes')
+        self.assertEqual(store.generate_image_variants(content), {})
+        self.assertEqual(store.saved, {})
+
     def test_compute_location(self):
         # We had a bug that __ got converted into a single _. Make sure that substitution of INVALID_CHARS (like space)
         # still happen.
@@ -6,6 +6,7 @@ like DISABLE_START_DATES
 import logging
 from datetime import datetime, timedelta
 import pytz
+from lazy import lazy
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
@@ -25,6 +26,7 @@ from xmodule.partitions.partitions import NoSuchUserPartitionError, NoSuchUserPa
 from xmodule.util.django import get_current_request_hostname
 
 from external_auth.models import ExternalAuthMap
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from courseware.masquerade import get_masquerade_role, is_masquerading_as_student
 from student import auth
 from student.models import CourseEnrollment, CourseEnrollmentAllowed
@@ -34,6 +36,7 @@ from student.roles import (
 )
 from util.milestones_helpers import (
     get_pre_requisite_courses_not_completed,
+    get_completed_pre_requisite_courses,
     any_unfulfilled_milestones,
 )
 
@@ -65,8 +68,8 @@ def has_access(user, action, obj, course_key=None):
     user: a Django user object. May be anonymous. If none is passed,
                     anonymous is assumed
 
-    obj: The object to check access for.  A module, descriptor, location, or
-                    certain special strings (e.g. 'global')
+    obj: The object to check access for.  A module, descriptor, course
+                    overview, location, or certain special strings (e.g. 'global')
 
     action: A string specifying the action that the client is trying to perform.
 
@@ -86,7 +89,7 @@ def has_access(user, action, obj, course_key=None):
 
     # delegate the work to type-specific functions.
     # (start with more specific types, then get more general)
-    if isinstance(obj, CourseDescriptor):
+    if isinstance(obj, (CourseDescriptor, CourseOverview)):
         return _has_access_course_desc(user, action, obj)
 
     if isinstance(obj, ErrorDescriptor):
@@ -114,10 +117,135 @@ def has_access(user, action, obj, course_key=None):
                     .format(type(obj)))
 
 
+def has_access_to_courses(user, action, courses):
+    """
+    Check whether a user has the access to do action on each of a list of
+    courses, such as the courses listed on the dashboard or in the catalog.
+
+    Same as calling has_access on each course, but the user's enrollments,
+    enrollment allowances, external auth domains and completed pre-requisite
+    courses are read in a few queries for all the courses, instead of a few
+    queries per course.
+
+    courses: a list of CourseDescriptors or CourseOverviews.
+
+    Returns a dict of bools keyed by course id.
+    """
+    if not user:
+        user = AnonymousUser()
+
+    prefetched = _CourseAccessData(user, courses)
+    return {
+        course.id: _has_access_course_desc(user, action, course, prefetched)
+        for course in courses
+    }
+
+
 # ================ Implementation helpers ================================
-def _has_access_course_desc(user, action, course):
+class _CourseAccessData(object):
+    """
+    The state of a user in courses that the course access checks depend on.
+
+    The state in the courses given to the constructor is read the first time
+    it is checked, in one query for all of them; the state in any other
+    course is queried each time it is checked.
+    """
+    def __init__(self, user, courses=()):
+        self.user = user
+        self.courses = courses
+        self.course_ids = frozenset(unicode(course.id) for course in courses)
+
+    @lazy
+    def enrolled_course_ids(self):
+        """
+        The ids of the prefetched courses the user is actively enrolled in.
+        """
+        return frozenset(
+            unicode(course_id) for course_id in CourseEnrollment.objects.filter(
+                user=self.user, course_id__in=[course.id for course in self.courses], is_active=True
+            ).values_list('course_id', flat=True)
+        )
+
+    @lazy
+    def allowed_course_ids(self):
+        """
+        The ids of the prefetched courses the user is allowed to enroll in.
+        """
+        return frozenset(
+            unicode(course_id) for course_id in CourseEnrollmentAllowed.objects.filter(
+                email=self.user.email, course_id__in=[course.id for course in self.courses]
+            ).values_list('course_id', flat=True)
+        )
+
+    @lazy
+    def external_domains(self):
+        """
+        The external auth domains the user registered through.
+        """
+        return frozenset(
+            ExternalAuthMap.objects.filter(user=self.user).values_list('external_domain', flat=True)
+        )
+
+    @lazy
+    def completed_course_ids(self):
+        """
+        The ids of the courses the user completed as pre-requisites.
+        """
+        return get_completed_pre_requisite_courses(self.user)
+
+    def is_prefetched(self, course):
+        """
+        Returns whether the state of the user in `course` is read with that
+        of all the courses given to the constructor.
+        """
+        return unicode(course.id) in self.course_ids
+
+    def is_enrolled(self, course):
+        """
+        Returns whether the user is actively enrolled in `course`.
+        """
+        if self.is_prefetched(course):
+            return self.user.is_authenticated() and unicode(course.id) in self.enrolled_course_ids
+        return CourseEnrollment.is_enrolled(self.user, course.id)
+
+    def is_enrollment_allowed(self, course):
+        """
+        Returns whether the user is in CourseEnrollmentAllowed for `course`.
+        """
+        if not self.user.is_authenticated():
+            return False
+        if self.is_prefetched(course):
+            return unicode(course.id) in self.allowed_course_ids
+        return CourseEnrollmentAllowed.objects.filter(email=self.user.email, course_id=course.id).exists()
+
+    def has_external_auth(self, course):
+        """
+        Returns whether the user registered through the external auth domain
+        that `course` restricts enrollment to.
+        """
+        if not self.user.is_authenticated():
+            return False
+        if self.is_prefetched(course):
+            return course.enrollment_domain in self.external_domains
+        return ExternalAuthMap.objects.filter(user=self.user, external_domain=course.enrollment_domain).exists()
+
+    def has_completed_pre_requisites(self, course):
+        """
+        Returns whether the user has completed the pre-requisite courses of
+        `course`.
+        """
+        if self.is_prefetched(course):
+            return all(
+                course_id in self.completed_course_ids
+                for course_id in course.pre_requisite_courses
+            )
+        return not get_pre_requisite_courses_not_completed(self.user, [course.id])
+
+
+def _has_access_course_desc(user, action, course, prefetched=None):
     """
-    Check if user has access to a course descriptor.
+    Check if user has access to a course descriptor, or to the course of a
+    course overview.
 
     Valid actions:
 
@@ -131,13 +259,21 @@ def _has_access_course_desc(user, action, course):
     'staff' -- staff access to course.
     'see_in_catalog' -- user is able to see the course listed in the course catalog.
     'see_about_page' -- user is able to see the course about page.
+
+    prefetched: the _CourseAccessData of the user, if it was read up front
+    for a list of courses.
     """
+    if prefetched is None:
+        prefetched = _CourseAccessData(user)
+
     def can_load():
         """
         Can this user load this course?
 
         NOTE: this is not checking whether user is actually enrolled in the course.
         """
+        if isinstance(course, CourseOverview):
+            return _can_load_course_overview(user, course)
         # delegate to generic descriptor check to check start dates
         return _has_access_descriptor(user, 'load', course, course.id)
 
@@ -148,7 +284,7 @@ def _has_access_course_desc(user, action, course):
         return (
             can_load() and
             (
-                CourseEnrollment.is_enrolled(user, course.id) or
+                prefetched.is_enrolled(course) or
                 _has_staff_access_to_descriptor(user, course, course.id)
             )
         )
@@ -162,7 +298,7 @@ def _has_access_course_desc(user, action, course):
             can_load_mobile_no_enroll_check() and
             # check enrollment
             (
-                CourseEnrollment.is_enrolled(user, course.id) or
+                prefetched.is_enrolled(course) or
                 _has_staff_access_to_descriptor(user, course, course.id)
             )
         )
@@ -201,8 +337,7 @@ def _has_access_course_desc(user, action, course):
 
         # if using registration method to restrict (say shibboleth)
         if settings.FEATURES.get('RESTRICT_ENROLL_BY_REG_METHOD') and course.enrollment_domain:
-            if user is not None and user.is_authenticated() and \
-                    ExternalAuthMap.objects.filter(user=user, external_domain=course.enrollment_domain):
+            if user is not None and prefetched.has_external_auth(course):
                 debug("Allow: external_auth of " + course.enrollment_domain)
                 reg_method_ok = True
             else:
@@ -218,9 +353,8 @@ def _has_access_course_desc(user, action, course):
         # (note that course.id actually points to a CourseKey)
         # (the filter call uses course_id= since that's the legacy database schema)
         # (sorry that it's confusing :( )
-        if user is not None and user.is_authenticated() and CourseEnrollmentAllowed:
-            if CourseEnrollmentAllowed.objects.filter(email=user.email, course_id=course.id):
-                return True
+        if user is not None and prefetched.is_enrollment_allowed(course):
+            return True
 
         if _has_staff_access_to_descriptor(user, course, course.id):
             return True
@@ -297,7 +431,7 @@ def _has_access_course_desc(user, action, course):
                 and not _has_staff_access_to_descriptor(user, course, course.id) \
                 and course.pre_requisite_courses \
                 and not user.is_anonymous() \
-                and get_pre_requisite_courses_not_completed(user, [course.id]):
+                and not prefetched.has_completed_pre_requisites(course):
             return False
         else:
             return True
@@ -319,6 +453,35 @@ def _has_access_course_desc(user, action, course):
     return _dispatch(checkers, action, user, course)
 
 
+def _can_load_course_overview(user, course_overview):
+    """
+    Can this user load the course of this overview?
+
+    Same as the 'load' check of _has_access_descriptor on the course, except
+    for group access, which course blocks do not use.
+    """
+    course_key = course_overview.id
+    if course_overview.visible_to_staff_only and not _has_staff_access_to_descriptor(user, course_overview, course_key):
+        return False
+
+    # If start dates are off, can always load
+    if settings.FEATURES['DISABLE_START_DATES'] and not is_masquerading_as_student(user, course_key):
+        debug("Allow: DISABLE_START_DATES")
+        return True
+
+    # Check start date
+    if course_overview.start is not None:
+        now = datetime.now(UTC())
+        effective_start = _adjust_start_date_for_beta_testers(user, course_overview, course_key=course_key)
+        if in_preview_mode() or now > effective_start:
+            debug("Allow: now > effective start date")
+            return True
+        return _has_staff_access_to_descriptor(user, course_overview, course_key)
+
+    debug("Allow: no start date")
+    return True
+
+
 def _has_access_error_desc(user, action, descriptor, course_key):
     """
     Only staff should see error descriptors.
@@ -1,14 +1,17 @@
 # Compute grades using real division, with no integer truncation
 from __future__ import division
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+import hashlib
+import itertools
 import json
 import random
 import logging
 
 from contextlib import contextmanager
 from django.conf import settings
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.test.client import RequestFactory
+from django.utils import timezone
 
 import dogstats_wrapper as dog_stats_api
 
@@ -20,15 +23,21 @@ from xmodule import graders
 from xmodule.graders import Score
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
-from .models import StudentModule
+from .models import PersistentSubsectionGrade, StudentModule, chunks
 from .module_render import get_module_for_descriptor
 from submissions import api as sub_api  # installed from the edx-submissions repository
+from submissions.models import ScoreSummary  # installed from the edx-submissions repository
 from opaque_keys import InvalidKeyError
-from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.keys import CourseKey, UsageKey
 
 
 log = logging.getLogger("edx.courseware")
 
+# The scores of a single student, fetched in bulk by `prefetch_scores`.
+# student_module_scores: dict of usage keys to the (grade, max_grade) of the student's StudentModules
+# submissions_scores: dict of location strings to (earned, possible) scores from the submissions API
+PrefetchedScores = namedtuple('PrefetchedScores', 'student_module_scores submissions_scores')
+
 
 def answer_distributions(course_key):
     """
@@ -122,16 +131,16 @@ def answer_distributions(course_key):
 
 
 @transaction.commit_manually
-def grade(student, request, course, keep_raw_scores=False):
+def grade(student, request, course, keep_raw_scores=False, prefetched_scores=None):
     """
     Wraps "_grade" with the manual_transaction context manager just in case
     there are unanticipated errors.
     """
     with manual_transaction():
-        return _grade(student, request, course, keep_raw_scores)
+        return _grade(student, request, course, keep_raw_scores, prefetched_scores)
 
 
-def _grade(student, request, course, keep_raw_scores):
+def _grade(student, request, course, keep_raw_scores, prefetched_scores=None):
     """
     Unwrapped version of "grade"
 
@@ -150,17 +159,32 @@ def _grade(student, request, course, keep_raw_scores):
     - keep_raw_scores : if True, then value for key 'raw_scores' contains scores
       for every graded module
 
+    If `prefetched_scores` (a PrefetchedScores for `student`, as returned by
+    `prefetch_scores`) is given, the student's StudentModule and submissions
+    scores are read from it instead of from the database.
+
     More information on the format is in the docstring for CourseGrader.
     """
     grading_context = course.grading_context
     raw_scores = []
 
+    # Taken before any scores are read, so that StudentModules changed while
+    # we are grading make the subsection grades persisted below stale.
+    computed = timezone.now()
+    course_version = _course_content_version(course, student)
+    persisted_scores = _get_persisted_subsection_scores(student, course, course_version)
+
     # Dict of item_ids -> (earned, possible) point tuples. This *only* grabs
     # scores that were registered with the submissions API, which for the moment
     # means only openassessment (edx-ora2)
-    submissions_scores = sub_api.get_scores(
-        course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id)
-    )
+    if prefetched_scores is not None:
+        submissions_scores = prefetched_scores.submissions_scores
+        student_module_scores = prefetched_scores.student_module_scores
+    else:
+        submissions_scores = sub_api.get_scores(
+            course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id)
+        )
+        student_module_scores = None
 
     totaled_scores = {}
     # This next complicated loop is just to collect the totaled_scores, which is
@@ -187,32 +211,65 @@ def _grade(student, request, course, keep_raw_scores):
                     for descriptor in section['xmoduledescriptors']
                 )
 
-            if not should_grade_section:
-                with manual_transaction():
-                    should_grade_section = StudentModule.objects.filter(
-                        student=student,
-                        module_state_key__in=[
-                            descriptor.location for descriptor in section['xmoduledescriptors']
-                        ]
-                    ).exists()
+            # Scores for sections in neither of the cases above only change
+            # when one of the student's StudentModules does, so they can be
+            # persisted and reused until then. Sections whose problems are
+            # picked per student (e.g. by library content or split tests)
+            # can change without any StudentModule of a problem changing.
+            can_persist_section = (
+                course_version is not None and
+                not should_grade_section and
+                not section['has_dynamic_children']
+            )
+            section_key = section_descriptor.location
+            persisted_section_scores = persisted_scores.get(section_key) if can_persist_section else None
+
+            if not should_grade_section and persisted_section_scores is None:
+                if student_module_scores is not None:
+                    should_grade_section = any(
+                        descriptor.location in student_module_scores
+                        for descriptor in section['xmoduledescriptors']
+                    )
+                else:
+                    with manual_transaction():
+                        should_grade_section = StudentModule.objects.filter(
+                            student=student,
+                            module_state_key__in=[
+                                descriptor.location for descriptor in section['xmoduledescriptors']
+                            ]
+                        ).exists()
+
+            if persisted_section_scores is not None:
+                _, graded_total = graders.aggregate_scores(persisted_section_scores, section_name)
+                if keep_raw_scores:
+                    raw_scores += persisted_section_scores
 
             # If we haven't seen a single problem in the section, we don't have
             # to grade it at all! We can assume 0%
-            if should_grade_section:
+            elif should_grade_section:
                 scores = []
+                # The modules of the section share a FieldDataCache, which loads
+                # the data of all the section's scored descriptors at once.
+                section_field_data_caches = []
 
-                def create_module(descriptor):
+                def create_module(descriptor, section=section, field_data_caches=section_field_data_caches):
                     '''creates an XModule instance given a descriptor'''
                     # TODO: We need the request to pass into here. If we could forego that, our arguments
                     # would be simpler
                     with manual_transaction():
-                        field_data_cache = FieldDataCache([descriptor], course.id, student)
+                        if not field_data_caches:
+                            field_data_caches.append(
+                                FieldDataCache(section['xmoduledescriptors'], course.id, student)
+                            )
+                        field_data_cache = field_data_caches[0]
+                        field_data_cache.add_descriptors_to_cache([descriptor])
                     return get_module_for_descriptor(student, request, descriptor, field_data_cache, course.id)
 
                 for module_descriptor in yield_dynamic_descriptor_descendents(section_descriptor, create_module):
 
                     (correct, total) = get_score(
-                        course.id, student, module_descriptor, create_module, scores_cache=submissions_scores
+                        course.id, student, module_descriptor, create_module,
+                        scores_cache=submissions_scores, student_module_scores=student_module_scores
                     )
                     if correct is None and total is None:
                         continue
@@ -241,6 +298,8 @@ def _grade(student, request, course, keep_raw_scores):
                 _, graded_total = graders.aggregate_scores(scores, section_name)
                 if keep_raw_scores:
                     raw_scores += scores
+                if can_persist_section:
+                    _persist_subsection_scores(student, course, course_version, section_key, scores, computed)
             else:
                 graded_total = Score(0.0, 1.0, True, section_name, None)
 
@@ -342,7 +401,17 @@ def _progress_summary(student, request, course):
 
         course_module = getattr(course_module, '_x_module', course_module)
 
+    # Scores of problems in subsections whose grades were persisted by grade()
+    # take precedence, since get_score would otherwise query (and possibly
+    # instantiate) each problem separately.
+    scores_cache = {}
+    persisted_scores = _get_persisted_subsection_scores(student, course, _course_content_version(course, student))
+    for section_scores in persisted_scores.itervalues():
+        for score in section_scores:
+            scores_cache[score.module_id.to_deprecated_string()] = (score.earned, score.possible)
+
     submissions_scores = sub_api.get_scores(course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id))
+    scores_cache.update(submissions_scores)
 
     chapters = []
     # Don't include chapters that aren't displayable (e.g. due to error)
@@ -367,7 +436,7 @@ def _progress_summary(student, request, course):
                 for module_descriptor in yield_dynamic_descriptor_descendents(section_module, module_creator):
                     course_id = course.id
                     (correct, total) = get_score(
-                        course_id, student, module_descriptor, module_creator, scores_cache=submissions_scores
+                        course_id, student, module_descriptor, module_creator, scores_cache=scores_cache
                     )
                     if correct is None and total is None:
                         continue
@@ -407,7 +476,7 @@ def _progress_summary(student, request, course):
     return chapters
 
 
-def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=None):
+def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=None, student_module_scores=None):
     """
     Return the score for a user on a problem, as a tuple (correct, total).
     e.g. (5,7) if you got 5 out of 7 points.
@@ -421,6 +490,9 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
            Can return None if user doesn't have access, or if something else went wrong.
     scores_cache: A dict of location names to (earned, possible) point tuples.
            If an entry is found in this cache, it takes precedence.
+    student_module_scores: A dict of usage keys to the (grade, max_grade) stored in the user's
+           StudentModules, as returned by `prefetch_scores`. If given, it is used instead of
+           querying StudentModule for the problem.
     """
     scores_cache = scores_cache or {}
 
@@ -447,18 +519,22 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
         # These are not problems, and do not have a score
         return (None, None)
 
-    try:
-        student_module = StudentModule.objects.get(
-            student=user,
-            course_id=course_id,
-            module_state_key=problem_descriptor.location
-        )
-    except StudentModule.DoesNotExist:
-        student_module = None
+    if student_module_scores is not None:
+        stored_grade, stored_max_grade = student_module_scores.get(problem_descriptor.location, (None, None))
+    else:
+        try:
+            student_module = StudentModule.objects.get(
+                student=user,
+                course_id=course_id,
+                module_state_key=problem_descriptor.location
+            )
+            stored_grade, stored_max_grade = student_module.grade, student_module.max_grade
+        except StudentModule.DoesNotExist:
+            stored_grade, stored_max_grade = None, None
 
-    if student_module is not None and student_module.max_grade is not None:
-        correct = student_module.grade if student_module.grade is not None else 0
-        total = student_module.max_grade
+    if stored_max_grade is not None:
+        correct = stored_grade if stored_grade is not None else 0
+        total = stored_max_grade
     else:
         # If the problem was not in the cache, or hasn't been graded yet,
         # we need to instantiate the problem.
@@ -479,7 +555,11 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
     weight = problem_descriptor.weight
     if weight is not None:
         if total == 0:
-            log.exception("Cannot reweight a problem with zero total points. Problem: " + str(student_module))
+            log.exception(
+                "Cannot reweight a problem with zero total points. Problem: %s, user: %s",
+                problem_descriptor.location,
+                user.id
+            )
             return (correct, total)
         correct = correct * weight / total
         total = weight
@@ -487,6 +567,145 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
     return (correct, total)
 
 
+def _persistent_grades_enabled():
+    """
+    Returns whether subsection grades should be persisted and reused.
+    """
+    return (
+        settings.FEATURES.get('ENABLE_PERSISTENT_SUBSECTION_GRADES', False) and
+        not settings.GENERATE_PROFILE_SCORES
+    )
+
+
+def _course_content_version(course, student):
+    """
+    Returns a string identifying the current version of the course's content
+    as seen by `student`, or None if persisted subsection grades can't be used
+    for this course, either because they are disabled or because the
+    modulestore does not keep track of when the course was last edited (e.g.
+    XML courses).
+
+    The version includes the groups `student` is in for each of the user
+    partitions restricting access to graded problems, since moving the
+    student to another cohort or content group changes which problems they
+    can see.
+    """
+    if not _persistent_grades_enabled() or not student.is_authenticated():
+        return None
+    edited_on = getattr(course, 'subtree_edited_on', None)
+    if edited_on is None:
+        return None
+
+    version = edited_on.isoformat()
+    partitions = _graded_content_partitions(course)
+    if partitions:
+        groups = []
+        for partition in partitions:
+            group = partition.scheme.get_group_for_user(course.id, student, partition)
+            groups.append(u'{}:{}'.format(partition.id, group.id if group is not None else ''))
+        version += u'.' + hashlib.sha1(u','.join(groups)).hexdigest()
+    return version
+
+
+def _graded_content_partitions(course):
+    """
+    Returns the user partitions of `course` used to restrict access to any
+    of its graded problems.
+    """
+    partition_ids = set()
+    for sections in course.grading_context['graded_sections'].itervalues():
+        for section in sections:
+            for descriptor in section['xmoduledescriptors']:
+                partition_ids.update(getattr(descriptor, 'merged_group_access', {}))
+    return [partition for partition in course.user_partitions if partition.id in partition_ids]
+
+
+def _get_persisted_subsection_scores(student, course, course_version):
+    """
+    Returns a dict mapping subsection usage keys to the list of Scores
+    persisted for `student` in that subsection.
+
+    Rows computed against another version of the course content, or computed
+    before the last change to any of the student's StudentModules in the
+    subsection, are stale and left out. This takes a constant number of
+    queries regardless of the size of the course.
+    """
+    if course_version is None or not student.is_authenticated():
+        return {}
+
+    with manual_transaction():
+        rows = list(PersistentSubsectionGrade.objects.filter(
+            user=student,
+            course_id=course.id,
+            course_version=course_version,
+        ))
+        if not rows:
+            return {}
+
+        last_modified = {}
+        for module_state_key, modified in StudentModule.objects.filter(
+                student=student,
+                course_id=course.id,
+                modified__gte=min(row.computed for row in rows),
+        ).values_list('module_state_key', 'modified'):
+            usage_key = UsageKey.from_string(module_state_key).map_into_course(course.id)
+            last_modified[usage_key] = max(modified, last_modified.get(usage_key, modified))
+
+    section_locations = {}
+    for sections in course.grading_context['graded_sections'].itervalues():
+        for section in sections:
+            section_locations[section['section_descriptor'].location] = [
+                descriptor.location for descriptor in section['xmoduledescriptors']
+            ]
+
+    persisted_scores = {}
+    for row in rows:
+        section_key = row.usage_key.map_into_course(course.id)
+        if section_key not in section_locations:
+            continue
+        if any(
+                location in last_modified and last_modified[location] >= row.computed
+                for location in section_locations[section_key]
+        ):
+            continue
+        persisted_scores[section_key] = [
+            Score(earned, possible, graded, display_name, UsageKey.from_string(location).map_into_course(course.id))
+            for earned, possible, graded, display_name, location in json.loads(row.scores)
+        ]
+    return persisted_scores
+
+
+def _persist_subsection_scores(student, course, course_version, section_key, scores, computed):
+    """
+    Stores the Scores `student` earned in the subsection at `section_key`, as
+    computed (starting) at `computed` against `course_version`.
+    """
+    serialized_scores = json.dumps([
+        [score.earned, score.possible, score.graded, score.section, unicode(score.module_id)]
+        for score in scores
+    ])
+    try:
+        with manual_transaction():
+            updated = PersistentSubsectionGrade.objects.filter(
+                user=student,
+                course_id=course.id,
+                usage_key=section_key,
+            ).update(course_version=course_version, scores=serialized_scores, computed=computed)
+            if not updated:
+                PersistentSubsectionGrade.objects.create(
+                    user=student,
+                    course_id=course.id,
+                    usage_key=section_key,
+                    course_version=course_version,
+                    scores=serialized_scores,
+                    computed=computed,
+                )
+    except IntegrityError:
+        # A concurrent request persisted this subsection first; its scores are
+        # just as good as ours.
+        pass
+
+
 @contextmanager
 def manual_transaction():
     """A context manager for managing manual transactions"""
@@ -500,7 +719,53 @@ def manual_transaction():
         transaction.commit()
 
 
-def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
+def prefetch_scores(course, students):
+    """
+    Returns a dict mapping the ids of `students` to the PrefetchedScores of
+    each student in `course`.
+
+    Rather than querying StudentModule per section and per problem, and the
+    submissions API per student, this fetches the scores of all of the
+    students together in a handful of `IN` queries.
+    """
+    students_by_anonymous_id = {
+        anonymous_id_for_user(student, course.id, save=False): student
+        for student in students
+    }
+    student_module_scores = {student.id: {} for student in students}
+    submissions_scores = {student.id: {} for student in students}
+
+    with manual_transaction():
+        for student_ids in chunks(student_module_scores.keys(), 500):
+            student_modules = StudentModule.objects.filter(
+                student__in=student_ids,
+                course_id=course.id,
+            ).values_list('student', 'module_state_key', 'grade', 'max_grade')
+            for student_id, module_state_key, stored_grade, stored_max_grade in student_modules:
+                usage_key = UsageKey.from_string(module_state_key).map_into_course(course.id)
+                student_module_scores[student_id][usage_key] = (stored_grade, stored_max_grade)
+
+        # This mirrors `submissions.api.get_scores`, for many students at once
+        for anonymous_ids in chunks(students_by_anonymous_id.keys(), 500):
+            score_summaries = ScoreSummary.objects.filter(
+                student_item__course_id=course.id.to_deprecated_string(),
+                student_item__student_id__in=anonymous_ids,
+            ).select_related('latest', 'student_item')
+            for summary in score_summaries:
+                if summary.latest.is_hidden():
+                    continue
+                student = students_by_anonymous_id[summary.student_item.student_id]
+                submissions_scores[student.id][summary.student_item.item_id] = (
+                    summary.latest.points_earned, summary.latest.points_possible
+                )
+
+    return {
+        student.id: PrefetchedScores(student_module_scores[student.id], submissions_scores[student.id])
+        for student in students
+    }
+
+
+def iterate_grades_for(course_or_id, students, keep_raw_scores=False, chunk_size=None):
     """Given a course_id and an iterable of students (User), yield a tuple of:
 
     (student, gradeset, err_msg) for every student enrolled in the course.
@@ -508,6 +773,11 @@ def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
     If an error occurred, gradeset will be an empty dict and err_msg will be an
     exception message. If there was no error, err_msg is an empty string.
 
+    If `chunk_size` is given, students are graded in chunks of that many, with
+    the scores of all of the students in a chunk fetched up front by
+    `prefetch_scores`. Only problems without a stored score then need to be
+    instantiated.
+
     The gradeset is a dictionary with the following fields:
 
     - grade : A final letter grade.
@@ -528,25 +798,54 @@ def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
     # grading that student.
     request = RequestFactory().get('/')
 
-    for student in students:
-        with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course.id)]):
-            try:
-                request.user = student
-                # Grading calls problem rendering, which calls masquerading,
-                # which checks session vars -- thus the empty session dict below.
-                # It's not pretty, but untangling that is currently beyond the
-                # scope of this feature.
-                request.session = {}
-                gradeset = grade(student, request, course, keep_raw_scores)
-                yield student, gradeset, ""
-            except Exception as exc:  # pylint: disable=broad-except
-                # Keep marching on even if this student couldn't be graded for
-                # some reason, but log it for future reference.
-                log.exception(
-                    'Cannot grade student %s (%s) in course %s because of exception: %s',
-                    student.username,
-                    student.id,
-                    course.id,
-                    exc.message
+    if chunk_size:
+        students = iter(students)
+        student_chunks = iter(lambda: list(itertools.islice(students, chunk_size)), [])
+    else:
+        student_chunks = ([student] for student in students)
+
+    for student_chunk in student_chunks:
+        prefetched_scores = {}
+        if chunk_size:
+            with dog_stats_api.timer('lms.grades.prefetch_scores', tags=[u'action:{}'.format(course.id)]):
+                try:
+                    prefetched_scores = prefetch_scores(course, student_chunk)
+                except Exception:  # pylint: disable=broad-except
+                    # Fall back to fetching each student's scores separately
+                    log.exception('Cannot prefetch scores for students in course %s', course.id)
+
+        for student in student_chunk:
+            yield _grade_for_iteration(request, student, course, keep_raw_scores, prefetched_scores)
+
+
+def _grade_for_iteration(request, student, course, keep_raw_scores, prefetched_scores):
+    """
+    Grades a single student for `iterate_grades_for`, returning its
+    (student, gradeset, err_msg) tuple.
+    """
+    with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course.id)]):
+        try:
+            request.user = student
+            # Grading calls problem rendering, which calls masquerading,
+            # which checks session vars -- thus the empty session dict below.
+            # It's not pretty, but untangling that is currently beyond the
+            # scope of this feature.
+            request.session = {}
+            if student.id in prefetched_scores:
+                gradeset = grade(
+                    student, request, course, keep_raw_scores, prefetched_scores=prefetched_scores[student.id]
                 )
-                yield student, {}, exc.message
+            else:
+                gradeset = grade(student, request, course, keep_raw_scores)
+            return student, gradeset, ""
+        except Exception as exc:  # pylint: disable=broad-except
+            # Keep marching on even if this student couldn't be graded for
+            # some reason, but log it for future reference.
+            log.exception(
+                'Cannot grade student %s (%s) in course %s because of exception: %s',
+                student.username,
+                student.id,
+                course.id,
+                exc.message
+            )
+            return student, {}, exc.message
@@ -0,0 +1,140 @@
+"""
+Benchmark the grading pipeline on a synthetic course.
+
+Generates a course of the requested size in the requested modulestore,
+enrolls new learners with random scores in it, then times grading them.
+The course and learners are left in the databases, so this should be run
+against disposable databases.
+"""
+import copy
+import json
+from optparse import make_option
+import shutil
+from tempfile import mkdtemp
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+
+from courseware.perf_tests.benchmark import run_grading_benchmarks
+from courseware.perf_tests.synthetic_course import create_learners, import_course, write_course_xml
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore, clear_existing_modulestores
+
+STORE_TYPES = (ModuleStoreEnum.Type.split, ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.xml)
+
+
+class Command(BaseCommand):
+    """
+    Time grades.grade, grades.progress_summary, grades.iterate_grades_for and
+    upload_grades_csv on a synthetic course.
+    """
+    help = __doc__
+
+    option_list = BaseCommand.option_list + (
+        make_option('--store', dest='store', default=ModuleStoreEnum.Type.split,
+                    help='Modulestore holding the course: one of {}'.format(', '.join(STORE_TYPES))),
+        make_option('--chapters', dest='chapters', type='int', default=5,
+                    help='Number of chapters in the course'),
+        make_option('--sequentials', dest='sequentials', type='int', default=4,
+                    help='Number of graded subsections in each chapter'),
+        make_option('--problems', dest='problems', type='int', default=5,
+                    help='Number of problems in each subsection'),
+        make_option('--graders', dest='graders', type='int', default=3,
+                    help='Number of assignment types in the grading policy'),
+        make_option('--learners', dest='learners', type='int', default=100,
+                    help='Number of enrolled learners'),
+        make_option('--sample', dest='sample', type='int', default=10,
+                    help='Number of learners graded one at a time'),
+        make_option('--chunk-size', dest='chunk_size', type='int', default=None,
+                    help='Number of learners graded together by iterate_grades_for and the grade report '
+                         '(defaults to GRADES_DOWNLOAD_CHUNK_SIZE)'),
+        make_option('--seed', dest='seed', type='int', default=0,
+                    help='Seed of the random learner scores'),
+        make_option('--output', dest='output', default=None,
+                    help='File to write the results to, as json'),
+    )
+
+    def handle(self, *args, **options):
+        store_type = options['store']
+        if store_type not in STORE_TYPES:
+            raise CommandError("Unknown modulestore: '{}'".format(store_type))
+        for name in ('chapters', 'sequentials', 'problems', 'graders', 'learners'):
+            if options[name] < 1:
+                raise CommandError("--{} must be positive".format(name))
+        if options['chunk_size'] is not None and options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be positive")
+
+        run_id = uuid4().hex[:8]
+        data_dir = mkdtemp()
+        try:
+            course_dir = write_course_xml(
+                data_dir, 'Benchmark', 'course_{}'.format(run_id), 'run',
+                options['chapters'], options['sequentials'], options['problems'], options['graders'],
+            )
+            if store_type == ModuleStoreEnum.Type.xml:
+                course_key = SlashSeparatedCourseKey('Benchmark', course_dir, 'run')
+                with override_settings(MODULESTORE=self._xml_modulestore_settings(data_dir, course_dir, course_key)):
+                    clear_existing_modulestores()
+                    try:
+                        results = self._benchmark(course_key, run_id, options)
+                    finally:
+                        clear_existing_modulestores()
+            else:
+                course_key = import_course(modulestore(), store_type, data_dir, course_dir)
+                results = self._benchmark(course_key, run_id, options)
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+        for name, measurements in results:
+            self.stdout.write(
+                "{:<26} {wall_time:>9.3f}s {queries:>8} queries {peak_memory_kb:>10} KB peak "
+                "(+{memory_growth_kb} KB)\n".format(name, **measurements)
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump({
+                    'course': dict(
+                        (name, options[name])
+                        for name in (
+                            'store', 'chapters', 'sequentials', 'problems', 'graders', 'learners', 'sample',
+                            'chunk_size',
+                        )
+                    ),
+                    'results': dict(results),
+                }, output_file, indent=2, sort_keys=True)
+
+    @staticmethod
+    def _benchmark(course_key, run_id, options):
+        """
+        Create the learners, and time grading them.
+        """
+        students = create_learners(
+            modulestore(), course_key, options['learners'], options['seed'], 'benchmark_{}'.format(run_id)
+        )
+        return run_grading_benchmarks(course_key, students, options['sample'], options['chunk_size'])
+
+    @staticmethod
+    def _xml_modulestore_settings(data_dir, course_dir, course_key):
+        """
+        Return the MODULESTORE setting with an XML modulestore loading the
+        course in `course_dir` of `data_dir` added.
+        """
+        modulestore_settings = copy.deepcopy(settings.MODULESTORE)
+        mixed_options = modulestore_settings['default']['OPTIONS']
+        mixed_options['stores'] = [
+            store for store in mixed_options['stores'] if store['NAME'] != ModuleStoreEnum.Type.xml
+        ] + [{
+            'NAME': ModuleStoreEnum.Type.xml,
+            'ENGINE': 'xmodule.modulestore.xml.XMLModuleStore',
+            'OPTIONS': {
+                'data_dir': data_dir,
+                'default_class': 'xmodule.hidden_module.HiddenDescriptor',
+                'source_dirs': [course_dir],
+            },
+        }]
+        mixed_options.setdefault('mappings', {})[unicode(course_key)] = ModuleStoreEnum.Type.xml
+        return modulestore_settings
@@ -0,0 +1,62 @@
+"""Tests for the benchmark_grading management command"""
+
+import json
+import os
+import shutil
+from tempfile import mkdtemp
+
+import ddt
+from django.core.management import call_command
+from nose.plugins.attrib import attr
+
+from courseware.models import StudentModule
+from courseware.perf_tests.synthetic_course import create_learners, import_course, write_course_xml
+from student.models import CourseEnrollment
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+
+
+@attr('shard_1')
+@ddt.ddt
+class BenchmarkGradingTestCase(ModuleStoreTestCase):
+    """
+    Tests for the synthetic courses and the benchmark_grading command.
+    """
+    def setUp(self):
+        super(BenchmarkGradingTestCase, self).setUp()
+        self.data_dir = mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+
+    @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+    def test_synthetic_course(self, store_type):
+        course_dir = write_course_xml(self.data_dir, 'Org', 'Number', 'run', 2, 3, 4, 2)
+        store = modulestore()
+        course_key = import_course(store, store_type, self.data_dir, course_dir)
+        course = store.get_course(course_key)
+        self.assertEqual(len(course.get_children()), 2)
+        self.assertEqual(len(store.get_items(course_key, qualifiers={'category': 'problem'})), 24)
+        self.assertEqual([grader['type'] for grader in course.raw_grader], ['Assignment0', 'Assignment1'])
+
+        users = create_learners(store, course_key, 5)
+        self.assertEqual(len(users), 5)
+        self.assertEqual(CourseEnrollment.num_enrolled_in(course_key), 5)
+        self.assertTrue(StudentModule.objects.filter(course_id=course_key).exists())
+
+    def test_command(self):
+        output = os.path.join(self.data_dir, 'results.json')
+        call_command(
+            'benchmark_grading', store=ModuleStoreEnum.Type.split, chapters=1, sequentials=2, problems=2,
+            graders=1, learners=3, sample=2, chunk_size=2, output=output,
+        )
+        with open(output) as output_file:
+            output_json = json.load(output_file)
+        results = output_json['results']
+        self.assertEqual(output_json['course']['chunk_size'], 2)
+        self.assertItemsEqual(
+            results.keys(),
+            ['grade', 'progress_summary', 'iterate_grades_for', 'iterate_grades_for_chunked', 'upload_grades_csv']
+        )
+        for measurements in results.values():
+            self.assertGreater(measurements['queries'], 0)
+            self.assertGreaterEqual(measurements['wall_time'], 0)
@@ -36,7 +36,8 @@ from opaque_keys.edx.block_types import BlockTypeKeyV1
 from opaque_keys.edx.asides import AsideUsageKeyV1
 from contracts import contract, new_contract
 
-from django.db import DatabaseError
+from django.conf import settings
+from django.db import DatabaseError, connection
 
 from xblock.runtime import KeyValueStore
 from xblock.exceptions import KeyValueMultiSaveError, InvalidScopeError
@@ -85,6 +86,30 @@ def _all_block_types(descriptors, aside_types):
     return block_types
 
 
+def _get_child_descriptors(descriptor, depth, descriptor_filter):
+    """
+    Return a list of all child descriptors down to the specified depth
+    that match the descriptor filter. Includes `descriptor`
+
+    descriptor: The parent to search inside
+    depth: The number of levels to descend, or None for infinite depth
+    descriptor_filter(descriptor): A function that returns True
+        if descriptor should be included in the results
+    """
+    if descriptor_filter(descriptor):
+        descriptors = [descriptor]
+    else:
+        descriptors = []
+
+    if depth is None or depth > 0:
+        new_depth = depth - 1 if depth is not None else depth
+
+        for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
+            descriptors.extend(_get_child_descriptors(child, new_depth, descriptor_filter))
+
+    return descriptors
+
+
 class DjangoKeyValueStore(KeyValueStore):
     """
     This KeyValueStore will read and write data in the following scopes to django models
@@ -725,6 +750,12 @@ class FieldDataCache(object):
         self.course_id = course_id
         self.user = user
 
+        # The usage keys of the descriptors whose data has been prefetched,
+        # so that adding them again doesn't query their data again.
+        self._cached_usage_keys = set()
+        # The number of queries made to prefetch data
+        self.num_queries = 0
+
         self.cache = {
             Scope.user_state: UserStateCache(
                 self.user,
@@ -745,13 +776,36 @@ class FieldDataCache(object):
     def add_descriptors_to_cache(self, descriptors):
         """
         Add all `descriptors` to this FieldDataCache.
+
+        The data of descriptors already in this FieldDataCache isn't loaded
+        again, so modules rendering their children can add them without
+        making any queries if they were prefetched.
         """
-        if self.user.is_authenticated():
-            for scope, fields in self._fields_to_cache(descriptors).items():
-                if scope not in self.cache:
-                    continue
+        new_descriptors = []
+        for descriptor in descriptors:
+            usage_key = descriptor.scope_ids.usage_id
+            if usage_key not in self._cached_usage_keys:
+                self._cached_usage_keys.add(usage_key)
+                new_descriptors.append(descriptor)
+
+        if new_descriptors and self.user.is_authenticated():
+            # Count the queries made by the caches on the debug cursor, which
+            # records them in connection.queries.
+            use_debug_cursor = connection.use_debug_cursor
+            connection.use_debug_cursor = True
+            start_queries = len(connection.queries)
+            try:
+                for scope, fields in self._fields_to_cache(new_descriptors).items():
+                    if scope not in self.cache:
+                        continue
 
-                self.cache[scope].cache_fields(fields, descriptors, self.asides)
+                    self.cache[scope].cache_fields(fields, new_descriptors, self.asides)
+            finally:
+                self.num_queries += len(connection.queries) - start_queries
+                if not (use_debug_cursor or settings.DEBUG):
+                    # Don't keep the queries, which would otherwise accumulate outside of requests
+                    del connection.queries[start_queries:]
+                connection.use_debug_cursor = use_debug_cursor
 
     def add_descriptor_descendents(self, descriptor, depth=None, descriptor_filter=lambda descriptor: True):
         """
@@ -764,32 +818,8 @@ class FieldDataCache(object):
             descriptor_filter is a function that accepts a descriptor and return whether the field data
                 should be cached
         """
-
-        def get_child_descriptors(descriptor, depth, descriptor_filter):
-            """
-            Return a list of all child descriptors down to the specified depth
-            that match the descriptor filter. Includes `descriptor`
-
-            descriptor: The parent to search inside
-            depth: The number of levels to descend, or None for infinite depth
-            descriptor_filter(descriptor): A function that returns True
-                if descriptor should be included in the results
-            """
-            if descriptor_filter(descriptor):
-                descriptors = [descriptor]
-            else:
-                descriptors = []
-
-            if depth is None or depth > 0:
-                new_depth = depth - 1 if depth is not None else depth
-
-                for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
-                    descriptors.extend(get_child_descriptors(child, new_depth, descriptor_filter))
-
-            return descriptors
-
         with modulestore().bulk_operations(descriptor.location.course_key):
-            descriptors = get_child_descriptors(descriptor, depth, descriptor_filter)
+            descriptors = _get_child_descriptors(descriptor, depth, descriptor_filter)
 
         self.add_descriptors_to_cache(descriptors)
 
@@ -811,6 +841,34 @@ class FieldDataCache(object):
         cache.add_descriptor_descendents(descriptor, depth, descriptor_filter)
         return cache
 
+    @classmethod
+    def cache_for_course_chapter(cls, course_id, user, course, chapter=None, asides=None):
+        """
+        Return a FieldDataCache for the courseware page of a chapter, holding
+        the data of the course, its chapters and their sections, and of all
+        the descendants of the chapter.
+
+        All this data is loaded at once, so that rendering the chapter's
+        sections and their children makes no more queries.
+
+        course_id: the course in the context of which we want StudentModules.
+        user: the django user for whom to load modules.
+        course: the course descriptor
+        chapter: the chapter descriptor, or None to only load the course's outline
+        """
+        with modulestore().bulk_operations(course_id):
+            descriptors = [course]
+            for course_chapter in course.get_children():
+                if chapter is not None and course_chapter.location == chapter.location:
+                    # Fetching the chapter with depth=None loads all its descendants at once
+                    chapter = modulestore().get_item(chapter.location, depth=None)
+                    descriptors.extend(_get_child_descriptors(chapter, None, lambda descriptor: True))
+                else:
+                    descriptors.append(course_chapter)
+                    descriptors.extend(course_chapter.get_children())
+
+        return cls(descriptors, course_id, user, asides=asides)
+
     def _fields_to_cache(self, descriptors):
         """
         Returns a map of scopes to fields in that scope that should be cached
@@ -18,7 +18,7 @@ import itertools
 from django.contrib.auth.models import User
 from django.conf import settings
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver, Signal
 
 from model_utils.models import TimeStampedModel
@@ -263,6 +263,54 @@ class OfflineComputedGrade(models.Model):
         return "[OfflineComputedGrade] %s: %s (%s) = %s" % (self.user, self.course_id, self.created, self.gradeset)
 
 
+class PersistentSubsectionGrade(models.Model):
+    """
+    Stores the scores a student earned on the problems of a single graded
+    subsection, so that `courseware.grades` does not need to instantiate every
+    problem in the subsection each time a student's grade is requested.
+
+    A row is only valid for the version of the course content it was computed
+    against (`course_version`), and only while none of the student's
+    StudentModules in the subsection have been modified since `computed`.
+    """
+    user = models.ForeignKey(User, db_index=True)
+    course_id = CourseKeyField(max_length=255, db_index=True)
+
+    # The usage key of the subsection (sequential) these scores belong to
+    usage_key = LocationKeyField(max_length=255, db_index=True)
+
+    # Identifies the version of the course content the scores were computed against
+    course_version = models.CharField(max_length=255, blank=True)
+
+    # JSON list of [earned, possible, graded, display_name, location] entries
+    scores = models.TextField(default='[]')
+
+    # When the scores were computed. StudentModules modified on or after this
+    # time make the row stale.
+    computed = models.DateTimeField(db_index=True)
+
+    class Meta(object):  # pylint: disable=missing-docstring
+        unique_together = (('user', 'course_id', 'usage_key'),)
+
+    def __unicode__(self):
+        return u"[PersistentSubsectionGrade] {}: {} {} ({})".format(
+            self.user, self.course_id, self.usage_key, self.course_version  # pylint: disable=no-member
+        )
+
+
+@receiver(post_delete, sender=StudentModule)
+def invalidate_persistent_subsection_grades(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Deleting a StudentModule (e.g. when an instructor resets a student's
+    attempts) cannot be detected by comparing modification times, so throw
+    away all of the student's persisted subsection grades for the course.
+    """
+    PersistentSubsectionGrade.objects.filter(
+        user_id=instance.student_id,
+        course_id=instance.course_id,
+    ).delete()
+
+
 class OfflineComputedGradeLog(models.Model):
     """
     Log of when offline grades are computed.
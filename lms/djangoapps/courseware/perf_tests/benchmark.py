@@ -0,0 +1,107 @@
+"""
+Time the grading pipeline on a course.
+
+Each benchmark reports its wall time, the number of SQL queries it made and
+the peak memory use of the process (`ru_maxrss`, which only ever grows, so the
+growth during a benchmark is reported as well).
+"""
+import resource
+from time import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import connection
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+from mock import patch
+
+from courseware import grades
+from instructor_task.tasks_helper import LocalTaskProgress, upload_grades_csv
+from request_cache.middleware import RequestCache
+from xmodule.modulestore.django import modulestore
+
+
+def measure(func):
+    """
+    Call `func`, and return a dict of measurements of the call.
+    """
+    RequestCache().clear_request_cache()
+    use_debug_cursor = connection.use_debug_cursor
+    connection.use_debug_cursor = True
+    start_queries = len(connection.queries)
+    start_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start_time = time()
+    try:
+        func()
+        wall_time = time() - start_time
+        queries = len(connection.queries) - start_queries
+    finally:
+        connection.use_debug_cursor = use_debug_cursor
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        'wall_time': wall_time,
+        'queries': queries,
+        'peak_memory_kb': peak_memory,
+        'memory_growth_kb': peak_memory - start_memory,
+    }
+
+
+def _request_for(user):
+    """
+    Return a request made by `user`, as passed to the grading functions.
+    """
+    request = RequestFactory().get('/')
+    request.user = user
+    request.session = {}
+    return request
+
+
+def run_grading_benchmarks(course_key, students, sample_size=10, chunk_size=None):
+    """
+    Time grading `students` in the course with `course_key`, and return a
+    list of `(benchmark name, measurements)` pairs.
+
+    `grades.grade` and `grades.progress_summary` are timed on the first
+    `sample_size` students only; `iterate_grades_for` and the grade report
+    are timed on all of them. `iterate_grades_for` is timed both grading one
+    student at a time and in chunks of `chunk_size` students, which defaults
+    to `settings.GRADES_DOWNLOAD_CHUNK_SIZE` and is also used by the report.
+    """
+    course = modulestore().get_course(course_key, depth=None)
+    sample = students[:sample_size]
+    chunk_size = chunk_size or settings.GRADES_DOWNLOAD_CHUNK_SIZE
+
+    def grade_sample():
+        """Grade each sampled student."""
+        for student in sample:
+            grades.grade(student, _request_for(student), course)
+
+    def progress_sample():
+        """Compute the progress page summary of each sampled student."""
+        for student in sample:
+            grades.progress_summary(student, _request_for(student), course)
+
+    def iterate_grades():
+        """Grade all the students, one at a time."""
+        for __ in grades.iterate_grades_for(course, students):
+            pass
+
+    def iterate_grades_chunked():
+        """Grade all the students, in chunks."""
+        for __ in grades.iterate_grades_for(course, students, chunk_size=chunk_size):
+            pass
+
+    def grade_report():
+        """Generate and store the grade report of the course."""
+        # There is no celery task to report progress to.
+        with patch('instructor_task.tasks_helper.TaskProgress', LocalTaskProgress):
+            with override_settings(GRADES_DOWNLOAD_CHUNK_SIZE=chunk_size):
+                upload_grades_csv(None, uuid4().hex, course_key, {}, 'graded')
+
+    return [
+        ('grade', measure(grade_sample)),
+        ('progress_summary', measure(progress_sample)),
+        ('iterate_grades_for', measure(iterate_grades)),
+        ('iterate_grades_for_chunked', measure(iterate_grades_chunked)),
+        ('upload_grades_csv', measure(grade_report)),
+    ]
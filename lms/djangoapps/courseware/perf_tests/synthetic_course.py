@@ -0,0 +1,136 @@
+"""
+Generate synthetic courses and learner state for the grading benchmarks.
+
+Courses are written as OLX, so that the same course can be loaded by the XML
+modulestore or imported into the mongo and split modulestores.
+"""
+import json
+import os
+import random
+
+from django.contrib.auth.models import User
+
+from courseware.models import StudentModule
+from student.models import CourseEnrollment
+from xmodule.contentstore.django import contentstore
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.xml_importer import import_course_from_xml
+
+PROBLEM_XML = (
+    '<problem url_name="{url_name}" display_name="Problem {index}">'
+    '<stringresponse answer="{index}"><textline size="10"/></stringresponse>'
+    '</problem>'
+)
+
+
+def write_course_xml(data_dir, org, number, run, chapters, sequentials, problems, graders):
+    """
+    Write a course to the directory `number` of `data_dir`, and return the
+    name of that directory.
+
+    The course has `chapters` chapters of `sequentials` graded subsections,
+    each holding a vertical of `problems` problems.  Subsections are assigned
+    in turn to `graders` assignment types of equal weight.
+    """
+    course_dir = os.path.join(data_dir, number)
+    for path in (os.path.join(course_dir, 'course'), os.path.join(course_dir, 'policies', run)):
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    assignment_types = ['Assignment{}'.format(index) for index in range(graders)]
+    body = []
+    for chapter in range(chapters):
+        body.append('<chapter url_name="chapter_{0}" display_name="Chapter {0}">'.format(chapter))
+        for sequential in range(sequentials):
+            block_id = '{}_{}'.format(chapter, sequential)
+            body.append(
+                '<sequential url_name="sequential_{0}" display_name="Subsection {0}" graded="true" '
+                'format="{1}"><vertical url_name="vertical_{0}">'.format(
+                    block_id, assignment_types[(chapter * sequentials + sequential) % graders]
+                )
+            )
+            for problem in range(problems):
+                url_name = 'problem_{}_{}'.format(block_id, problem)
+                body.append(PROBLEM_XML.format(url_name=url_name, index=problem))
+            body.append('</vertical></sequential>')
+        body.append('</chapter>')
+
+    with open(os.path.join(course_dir, 'course.xml'), 'w') as course_file:
+        course_file.write('<course org="{}" course="{}" url_name="{}"/>'.format(org, number, run))
+    with open(os.path.join(course_dir, 'course', '{}.xml'.format(run)), 'w') as course_file:
+        course_file.write('<course display_name="Synthetic course {}">{}</course>'.format(number, ''.join(body)))
+
+    num_assignments = chapters * sequentials
+    grading_policy = {
+        'GRADER': [
+            {
+                'type': assignment_type,
+                'short_label': assignment_type,
+                'min_count': num_assignments // graders + (1 if index < num_assignments % graders else 0),
+                'drop_count': 0,
+                'weight': 1.0 / graders,
+            }
+            for index, assignment_type in enumerate(assignment_types)
+        ],
+        'GRADE_CUTOFFS': {'Pass': 0.5},
+    }
+    with open(os.path.join(course_dir, 'policies', run, 'grading_policy.json'), 'w') as policy_file:
+        json.dump(grading_policy, policy_file)
+    with open(os.path.join(course_dir, 'policies', run, 'policy.json'), 'w') as policy_file:
+        json.dump({'course/{}'.format(run): {'start': '2015-01-01T00:00:00Z'}}, policy_file)
+
+    return number
+
+
+def import_course(store, store_type, data_dir, course_dir):
+    """
+    Import the course in `course_dir` of `data_dir` into the `store_type`
+    modulestore of the mixed modulestore `store`, and return its key.
+    """
+    with store.default_store(store_type):
+        courses = import_course_from_xml(
+            store, ModuleStoreEnum.UserID.mgmt_command, data_dir, [course_dir], load_error_modules=False,
+            static_content_store=contentstore(), create_if_not_present=True,
+        )
+    return courses[0].id
+
+
+def create_learners(store, course_key, num_learners, seed=0, username_prefix='benchmark'):
+    """
+    Enroll `num_learners` new users in the course, and give each of them a
+    random score on about 80% of its problems.
+
+    Returns the users.
+    """
+    usernames = ['{}_{}'.format(username_prefix, index) for index in range(num_learners)]
+    _bulk_create(User, [User(username=username, email=username + '@example.com') for username in usernames])
+    users = list(User.objects.filter(username__startswith='{}_'.format(username_prefix)).order_by('id'))
+    _bulk_create(CourseEnrollment, [
+        CourseEnrollment(user=user, course_id=course_key, mode='honor', is_active=True) for user in users
+    ])
+
+    problem_keys = [problem.location for problem in store.get_items(course_key, qualifiers={'category': 'problem'})]
+    rand = random.Random(seed)
+    student_modules = []
+    for user in users:
+        for problem_key in problem_keys:
+            if rand.random() < 0.8:
+                student_modules.append(StudentModule(
+                    student=user,
+                    course_id=course_key,
+                    module_state_key=problem_key,
+                    module_type='problem',
+                    state='{}',
+                    grade=rand.randint(0, 1),
+                    max_grade=1,
+                ))
+    _bulk_create(StudentModule, student_modules)
+    return users
+
+
+def _bulk_create(model, objects, batch_size=500):
+    """
+    Insert `objects` in batches small enough for every database backend.
+    """
+    for start in range(0, len(objects), batch_size):
+        model.objects.bulk_create(objects[start:start + batch_size])
@@ -1,6 +1,7 @@
 import datetime
 import pytz
 
+from django.contrib.auth.models import User
 from django.test import TestCase
 from django.core.urlresolvers import reverse
 from mock import Mock, patch
@@ -11,6 +12,7 @@ import courseware.access as access
 from courseware.masquerade import CourseMasquerade
 from courseware.tests.factories import UserFactory, StaffFactory, InstructorFactory
 from courseware.tests.helpers import LoginEnrollmentTestCase
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from student.tests.factories import AnonymousUserFactory, CourseEnrollmentAllowedFactory, CourseEnrollmentFactory
 from xmodule.course_module import (
     CATALOG_VISIBILITY_CATALOG_AND_ABOUT, CATALOG_VISIBILITY_ABOUT,
@@ -23,6 +25,7 @@ from util.milestones_helpers import (
     set_prerequisite_courses,
     fulfill_course_milestone,
     seed_milestone_relationship_types,
+    get_pre_requisite_courses_not_completed,
 )
 
 # pylint: disable=missing-docstring
@@ -256,6 +259,101 @@ class AccessTestCase(LoginEnrollmentTestCase, ModuleStoreTestCase):
         )
         self.assertFalse(access._has_access_course_desc(user, 'enroll', course))
 
+    @patch.dict('django.conf.settings.FEATURES', {'DISABLE_START_DATES': False})
+    def test__has_access_course_overview(self):
+        """
+        Check that a course and its overview give the same access.
+        """
+        tomorrow = datetime.datetime.now(pytz.utc) + datetime.timedelta(days=1)
+        courses = [
+            CourseFactory.create(),
+            CourseFactory.create(start=tomorrow),
+            CourseFactory.create(visible_to_staff_only=True),
+            CourseFactory.create(invitation_only=True),
+            CourseFactory.create(catalog_visibility=CATALOG_VISIBILITY_NONE),
+        ]
+        for course in courses:
+            overview = CourseOverview.get_from_id(course.id)
+            for user in (self.anonymous_user, self.student, self.global_staff):
+                for action in ('load', 'enroll', 'see_exists', 'see_in_catalog', 'see_about_page', 'staff'):
+                    self.assertEqual(
+                        access.has_access(user, action, overview),
+                        access.has_access(user, action, course),
+                        (course.id, user, action)
+                    )
+
+    def test_has_access_to_courses(self):
+        """
+        Check that has_access_to_courses gives the same access as has_access.
+        """
+        yesterday = datetime.datetime.now(pytz.utc) - datetime.timedelta(days=1)
+        courses = [
+            CourseFactory.create(),
+            CourseFactory.create(invitation_only=True),
+            CourseFactory.create(invitation_only=True),
+            CourseFactory.create(enrollment_end=yesterday),
+        ]
+        CourseEnrollmentFactory(user=self.student, course_id=courses[0].id)
+        CourseEnrollmentFactory(user=self.student, course_id=courses[3].id, is_active=False)
+        CourseEnrollmentAllowedFactory(email=self.student.email, course_id=courses[1].id)
+        overviews = [CourseOverview.get_from_id(course.id) for course in courses]
+
+        for user in (None, self.anonymous_user, self.student, self.global_staff):
+            for action in ('load', 'enroll', 'see_exists', 'see_in_catalog', 'view_courseware_with_prerequisites'):
+                for course_list in (courses, overviews):
+                    self.assertEqual(
+                        access.has_access_to_courses(user, action, course_list),
+                        {course.id: access.has_access(user, action, course) for course in course_list},
+                        (user, action)
+                    )
+
+    @patch.dict('django.conf.settings.FEATURES', {'DISABLE_START_DATES': False})
+    def test_has_access_to_courses_num_queries(self):
+        """
+        Check that the number of queries does not grow with the number of courses.
+        """
+        yesterday = datetime.datetime.now(pytz.utc) - datetime.timedelta(days=1)
+        courses = [CourseOverview.get_from_id(CourseFactory.create(start=yesterday).id) for __ in range(4)]
+        for course in courses:
+            CourseEnrollmentFactory(user=self.student, course_id=course.id)
+
+        for course_list in (courses[:1], courses):
+            # one query each for the enrollments, enrollment allowances and roles of the user
+            user = User.objects.get(id=self.student.id)
+            with self.assertNumQueries(3):
+                access.has_access_to_courses(user, 'load_forum', course_list)
+                access.has_access_to_courses(user, 'see_exists', course_list)
+
+    @patch.dict("django.conf.settings.FEATURES", {'ENABLE_PREREQUISITE_COURSES': True, 'MILESTONES_APP': True})
+    def test_has_access_to_courses_with_pre_requisites(self):
+        """
+        Check that has_access_to_courses finds the same courses with unmet
+        pre-requisites as get_pre_requisite_courses_not_completed.
+        """
+        seed_milestone_relationship_types()
+        pre_requisite_courses = [CourseFactory.create() for __ in range(2)]
+        pre_requisite_ids = [unicode(course.id) for course in pre_requisite_courses]
+        courses = [
+            CourseFactory.create(),
+            # completed, partially completed and unmet pre-requisites
+            CourseFactory.create(pre_requisite_courses=pre_requisite_ids[:1]),
+            CourseFactory.create(pre_requisite_courses=pre_requisite_ids),
+            CourseFactory.create(pre_requisite_courses=pre_requisite_ids[1:]),
+        ]
+        for course in courses:
+            set_prerequisite_courses(course.id, course.pre_requisite_courses)
+            CourseEnrollmentFactory(user=self.student, course_id=course.id)
+        fulfill_course_milestone(pre_requisite_courses[0].id, self.student)
+        overviews = [CourseOverview.get_from_id(course.id) for course in courses]
+
+        not_completed = get_pre_requisite_courses_not_completed(self.student, [course.id for course in courses])
+        self.assertItemsEqual(not_completed.keys(), [courses[2].id, courses[3].id])
+        for course_list in (courses, overviews):
+            self.assertEqual(
+                access.has_access_to_courses(self.student, 'view_courseware_with_prerequisites', course_list),
+                {course.id: course.id not in not_completed for course in course_list}
+            )
+
     def test__user_passed_as_none(self):
         """Ensure has_access handles a user being passed as null"""
         access.has_access(None, 'staff', 'global', None)
@@ -19,8 +19,10 @@ from courseware.tests.factories import StudentPrefsFactory, StudentInfoFactory
 from xblock.fields import Scope, BlockScope, ScopeIds
 from xblock.exceptions import KeyValueMultiSaveError
 from xblock.core import XBlock
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from django.test import TestCase
-from django.db import DatabaseError
+from django.db import DatabaseError, connection
 
 
 def mock_field(scope, name):
@@ -416,3 +418,73 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+@attr('shard_1')
+class TestFieldDataCachePrefetch(TestCase):
+    """Tests that FieldDataCache only loads the data of each descriptor once"""
+
+    def setUp(self):
+        super(TestFieldDataCachePrefetch, self).setUp()
+        self.user = UserFactory.create(username='user')
+
+    def test_add_descriptors_again(self):
+        descriptor = mock_descriptor([mock_field(Scope.user_state, 'a_field')])
+        with self.assertNumQueries(1):
+            field_data_cache = FieldDataCache([descriptor], course_id, self.user)
+        with self.assertNumQueries(0):
+            field_data_cache.add_descriptors_to_cache([descriptor])
+        self.assertEqual(field_data_cache.num_queries, 1)
+
+    def test_num_queries(self):
+        descriptors = []
+        for index in range(501):
+            descriptor = mock_descriptor([
+                mock_field(Scope.user_state, 'a_field'),
+                mock_field(Scope.user_state_summary, 'a_summary_field'),
+            ])
+            descriptor.scope_ids = ScopeIds(
+                'user1', 'mock_problem', location('def_id'), location('usage_id_{}'.format(index))
+            )
+            descriptors.append(descriptor)
+
+        # Two chunks of usage ids for each of the two scopes
+        with self.assertNumQueries(4):
+            field_data_cache = FieldDataCache(descriptors, course_id, self.user)
+        self.assertEqual(field_data_cache.num_queries, 4)
+
+    def test_queries_not_kept(self):
+        descriptor = mock_descriptor([mock_field(Scope.user_state, 'a_field')])
+        num_queries = len(connection.queries)
+        field_data_cache = FieldDataCache([descriptor], course_id, self.user)
+        self.assertEqual(field_data_cache.num_queries, 1)
+        # the queries are only recorded to count them
+        self.assertEqual(len(connection.queries), num_queries)
+        self.assertFalse(connection.use_debug_cursor)
+
+
+@attr('shard_1')
+class TestCacheForCourseChapter(ModuleStoreTestCase):
+    """Tests for FieldDataCache.cache_for_course_chapter"""
+
+    def setUp(self):
+        super(TestCacheForCourseChapter, self).setUp()
+        self.user = UserFactory.create()
+        self.course = CourseFactory.create()
+        self.chapter = ItemFactory.create(parent=self.course, category='chapter')
+        self.sequential = ItemFactory.create(parent=self.chapter, category='sequential')
+        self.vertical = ItemFactory.create(parent=self.sequential, category='vertical')
+        ItemFactory.create(parent=self.vertical, category='problem')
+        self.course = self.store.get_course(self.course.id, depth=2)
+
+    def test_chapter_descendants_are_prefetched(self):
+        field_data_cache = FieldDataCache.cache_for_course_chapter(
+            self.course.id, self.user, self.course, self.course.get_children()[0]
+        )
+        with self.assertNumQueries(0):
+            field_data_cache.add_descriptor_descendents(self.store.get_item(self.sequential.location, depth=None))
+
+    def test_outline_only(self):
+        field_data_cache = FieldDataCache.cache_for_course_chapter(self.course.id, self.user, self.course)
+        with self.assertNumQueries(0):
+            field_data_cache.add_descriptors_to_cache([self.course] + self.course.get_children())
@@ -18,7 +18,7 @@ from capa.tests.response_xml_factory import (
     CodeResponseXMLFactory,
 )
 from courseware import grades
-from courseware.models import StudentModule
+from courseware.models import PersistentSubsectionGrade, StudentModule
 from courseware.tests.helpers import LoginEnrollmentTestCase
 from lms.djangoapps.lms_xblock.runtime import quote_slashes
 from student.tests.factories import UserFactory
@@ -26,6 +26,7 @@ from student.models import anonymous_id_for_user
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.partitions.partitions import Group, UserPartition
+from openedx.core.djangoapps.user_api.course_tag import api as course_tag_api
 from openedx.core.djangoapps.user_api.tests.factories import UserCourseTagFactory
 
 
@@ -495,6 +496,29 @@ class TestCourseGrader(TestSubmittingProblems):
             self.check_grade_percent(1.0)
             self.assertEqual(self.get_grade_summary()['grade'], 'A')
 
+    def test_prefetched_scores(self):
+        """
+        Check that grading with scores prefetched in bulk gives the same grade.
+        """
+        self.basic_setup()
+        self.submit_question_answer('p1', {'2_1': 'Correct'})
+        self.submit_question_answer('p2', {'2_1': 'Correct'})
+        self.submit_question_answer('p3', {'2_1': 'Incorrect'})
+
+        prefetched_scores = grades.prefetch_scores(self.course, [self.student_user])[self.student_user.id]
+        self.assertEqual(prefetched_scores.student_module_scores[self.problem_location('p1')], (1.0, 1.0))
+        self.assertEqual(prefetched_scores.student_module_scores[self.problem_location('p3')], (0.0, 1.0))
+        self.assertEqual(prefetched_scores.submissions_scores, {})
+
+        with patch('courseware.grades.StudentModule.objects.get') as mock_get:
+            results = list(grades.iterate_grades_for(self.course, [self.student_user], chunk_size=10))
+            self.assertFalse(mock_get.called)
+        [(student, gradeset, err_msg)] = results
+        self.assertEqual(student, self.student_user)
+        self.assertEqual(err_msg, "")
+        self.assertEqual(gradeset['percent'], 0.67)
+        self.assertEqual(gradeset['grade'], 'B')
+
     def test_submissions_api_anonymous_student_id(self):
         """
         Check that the submissions API is sent an anonymous student ID.
@@ -595,6 +619,130 @@ class TestCourseGrader(TestSubmittingProblems):
         self.assertEqual(self.score_for_hw('homework3'), [1.0, 1.0])
 
 
+@attr('shard_1')
+@patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_SUBSECTION_GRADES': True})
+class TestPersistentSubsectionGrades(TestSubmittingProblems):
+    """
+    Tests that persisted subsection grades are written, reused and invalidated.
+    """
+    def setUp(self):
+        super(TestPersistentSubsectionGrades, self).setUp()
+        grading_policy = {
+            "GRADER": [{
+                "type": "Homework",
+                "min_count": 1,
+                "drop_count": 0,
+                "short_label": "HW",
+                "weight": 1.0
+            }],
+            "GRADE_CUTOFFS": {
+                'A': .9,
+                'B': .33
+            }
+        }
+        self.add_grading_policy(grading_policy)
+        self.homework = self.add_graded_section_to_course('homework')
+        self.add_dropdown_to_section(self.homework.location, 'p1', 1)
+        self.add_dropdown_to_section(self.homework.location, 'p2', 1)
+        self.add_dropdown_to_section(self.homework.location, 'p3', 1)
+        self.refresh_course()
+
+    def persisted_grades(self):
+        """
+        Returns the subsection grades persisted for the test student.
+        """
+        return PersistentSubsectionGrade.objects.filter(user=self.student_user, course_id=self.course.id)
+
+    def test_grades_are_persisted(self):
+        self.submit_question_answer('p1', {'2_1': 'Correct'})
+        self.check_grade_percent(0.33)
+        self.assertEqual(
+            [row.usage_key.map_into_course(self.course.id) for row in self.persisted_grades()],
+            [self.homework.location]
+        )
+
+    def test_persisted_grades_are_reused(self):
+        self.submit_question_answer('p1', {'2_1': 'Correct'})
+        self.submit_question_answer('p2', {'2_1': 'Correct'})
+        self.check_grade_percent(0.67)
+
+        with patch('courseware.grades.get_score', wraps=grades.get_score) as mock_get_score:
+            self.check_grade_percent(0.67)
+            self.assertFalse(mock_get_score.called)
+
+        self.assertEqual(self.score_for_hw('homework'), [1.0, 1.0, 0.0])
+
+    def test_new_submission_makes_grade_stale(self):
+        self.submit_question_answer('p1', {'2_1': 'Correct'})
+        self.check_grade_percent(0.33)
+        self.submit_question_answer('p2', {'2_1': 'Correct'})
+        self.check_grade_percent(0.67)
+
+    def test_deleted_state_discards_persisted_grades(self):
+        self.submit_question_answer('p1', {'2_1': 'Correct'})
+        self.check_grade_percent(0.33)
+        StudentModule.objects.get(
+            student=self.student_user,
+            module_state_key=self.problem_location('p1'),
+        ).delete()
+        self.assertFalse(self.persisted_grades().exists())
+        self.check_grade_percent(0)
+
+    def test_course_edit_makes_grade_stale(self):
+        self.submit_question_answer('p1', {'2_1': 'Correct'})
+        self.check_grade_percent(0.33)
+        self.add_dropdown_to_section(self.homework.location, 'p4', 1)
+        self.check_grade_percent(0.25)
+
+    def add_partition(self):
+        """
+        Adds a user partition with two groups to the course, and returns it.
+        """
+        partition = UserPartition(0, 'first_partition', 'First Partition', [Group(0, 'alpha'), Group(1, 'beta')])
+        self.course.user_partitions = [partition]
+        self.update_course(self.course, self.student_user.id)
+        return partition
+
+    def test_group_change_makes_grade_stale(self):
+        partition = self.add_partition()
+        problem = self.store.get_item(self.problem_location('p3'))
+        problem.group_access = {partition.id: [0]}
+        self.store.update_item(problem, self.student_user.id)
+        self.refresh_course()
+        partition_key = partition.scheme.key_for_partition(partition)
+        course_tag_api.set_course_tag(self.student_user, self.course.id, partition_key, 0)
+
+        self.submit_question_answer('p1', {'2_1': 'Correct'})
+        self.check_grade_percent(0.33)
+        self.assertTrue(self.persisted_grades().exists())
+
+        # p3 is hidden from the students of group 1
+        course_tag_api.set_course_tag(self.student_user, self.course.id, partition_key, 1)
+        self.check_grade_percent(0.5)
+
+    def test_dynamic_sections_are_not_persisted(self):
+        partition = self.add_partition()
+        split_section = self.add_graded_section_to_course('split_homework')
+        vertical_url = self.course.id.make_usage_key('vertical', 'split_vertical')
+        split_test = ItemFactory.create(
+            parent_location=split_section.location,
+            category='split_test',
+            user_partition_id=partition.id,
+            group_id_to_child={'0': vertical_url},
+        )
+        ItemFactory.create(parent_location=split_test.location, category='vertical', location=vertical_url)
+        self.add_dropdown_to_section(split_section.location, 'split_p1', 1)
+        self.refresh_course()
+
+        self.submit_question_answer('p1', {'2_1': 'Correct'})
+        self.submit_question_answer('split_p1', {'2_1': 'Correct'})
+        self.get_grade_summary()
+        self.assertEqual(
+            [row.usage_key.map_into_course(self.course.id) for row in self.persisted_grades()],
+            [self.homework.location]
+        )
+
+
 @attr('shard_1')
 class ProblemWithUploadedFilesTest(TestSubmittingProblems):
     """Tests of problems with uploaded files."""
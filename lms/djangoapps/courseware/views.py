@@ -29,6 +29,7 @@ from django_future.csrf import ensure_csrf_cookie
 from django.views.decorators.cache import cache_control
 from django.db import transaction
 from markupsafe import escape
+import dogstats_wrapper as dog_stats_api
 
 from courseware import grades
 from courseware.access import has_access, in_preview_mode, _adjust_start_date_for_beta_testers
@@ -400,8 +401,13 @@ def _index_bulk_op(request, course_key, chapter, section, position):
     masquerade = setup_masquerade(request, course_key, staff_access)
 
     try:
-        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
-            course_key, user, course, depth=2)
+        # Load the data of the course outline, and of the whole chapter if a
+        # section is being shown, at once.
+        if chapter is not None and section is not None:
+            prefetched_chapter = course.get_child_by(lambda m: m.location.name == chapter)
+        else:
+            prefetched_chapter = None
+        field_data_cache = FieldDataCache.cache_for_course_chapter(course_key, user, course, prefetched_chapter)
 
         course_module = get_module_for_descriptor(user, request, course, field_data_cache, course_key)
         if course_module is None:
@@ -564,6 +570,7 @@ def _index_bulk_op(request, course_key, chapter, section, position):
             ))
 
         result = render_to_response('courseware/courseware.html', context)
+        dog_stats_api.histogram('courseware.index.field_data_cache_queries', field_data_cache.num_queries)
     except Exception as e:
 
         # Doesn't bar Unicode characters from URL, but if Unicode characters do
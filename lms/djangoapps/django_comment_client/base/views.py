@@ -154,7 +154,7 @@ def create_thread(request, course_id, commentable_id):
 
     if follow:
         user = cc.User.from_django_user(request.user)
-        user.follow(thread)
+        user.follow(thread, course_id=course_key)
 
     event_data = {
         'title': thread.title,
@@ -258,7 +258,7 @@ def _create_comment(request, course_key, thread_id=None, parent_id=None):
 
     if followed:
         user = cc.User.from_django_user(request.user)
-        user.follow(comment.thread)
+        user.follow(comment.thread, course_id=course_key)
 
     event_data = {'discussion': {'id': comment.thread_id}, 'options': {'followed': followed}}
 
@@ -400,7 +400,7 @@ def vote_for_comment(request, course_id, comment_id, value):
     course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
     user = cc.User.from_django_user(request.user)
     comment = cc.Comment.find(comment_id)
-    user.vote(comment, value)
+    user.vote(comment, value, course_id=course_key)
     return JsonResponse(prepare_content(comment.to_dict(), course_key))
 
 
@@ -415,7 +415,7 @@ def undo_vote_for_comment(request, course_id, comment_id):
     course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
     user = cc.User.from_django_user(request.user)
     comment = cc.Comment.find(comment_id)
-    user.unvote(comment)
+    user.unvote(comment, course_id=course_key)
     return JsonResponse(prepare_content(comment.to_dict(), course_key))
 
 
@@ -430,7 +430,7 @@ def vote_for_thread(request, course_id, thread_id, value):
     course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
     user = cc.User.from_django_user(request.user)
     thread = cc.Thread.find(thread_id)
-    user.vote(thread, value)
+    user.vote(thread, value, course_id=course_key)
 
     return JsonResponse(prepare_content(thread.to_dict(), course_key))
 
@@ -446,7 +446,7 @@ def flag_abuse_for_thread(request, course_id, thread_id):
     course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
     user = cc.User.from_django_user(request.user)
     thread = cc.Thread.find(thread_id)
-    thread.flagAbuse(user, thread)
+    thread.flagAbuse(user, thread, course_id=course_key)
 
     return JsonResponse(prepare_content(thread.to_dict(), course_key))
 
@@ -464,7 +464,7 @@ def un_flag_abuse_for_thread(request, course_id, thread_id):
     course = get_course_by_id(course_key)
     thread = cc.Thread.find(thread_id)
     remove_all = cached_has_permission(request.user, 'openclose_thread', course_key) or has_access(request.user, 'staff', course)
-    thread.unFlagAbuse(user, thread, remove_all)
+    thread.unFlagAbuse(user, thread, remove_all, course_id=course_key)
 
     return JsonResponse(prepare_content(thread.to_dict(), course_key))
 
@@ -480,7 +480,7 @@ def flag_abuse_for_comment(request, course_id, comment_id):
     course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
     user = cc.User.from_django_user(request.user)
     comment = cc.Comment.find(comment_id)
-    comment.flagAbuse(user, comment)
+    comment.flagAbuse(user, comment, course_id=course_key)
     return JsonResponse(prepare_content(comment.to_dict(), course_key))
 
 
@@ -497,7 +497,7 @@ def un_flag_abuse_for_comment(request, course_id, comment_id):
     course = get_course_by_id(course_key)
     remove_all = cached_has_permission(request.user, 'openclose_thread', course_key) or has_access(request.user, 'staff', course)
     comment = cc.Comment.find(comment_id)
-    comment.unFlagAbuse(user, comment, remove_all)
+    comment.unFlagAbuse(user, comment, remove_all, course_id=course_key)
     return JsonResponse(prepare_content(comment.to_dict(), course_key))
 
 
@@ -512,7 +512,7 @@ def undo_vote_for_thread(request, course_id, thread_id):
     course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
     user = cc.User.from_django_user(request.user)
     thread = cc.Thread.find(thread_id)
-    user.unvote(thread)
+    user.unvote(thread, course_id=course_key)
 
     return JsonResponse(prepare_content(thread.to_dict(), course_key))
 
@@ -528,7 +528,7 @@ def pin_thread(request, course_id, thread_id):
     course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
     user = cc.User.from_django_user(request.user)
     thread = cc.Thread.find(thread_id)
-    thread.pin(user, thread_id)
+    thread.pin(user, thread_id, course_id=course_key)
 
     return JsonResponse(prepare_content(thread.to_dict(), course_key))
 
@@ -544,7 +544,7 @@ def un_pin_thread(request, course_id, thread_id):
     course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
     user = cc.User.from_django_user(request.user)
     thread = cc.Thread.find(thread_id)
-    thread.un_pin(user, thread_id)
+    thread.un_pin(user, thread_id, course_id=course_key)
 
     return JsonResponse(prepare_content(thread.to_dict(), course_key))
 
@@ -555,7 +555,7 @@ def un_pin_thread(request, course_id, thread_id):
 def follow_thread(request, course_id, thread_id):
     user = cc.User.from_django_user(request.user)
     thread = cc.Thread.find(thread_id)
-    user.follow(thread)
+    user.follow(thread, course_id=course_id)
     return JsonResponse({})
 
 
@@ -569,7 +569,7 @@ def follow_commentable(request, course_id, commentable_id):
     """
     user = cc.User.from_django_user(request.user)
     commentable = cc.Commentable.find(commentable_id)
-    user.follow(commentable)
+    user.follow(commentable, course_id=course_id)
     return JsonResponse({})
 
 
@@ -579,7 +579,7 @@ def follow_commentable(request, course_id, commentable_id):
 def follow_user(request, course_id, followed_user_id):
     user = cc.User.from_django_user(request.user)
     followed_user = cc.User.find(followed_user_id)
-    user.follow(followed_user)
+    user.follow(followed_user, course_id=course_id)
     return JsonResponse({})
 
 
@@ -593,7 +593,7 @@ def unfollow_thread(request, course_id, thread_id):
     """
     user = cc.User.from_django_user(request.user)
     thread = cc.Thread.find(thread_id)
-    user.unfollow(thread)
+    user.unfollow(thread, course_id=course_id)
     return JsonResponse({})
 
 
@@ -607,7 +607,7 @@ def unfollow_commentable(request, course_id, commentable_id):
     """
     user = cc.User.from_django_user(request.user)
     commentable = cc.Commentable.find(commentable_id)
-    user.unfollow(commentable)
+    user.unfollow(commentable, course_id=course_id)
     return JsonResponse({})
 
 
@@ -621,7 +621,7 @@ def unfollow_user(request, course_id, followed_user_id):
     """
     user = cc.User.from_django_user(request.user)
     followed_user = cc.User.find(followed_user_id)
-    user.unfollow(followed_user)
+    user.unfollow(followed_user, course_id=course_id)
     return JsonResponse({})
 
 
@@ -397,7 +397,10 @@ def user_profile(request, course_key, user_id):
         threads, page, num_pages = profiled_user.active_threads(query_params)
         query_params['page'] = page
         query_params['num_pages'] = num_pages
-        user_info = cc.User.from_django_user(request.user).to_dict()
+        cc_user = cc.User.from_django_user(request.user)
+        # the page also shows the profiled user, so retrieve both users at once
+        cc.User.retrieve_all([cc_user] if request.is_ajax() else [cc_user, profiled_user])
+        user_info = cc_user.to_dict()
 
         with newrelic.agent.FunctionTrace(nr_transaction, "get_metadata_for_threads"):
             annotated_content_info = utils.get_metadata_for_threads(course_key, threads, request.user, user_info)
@@ -0,0 +1,226 @@
+"""
+Tests of the connections of the comment client to the comments service, and of its cache.
+"""
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+import json
+from SocketServer import ThreadingMixIn
+import threading
+
+import mock
+from nose.plugins.attrib import attr
+import requests
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from lms.lib.comment_client import Thread, User
+from lms.lib.comment_client import utils
+
+
+class StubCommentServiceHandler(BaseHTTPRequestHandler):
+    """
+    Responds to GET requests of /threads/<id> with the thread `id`, and to PUT
+    requests with an empty object, keeping connections alive.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.connections.append(self.client_address)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.server.requests.append(('GET', self.path))
+        thread_id = self.path.split('?')[0].split('/')[-1]
+        self._respond({'id': thread_id, 'title': u'Thread {}'.format(thread_id)})
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        self.server.requests.append(('PUT', self.path))
+        self.rfile.read(int(self.headers.getheader('content-length')))
+        self._respond({})
+
+    def _respond(self, response):
+        """
+        Send the JSON `response`.
+        """
+        body = json.dumps(response)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class StubCommentServiceServer(ThreadingMixIn, HTTPServer):
+    """
+    A comments service on a free local port, recording the connections and
+    requests made to it.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StubCommentServiceHandler)
+        self.connections = []
+        self.requests = []
+        self.url = 'http://127.0.0.1:{}/threads'.format(self.server_address[1])
+
+
+class StubCommentServiceTestCase(TestCase):
+    """
+    Runs a stub comments service for each test.
+    """
+    def setUp(self):
+        super(StubCommentServiceTestCase, self).setUp()
+        self.server = StubCommentServiceServer()
+        server_thread = threading.Thread(target=self.server.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        # each test gets a new session
+        patcher = mock.patch.multiple(utils, _SESSION=None, _SESSION_PID=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(Thread, 'base_url', self.server.url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+@attr('shard_1')
+class CommentClientSessionTest(StubCommentServiceTestCase):
+    """
+    Tests of the requests session shared by the requests to the comments service.
+    """
+    def test_connection_reused(self):
+        for thread_id in range(5):
+            response = utils.perform_request('get', '{}/{}'.format(self.server.url, thread_id))
+            self.assertEqual(response['id'], str(thread_id))
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_new_session_after_fork(self):
+        session = utils.get_session()
+        self.assertIs(utils.get_session(), session)
+        with mock.patch('os.getpid', return_value=-1):
+            self.assertIsNot(utils.get_session(), session)
+
+    def test_find_all(self):
+        ids = [str(thread_id) for thread_id in range(10)]
+        threads = Thread.find_all(ids, recursive=False)
+        self.assertEqual([thread.title for thread in threads], [u'Thread {}'.format(thread_id) for thread_id in ids])
+        self.assertTrue(all(thread.retrieved for thread in threads))
+        # the threads are requested over the same connection
+        self.assertEqual(len(self.server.connections), 1)
+
+        # retrieved threads aren't requested again
+        Thread.retrieve_all(threads)
+        self.assertEqual(len(self.server.requests), len(ids))
+
+    def test_retry(self):
+        response = mock.Mock(status_code=200, json=mock.Mock(return_value={}))
+        with mock.patch('requests.Session.request', side_effect=[requests.exceptions.ConnectionError, response]):
+            self.assertEqual(utils.perform_request('get', self.server.url), {})
+        with mock.patch('requests.Session.request', side_effect=[requests.exceptions.ConnectionError, response]):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                utils.perform_request('post', self.server.url, {'body': 'body'})
+
+
+@attr('shard_1')
+@override_settings(COMMENTS_SERVICE_CACHE_TIMEOUT=10)
+class CommentClientCacheTest(StubCommentServiceTestCase):
+    """
+    Tests of the cache of the responses of the comments service.
+    """
+    def setUp(self):
+        super(CommentClientCacheTest, self).setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def get(self, thread_id, **params):
+        """
+        Request the thread `thread_id`, and return its title.
+        """
+        return utils.perform_request('get', '{}/{}'.format(self.server.url, thread_id), params)['title']
+
+    def requested(self, method='GET'):
+        """
+        Return the number of requests with `method` received by the service.
+        """
+        return len([request for request in self.server.requests if request[0] == method])
+
+    def test_cached(self):
+        self.assertEqual(self.get(1, user_id='1'), u'Thread 1')
+        self.assertEqual(self.get(1, user_id='1'), u'Thread 1')
+        self.assertEqual(self.requested(), 1)
+        # the parameters of the requests are part of the key
+        self.get(1, user_id='2')
+        self.get(2, user_id='2')
+        self.assertEqual(self.requested(), 3)
+
+    def test_marked_as_read(self):
+        self.get(1, mark_as_read=True)
+        self.get(1, mark_as_read=True)
+        self.assertEqual(self.requested(), 2)
+
+    def test_marked_as_read_invalidates_user(self):
+        self.get(1, user_id='1', course_id='course/A')
+        self.get(1, user_id='2', course_id='course/A')
+        self.get(2, user_id='1', mark_as_read=True)
+        self.get(1, user_id='1', course_id='course/A')
+        self.get(1, user_id='2', course_id='course/A')
+        # only the responses of the user who read the thread were requested again
+        self.assertEqual(self.requested(), 4)
+
+    def test_invalidated_by_user_writes(self):
+        self.get(1, user_id='1', course_id='course/A')
+        self.get(1, user_id='1', course_id='course/B')
+        utils.perform_request('put', '{}/2'.format(self.server.url), {'course_id': 'course/A', 'user_id': '1'})
+        self.get(1, user_id='1', course_id='course/B')
+        self.assertEqual(self.requested(), 3)
+
+    def test_disabled(self):
+        with override_settings(COMMENTS_SERVICE_CACHE_TIMEOUT=0):
+            self.get(1)
+            self.get(1)
+        self.assertEqual(self.requested(), 2)
+
+    def test_invalidated_by_course_writes(self):
+        threads = [('1', 'course/A'), ('2', 'course/B'), ('3', None)]
+
+        def get_all():
+            """
+            Request the threads, some of them about courses.
+            """
+            for thread_id, course_id in threads:
+                self.get(thread_id, **({'course_id': course_id} if course_id else {}))
+
+        get_all()
+        utils.perform_request('put', '{}/1'.format(self.server.url), {'course_id': 'course/A', 'title': 'New'})
+        get_all()
+        # the thread of course B was cached
+        self.assertEqual(
+            sorted(path.split('?')[0].split('/')[-1] for method, path in self.server.requests if method == 'GET'),
+            ['1', '1', '2', '3', '3']
+        )
+
+    def test_invalidated_by_writes_without_course(self):
+        self.get(1, course_id='course/A')
+        self.get(2)
+        Thread(id='1').save()
+        self.assertEqual(self.requested('PUT'), 1)
+        self.get(1, course_id='course/A')
+        self.get(2)
+        self.assertEqual(self.requested(), 4)
+
+    def test_vote_invalidates_its_course(self):
+        self.get(1, course_id='course/A')
+        self.get(2, course_id='course/B')
+        with mock.patch('lms.lib.comment_client.user.settings.PREFIX', self.server.url):
+            User(id='1').vote(Thread(id='1'), 'up', course_id='course/A')
+        self.assertEqual(self.requested('PUT'), 1)
+        self.get(1, course_id='course/A')
+        self.get(2, course_id='course/B')
+        # only the responses about course A were requested again
+        self.assertEqual(self.requested(), 3)
@@ -0,0 +1,67 @@
+"""
+Generate a grade report for a course in a pool of local processes.
+
+This is useful for very large courses, whose reports take too long to
+generate in a single celery task.
+"""
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from instructor_task.tasks_helper import REPORT_SHARD_ROW_FUNCTIONS, generate_report_in_process_pool
+
+
+class Command(BaseCommand):
+    """
+    Generate a grade report for a course, grading shards of its enrolled
+    students in parallel processes, and store it in the report store.
+    """
+    args = "<course_id>"
+    help = __doc__
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '-p',
+            '--processes',
+            type='int',
+            dest='processes',
+            default=4,
+            help='Number of processes grading students'
+        ),
+        make_option(
+            '-s',
+            '--students-per-shard',
+            type='int',
+            dest='students_per_shard',
+            default=500,
+            help='Number of students graded by a process at a time'
+        ),
+        make_option(
+            '-r',
+            '--report',
+            dest='report',
+            default='grade_report',
+            help='Report to generate: one of {}'.format(', '.join(sorted(REPORT_SHARD_ROW_FUNCTIONS)))
+        ),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError("generate_grade_report requires one argument: <course_id>")
+
+        try:
+            course_id = CourseKey.from_string(args[0])
+        except InvalidKeyError:
+            raise CommandError("Invalid course_id: '{}'".format(args[0]))
+
+        if options['report'] not in REPORT_SHARD_ROW_FUNCTIONS:
+            raise CommandError("Unknown report: '{}'".format(options['report']))
+        if options['processes'] < 1 or options['students_per_shard'] < 1:
+            raise CommandError("--processes and --students-per-shard must be positive")
+
+        succeeded, failed = generate_report_in_process_pool(
+            options['report'], course_id, options['processes'], options['students_per_shard']
+        )
+        self.stdout.write("Graded {} students successfully and {} unsuccessfully\n".format(succeeded, failed))
@@ -197,6 +197,10 @@ class ReportStore(object):
     can simply be appended to for the sake of memory efficiency, rather than
     passing in the whole dataset. Doing that for now just because it's simpler.
     """
+    # Files whose names start with this prefix hold part of a report that is
+    # being generated in shards. They are not listed by `links_for`.
+    PARTIAL_REPORT_PREFIX = u'partial_'
+
     @classmethod
     def from_config(cls):
         """
@@ -218,6 +222,20 @@ class ReportStore(object):
         for row in rows:
             yield [unicode(item).encode('utf-8') for item in row]
 
+    def _get_unicode_decoded_rows(self, rows):
+        """
+        Given an iterable of `rows` read from a CSV file, return a new list of
+        rows with their utf-8 encoded strings decoded to unicode.
+        """
+        return [[item.decode('utf-8') for item in row] for row in rows]
+
+    @classmethod
+    def _is_partial_report(cls, filename):
+        """
+        Return whether `filename` names part of a report generated in shards.
+        """
+        return filename.startswith(cls.PARTIAL_REPORT_PREFIX)
+
 
 class S3ReportStore(ReportStore):
     """
@@ -322,6 +340,23 @@ class S3ReportStore(ReportStore):
 
         self.store(course_id, filename, output_buffer)
 
+    def load_rows(self, course_id, filename):
+        """
+        Return the rows of the csv file stored by `store_rows` under `course_id`
+        and `filename`, or None if there is no such file.
+        """
+        key = self.bucket.get_key(self.key_for(course_id, filename).key)
+        if key is None:
+            return None
+        gzip_file = GzipFile(fileobj=StringIO(key.get_contents_as_string()), mode="rb")
+        return self._get_unicode_decoded_rows(csv.reader(gzip_file))
+
+    def delete(self, course_id, filename):
+        """
+        Delete the file stored under `course_id` and `filename`, if any.
+        """
+        self.bucket.delete_key(self.key_for(course_id, filename).key)
+
     def links_for(self, course_id):
         """
         For a given `course_id`, return a list of `(filename, url)` tuples. `url`
@@ -331,6 +366,7 @@ class S3ReportStore(ReportStore):
         return [
             (key.key.split("/")[-1], key.generate_url(expires_in=300))
             for key in sorted(self.bucket.list(prefix=course_dir.key), reverse=True, key=lambda k: k.last_modified)
+            if not self._is_partial_report(key.key.split("/")[-1])
         ]
 
 
@@ -397,6 +433,25 @@ class LocalFSReportStore(ReportStore):
 
         self.store(course_id, filename, output_buffer)
 
+    def load_rows(self, course_id, filename):
+        """
+        Return the rows of the csv file written by `store_rows` for `course_id`
+        and `filename`, or None if there is no such file.
+        """
+        full_path = self.path_to(course_id, filename)
+        if not os.path.exists(full_path):
+            return None
+        with open(full_path, "rb") as f:
+            return self._get_unicode_decoded_rows(csv.reader(f))
+
+    def delete(self, course_id, filename):
+        """
+        Delete the file written for `course_id` and `filename`, if any.
+        """
+        full_path = self.path_to(course_id, filename)
+        if os.path.exists(full_path):
+            os.remove(full_path)
+
     def links_for(self, course_id):
         """
         For a given `course_id`, return a list of `(filename, url)` tuples. `url`
@@ -408,7 +463,11 @@ class LocalFSReportStore(ReportStore):
         course_dir = self.path_to(course_id, '')
         if not os.path.exists(course_dir):
             return []
-        files = [(filename, os.path.join(course_dir, filename)) for filename in os.listdir(course_dir)]
+        files = [
+            (filename, os.path.join(course_dir, filename))
+            for filename in os.listdir(course_dir)
+            if not self._is_partial_report(filename)
+        ]
         files.sort(key=lambda (filename, full_path): os.path.getmtime(full_path), reverse=True)
 
         return [
@@ -36,6 +36,7 @@ from instructor_task.tasks_helper import (
     delete_problem_module_state,
     upload_grades_csv,
     upload_problem_grade_report,
+    run_report_shard_subtask,
     upload_students_csv,
     cohort_students_and_upload
 )
@@ -152,7 +153,7 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
         xmodule_instance_args.get('task_id'), entry_id, action_name
     )
 
-    task_fn = partial(upload_grades_csv, xmodule_instance_args)
+    task_fn = partial(upload_grades_csv, xmodule_instance_args, shard_task=generate_report_shard)
     return run_main_task(entry_id, task_fn, action_name)
 
 
@@ -169,10 +170,23 @@ def calculate_problem_grade_report(entry_id, xmodule_instance_args):
         xmodule_instance_args.get('task_id'), entry_id, action_name
     )
 
-    task_fn = partial(upload_problem_grade_report, xmodule_instance_args)
+    task_fn = partial(upload_problem_grade_report, xmodule_instance_args, shard_task=generate_report_shard)
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def generate_report_shard(entry_id, report_name, report_id, shard_index, student_ids, timestamp, subtask_status_dict):
+    """
+    Generate the part of a grade report for the students with `student_ids`,
+    as queued by `calculate_grades_csv` or `calculate_problem_grade_report`
+    for courses with more than `settings.GRADES_DOWNLOAD_STUDENTS_PER_SHARD`
+    enrolled students.
+    """
+    return run_report_shard_subtask(
+        entry_id, report_name, report_id, shard_index, student_ids, timestamp, subtask_status_dict
+    )
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
 def calculate_students_features_csv(entry_id, xmodule_instance_args):
     """
@@ -7,22 +7,28 @@ import json
 from collections import OrderedDict
 from datetime import datetime
 from eventtracking import tracker
-from itertools import chain
+from itertools import chain, count
 from time import time
+from traceback import format_exc
+from uuid import uuid4
+import multiprocessing
 import unicodecsv
 import logging
 
 from celery import Task, current_task
 from celery.states import SUCCESS, FAILURE
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.files.storage import DefaultStorage
+from django import db
 from django.db import transaction, reset_queries
 import dogstats_wrapper as dog_stats_api
 from pytz import UTC
 
 from track.views import task_track
 from util.file import course_filename_prefix_generator, UniversalNewlineIterator
-from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.django import modulestore, clear_existing_modulestores
 from xmodule.split_test_module import get_split_user_partitions
 
 from certificates.models import CertificateWhitelist, certificate_info_for_user
@@ -34,11 +40,17 @@ from courseware.module_render import get_module_for_descriptor_internal
 from instructor_analytics.basic import enrolled_students_features
 from instructor_analytics.csvs import format_dictlist
 from instructor_task.models import ReportStore, InstructorTask, PROGRESS
+from instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    queue_subtasks_for_query,
+    update_subtask_status,
+)
 from lms.djangoapps.lms_xblock.runtime import LmsPartitionService
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
 from openedx.core.djangoapps.content.course_structures.models import CourseStructure
-from opaque_keys.edx.keys import UsageKey
+from opaque_keys.edx.keys import CourseKey, UsageKey
 from openedx.core.djangoapps.course_groups.cohorts import add_user_to_cohort, is_course_cohorted
 from student.models import CourseEnrollment
 from verify_student.models import SoftwareSecurePhotoVerification
@@ -58,6 +70,9 @@ UPDATE_STATUS_SKIPPED = 'skipped'
 # The setting name used for events when "settings" (account settings, preferences, profile information) change.
 REPORT_REQUESTED_EVENT_NAME = u'edx.instructor.report.requested'
 
+# Format used to pass the start date of a report generated in shards to its subtasks.
+PARTIAL_REPORT_DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
 
 class BaseInstructorTask(Task):
     """
@@ -182,18 +197,10 @@ class TaskProgress(object):
         self.skipped = 0
         self.failed = 0
 
-    def update_task_state(self, extra_meta=None):
+    def get_progress_dict(self, extra_meta=None):
         """
-        Update the current celery task's state to the progress state
-        specified by the current object.  Returns the progress
-        dictionary for use by `run_main_task` and
-        `BaseInstructorTask.on_success`.
-
-        Arguments:
-            extra_meta (dict): Extra metadata to pass to `update_state`
-
-        Returns:
-            dict: The current task's progress dict
+        Return the progress dictionary for the current object, updated
+        with `extra_meta` if given.
         """
         progress_dict = {
             'action_name': self.action_name,
@@ -206,10 +213,41 @@ class TaskProgress(object):
         }
         if extra_meta is not None:
             progress_dict.update(extra_meta)
+        return progress_dict
+
+    def update_task_state(self, extra_meta=None):
+        """
+        Update the current celery task's state to the progress state
+        specified by the current object.  Returns the progress
+        dictionary for use by `run_main_task` and
+        `BaseInstructorTask.on_success`.
+
+        Arguments:
+            extra_meta (dict): Extra metadata to pass to `update_state`
+
+        Returns:
+            dict: The current task's progress dict
+        """
+        progress_dict = self.get_progress_dict(extra_meta)
         _get_current_task().update_state(state=PROGRESS, meta=progress_dict)
         return progress_dict
 
 
+class LocalTaskProgress(TaskProgress):
+    """
+    TaskProgress for work done outside of a celery task, such as a report
+    shard generated in a local process pool. Its progress is only logged.
+    """
+    def update_task_state(self, extra_meta=None):
+        """
+        Log the progress state specified by the current object, and return
+        the progress dictionary.
+        """
+        progress_dict = self.get_progress_dict(extra_meta)
+        TASK_LOG.info(u'Local task progress: %s', progress_dict)
+        return progress_dict
+
+
 def run_main_task(entry_id, task_fcn, action_name):
     """
     Applies the `task_fcn` to the arguments defined in `entry_id` InstructorTask.
@@ -559,7 +597,9 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp):
     tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": csv_name, })
 
 
-def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):  # pylint: disable=too-many-statements
+def upload_grades_csv(
+        _xmodule_instance_args, _entry_id, course_id, _task_input, action_name, shard_task=None
+):  # pylint: disable=bad-continuation
     """
     For a given `course_id`, generate a grades CSV file for all students that
     are enrolled, and store using a `ReportStore`. Once created, the files can
@@ -568,13 +608,17 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     buffered, so we'll never write part of a CSV file to S3 -- i.e. any files
     that are visible in ReportStore will be complete ones.
 
+    If `shard_task` is given and the course has more enrolled students than
+    `settings.GRADES_DOWNLOAD_STUDENTS_PER_SHARD`, the students are instead
+    split into shards which are graded by `shard_task` subtasks (see
+    `queue_report_shards`).
+
     As we start to add more CSV downloads, it will probably be worthwhile to
     make a more general CSVDoc class instead of building out the rows like we
     do here.
     """
     start_time = time()
     start_date = datetime.now(UTC)
-    status_interval = 100
     enrolled_students = CourseEnrollment.users_enrolled_in(course_id)
     task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
 
@@ -587,6 +631,39 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     )
     TASK_LOG.info(u'%s, Task type: %s, Starting task execution', task_info_string, action_name)
 
+    if shard_task is not None and _should_shard_report(task_progress.total):
+        return queue_report_shards(
+            shard_task, 'grade_report', _entry_id, action_name, enrolled_students, task_progress.total, start_date
+        )
+
+    rows, err_rows = _grade_report_rows(course_id, enrolled_students, task_progress, task_info_string)
+
+    # By this point, we've got the rows we're going to stuff into our CSV files.
+    current_step = {'step': 'Uploading CSVs'}
+    task_progress.update_task_state(extra_meta=current_step)
+    TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
+
+    # Perform the actual upload
+    upload_csv_to_report_store(rows, 'grade_report', course_id, start_date)
+
+    # If there are any error rows (don't count the header), write them out as well
+    if len(err_rows) > 1:
+        upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
+
+    # One last update before we close out...
+    TASK_LOG.info(u'%s, Task type: %s, Finalizing grade task', task_info_string, action_name)
+    return task_progress.update_task_state(extra_meta=current_step)
+
+
+def _grade_report_rows(course_id, students, task_progress, task_info_string):  # pylint: disable=too-many-statements
+    """
+    Grade `students` in the course with `course_id`, and return the rows of
+    the grade report and of its error report for them, each starting with its
+    header row. If no student could be graded, the grade report rows are empty.
+    """
+    status_interval = 100
+    action_name = task_progress.action_name
+
     course = get_course_by_id(course_id)
     course_is_cohorted = is_course_cohorted(course.id)
     cohorts_header = ['Cohort Name'] if course_is_cohorted else []
@@ -604,16 +681,18 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     err_rows = [["id", "username", "error_msg"]]
     current_step = {'step': 'Calculating Grades'}
 
-    total_enrolled_students = enrolled_students.count()
+    total_students = task_progress.total
     student_counter = 0
     TASK_LOG.info(
         u'%s, Task type: %s, Current step: %s, Starting grade calculation for total students: %s',
         task_info_string,
         action_name,
         current_step,
-        total_enrolled_students
+        total_students
     )
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students):
+    for student, gradeset, err_msg in iterate_grades_for(
+            course_id, students, chunk_size=settings.GRADES_DOWNLOAD_CHUNK_SIZE
+    ):
         # Periodically update task status (this is a cache write)
         if task_progress.attempted % status_interval == 0:
             task_progress.update_task_state(extra_meta=current_step)
@@ -628,7 +707,7 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
             action_name,
             current_step,
             student_counter,
-            total_enrolled_students
+            total_students
         )
 
         if gradeset:
@@ -693,24 +772,9 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
         action_name,
         current_step,
         student_counter,
-        total_enrolled_students
+        total_students
     )
-
-    # By this point, we've got the rows we're going to stuff into our CSV files.
-    current_step = {'step': 'Uploading CSVs'}
-    task_progress.update_task_state(extra_meta=current_step)
-    TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
-
-    # Perform the actual upload
-    upload_csv_to_report_store(rows, 'grade_report', course_id, start_date)
-
-    # If there are any error rows (don't count the header), write them out as well
-    if len(err_rows) > 1:
-        upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
-
-    # One last update before we close out...
-    TASK_LOG.info(u'%s, Task type: %s, Finalizing grade task', task_info_string, action_name)
-    return task_progress.update_task_state(extra_meta=current_step)
+    return rows, err_rows
 
 
 def _order_problems(blocks):
@@ -763,37 +827,72 @@ def _order_problems(blocks):
     return problems
 
 
-def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+def upload_problem_grade_report(
+        _xmodule_instance_args, _entry_id, course_id, _task_input, action_name, shard_task=None
+):  # pylint: disable=bad-continuation
     """
     Generate a CSV containing all students' problem grades within a given
     `course_id`.
+
+    If `shard_task` is given, large courses are graded in shards as in
+    `upload_grades_csv`.
     """
     start_time = time()
     start_date = datetime.now(UTC)
-    status_interval = 100
     enrolled_students = CourseEnrollment.users_enrolled_in(course_id)
     task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
 
+    if not CourseStructure.objects.filter(course_id=course_id).exists():
+        return task_progress.update_task_state(
+            extra_meta={'step': 'Generating course structure. Please refresh and try again.'}
+        )
+
+    if shard_task is not None and _should_shard_report(task_progress.total):
+        return queue_report_shards(
+            shard_task, 'problem_grade_report', _entry_id, action_name, enrolled_students, task_progress.total,
+            start_date
+        )
+
+    rows, error_rows = _problem_grade_report_rows(course_id, enrolled_students, task_progress, None)
+
+    # Perform the upload if any students have been successfully graded
+    if len(rows) > 1:
+        upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
+    # If there are any error rows, write them out as well
+    if len(error_rows) > 1:
+        upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
+
+    return task_progress.update_task_state(extra_meta={'step': 'Uploading CSV'})
+
+
+def _problem_grade_report_rows(course_id, students, task_progress, _task_info_string):
+    """
+    Grade `students` in the course with `course_id`, and return the rows of
+    the problem grade report and of its error report for them, each starting
+    with its header row.
+
+    Raises CourseStructure.DoesNotExist if the course structure has not been
+    generated yet.
+    """
+    status_interval = 100
+
     # This struct encapsulates both the display names of each static item in the
     # header row as values as well as the django User field names of those items
     # as the keys.  It is structured in this way to keep the values related.
     header_row = OrderedDict([('id', 'Student ID'), ('email', 'Email'), ('username', 'Username')])
 
-    try:
-        course_structure = CourseStructure.objects.get(course_id=course_id)
-        blocks = course_structure.ordered_blocks
-        problems = _order_problems(blocks)
-    except CourseStructure.DoesNotExist:
-        return task_progress.update_task_state(
-            extra_meta={'step': 'Generating course structure. Please refresh and try again.'}
-        )
+    course_structure = CourseStructure.objects.get(course_id=course_id)
+    blocks = course_structure.ordered_blocks
+    problems = _order_problems(blocks)
 
     # Just generate the static fields for now.
     rows = [list(header_row.values()) + ['Final Grade'] + list(chain.from_iterable(problems.values()))]
     error_rows = [list(header_row.values()) + ['error_msg']]
     current_step = {'step': 'Calculating Grades'}
 
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students, keep_raw_scores=True):
+    for student, gradeset, err_msg in iterate_grades_for(
+            course_id, students, keep_raw_scores=True, chunk_size=settings.GRADES_DOWNLOAD_CHUNK_SIZE
+    ):
         student_fields = [getattr(student, field_name) for field_name in header_row]
         task_progress.attempted += 1
 
@@ -824,14 +923,278 @@ def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _t
         if task_progress.attempted % status_interval == 0:
             task_progress.update_task_state(extra_meta=current_step)
 
-    # Perform the upload if any students have been successfully graded
-    if len(rows) > 1:
-        upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
-    # If there are any error rows, write them out as well
-    if len(error_rows) > 1:
-        upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
+    return rows, error_rows
 
-    return task_progress.update_task_state(extra_meta={'step': 'Uploading CSV'})
+
+# Reports that can be generated in shards, mapped to the function that
+# returns the report's rows and error rows for a subset of the students.
+REPORT_SHARD_ROW_FUNCTIONS = {
+    'grade_report': _grade_report_rows,
+    'problem_grade_report': _problem_grade_report_rows,
+}
+
+
+# The header of the error report of each report that can be generated in
+# shards, and the fields of the students starting each of its rows.
+REPORT_SHARD_ERROR_FIELDS = {
+    'grade_report': (['id', 'username', 'error_msg'], ['id', 'username']),
+    'problem_grade_report': (['Student ID', 'Email', 'Username', 'error_msg'], ['id', 'email', 'username']),
+}
+
+
+# Merged reports uploaded even if they have no rows besides their header, as
+# the unsharded grade report is; the others are only uploaded with data.
+ALWAYS_UPLOADED_REPORTS = ('grade_report',)
+
+
+class ReportShardMissingError(Exception):
+    """
+    Error signaling that a partial report to merge was never stored.
+    """
+    pass
+
+
+def _should_shard_report(total_num_students):
+    """
+    Return whether a report for `total_num_students` students should be
+    generated in shards.
+    """
+    students_per_shard = settings.GRADES_DOWNLOAD_STUDENTS_PER_SHARD
+    return bool(students_per_shard) and total_num_students > students_per_shard
+
+
+def _partial_report_filename(report_name, report_id, shard_index, suffix=''):
+    """
+    Return the name of the file holding the rows of shard `shard_index` of a
+    report (or of its error report, if `suffix` is '_err').
+    """
+    return u"{prefix}{report_name}{suffix}_{report_id}_{shard_index}.csv".format(
+        prefix=ReportStore.PARTIAL_REPORT_PREFIX,
+        report_name=report_name,
+        suffix=suffix,
+        report_id=report_id,
+        shard_index=shard_index,
+    )
+
+
+def queue_report_shards(shard_task, report_name, entry_id, action_name, students, total_num_students, start_date):
+    """
+    Split `students` into shards of `settings.GRADES_DOWNLOAD_STUDENTS_PER_SHARD`
+    students, and queue a `shard_task` subtask for each of them. Each subtask
+    calls `run_report_shard_subtask`, and the last one to finish merges the
+    partial reports they wrote.
+
+    Returns the progress of the InstructorTask with `entry_id`, which is
+    updated as each of the subtasks completes.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    report_id = uuid4().hex
+    shard_indexes = count()
+
+    def create_shard_subtask(item_list, subtask_status):
+        """Create a subtask generating the report for the students in `item_list`."""
+        return shard_task.subtask(
+            (
+                entry_id,
+                report_name,
+                report_id,
+                next(shard_indexes),
+                [item['pk'] for item in item_list],
+                start_date.strftime(PARTIAL_REPORT_DATE_FORMAT),
+                subtask_status.to_dict(),
+            ),
+            task_id=subtask_status.task_id,
+            routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+        )
+
+    return queue_subtasks_for_query(
+        entry,
+        action_name,
+        create_shard_subtask,
+        [students],
+        [],
+        settings.GRADES_DOWNLOAD_STUDENTS_PER_SHARD,
+        total_num_students,
+    )
+
+
+def generate_report_shard(report_name, course_id, report_id, shard_index, student_ids, task_progress):
+    """
+    Generate the rows of the `report_name` report for the students with
+    `student_ids`, and store them (and their error rows) as partial reports.
+    """
+    task_info_string = u'Report: {report_name}, Course: {course_id}, Shard: {shard_index}'.format(
+        report_name=report_name,
+        course_id=course_id,
+        shard_index=shard_index,
+    )
+    students = User.objects.filter(id__in=student_ids).order_by('id')
+    rows, err_rows = REPORT_SHARD_ROW_FUNCTIONS[report_name](course_id, students, task_progress, task_info_string)
+
+    report_store = ReportStore.from_config()
+    report_store.store_rows(course_id, _partial_report_filename(report_name, report_id, shard_index), rows)
+    report_store.store_rows(course_id, _partial_report_filename(report_name, report_id, shard_index, '_err'), err_rows)
+    return task_progress
+
+
+def store_failed_report_shard(report_name, course_id, report_id, shard_index, student_ids, err_msg):
+    """
+    Store the partial reports of a shard that failed to be generated, listing
+    all of the students with `student_ids` in the error report with `err_msg`.
+    """
+    header, fields = REPORT_SHARD_ERROR_FIELDS[report_name]
+    students = User.objects.filter(id__in=student_ids).order_by('id')
+    err_rows = [header] + [[getattr(student, field) for field in fields] + [err_msg] for student in students]
+
+    report_store = ReportStore.from_config()
+    report_store.store_rows(course_id, _partial_report_filename(report_name, report_id, shard_index), [])
+    report_store.store_rows(course_id, _partial_report_filename(report_name, report_id, shard_index, '_err'), err_rows)
+
+
+def merge_report_shards(report_name, course_id, report_id, num_shards, start_date):
+    """
+    Concatenate the partial reports stored by `generate_report_shard` for
+    each of the `num_shards` shards into the final report and error report,
+    and delete the partial reports. Only the reports in
+    ALWAYS_UPLOADED_REPORTS are uploaded when they have no data rows.
+
+    Raises ReportShardMissingError, without storing any report, if one of
+    the partial reports is missing.
+    """
+    report_store = ReportStore.from_config()
+    reports = []
+    for suffix in ('', '_err'):
+        rows = []
+        for shard_index in xrange(num_shards):
+            filename = _partial_report_filename(report_name, report_id, shard_index, suffix)
+            shard_rows = report_store.load_rows(course_id, filename)
+            if shard_rows is None:
+                raise ReportShardMissingError(
+                    u'Partial report {} of course {} is missing'.format(filename, course_id)
+                )
+            # Every non-empty partial report starts with its own header row
+            rows.extend(shard_rows if not rows else shard_rows[1:])
+        reports.append((suffix, rows))
+
+    for suffix, rows in reports:
+        if len(rows) > 1 or report_name + suffix in ALWAYS_UPLOADED_REPORTS:
+            upload_csv_to_report_store(rows, report_name + suffix, course_id, start_date)
+        for shard_index in xrange(num_shards):
+            report_store.delete(course_id, _partial_report_filename(report_name, report_id, shard_index, suffix))
+
+
+def run_report_shard_subtask(entry_id, report_name, report_id, shard_index, student_ids, timestamp,
+                             subtask_status_dict):
+    """
+    Generate shard `shard_index` of a report queued by `queue_report_shards`,
+    record its progress in the parent InstructorTask, and merge the partial
+    reports if it is the last shard to finish.
+
+    The students of a shard that fails are listed in the error report.  The
+    parent InstructorTask is only marked as succeeded once the partial
+    reports are merged, or as failed if they can't be.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    task_progress = TaskProgress(report_name, len(student_ids), time())
+    try:
+        generate_report_shard(report_name, entry.course_id, report_id, shard_index, student_ids, task_progress)
+        subtask_status.increment(succeeded=task_progress.succeeded, failed=task_progress.failed, state=SUCCESS)
+    except Exception as exception:  # pylint: disable=broad-except
+        TASK_LOG.exception(u'Shard %s of %s for InstructorTask %s failed', shard_index, report_name, entry_id)
+        subtask_status.increment(failed=len(student_ids), state=FAILURE)
+        try:
+            store_failed_report_shard(
+                report_name, entry.course_id, report_id, shard_index, student_ids, unicode(exception)
+            )
+        except Exception:  # pylint: disable=broad-except
+            # the merge will find the partial reports missing, and fail the task
+            TASK_LOG.exception(u'Unable to store the failure of shard %s of %s', shard_index, report_name)
+    update_subtask_status(entry_id, current_task_id, subtask_status, complete_parent=False)
+
+    subtasks = json.loads(InstructorTask.objects.get(pk=entry_id).subtasks)
+    shards_done = subtasks['succeeded'] + subtasks['failed']
+    # cache.add fails if the key already exists, so only one shard merges
+    if shards_done >= subtasks['total'] and cache.add(u'report-merge-{}'.format(report_id), 'true', 60 * 10):
+        start_date = datetime.strptime(timestamp, PARTIAL_REPORT_DATE_FORMAT).replace(tzinfo=UTC)
+        entry = InstructorTask.objects.get(pk=entry_id)
+        try:
+            merge_report_shards(report_name, entry.course_id, report_id, subtasks['total'], start_date)
+        except Exception as exception:  # pylint: disable=broad-except
+            TASK_LOG.exception(u'Merging the shards of %s for InstructorTask %s failed', report_name, entry_id)
+            entry.task_output = InstructorTask.create_output_for_failure(exception, format_exc())
+            entry.task_state = FAILURE
+        else:
+            entry.task_state = SUCCESS
+        entry.save_now()
+
+    return subtask_status.to_dict()
+
+
+def _init_report_shard_process():
+    """
+    Prepare a freshly forked process of `generate_report_in_process_pool`,
+    which must not share database or modulestore connections with its parent.
+    """
+    db.close_connection()
+    clear_existing_modulestores()
+
+
+def _generate_report_shard_in_process(args):
+    """
+    Generate a report shard in a process of `generate_report_in_process_pool`,
+    returning the number of students graded successfully and unsuccessfully.
+
+    The students of a shard that fails are listed in the error report, and
+    counted as failed.
+    """
+    report_name, course_id, report_id, shard_index, student_ids = args
+    course_key = CourseKey.from_string(course_id)
+    task_progress = LocalTaskProgress(report_name, len(student_ids), time())
+    try:
+        generate_report_shard(report_name, course_key, report_id, shard_index, student_ids, task_progress)
+    except Exception as exception:  # pylint: disable=broad-except
+        TASK_LOG.exception(u'Shard %s of %s for course %s failed', shard_index, report_name, course_id)
+        try:
+            store_failed_report_shard(report_name, course_key, report_id, shard_index, student_ids, unicode(exception))
+        except Exception:  # pylint: disable=broad-except
+            # the merge will find the partial reports missing, and fail the report
+            TASK_LOG.exception(u'Unable to store the failure of shard %s of %s', shard_index, report_name)
+        return 0, len(student_ids)
+    return task_progress.succeeded, task_progress.failed
+
+
+def generate_report_in_process_pool(report_name, course_id, num_processes, students_per_shard):
+    """
+    Generate the `report_name` report for all students enrolled in the course
+    with `course_id`, grading shards of `students_per_shard` students in a
+    pool of `num_processes` local processes rather than in Celery subtasks.
+
+    Returns the total numbers of students graded successfully and
+    unsuccessfully.
+    """
+    start_date = datetime.now(UTC)
+    report_id = uuid4().hex
+    student_ids = list(CourseEnrollment.users_enrolled_in(course_id).order_by('id').values_list('id', flat=True))
+    shards = [
+        (report_name, unicode(course_id), report_id, shard_index, student_ids[start:start + students_per_shard])
+        for shard_index, start in enumerate(xrange(0, len(student_ids), students_per_shard))
+    ]
+
+    # Forked processes must open their own database connections
+    db.close_connection()
+    pool = multiprocessing.Pool(num_processes, initializer=_init_report_shard_process)
+    try:
+        results = pool.map(_generate_report_shard_in_process, shards)
+    finally:
+        pool.close()
+        pool.join()
+
+    merge_report_shards(report_name, course_id, report_id, len(shards), start_date)
+    return sum(succeeded for succeeded, _ in results), sum(failed for _, failed in results)
 
 
 def upload_students_csv(_xmodule_instance_args, _entry_id, course_id, task_input, action_name):
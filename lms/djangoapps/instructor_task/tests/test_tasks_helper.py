@@ -6,8 +6,13 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 Tests that CSV grade report generation works with unicode emails.
 
 """
+from datetime import datetime
+from time import time
+import os
+
 import ddt
 from mock import Mock, patch
+from pytz import UTC
 import tempfile
 import unicodecsv
 
@@ -26,7 +31,16 @@ from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.partitions.partitions import Group, UserPartition
 from instructor_task.models import ReportStore
 from instructor_task.tasks_helper import (
-    cohort_students_and_upload, upload_grades_csv, upload_problem_grade_report, upload_students_csv
+    _generate_report_shard_in_process,
+    cohort_students_and_upload,
+    generate_report_shard,
+    merge_report_shards,
+    store_failed_report_shard,
+    upload_grades_csv,
+    upload_problem_grade_report,
+    upload_students_csv,
+    LocalTaskProgress,
+    ReportShardMissingError,
 )
 from openedx.core.djangoapps.util.testing import ContentGroupTestCase, TestConditionalContent
 
@@ -264,6 +278,90 @@ class TestInstructorGradeReport(TestReportMixin, InstructorTaskCourseTestCase):
         self.assertDictContainsSubset({'attempted': 1, 'succeeded': 1, 'failed': 0}, result)
 
 
+class TestShardedGradeReport(TestReportMixin, InstructorTaskCourseTestCase):
+    """
+    Tests that grade reports generated in shards are merged correctly.
+    """
+    def setUp(self):
+        super(TestShardedGradeReport, self).setUp()
+        self.course = CourseFactory.create()
+
+    def test_merge_report_shards(self):
+        students = [self.create_student('student{}'.format(i), 'student{}@example.com'.format(i)) for i in range(3)]
+        shards = [[students[0].id, students[1].id], [students[2].id]]
+        for shard_index, student_ids in enumerate(shards):
+            task_progress = LocalTaskProgress('graded', len(student_ids), time())
+            generate_report_shard('grade_report', self.course.id, 'report', shard_index, student_ids, task_progress)
+            self.assertEqual(task_progress.succeeded, len(student_ids))
+
+        report_store = ReportStore.from_config()
+        # partial reports are not listed as downloadable reports
+        self.assertEqual(report_store.links_for(self.course.id), [])
+
+        merge_report_shards('grade_report', self.course.id, 'report', len(shards), datetime.now(UTC))
+        links = report_store.links_for(self.course.id)
+        self.assertEqual(len(links), 1)
+        self.assertIn('grade_report', links[0][0])
+        self.verify_rows_in_csv(
+            [{'id': unicode(student.id), 'username': student.username} for student in students],
+            ignore_other_columns=True,
+        )
+        # partial reports are deleted once merged
+        self.assertEqual(os.listdir(report_store.path_to(self.course.id, '')), [links[0][0]])
+
+    def test_merge_failed_report_shard(self):
+        students = [self.create_student('student{}'.format(i), 'student{}@example.com'.format(i)) for i in range(2)]
+        task_progress = LocalTaskProgress('graded', 1, time())
+        generate_report_shard('grade_report', self.course.id, 'report', 0, [students[0].id], task_progress)
+        store_failed_report_shard('grade_report', self.course.id, 'report', 1, [students[1].id], 'Shard failed')
+
+        merge_report_shards('grade_report', self.course.id, 'report', 2, datetime.now(UTC))
+        report_store = ReportStore.from_config()
+        filenames = sorted(filename for filename, __ in report_store.links_for(self.course.id))
+        self.assertEqual(len(filenames), 2)
+        self.assertIn('grade_report_err', filenames[1])
+        with open(report_store.path_to(self.course.id, filenames[1])) as csv_file:
+            self.assertEqual(
+                list(unicodecsv.DictReader(csv_file)),
+                [{'id': unicode(students[1].id), 'username': students[1].username, 'error_msg': 'Shard failed'}],
+            )
+
+    def test_merge_missing_report_shard(self):
+        student = self.create_student('student', 'student@example.com')
+        task_progress = LocalTaskProgress('graded', 1, time())
+        generate_report_shard('grade_report', self.course.id, 'report', 0, [student.id], task_progress)
+
+        with self.assertRaises(ReportShardMissingError):
+            merge_report_shards('grade_report', self.course.id, 'report', 2, datetime.now(UTC))
+        self.assertEqual(ReportStore.from_config().links_for(self.course.id), [])
+
+    def test_failed_shard_in_process(self):
+        students = [self.create_student('student{}'.format(i), 'student{}@example.com'.format(i)) for i in range(2)]
+        shard = ('grade_report', unicode(self.course.id), 'report', 0, [student.id for student in students])
+        with patch('instructor_task.tasks_helper.generate_report_shard', side_effect=Exception('Shard failed')):
+            self.assertEqual(_generate_report_shard_in_process(shard), (0, 2))
+
+        merge_report_shards('grade_report', self.course.id, 'report', 1, datetime.now(UTC))
+        report_store = ReportStore.from_config()
+        filenames = sorted(filename for filename, __ in report_store.links_for(self.course.id))
+        self.assertEqual(len(filenames), 2)
+        with open(report_store.path_to(self.course.id, filenames[1])) as csv_file:
+            self.assertEqual(
+                [row['username'] for row in unicodecsv.DictReader(csv_file)],
+                [student.username for student in students],
+            )
+
+    def test_merge_empty_problem_grade_report(self):
+        student = self.create_student('student', 'student@example.com')
+        store_failed_report_shard('problem_grade_report', self.course.id, 'report', 0, [student.id], 'Shard failed')
+
+        merge_report_shards('problem_grade_report', self.course.id, 'report', 1, datetime.now(UTC))
+        # like the unsharded report, only the error report is uploaded when no student was graded
+        links = ReportStore.from_config().links_for(self.course.id)
+        self.assertEqual(len(links), 1)
+        self.assertIn('problem_grade_report_err', links[0][0])
+
+
 class TestProblemGradeReport(TestReportMixin, InstructorTaskModuleTestCase):
     """
     Test that the problem CSV generation works.
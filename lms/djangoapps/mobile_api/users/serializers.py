@@ -10,7 +10,7 @@ from certificates.models import certificate_status_for_student, CertificateStatu
 
 
 class CourseField(serializers.RelatedField):
-    """Custom field to wrap a CourseDescriptor object. Read-only."""
+    """Custom field to wrap a CourseOverview object. Read-only."""
 
     def to_native(self, course):
         course_id = unicode(course.id)
@@ -68,7 +68,7 @@ class CourseEnrollmentSerializer(serializers.ModelSerializer):
     """
     Serializes CourseEnrollment models
     """
-    course = CourseField()
+    course = CourseField(source='course_overview')
     certificate = serializers.SerializerMethodField('get_certificate')
 
     def get_certificate(self, model):
@@ -17,6 +17,7 @@ from courseware.model_data import FieldDataCache
 from courseware.module_render import get_module_for_descriptor
 from courseware.views import get_current_child, save_positions_recursively_up
 from student.models import CourseEnrollment, User
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 
 from xblock.fields import Scope
 from xblock.runtime import KeyValueStore
@@ -232,13 +233,17 @@ class UserCourseEnrollmentsList(generics.ListAPIView):
     lookup_field = 'username'
 
     def get_queryset(self):
-        enrollments = self.queryset.filter(
+        enrollments = list(self.queryset.filter(
             user__username=self.kwargs['username'],
             is_active=True
-        ).order_by('created').reverse()
+        ).order_by('created').reverse())
+        course_overviews = CourseOverview.get_from_ids([enrollment.course_id for enrollment in enrollments])
+        for enrollment in enrollments:
+            enrollment.course_overview = course_overviews[enrollment.course_id]
         return [
             enrollment for enrollment in enrollments
-            if enrollment.course and is_mobile_available_for_user(self.request.user, enrollment.course)
+            if enrollment.course_overview and
+            is_mobile_available_for_user(self.request.user, enrollment.course_overview)
         ]
 
 
@@ -60,6 +60,21 @@ DISCUSSION_SETTINGS = {
     'MAX_COMMENT_DEPTH': 2,
 }
 
+# Connections of each process to the comments service. At most POOL_MAXSIZE
+# connections are kept open, requests time out after TIMEOUT seconds, and GET
+# requests failing to connect are retried up to MAX_RETRIES times. Other
+# requests are never retried, even when their kept-alive connection was closed.
+COMMENTS_SERVICE_CONNECTION = {
+    'POOL_MAXSIZE': 10,
+    'TIMEOUT': 5,
+    'MAX_RETRIES': 1,
+}
+
+# Seconds during which the results of GET requests to the comments service are
+# cached, or 0 not to cache them. Writes through the comment client invalidate
+# them, but writes of other clients only show once they expire.
+COMMENTS_SERVICE_CACHE_TIMEOUT = 10
+
 
 # Features
 FEATURES = {
@@ -395,6 +410,10 @@ FEATURES = {
 
     # Teams feature
     'ENABLE_TEAMS': False,
+
+    # Persist students' subsection grades so that grading does not need to
+    # instantiate every problem in the course each time
+    'ENABLE_PERSISTENT_SUBSECTION_GRADES': False,
 }
 
 # Ignore static asset files on import which match this pattern
@@ -695,6 +714,28 @@ XBLOCK_SELECT_FUNCTION = prefer_xmodules
 
 MODULESTORE_BRANCH = 'published-only'
 CONTENTSTORE = None
+
+# Local disk cache of course assets too large for memcached, used by
+# StaticContentServer. Cached assets are still checked against their GridFS
+# metadata on each request. Disabled unless ROOT is set to a writable directory.
+STATIC_CONTENT_DISK_CACHE = {
+    'ROOT': None,
+    # Largest asset to cache, in bytes
+    'MAX_ASSET_SIZE': 100 * 1024 * 1024,
+    # Total size of the cached assets, in bytes
+    'MAX_TOTAL_SIZE': 2 * 1024 * 1024 * 1024,
+}
+
+# Per-process cache of the course assets cached in memcached, used by
+# StaticContentServer. Assets are kept for at most TIMEOUT seconds, and are
+# no longer served at most CHECK_INTERVAL seconds after they are changed in
+# Studio. Disabled unless MAX_BYTES is positive.
+STATIC_CONTENT_MEMORY_CACHE = {
+    # Total size of the cached assets, in bytes
+    'MAX_BYTES': 32 * 1024 * 1024,
+    'TIMEOUT': 60,
+    'CHECK_INTERVAL': 5,
+}
 DOC_STORE_CONFIG = {
     'host': 'localhost',
     'db': 'xmodule',
@@ -755,6 +796,18 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Pool of sandboxed Pythons kept running with the modules used by
+    # problems already imported, to avoid starting a new one for every
+    # execution.  A size of 0 disables the pool.
+    'warm_pool': {
+        # How many sandboxed Pythons can each process keep running?
+        'size': 0,
+        # How many executions before a sandboxed Python is replaced?
+        'max_runs': 100,
+        # How many seconds can an execution take?
+        'timeout': 5,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -767,6 +820,11 @@ CODE_JAIL = {
 #   ]
 COURSES_WITH_UNSAFE_CODE = []
 
+# Results of sandboxed code are cached in the 'safe_exec' cache (or the default
+# cache if it isn't configured), behind a per-process LRU cache holding at most
+# this many bytes of results.  0 disables the per-process cache.
+SAFE_EXEC_LOCAL_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
 ############################### DJANGO BUILT-INS ###############################
 # Change DEBUG/TEMPLATE_DEBUG in your environment settings files, not here
 DEBUG = False
@@ -1074,6 +1132,8 @@ MIDDLEWARE_CLASSES = (
     #'django.contrib.auth.middleware.AuthenticationMiddleware',
     'cache_toolbox.middleware.CacheBackedAuthenticationMiddleware',
     'student.middleware.UserStandingMiddleware',
+    # Must go before TransactionMiddleware, to invalidate cached enrollments after commits
+    'student.middleware.EnrollmentCacheMiddleware',
     'contentserver.middleware.StaticContentServer',
     'crum.CurrentRequestUserMiddleware',
 
@@ -1752,6 +1812,7 @@ INSTALLED_APPS = (
     'lms.djangoapps.lms_xblock',
 
     'openedx.core.djangoapps.content.course_structures',
+    'openedx.core.djangoapps.content.course_overviews',
     'course_structure_api',
 
     # Mailchimp Syncing
@@ -1958,6 +2019,14 @@ GRADES_DOWNLOAD = {
     'ROOT_PATH': '/tmp/edx-s3/grades',
 }
 
+# Number of students whose scores are fetched together when generating grade reports
+GRADES_DOWNLOAD_CHUNK_SIZE = 100
+
+# Courses with more enrolled students than this have their grade reports
+# generated by parallel subtasks, each grading this many students.
+# Set to None to always generate grade reports in a single task.
+GRADES_DOWNLOAD_STUDENTS_PER_SHARD = None
+
 
 #### PASSWORD POLICY SETTINGS #####
 PASSWORD_MIN_LENGTH = 8
@@ -2258,6 +2327,11 @@ API_DATE_FORMAT = '%Y-%m-%d'
 # Enrollment API Cache Timeout
 ENROLLMENT_COURSE_DETAILS_CACHE_TIMEOUT = 60
 
+# Seconds for which the state of a user's enrollment in a course is cached
+# in the shared cache, on top of the per-request cache.  Set to 0 to only
+# cache it for the duration of a request.
+COURSE_ENROLLMENT_CACHE_TIMEOUT = 60
+
 # for Student Notes we would like to avoid too frequent token refreshes (default is 30 seconds)
 if FEATURES['ENABLE_EDXNOTES']:
     OAUTH_ID_TOKEN_EXPIRATION = 60 * 60
@@ -210,6 +210,16 @@ CACHES = {
 
 }
 
+# The default cache outlives the database transactions that tests roll back,
+# so don't cache enrollment states in it across requests.
+COURSE_ENROLLMENT_CACHE_TIMEOUT = 0
+
+# Likewise, don't keep course assets in memory across tests.
+STATIC_CONTENT_MEMORY_CACHE = {'MAX_BYTES': 0}
+
+# Tests mock the comments service, and expect each call to reach it.
+COMMENTS_SERVICE_CACHE_TIMEOUT = 0
+
 # Dummy secret key for dev
 SECRET_KEY = '85920908f28904ed733fe576320db18cabd7b6cd'
 
@@ -44,7 +44,7 @@ class Comment(models.Model):
         else:
             return super(Comment, cls).url(action, params)
 
-    def flagAbuse(self, user, voteable):
+    def flagAbuse(self, user, voteable, course_id=None):
         if voteable.type == 'thread':
             url = _url_for_flag_abuse_thread(voteable.id)
         elif voteable.type == 'comment':
@@ -57,11 +57,12 @@ class Comment(models.Model):
             url,
             params,
             metric_tags=self._metric_tags,
-            metric_action='comment.abuse.flagged'
+            metric_action='comment.abuse.flagged',
+            course_id=course_id or voteable.get('course_id')
         )
         voteable._update_from_response(response)
 
-    def unFlagAbuse(self, user, voteable, removeAll):
+    def unFlagAbuse(self, user, voteable, removeAll, course_id=None):
         if voteable.type == 'thread':
             url = _url_for_unflag_abuse_thread(voteable.id)
         elif voteable.type == 'comment':
@@ -78,7 +79,8 @@ class Comment(models.Model):
             url,
             params,
             metric_tags=self._metric_tags,
-            metric_action='comment.abuse.unflagged'
+            metric_action='comment.abuse.unflagged',
+            course_id=course_id or voteable.get('course_id')
         )
         voteable._update_from_response(response)
 
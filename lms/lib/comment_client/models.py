@@ -98,6 +98,27 @@ class Model(object):
     def find(cls, id):
         return cls(id=id)
 
+    @classmethod
+    def find_all(cls, ids, *args, **kwargs):
+        """
+        Return the retrieved instances of `ids`, in the same order.
+        """
+        return cls.retrieve_all([cls.find(id) for id in ids], *args, **kwargs)
+
+    @classmethod
+    def retrieve_all(cls, instances, *args, **kwargs):
+        """
+        Retrieve the `instances` which haven't been retrieved yet, passing them
+        the arguments of `retrieve`, and return them.
+
+        The comments service has no endpoint returning several resources, so
+        they are requested one after the other, over the kept-alive
+        connections of the process.
+        """
+        for instance in instances:
+            instance.retrieve(*args, **kwargs)
+        return instances
+
     def _update_from_response(self, response_data):
         for k, v in response_data.items():
             if k in self.accessible_fields:
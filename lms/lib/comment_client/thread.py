@@ -135,7 +135,7 @@ class Thread(models.Model):
         )
         self._update_from_response(response)
 
-    def flagAbuse(self, user, voteable):
+    def flagAbuse(self, user, voteable, course_id=None):
         if voteable.type == 'thread':
             url = _url_for_flag_abuse_thread(voteable.id)
         elif voteable.type == 'comment':
@@ -148,11 +148,12 @@ class Thread(models.Model):
             url,
             params,
             metric_action='thread.abuse.flagged',
-            metric_tags=self._metric_tags
+            metric_tags=self._metric_tags,
+            course_id=course_id or voteable.get('course_id')
         )
         voteable._update_from_response(response)
 
-    def unFlagAbuse(self, user, voteable, removeAll):
+    def unFlagAbuse(self, user, voteable, removeAll, course_id=None):
         if voteable.type == 'thread':
             url = _url_for_unflag_abuse_thread(voteable.id)
         elif voteable.type == 'comment':
@@ -169,11 +170,12 @@ class Thread(models.Model):
             url,
             params,
             metric_tags=self._metric_tags,
-            metric_action='thread.abuse.unflagged'
+            metric_action='thread.abuse.unflagged',
+            course_id=course_id or voteable.get('course_id')
         )
         voteable._update_from_response(response)
 
-    def pin(self, user, thread_id):
+    def pin(self, user, thread_id, course_id=None):
         url = _url_for_pin_thread(thread_id)
         params = {'user_id': user.id}
         response = perform_request(
@@ -181,11 +183,12 @@ class Thread(models.Model):
             url,
             params,
             metric_tags=self._metric_tags,
-            metric_action='thread.pin'
+            metric_action='thread.pin',
+            course_id=course_id or self.get('course_id')
         )
         self._update_from_response(response)
 
-    def un_pin(self, user, thread_id):
+    def un_pin(self, user, thread_id, course_id=None):
         url = _url_for_un_pin_thread(thread_id)
         params = {'user_id': user.id}
         response = perform_request(
@@ -193,7 +196,8 @@ class Thread(models.Model):
             url,
             params,
             metric_tags=self._metric_tags,
-            metric_action='thread.unpin'
+            metric_action='thread.unpin',
+            course_id=course_id or self.get('course_id')
         )
         self._update_from_response(response)
 
@@ -29,7 +29,7 @@ class User(models.Model):
                    external_id=str(user.id),
                    username=user.username)
 
-    def follow(self, source):
+    def follow(self, source, course_id=None):
         params = {'source_type': source.type, 'source_id': source.id}
         response = perform_request(
             'post',
@@ -37,9 +37,10 @@ class User(models.Model):
             params,
             metric_action='user.follow',
             metric_tags=self._metric_tags + ['target.type:{}'.format(source.type)],
+            course_id=course_id or source.get('course_id'),
         )
 
-    def unfollow(self, source):
+    def unfollow(self, source, course_id=None):
         params = {'source_type': source.type, 'source_id': source.id}
         response = perform_request(
             'delete',
@@ -47,9 +48,10 @@ class User(models.Model):
             params,
             metric_action='user.unfollow',
             metric_tags=self._metric_tags + ['target.type:{}'.format(source.type)],
+            course_id=course_id or source.get('course_id'),
         )
 
-    def vote(self, voteable, value):
+    def vote(self, voteable, value, course_id=None):
         if voteable.type == 'thread':
             url = _url_for_vote_thread(voteable.id)
         elif voteable.type == 'comment':
@@ -63,10 +65,11 @@ class User(models.Model):
             params,
             metric_action='user.vote',
             metric_tags=self._metric_tags + ['target.type:{}'.format(voteable.type)],
+            course_id=course_id or voteable.get('course_id'),
         )
         voteable._update_from_response(response)
 
-    def unvote(self, voteable):
+    def unvote(self, voteable, course_id=None):
         if voteable.type == 'thread':
             url = _url_for_vote_thread(voteable.id)
         elif voteable.type == 'comment':
@@ -80,6 +83,7 @@ class User(models.Model):
             params,
             metric_action='user.unvote',
             metric_tags=self._metric_tags + ['target.type:{}'.format(voteable.type)],
+            course_id=course_id or voteable.get('course_id'),
         )
         voteable._update_from_response(response)
 
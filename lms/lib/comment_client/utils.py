@@ -1,14 +1,28 @@
 from contextlib import contextmanager
 import dogstats_wrapper as dog_stats_api
+import hashlib
 import logging
+import os
 import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
+from django.core.cache import cache
+import threading
 from time import time
 from uuid import uuid4
 from django.utils.translation import get_language
 
 log = logging.getLogger(__name__)
 
+# The requests session of this process, and the id of the process.
+_SESSION = None
+_SESSION_PID = None
+_SESSION_LOCK = threading.Lock()
+
+CACHE_KEY_PREFIX = 'comment_client.'
+# The cache key of the generation of all the cached responses.
+GENERATION_KEY = CACHE_KEY_PREFIX + 'generation'
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -50,9 +64,154 @@ def request_timer(request_id, method, url, tags=None):
     )
 
 
+def connection_setting(name):
+    """
+    Return the setting `name` of the connections to the comments service.
+    """
+    return settings.COMMENTS_SERVICE_CONNECTION[name]
+
+
+def get_session():
+    """
+    Return the requests session shared by the threads of this process, which
+    keeps its connections to the comments service open.
+
+    A forked process creates its own session, rather than sharing the
+    connections of its parent.
+    """
+    global _SESSION, _SESSION_PID  # pylint: disable=global-statement
+    with _SESSION_LOCK:
+        if _SESSION is None or _SESSION_PID != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=connection_setting('POOL_MAXSIZE'))
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _SESSION, _SESSION_PID = session, os.getpid()
+        return _SESSION
+
+
+def _send_request(method, url, **kwargs):
+    """
+    Send a request with the session of this process, and return its response.
+
+    GET requests failing to connect are retried. Other requests aren't, since
+    the service may have processed them: in particular, a write sent on a
+    kept-alive connection which the service closed while it was idle fails
+    with a ConnectionError, like any write the service didn't answer.
+    """
+    retries = connection_setting('MAX_RETRIES') if method == 'get' else 0
+    while True:
+        try:
+            return get_session().request(method, url, **kwargs)
+        except requests.exceptions.ConnectionError:
+            if retries <= 0:
+                raise
+            retries -= 1
+            log.warning(u"comment_client retrying request: method=%s, url=%s", method, url)
+            dog_stats_api.increment('comment_client.request.retry', tags=[u'method:{}'.format(method)])
+
+
+def _generation_key(course_id):
+    """
+    Return the cache key of the generation of the cached responses about
+    `course_id`, or of the responses which aren't about a course.
+    """
+    return CACHE_KEY_PREFIX + (u'generation.{}'.format(course_id) if course_id else 'generation.none')
+
+
+def _user_generation_key(user_id):
+    """
+    Return the cache key of the generation of the cached responses of requests by `user_id`.
+    """
+    return CACHE_KEY_PREFIX + u'generation.user.{}'.format(user_id)
+
+
+def invalidate_cached_responses(course_id=None, user_id=None):
+    """
+    Invalidate the cached responses of the comments service about `course_id`,
+    with the responses which aren't about a course, and the responses of
+    requests by `user_id`. Invalidate all the cached responses if neither is
+    given.
+    """
+    timeout = getattr(settings, 'COMMENTS_SERVICE_CACHE_TIMEOUT', 0)
+    if not timeout:
+        return
+    keys = []
+    if course_id:
+        keys.extend([_generation_key(course_id), _generation_key(None)])
+    if user_id:
+        keys.append(_user_generation_key(user_id))
+    # the responses cached under the previous generations expire before the new ones
+    cache.set_many({key: uuid4().hex for key in keys or [GENERATION_KEY]}, timeout * 2)
+
+
+def _response_cache_key(method, url, params, raw):
+    """
+    Return the key of the cached response of the request, or None if it
+    mustn't be cached.
+
+    Only GET requests which don't mark threads as read are cached. Their
+    user, course and group are parameters of the request.
+    """
+    if method != 'get' or params.get('mark_as_read') or not getattr(settings, 'COMMENTS_SERVICE_CACHE_TIMEOUT', 0):
+        return None
+    generation_keys = [GENERATION_KEY, _generation_key(params.get('course_id'))]
+    if params.get('user_id'):
+        generation_keys.append(_user_generation_key(params['user_id']))
+    generations = cache.get_many(generation_keys)
+    request = repr((
+        url, sorted(params.items()), raw, get_language(), [generations.get(key) for key in generation_keys]
+    ))
+    return CACHE_KEY_PREFIX + 'response.' + hashlib.sha1(request.encode('utf-8')).hexdigest()
+
+
 def perform_request(method, url, data_or_params=None, raw=False,
-                    metric_action=None, metric_tags=None, paged_results=False):
+                    metric_action=None, metric_tags=None, paged_results=False, course_id=None):
+    """
+    Perform the request to the comments service, and return its result.
+
+    The results of GET requests are cached for COMMENTS_SERVICE_CACHE_TIMEOUT
+    seconds. Other requests invalidate the cached results of their course, or
+    all of them if their course is unknown, and those of their user. Marking
+    a thread as read invalidates the cached results of the user.
+
+    `course_id` is the course of requests which don't send it as a parameter,
+    such as votes, and is only used to invalidate the cached results.
+    """
+    if data_or_params is None:
+        data_or_params = {}
+
+    cache_key = _response_cache_key(method, url, data_or_params, raw)
+    if cache_key is not None:
+        result = cache.get(cache_key)
+        dog_stats_api.increment('comment_client.request.cache', tags=[
+            u'action:{}'.format(metric_action), u'result:{}'.format('miss' if result is None else 'hit')
+        ])
+        if result is not None:
+            return result
+
+    try:
+        result = _perform_request(method, url, data_or_params, raw, metric_action, metric_tags, paged_results)
+    finally:
+        course_id = data_or_params.get('course_id') or course_id
+        user_id = data_or_params.get('user_id')
+        if method != 'get':
+            if course_id:
+                invalidate_cached_responses(unicode(course_id), user_id)
+            else:
+                invalidate_cached_responses()
+        elif data_or_params.get('mark_as_read') and user_id:
+            invalidate_cached_responses(user_id=user_id)
+
+    if cache_key is not None:
+        cache.set(cache_key, result, settings.COMMENTS_SERVICE_CACHE_TIMEOUT)
+    return result
 
+
+def _perform_request(method, url, data_or_params, raw, metric_action, metric_tags, paged_results):
+    """
+    Perform the request to the comments service, and return its result.
+    """
     if metric_tags is None:
         metric_tags = []
 
@@ -60,8 +219,6 @@ def perform_request(method, url, data_or_params=None, raw=False,
     if metric_action:
         metric_tags.append(u'action:{}'.format(metric_action))
 
-    if data_or_params is None:
-        data_or_params = {}
     headers = {
         'X-Edx-Api-Key': getattr(settings, "COMMENTS_SERVICE_KEY", None),
         'Accept-Language': get_language(),
@@ -76,13 +233,13 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = merge_dict(data_or_params, request_id_dict)
     with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
+        response = _send_request(
             method,
             url,
             data=data,
             params=params,
             headers=headers,
-            timeout=5
+            timeout=connection_setting('TIMEOUT')
         )
 
     metric_tags.append(u'status_code:{}'.format(response.status_code))
@@ -38,6 +38,8 @@ def run():
     if settings.FEATURES.get('ENABLE_THIRD_PARTY_AUTH', False):
         enable_third_party_auth()
 
+    configure_sandbox_pool()
+
     # Initialize Segment.io analytics module. Flushes first time a message is received and
     # every 50 messages thereafter, or if 10 seconds have passed since last flush
     if settings.FEATURES.get('SEGMENT_IO_LMS') and hasattr(settings, 'SEGMENT_IO_LMS_KEY'):
@@ -58,6 +60,28 @@ def add_mimetypes():
     mimetypes.add_type('application/font-woff', '.woff')
 
 
+def configure_sandbox_pool():
+    """
+    Start the pool of warm sandboxed Pythons for capa problems, if enabled in settings.CODE_JAIL.
+    """
+    from capa.safe_exec import sandbox_pool
+    from capa.safe_exec.safe_exec import ASSUMED_IMPORTS
+
+    pool_settings = settings.CODE_JAIL.get('warm_pool', {})
+    if not settings.CODE_JAIL.get('python_bin') or not pool_settings.get('size'):
+        return
+
+    sandbox_pool.configure(
+        settings.CODE_JAIL['python_bin'],
+        user=settings.CODE_JAIL.get('user'),
+        size=pool_settings['size'],
+        max_runs=pool_settings.get('max_runs', 100),
+        timeout=pool_settings.get('timeout', 5),
+        preload=[modname for __, modname in ASSUMED_IMPORTS],
+        limits=settings.CODE_JAIL.get('limits'),
+    )
+
+
 def enable_theme():
     """
     Enable the settings for a custom theme, whose files should be stored
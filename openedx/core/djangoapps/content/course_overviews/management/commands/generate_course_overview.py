@@ -0,0 +1,48 @@
+"""
+Generate and store the overviews of courses, e.g. of courses published before
+overviews were stored, or of the courses of the XML modulestore.
+"""
+import logging
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from opaque_keys.edx.keys import CourseKey
+from xmodule.modulestore.django import modulestore
+
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    args = '<course_id course_id ...>'
+    help = 'Generates and stores the overviews of one or more courses.'
+
+    option_list = BaseCommand.option_list + (
+        make_option('--all',
+                    action='store_true',
+                    default=False,
+                    help='Generate overviews of all courses.'),
+    )
+
+    def handle(self, *args, **options):
+
+        if options['all']:
+            course_keys = [course.id for course in modulestore().get_courses()]
+        else:
+            course_keys = [CourseKey.from_string(arg) for arg in args]
+
+        if not course_keys:
+            log.fatal('No courses specified.')
+            return
+
+        log.info('Generating course overviews for %d courses.', len(course_keys))
+
+        for course_key in course_keys:
+            try:
+                CourseOverview.load_from_module_store(course_key)
+            except Exception:  # pylint: disable=broad-except
+                log.exception('An error occurred while generating the overview of %s', unicode(course_key))
+
+        log.info('Finished generating course overviews.')
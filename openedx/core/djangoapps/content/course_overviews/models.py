@@ -0,0 +1,287 @@
+"""
+Denormalized summaries of courses, from which course lists such as the student
+dashboard and the course catalog are rendered without loading the courses from
+the modulestore.
+"""
+import json
+import logging
+
+from django.db import models
+from django.db.utils import IntegrityError
+from django.utils.translation import ugettext
+from model_utils.models import TimeStampedModel
+
+from openedx.core.lib.courses import course_image_url
+from util.date_utils import strftime_localized
+from xmodule import course_metadata_utils
+from xmodule.course_module import CourseDescriptor
+from xmodule.modulestore.django import modulestore
+from xmodule_django.models import CourseKeyField, UsageKeyField
+
+
+log = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+
+class CourseOverview(TimeStampedModel):
+    """
+    The fields of a published course that course lists display or check
+    access with, copied from its CourseDescriptor.
+
+    A CourseOverview has the same attributes and methods as a CourseDescriptor
+    for those fields, so that it can be passed in place of one to has_access,
+    course_image_url and the course list templates.
+    """
+    # Version of the fields stored in an overview.  Increment it when adding
+    # or changing fields, so that overviews stored by older code are
+    # regenerated from the modulestore when read.
+    VERSION = 1
+
+    version = models.IntegerField()
+
+    id = CourseKeyField(db_index=True, primary_key=True, max_length=255)  # pylint: disable=invalid-name
+    _location = UsageKeyField(max_length=255)
+    org = models.CharField(max_length=255, db_index=True)
+
+    display_name = models.TextField(null=True)
+    display_number_with_default = models.TextField()
+    display_org_with_default = models.TextField()
+
+    start = models.DateTimeField(null=True)
+    end = models.DateTimeField(null=True)
+    advertised_start = models.TextField(null=True)
+    announcement = models.DateTimeField(null=True)
+
+    course_image_url = models.TextField()
+    facebook_url = models.TextField(null=True)
+    social_sharing_url = models.TextField(null=True)
+    end_of_course_survey_url = models.TextField(null=True)
+
+    certificates_display_behavior = models.TextField(null=True)
+    certificates_show_before_end = models.BooleanField(default=False)
+    cert_name_short = models.TextField()
+    cert_name_long = models.TextField()
+    lowest_passing_grade = models.FloatField(null=True)
+
+    days_early_for_beta = models.FloatField(null=True)
+    mobile_available = models.BooleanField(default=False)
+    visible_to_staff_only = models.BooleanField(default=False)
+    _pre_requisite_courses_json = models.TextField()
+
+    enrollment_start = models.DateTimeField(null=True)
+    enrollment_end = models.DateTimeField(null=True)
+    enrollment_domain = models.TextField(null=True)
+    invitation_only = models.BooleanField(default=False)
+    ispublic = models.NullBooleanField()
+    catalog_visibility = models.TextField(null=True)
+
+    @classmethod
+    def _create_from_course(cls, course):
+        """
+        Returns an unsaved overview of the CourseDescriptor `course`.
+        """
+        return cls(
+            version=cls.VERSION,
+            id=course.id,
+            _location=course.location,
+            org=course.location.org,
+            display_name=course.display_name,
+            display_number_with_default=course.display_number_with_default,
+            display_org_with_default=course.display_org_with_default,
+
+            start=course.start,
+            end=course.end,
+            advertised_start=course.advertised_start,
+            announcement=course.announcement,
+
+            course_image_url=course_image_url(course),
+            facebook_url=course.facebook_url,
+            social_sharing_url=course.social_sharing_url,
+            end_of_course_survey_url=course.end_of_course_survey_url,
+
+            certificates_display_behavior=course.certificates_display_behavior,
+            certificates_show_before_end=course.certificates_show_before_end,
+            cert_name_short=course.cert_name_short,
+            cert_name_long=course.cert_name_long,
+            lowest_passing_grade=course.lowest_passing_grade,
+
+            days_early_for_beta=course.days_early_for_beta,
+            mobile_available=course.mobile_available,
+            visible_to_staff_only=course.visible_to_staff_only,
+            _pre_requisite_courses_json=json.dumps(course.pre_requisite_courses),
+
+            enrollment_start=course.enrollment_start,
+            enrollment_end=course.enrollment_end,
+            enrollment_domain=course.enrollment_domain,
+            invitation_only=course.invitation_only,
+            # ispublic is an LMS field, which Studio's courses don't have.
+            ispublic=getattr(course, 'ispublic', None),
+            catalog_visibility=course.catalog_visibility,
+        )
+
+    @classmethod
+    def load_from_module_store(cls, course_id):
+        """
+        Loads the course with `course_id` from the modulestore, and stores and
+        returns its overview.
+
+        Returns None if the course does not exist or fails to load.
+        """
+        store = modulestore()
+        with store.bulk_operations(course_id):
+            course = store.get_course(course_id)
+            if isinstance(course, CourseDescriptor):
+                overview = cls._create_from_course(course)
+                try:
+                    overview.save()
+                except IntegrityError:
+                    # Another process stored an overview of the course first.
+                    log.info(u"Overview of course %s was stored concurrently", course_id)
+                return overview
+            elif course is not None:
+                log.warning(u"Not storing an overview of course %s, which failed to load", course_id)
+        return None
+
+    @classmethod
+    def get_from_id(cls, course_id):
+        """
+        Returns the overview of the course with `course_id`, creating it
+        from the modulestore if it is missing or was stored by older code.
+
+        Returns None if the course does not exist or fails to load.
+        """
+        try:
+            overview = cls.objects.get(id=course_id)
+            if overview.version >= cls.VERSION:
+                return overview
+        except cls.DoesNotExist:
+            pass
+        return cls.load_from_module_store(course_id)
+
+    @classmethod
+    def get_from_ids(cls, course_ids):
+        """
+        Returns a dict of the overviews of the courses with `course_ids`,
+        keyed by course id, reading all the stored overviews in one query.
+
+        Like get_from_id, missing overviews are created from the modulestore,
+        and the overviews of courses that do not exist or fail to load are None.
+        """
+        overviews = {
+            overview.id: overview
+            for overview in cls.objects.filter(id__in=course_ids, version__gte=cls.VERSION)
+        }
+        for course_id in course_ids:
+            if course_id not in overviews:
+                overviews[course_id] = cls.load_from_module_store(course_id)
+        return overviews
+
+    @classmethod
+    def get_all_courses(cls, org=None):
+        """
+        Returns the overviews of all the courses in the modulestore, or only of
+        the courses of organization `org` if it is given.
+
+        The courses are listed by their keys, without loading them, and only
+        the courses without an up to date overview are loaded to create one.
+        """
+        overviews = cls.get_from_ids(modulestore().get_course_keys(org=org))
+        return [overview for overview in overviews.itervalues() if overview is not None]
+
+    @property
+    def location(self):
+        """
+        Returns the usage key of the course block.
+        """
+        # Deprecated Locations are read back without their run, so map them
+        # into the course again.
+        return self._location.map_into_course(self.id)
+
+    @property
+    def number(self):
+        """
+        Returns the course number.
+        """
+        return self.id.course
+
+    @property
+    def display_name_with_default(self):
+        """
+        Returns the display name of the course if it has one, otherwise a name
+        derived from its location.
+        """
+        return course_metadata_utils.display_name_with_default(self.display_name, self._location)
+
+    @property
+    def pre_requisite_courses(self):
+        """
+        Returns the ids of the courses required before this one, as strings.
+        """
+        return json.loads(self._pre_requisite_courses_json)
+
+    @property
+    def start_date_is_still_default(self):
+        """
+        Checks if the start date set for the course is still default, i.e.
+        .start has not been modified, and .advertised_start has not been set.
+        """
+        return course_metadata_utils.course_start_date_is_default(self.start, self.advertised_start)
+
+    @property
+    def sorting_score(self):
+        """
+        Returns a number to sort courses by how "new" they are, lowest first.
+        """
+        return course_metadata_utils.sorting_score(self.start, self.advertised_start, self.announcement)
+
+    def has_started(self):
+        """
+        Returns True if the current time is after the course start date.
+        """
+        return course_metadata_utils.has_course_started(self.start)
+
+    def has_ended(self):
+        """
+        Returns True if the current time is after the course end date.
+        Returns False if there is no end date specified.
+        """
+        return course_metadata_utils.has_course_ended(self.end)
+
+    def may_certify(self):
+        """
+        Return True if it is acceptable to show the student a certificate download link.
+        """
+        return course_metadata_utils.may_certify_for_course(
+            self.certificates_display_behavior,
+            self.certificates_show_before_end,
+            self.has_ended()
+        )
+
+    def start_datetime_text(self, format_string="SHORT_DATE"):
+        """
+        Returns the desired text corresponding the course's start date and
+        time in UTC.  Prefers .advertised_start, then falls back to .start
+        """
+        return course_metadata_utils.course_start_datetime_text(
+            self.start,
+            self.advertised_start,
+            format_string,
+            ugettext,
+            strftime_localized
+        )
+
+    def end_datetime_text(self, format_string="SHORT_DATE"):
+        """
+        Returns the end date or date_time for the course formatted as a string.
+        """
+        return course_metadata_utils.course_end_datetime_text(self.end, format_string, strftime_localized)
+
+    def clean_id(self, padding_char='='):
+        """
+        Returns a unique deterministic base32-encoded ID for the course.
+        """
+        return course_metadata_utils.clean_course_key(self.id, padding_char)
+
+
+# Signals must be imported in a file that is automatically loaded at app startup (e.g. models.py). We import them
+# at the end of this file to avoid circular dependencies.
+import signals  # pylint: disable=unused-import
@@ -0,0 +1,29 @@
+"""
+Keep the course overviews up to date with the published courses.
+"""
+from django.dispatch.dispatcher import receiver
+
+from xmodule.modulestore.django import SignalHandler
+
+
+@receiver(SignalHandler.course_published)
+def _listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Queue the regeneration of the overview of a course when it is published.
+    """
+    # Import here to avoid a circular import.
+    from .tasks import update_course_overview
+
+    # The countdown=0 kwarg ensures the task does not read the course before
+    # the signal emitter has finished all operations.
+    update_course_overview.apply_async([unicode(course_key)], countdown=0)
+
+
+@receiver(SignalHandler.course_deleted)
+def _listen_for_course_delete(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Delete the overview of a course when it is deleted.
+    """
+    from .models import CourseOverview
+
+    CourseOverview.objects.filter(id=course_key).delete()
@@ -0,0 +1,27 @@
+"""
+Asynchronous tasks keeping the course overviews up to date.
+"""
+import logging
+
+from celery.task import task
+from opaque_keys.edx.keys import CourseKey
+
+
+log = logging.getLogger('edx.celery.task')
+
+
+@task(name=u'openedx.core.djangoapps.content.course_overviews.tasks.update_course_overview')
+def update_course_overview(course_key):
+    """
+    Regenerates and stores the overview of the specified course from the modulestore.
+    """
+    # Import here to avoid circular import.
+    from .models import CourseOverview
+
+    # Callers pass the course key as a Unicode string, which Celery can serialize.
+    if not isinstance(course_key, basestring):
+        raise ValueError('course_key must be a string. {} is not acceptable.'.format(type(course_key)))
+
+    course_key = CourseKey.from_string(course_key)
+    if CourseOverview.load_from_module_store(course_key) is None:
+        log.warning(u'No overview of course %s could be generated.', course_key)
@@ -0,0 +1,150 @@
+"""
+Tests for course_overviews app.
+"""
+import datetime
+
+import ddt
+from django.utils import timezone
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory
+
+from .models import CourseOverview
+
+
+@ddt.ddt
+class CourseOverviewTestCase(ModuleStoreTestCase):
+    """
+    Tests for CourseOverview model.
+    """
+    # Dates are stored without microseconds by some databases.
+    NEXT_WEEK = timezone.now().replace(microsecond=0) + datetime.timedelta(days=7)
+    LAST_WEEK = timezone.now().replace(microsecond=0) - datetime.timedelta(days=7)
+
+    COURSE_OVERVIEW_ATTRIBUTES = (
+        'id', 'location', 'number', 'display_name', 'display_name_with_default',
+        'display_number_with_default', 'display_org_with_default', 'start', 'end',
+        'advertised_start', 'announcement', 'facebook_url', 'social_sharing_url',
+        'end_of_course_survey_url', 'certificates_display_behavior', 'certificates_show_before_end',
+        'cert_name_short', 'cert_name_long', 'lowest_passing_grade', 'days_early_for_beta',
+        'mobile_available', 'visible_to_staff_only', 'pre_requisite_courses', 'enrollment_start',
+        'enrollment_end', 'enrollment_domain', 'invitation_only', 'catalog_visibility',
+        'start_date_is_still_default', 'sorting_score',
+    )
+
+    COURSE_OVERVIEW_METHODS = (
+        'has_started', 'has_ended', 'may_certify', 'start_datetime_text', 'end_datetime_text',
+    )
+
+    def check_course_overview_against_course(self, course):
+        """
+        Check that the overview of `course` matches `course`.
+        """
+        overview = CourseOverview.get_from_id(course.id)
+        for attribute in self.COURSE_OVERVIEW_ATTRIBUTES:
+            self.assertEqual(getattr(overview, attribute), getattr(course, attribute), attribute)
+        for method in self.COURSE_OVERVIEW_METHODS:
+            self.assertEqual(getattr(overview, method)(), getattr(course, method)(), method)
+        self.assertEqual(overview.clean_id(padding_char='_'), course.clean_id(padding_char='_'))
+
+    @ddt.data(
+        {
+            'display_name': 'Test Course',
+            'start': LAST_WEEK,
+            'end': NEXT_WEEK,
+            'advertised_start': 'Spring 2015',
+            'social_sharing_url': 'https://example.com/share',
+            'certificates_display_behavior': 'early_with_info',
+            'mobile_available': True,
+            'pre_requisite_courses': ['course-v1:edX+Prereq+Run'],
+        },
+        {
+            'start': NEXT_WEEK,
+            'end': None,
+            'display_coursenumber': 'Overridden number',
+            'display_organization': 'Overridden org',
+            'days_early_for_beta': 10,
+            'visible_to_staff_only': True,
+            'invitation_only': True,
+            'catalog_visibility': 'none',
+        },
+        {
+            'display_name': 'Default start',
+            'announcement': LAST_WEEK,
+        },
+    )
+    def test_course_overview_matches_course(self, metadata):
+        for store_type in (ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split):
+            with self.store.default_store(store_type):
+                course = CourseFactory.create(**metadata)
+                self.check_course_overview_against_course(course)
+
+    def test_overview_generated_on_publish(self):
+        course = CourseFactory.create(display_name='Published')
+        self.assertEqual(CourseOverview.objects.get(id=course.id).display_name, 'Published')
+
+        course.display_name = 'Republished'
+        self.store.update_item(course, self.user.id)
+        self.assertEqual(CourseOverview.objects.get(id=course.id).display_name, 'Republished')
+
+    @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+    def test_overview_deleted_with_course(self, store_type):
+        with self.store.default_store(store_type):
+            course = CourseFactory.create()
+            self.assertTrue(CourseOverview.objects.filter(id=course.id).exists())
+
+            self.store.delete_course(course.id, self.user.id)
+            self.assertFalse(CourseOverview.objects.filter(id=course.id).exists())
+
+    def test_missing_overview_loaded_from_modulestore(self):
+        course = CourseFactory.create()
+        CourseOverview.objects.all().delete()
+
+        self.assertEqual(CourseOverview.get_from_id(course.id).id, course.id)
+        self.assertTrue(CourseOverview.objects.filter(id=course.id).exists())
+
+    def test_outdated_overview_regenerated(self):
+        course = CourseFactory.create(display_name='Current')
+        CourseOverview.objects.filter(id=course.id).update(
+            version=CourseOverview.VERSION - 1, display_name='Outdated'
+        )
+
+        self.assertEqual(CourseOverview.get_from_id(course.id).display_name, 'Current')
+        self.assertEqual(CourseOverview.objects.get(id=course.id).version, CourseOverview.VERSION)
+
+    def test_non_existent_course(self):
+        course_key = self.store.make_course_key('Non', 'Existent', 'Course')
+        self.assertIsNone(CourseOverview.get_from_id(course_key))
+        self.assertEqual(CourseOverview.get_from_ids([course_key]), {course_key: None})
+
+    def test_get_from_ids(self):
+        courses = [CourseFactory.create() for __ in range(3)]
+        course_ids = [course.id for course in courses]
+        # one query reads all the stored overviews
+        with self.assertNumQueries(1):
+            overviews = CourseOverview.get_from_ids(course_ids)
+        self.assertItemsEqual(overviews.keys(), course_ids)
+        for course_id, overview in overviews.iteritems():
+            self.assertEqual(overview.id, course_id)
+
+    def test_get_all_courses(self):
+        first = CourseFactory.create(org='FirstOrg')
+        second = CourseFactory.create(org='SecondOrg')
+
+        self.assertItemsEqual(
+            [overview.id for overview in CourseOverview.get_all_courses()],
+            [first.id, second.id]
+        )
+        self.assertEqual(
+            [overview.id for overview in CourseOverview.get_all_courses(org='SecondOrg')],
+            [second.id]
+        )
+
+    def test_get_all_courses_without_overviews(self):
+        course = CourseFactory.create()
+        CourseOverview.objects.all().delete()
+
+        # courses are listed from the modulestore, creating their missing overviews
+        self.assertEqual([overview.id for overview in CourseOverview.get_all_courses()], [course.id])
+        self.assertTrue(CourseOverview.objects.filter(id=course.id).exists())
@@ -2,6 +2,7 @@ import json
 import logging
 
 from collections import OrderedDict
+from django.db import models
 from model_utils.models import TimeStampedModel
 
 from util.models import CompressedTextField
@@ -21,6 +22,10 @@ class CourseStructure(TimeStampedModel):
     # we'd have to be careful about caching.
     structure_json = CompressedTextField(verbose_name='Structure JSON', blank=True, null=True)
 
+    # Id of the split modulestore structure the course structure was generated from, if any. Used to only regenerate
+    # the blocks that changed when the course is published again.
+    version = models.CharField(max_length=255, blank=True, null=True, verbose_name='Structure version')
+
     @property
     def structure(self):
         if self.structure_json:
@@ -1,14 +1,41 @@
 import json
 import logging
 
+from bson.objectid import ObjectId
 from celery.task import task
 from opaque_keys.edx.keys import CourseKey
+from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
 
 
 log = logging.getLogger('edx.celery.task')
 
 
+def _generate_block(block):
+    """
+    Generates the course structure dictionary entry for the specified block.
+    """
+    children = block.get_children() if block.has_children else []
+    key = unicode(block.scope_ids.usage_id)
+    entry = {
+        "usage_key": key,
+        "block_type": block.category,
+        "display_name": block.display_name,
+        "children": [unicode(child.scope_ids.usage_id) for child in children]
+    }
+
+    # Retrieve these attributes separately so that we can fail gracefully if the block doesn't have the attribute.
+    attrs = (('graded', False), ('format', None))
+    for attr, default in attrs:
+        if hasattr(block, attr):
+            entry[attr] = getattr(block, attr, default)
+        else:
+            log.warning('Failed to retrieve %s attribute of block %s. Defaulting to %s.', attr, key, default)
+            entry[attr] = default
+
+    return entry, children
+
+
 def _generate_course_structure(course_key):
     """
     Generates a course structure dictionary for the specified course.
@@ -18,25 +45,8 @@ def _generate_course_structure(course_key):
     blocks_dict = {}
     while blocks_stack:
         curr_block = blocks_stack.pop()
-        children = curr_block.get_children() if curr_block.has_children else []
-        key = unicode(curr_block.scope_ids.usage_id)
-        block = {
-            "usage_key": key,
-            "block_type": curr_block.category,
-            "display_name": curr_block.display_name,
-            "children": [unicode(child.scope_ids.usage_id) for child in children]
-        }
-
-        # Retrieve these attributes separately so that we can fail gracefully if the block doesn't have the attribute.
-        attrs = (('graded', False), ('format', None))
-        for attr, default in attrs:
-            if hasattr(curr_block, attr):
-                block[attr] = getattr(curr_block, attr, default)
-            else:
-                log.warning('Failed to retrieve %s attribute of block %s. Defaulting to %s.', attr, key, default)
-                block[attr] = default
-
-        blocks_dict[key] = block
+        block, children = _generate_block(curr_block)
+        blocks_dict[block['usage_key']] = block
 
         # Add this blocks children to the stack so that we can traverse them as well.
         blocks_stack.extend(children)
@@ -46,6 +56,137 @@ def _generate_course_structure(course_key):
     }
 
 
+def _get_split_course_version(course_key):
+    """
+    Returns the id (as a string) of the split modulestore structure currently backing the specified course, or None
+    if the course is not stored in the split modulestore.
+    """
+    store = modulestore()
+    if store.get_modulestore_type(course_key) != ModuleStoreEnum.Type.split:
+        return None
+
+    split_store = store._get_modulestore_for_courselike(course_key)  # pylint: disable=protected-access
+    if split_store.get_branch_setting(course_key) == ModuleStoreEnum.Branch.draft_preferred:
+        branch = ModuleStoreEnum.BranchName.draft
+    else:
+        branch = ModuleStoreEnum.BranchName.published
+
+    index = split_store.get_course_index_info(course_key)
+    version = index['versions'].get(branch) if index else None
+    return unicode(version) if version else None
+
+
+def _block_graded_value(block_data):
+    """
+    Returns the value of the (inheritable) graded field explicitly set on a split structure block, if any.
+    """
+    return block_data.fields.get('graded', block_data.defaults.get('graded'))
+
+
+def _descendants(blocks, block_key):
+    """
+    Returns the keys of all the descendants of the specified block of a split structure.
+    """
+    descendants = set()
+    stack = list(blocks[block_key].fields.get('children', []))
+    while stack:
+        child_key = stack.pop()
+        if child_key in descendants or child_key not in blocks:
+            continue
+        descendants.add(child_key)
+        stack.extend(blocks[child_key].fields.get('children', []))
+    return descendants
+
+
+def _changed_block_keys(old_blocks, new_blocks):
+    """
+    Returns the keys of the blocks of the split structure `new_blocks` whose course structure entries may differ from
+    those generated for the structure `old_blocks`.
+    """
+    changed = set()
+    for block_key, new_block in new_blocks.iteritems():
+        old_block = old_blocks.get(block_key)
+        if old_block is None:
+            changed.add(block_key)
+            changed.update(_descendants(new_blocks, block_key))
+            continue
+
+        if old_block.edit_info.update_version == new_block.edit_info.update_version or (
+                old_block.block_type == new_block.block_type and
+                old_block.definition == new_block.definition and
+                old_block.fields == new_block.fields and
+                old_block.defaults == new_block.defaults
+        ):
+            continue
+
+        changed.add(block_key)
+        if _block_graded_value(old_block) != _block_graded_value(new_block):
+            # The graded field is inherited, so the entries of all descendants may have changed.
+            changed.update(_descendants(new_blocks, block_key))
+        else:
+            # Blocks moved under this block may inherit a different graded value.
+            old_children = set(old_block.fields.get('children', []))
+            for child_key in new_block.fields.get('children', []):
+                if child_key not in old_children and child_key in new_blocks:
+                    changed.add(child_key)
+                    changed.update(_descendants(new_blocks, child_key))
+    return changed
+
+
+def _update_course_structure_from_versions(course_key, structure, old_version, new_version):
+    """
+    Updates the course structure dictionary `structure`, generated from the split modulestore structure with id
+    `old_version`, so that it describes the structure with id `new_version`. Only the entries of blocks that changed
+    between the two versions are regenerated.
+
+    Returns None if the course structure must be generated from scratch instead.
+    """
+    store = modulestore()
+    split_store = store._get_modulestore_for_courselike(course_key)  # pylint: disable=protected-access
+    structures = {
+        unicode(split_structure['_id']): split_structure
+        for split_structure in split_store.find_structures_by_id([ObjectId(old_version), ObjectId(new_version)])
+    }
+    old_structure = structures.get(old_version)
+    new_structure = structures.get(new_version)
+    if old_structure is None or new_structure is None or old_structure['root'] != new_structure['root']:
+        return None
+
+    changed_keys = _changed_block_keys(old_structure['blocks'], new_structure['blocks'])
+    if len(changed_keys) * 2 > len(new_structure['blocks']):
+        # Generating the whole course at once is cheaper than loading most of its blocks one by one.
+        return None
+
+    blocks = structure['blocks']
+    with store.bulk_operations(course_key, emit_signals=False):
+        for block_key in changed_keys:
+            block = store.get_item(course_key.make_usage_key(block_key.type, block_key.id))
+            entry, __ = _generate_block(block)
+            blocks[entry['usage_key']] = entry
+
+    # Drop the entries of the blocks that are no longer part of the course.
+    reachable_blocks = {}
+    blocks_stack = [structure['root']]
+    while blocks_stack:
+        key = blocks_stack.pop()
+        if key in reachable_blocks:
+            continue
+        if key not in blocks:
+            log.warning('Block %s is missing from the updated structure of course %s.', key, course_key)
+            return None
+        reachable_blocks[key] = blocks[key]
+        blocks_stack.extend(blocks[key]['children'])
+
+    log.info(
+        'Updated course structure of %s from version %s to %s, regenerating %d blocks.',
+        course_key, old_version, new_version, len(changed_keys)
+    )
+    return {
+        "root": structure['root'],
+        "blocks": reachable_blocks
+    }
+
+
 @task(name=u'openedx.core.djangoapps.content.course_structures.tasks.update_course_structure')
 def update_course_structure(course_key):
     """
@@ -62,7 +203,30 @@ def update_course_structure(course_key):
     course_key = CourseKey.from_string(course_key)
 
     try:
-        structure = _generate_course_structure(course_key)
+        course_structure = CourseStructure.objects.get(course_id=course_key)
+    except CourseStructure.DoesNotExist:
+        course_structure = None
+
+    try:
+        version = _get_split_course_version(course_key)
+        if (
+                course_structure is not None and course_structure.structure_json and
+                version and course_structure.version == version
+        ):
+            log.info('Course structure of %s is already up to date with version %s.', course_key, version)
+            return
+
+        structure = None
+        if (
+                course_structure is not None and course_structure.structure_json and
+                course_structure.version and version and course_structure.version != version
+        ):
+            # Only update the blocks that changed since the stored structure was generated.
+            structure = _update_course_structure_from_versions(
+                course_key, course_structure.structure, course_structure.version, version
+            )
+        if structure is None:
+            structure = _generate_course_structure(course_key)
     except Exception as ex:
         log.exception('An error occurred while generating course structure: %s', ex.message)
         raise
@@ -71,9 +235,10 @@ def update_course_structure(course_key):
 
     cs, created = CourseStructure.objects.get_or_create(
         course_id=course_key,
-        defaults={'structure_json': structure_json}
+        defaults={'structure_json': structure_json, 'version': version}
     )
 
     if not created:
         cs.structure_json = structure_json
+        cs.version = version
         cs.save()
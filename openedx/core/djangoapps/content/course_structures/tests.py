@@ -1,10 +1,14 @@
 import json
 
+from mock import patch
+
+from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import SignalHandler
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from openedx.core.djangoapps.content.course_structures.models import CourseStructure
 from openedx.core.djangoapps.content.course_structures.signals import listen_for_course_publish
+from openedx.core.djangoapps.content.course_structures import tasks
 from openedx.core.djangoapps.content.course_structures.tasks import _generate_course_structure, update_course_structure
 
 
@@ -163,3 +167,66 @@ class CourseStructureTaskTests(ModuleStoreTestCase):
         cs = CourseStructure.objects.get(course_id=course_id)
         self.assertEqual(cs.course_id, course_id)
         self.assertEqual(cs.structure, structure)
+
+
+class IncrementalCourseStructureTaskTests(SignalDisconnectTestMixin, ModuleStoreTestCase):
+    """
+    Tests that the course structures of split modulestore courses are updated incrementally.
+    """
+    def setUp(self):
+        super(IncrementalCourseStructureTaskTests, self).setUp()
+        self.course = CourseFactory.create(default_store=ModuleStoreEnum.Type.split)
+        self.chapters = [
+            ItemFactory.create(parent=self.course, category='chapter', display_name='Chapter {}'.format(index))
+            for index in range(3)
+        ]
+        self.sequential = ItemFactory.create(parent=self.chapters[0], category='sequential')
+        CourseStructure.objects.all().delete()
+        update_course_structure(unicode(self.course.id))
+
+    def assert_structure_updated_incrementally(self):
+        """
+        Update the course structure, and verify that it matches a fully regenerated one although the course was not
+        fully regenerated.
+        """
+        with patch.object(tasks, '_generate_course_structure', wraps=_generate_course_structure) as mock_generate:
+            update_course_structure(unicode(self.course.id))
+        self.assertFalse(mock_generate.called)
+        self.assertDictEqual(CourseStructure.objects.get(course_id=self.course.id).structure,
+                             _generate_course_structure(self.course.id))
+
+    def test_version_stored(self):
+        self.assertEqual(
+            CourseStructure.objects.get(course_id=self.course.id).version,
+            tasks._get_split_course_version(self.course.id)  # pylint: disable=protected-access
+        )
+
+    def test_block_added(self):
+        ItemFactory.create(parent=self.sequential, category='vertical', display_name='New Unit')
+        self.assert_structure_updated_incrementally()
+
+    def test_block_edited(self):
+        self.sequential.graded = True
+        self.sequential.format = 'Homework'
+        self.store.update_item(self.sequential, self.user.id)
+        self.assert_structure_updated_incrementally()
+
+    def test_block_deleted(self):
+        self.store.delete_item(self.sequential.location, self.user.id)
+        self.assert_structure_updated_incrementally()
+
+    def test_unchanged_version_not_regenerated(self):
+        with patch.object(tasks, '_generate_course_structure') as mock_generate:
+            with patch.object(tasks, '_update_course_structure_from_versions') as mock_update:
+                update_course_structure(unicode(self.course.id))
+        self.assertFalse(mock_generate.called)
+        self.assertFalse(mock_update.called)
+        self.assertDictEqual(CourseStructure.objects.get(course_id=self.course.id).structure,
+                             _generate_course_structure(self.course.id))
+
+    def test_unknown_version_falls_back(self):
+        CourseStructure.objects.filter(course_id=self.course.id).update(version='0' * 24)
+        ItemFactory.create(parent=self.sequential, category='vertical')
+        with patch.object(tasks, '_generate_course_structure', wraps=_generate_course_structure) as mock_generate:
+            update_course_structure(unicode(self.course.id))
+        self.assertTrue(mock_generate.called)